@@ -0,0 +1,38 @@
+"""Composite (symbol, timestamp) index on market_data
+
+Revision ID: 002_market_data_index
+Revises: 001_initial_schema
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_market_data_index'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_market_data_symbol_timestamp'
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    # market_data was historically created by DatabaseService itself
+    if not inspector.has_table('market_data'):
+        op.create_table(
+            'market_data',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('symbol', sa.String()),
+            sa.Column('timestamp', sa.DateTime()),
+            sa.Column('price', sa.Float()),
+            sa.Column('volume', sa.Float()),
+        )
+    existing = {index['name'] for index in inspector.get_indexes('market_data')} if inspector.has_table('market_data') else set()
+    if INDEX_NAME not in existing:
+        op.create_index(INDEX_NAME, 'market_data', ['symbol', 'timestamp'])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name='market_data')
@@ -0,0 +1,40 @@
+"""Append-only analysis_results history table
+
+Revision ID: 003_analysis_results
+Revises: 002_market_data_index
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_analysis_results'
+down_revision = '002_market_data_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'analysis_results',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('analysis_id', sa.String(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('agent_name', sa.String(), nullable=False),
+        sa.Column('verdict', sa.String(), nullable=True),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('value', sa.Float(), nullable=True),
+        sa.Column('as_of', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_analysis_results_symbol_as_of', 'analysis_results', ['symbol', 'as_of'])
+    op.create_index(
+        'ix_analysis_results_symbol_agent_as_of', 'analysis_results', ['symbol', 'agent_name', 'as_of']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analysis_results_symbol_agent_as_of', table_name='analysis_results')
+    op.drop_index('ix_analysis_results_symbol_as_of', table_name='analysis_results')
+    op.drop_table('analysis_results')
@@ -1,7 +1,5 @@
-import pandas as pd
-import numpy as np
 import json
-from backend.utils.data_provider import fetch_price_series, fetch_eps_data
+from backend.utils.data_provider import fetch_price_frame, fetch_eps_data
 from backend.agents.event.earnings_calendar_agent import run as earnings_run
 from backend.agents.event.corporate_actions_agent import run as corp_run
 from backend.utils.cache_utils import get_redis_client
@@ -20,28 +18,14 @@ async def run(symbol: str, agent_outputs: dict = {}) -> dict:
         return json.loads(cached)
 
     # 1) Fetch price series (60d) and compute 50-day MA
-    prices = await fetch_price_series(symbol, source_preference=["api", "scrape"])
-    
-    price_series_1d = None
-    if prices is not None:
-        if isinstance(prices, pd.Series):
-            price_series_1d = prices
-        elif isinstance(prices, np.ndarray) and prices.ndim == 1:
-            price_series_1d = pd.Series(prices)
-        elif isinstance(prices, np.ndarray) and prices.ndim > 1:
-            # Assuming close price is at a specific column, e.g., index 3 for OHLCV
-            if prices.shape[1] > 3: # Ensure the column exists
-                price_series_1d = pd.Series(prices[:, 3])
-        elif isinstance(prices, list): # Basic list handling
-             price_series_1d = pd.Series(prices)
+    prices = await fetch_price_frame(symbol, source_preference=["api", "scrape"])
 
     ma50 = None
     current_price = None
-    if price_series_1d is not None and not price_series_1d.empty:
-        current_price = price_series_1d.iloc[-1]
-        ma50 = (price_series_1d.rolling(window=50).mean().iloc[-1]
-                if len(price_series_1d) >= 50 else price_series_1d.mean())
- 
+    if not prices.empty:
+        current_price = prices.last
+        ma50 = float(prices.close[-50:].mean())
+
     # 2) Fetch EPS time series, compute QoQ growth
     eps_ts = await fetch_eps_data(symbol)
     eps_growth = None
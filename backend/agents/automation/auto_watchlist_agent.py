@@ -1,70 +1,42 @@
-from backend.utils.data_provider import fetch_price_series
+from backend.utils.data_provider import fetch_price_frame, fetch_price_panel
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.price_panel import PricePanel
+from backend.quant.panel import compute_indicators_panel, latest_values
 from backend.config.settings import settings
 from backend.agents.automation.utils import tracker
-import pandas as pd
-import numpy as np
 import json # Import json
 from loguru import logger # Add logger import
+from typing import Dict, List
 
 agent_name = "auto_watchlist_agent"
 
+# Return since the first bar of the fetched window, for every symbol in one pass
+MOMENTUM_SPEC = {"momentum": {"lookbacks": [None]}}
 
-async def run(symbol: str, agent_outputs: dict = {}) -> dict:
-    redis_client = await get_redis_client()
-    cache_key = f"{agent_name}:{symbol}"
-    cached = await redis_client.get(cache_key)
-    if cached:
-        try:
-            return json.loads(cached)
-        except json.JSONDecodeError:
-            pass # Fall through to recompute if cache is corrupt
 
-    # Fetch 30-day price series to check momentum
-    prices = await fetch_price_series(symbol, source_preference=["api", "scrape"])
+def _window_momentum(panel: PricePanel) -> Dict[str, float]:
+    # Momentum needs at least two bars; symbols without history get none
+    if not len(panel) or panel.bars < 2:
+        return {}
+    latest = latest_values(compute_indicators_panel(panel, MOMENTUM_SPEC))["momentum.window"]
+    return dict(zip(panel.symbols, latest.tolist()))
 
+
+def _evaluate(symbol: str, agent_outputs: dict, momentum) -> dict:
     # Evaluate signals from agent_outputs
     flags = []
     for key, out in agent_outputs.items():
         if out.get("verdict") in ("STRONG_BUY", "BUY", "POSITIVE"):
             flags.append(key)
 
-    # Simple momentum: last price > first, ensure prices is a non-empty Series or list of numbers
-    if isinstance(prices, pd.Series) and not prices.empty:
-        # Ensure numeric types before comparison if series can hold objects
-        if pd.api.types.is_numeric_dtype(prices.dtype): # Check dtype of series
-            if prices.iloc[-1] > prices.iloc[0]:
-                flags.append("Positive Momentum")
-        else:
-            # Attempt to convert to numeric if possible, coercing errors
-            numeric_prices = pd.to_numeric(prices, errors='coerce')
-            if not numeric_prices.empty and not numeric_prices.isnull().all() and pd.api.types.is_numeric_dtype(numeric_prices.dtype):
-                 # Check first and last valid numbers
-                first_valid = numeric_prices.dropna().iloc[0] if not numeric_prices.dropna().empty else None
-                last_valid = numeric_prices.dropna().iloc[-1] if not numeric_prices.dropna().empty else None
-                if first_valid is not None and last_valid is not None and last_valid > first_valid:
-                    flags.append("Positive Momentum")
-                elif not (first_valid is not None and last_valid is not None) : # only log if we couldn't compare
-                    logger.warning(f"auto_watchlist_agent: Prices series for {symbol} could not be reliably converted to numeric for momentum check.")
-            else:
-                logger.warning(f"auto_watchlist_agent: Prices series for {symbol} is not numeric and could not be converted, skipping momentum.")
-
-    elif isinstance(prices, list) and len(prices) >= 2: # Check if list and has at least two elements
-        # Further check if elements are numeric before comparison
-        first_price = prices[0]
-        last_price = prices[-1]
-        if isinstance(first_price, (int, float)) and isinstance(last_price, (int, float)):
-            if last_price > first_price:
-                flags.append("Positive Momentum")
-        else:
-            logger.warning(f"auto_watchlist_agent: Prices list for {symbol} contains non-numeric elements at boundaries, skipping momentum.")
-    elif prices is not None and not isinstance(prices, pd.Series) and not isinstance(prices, list): # Catch other truthy but unhandled price types
-        logger.warning(f"auto_watchlist_agent: Unhandled prices type for {symbol}: {type(prices)}, skipping momentum.")
+    # Simple momentum: last price > first
+    if momentum is not None and momentum > 0:
+        flags.append("Positive Momentum")
 
     verdict = "WATCH" if flags else "IGNORE"
     confidence = min(len(flags) / (len(agent_outputs) + 1), 1.0)
 
-    result = {
+    return {
         "symbol": symbol,
         "verdict": verdict,
         "confidence": round(confidence, 4),
@@ -74,6 +46,42 @@ async def run(symbol: str, agent_outputs: dict = {}) -> dict:
         "agent_name": agent_name,
     }
 
+
+async def run(symbol: str, agent_outputs: dict = {}) -> dict:
+    redis_client = await get_redis_client()
+    cache_key = f"{agent_name}:{symbol}"
+    cached = await redis_client.get(cache_key)
+    if cached:
+        try:
+            return json.loads(cached)
+        except json.JSONDecodeError:
+            pass # Fall through to recompute if cache is corrupt
+
+    # Fetch 30-day price series to check momentum
+    prices = await fetch_price_frame(symbol, source_preference=["api", "scrape"])
+    momentum = None
+    if len(prices) >= 2:
+        momentum = _window_momentum(PricePanel.from_frames({symbol: prices})).get(symbol)
+    result = _evaluate(symbol, agent_outputs, momentum)
+
     await redis_client.set(cache_key, json.dumps(result), ex=settings.agent_cache_ttl)
     tracker.update("automation", agent_name, "implemented")
     return result
+
+
+async def run_batch(symbols: List[str], agent_outputs: Dict[str, dict] = None) -> Dict[str, dict]:
+    """Evaluate a whole watchlist, fetching prices concurrently and computing momentum as one panel."""
+    agent_outputs = agent_outputs or {}
+    panel = await fetch_price_panel(symbols, source_preference=["api", "scrape"])
+    momentum = _window_momentum(panel)
+    missing = [symbol for symbol in symbols if symbol not in momentum]
+    if missing:
+        logger.warning(f"{agent_name}: no price history for {missing}")
+
+    redis_client = await get_redis_client()
+    results = {}
+    for symbol in symbols:
+        results[symbol] = _evaluate(symbol, agent_outputs.get(symbol, {}), momentum.get(symbol))
+        await redis_client.set(f"{agent_name}:{symbol}", json.dumps(results[symbol]), ex=settings.agent_cache_ttl)
+    tracker.update("automation", agent_name, "implemented")
+    return results
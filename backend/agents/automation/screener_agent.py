@@ -0,0 +1,146 @@
+from backend.utils.data_provider import fetch_price_panel
+from backend.utils.cache_utils import get_redis_client
+from backend.config.settings import settings
+from backend.agents.automation.utils import tracker
+from backend.quant.panel import compute_indicators_panel, latest_frame
+from loguru import logger
+from typing import Dict, List, Optional
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+agent_name = "screener_agent"
+
+# Indicators every screen needs; all symbols are computed in one panel pass
+SCREEN_SPEC = {
+    "rsi": {"period": 14},
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+    "sma_cross": {"fast": 50, "slow": 200},
+    "bollinger": {"window": 20, "num_std": 2.0},
+    "adx": {"window": 14},
+    "momentum": {"lookbacks": [21, 126]},
+}
+
+BUY_THRESHOLD = 0.6
+AVOID_THRESHOLD = 0.4
+
+
+def score_universe(latest: pd.DataFrame) -> pd.DataFrame:
+    """Score each symbol (row of ``latest_frame``) between 0 and 1 from its latest indicators.
+
+    The score averages RSI headroom, the 50/200 SMA trend, the MACD histogram
+    sign, the position inside the Bollinger bands and the symbol's 126-bar
+    momentum percentile within the universe. Components that are not
+    available yet (short history) are skipped.
+    """
+    components = pd.DataFrame(index=latest.index)
+    components["rsi"] = ((70 - latest["rsi"]) / 40).clip(0, 1)
+    spread, histogram = latest["sma_cross.spread"], latest["macd.histogram"]
+    components["trend"] = np.where(spread.isna(), np.nan, (spread > 0).astype(float))
+    components["macd"] = np.where(histogram.isna(), np.nan, (histogram > 0).astype(float))
+    components["bands"] = (1 - latest["bollinger.percent_b"]).clip(0, 1)
+    components["momentum"] = latest["momentum.126"].rank(pct=True)
+
+    scored = pd.DataFrame(index=latest.index)
+    scored["score"] = components.mean(axis=1, skipna=True).fillna(0.5)
+    scored["verdict"] = np.select(
+        [scored["score"] >= BUY_THRESHOLD, scored["score"] <= AVOID_THRESHOLD], ["BUY", "AVOID"], "WATCH"
+    )
+    return scored
+
+
+def _signals(row: pd.Series) -> List[str]:
+    signals = []
+    if row["rsi"] < 30:
+        signals.append("RSI Oversold")
+    elif row["rsi"] > 70:
+        signals.append("RSI Overbought")
+    if row["sma_cross.cross"] == 1:
+        signals.append("Golden Cross")
+    elif row["sma_cross.cross"] == -1:
+        signals.append("Death Cross")
+    if row["bollinger.percent_b"] < 0:
+        signals.append("Below Lower Band")
+    elif row["bollinger.percent_b"] > 1:
+        signals.append("Above Upper Band")
+    if row.get("adx.adx", np.nan) > 25:
+        signals.append("Strong Trend")
+    return signals
+
+
+def _clean(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else round(float(value), 4)
+
+
+async def run(symbols: List[str], top_n: Optional[int] = None) -> Dict:
+    """Screen a universe of symbols with the technical indicators computed cross-sectionally."""
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    symbols = list(dict.fromkeys(symbols))
+    redis_client = await get_redis_client()
+    universe_key = hashlib.sha1(",".join(sorted(symbols)).encode()).hexdigest()
+    cache_key = f"{agent_name}:{universe_key}:{top_n}"
+    cached = await redis_client.get(cache_key)
+    if cached:
+        try:
+            return json.loads(cached)
+        except json.JSONDecodeError:
+            pass  # Fall through to recompute if cache is corrupt
+
+    panel = await fetch_price_panel(symbols, source_preference=["api", "scrape"])
+    skipped = [symbol for symbol in symbols if symbol not in panel.symbols]
+    if not len(panel):
+        return {
+            "symbol": ", ".join(symbols),
+            "verdict": "NO_DATA",
+            "confidence": 0.0,
+            "value": 0,
+            "details": {"reason": "No price history for any symbol", "skipped": skipped},
+            "score": 0.0,
+            "agent_name": agent_name,
+        }
+
+    spec = SCREEN_SPEC
+    if panel.high is None or panel.low is None:
+        spec = {name: params for name, params in SCREEN_SPEC.items() if name != "adx"}  # close-only history
+    latest = latest_frame(compute_indicators_panel(panel, spec), panel)
+    scored = score_universe(latest).sort_values("score", ascending=False, kind="stable")
+    ranked = []
+    for symbol, row in scored.iterrows():
+        indicators = latest.loc[symbol]
+        ranked.append({
+            "symbol": symbol,
+            "score": round(float(row["score"]), 4),
+            "verdict": row["verdict"],
+            "signals": _signals(indicators),
+            "indicators": {
+                "rsi": _clean(indicators["rsi"]),
+                "macd_histogram": _clean(indicators["macd.histogram"]),
+                "sma_spread": _clean(indicators["sma_cross.spread"]),
+                "percent_b": _clean(indicators["bollinger.percent_b"]),
+                "adx": _clean(indicators.get("adx.adx")),
+                "momentum_21": _clean(indicators["momentum.21"]),
+                "momentum_126": _clean(indicators["momentum.126"]),
+            },
+        })
+    if top_n is not None:
+        ranked = ranked[:top_n]
+    shortlist = [entry["symbol"] for entry in ranked if entry["verdict"] == "BUY"]
+    if skipped:
+        logger.warning(f"{agent_name}: no price history for {len(skipped)} of {len(symbols)} symbols")
+
+    confidence = float(scored["score"].mean())
+    result = {
+        "symbol": ", ".join(symbols),
+        "verdict": "COMPLETED",
+        "confidence": round(confidence, 4),
+        "value": len(shortlist),
+        "details": {"ranked": ranked, "shortlist": shortlist, "skipped": skipped, "bars": panel.bars},
+        "score": round(confidence, 4),
+        "agent_name": agent_name,
+    }
+
+    await redis_client.set(cache_key, json.dumps(result), ex=settings.agent_cache_ttl)
+    tracker.update("automation", agent_name, "implemented")
+    return result
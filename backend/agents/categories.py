@@ -172,7 +172,7 @@ class CategoryManager:
             "target_price_agent",
             "theme_match_agent",
             "peer_compare_agent",
-            # "factor_score_agent", # Removed - Missing file (base.py)
+            "factor_score_agent",
             # "ask_alpha_agent", # Removed - Missing file
             "ask_adam_agent",
         ],
@@ -206,6 +206,21 @@ class CategoryManager:
                 continue
         return agents
 
+    @classmethod
+    def get_agent_cache_names(cls, category: CategoryType) -> List[str]:
+        """Names the category's agents cache their results under (their module-level agent_name)."""
+        names = []
+        for agent_name in cls._agent_registry.get(category, []):
+            try:
+                module = importlib.import_module(
+                    f"backend.agents.{category.value}.{agent_name}"
+                )
+            except Exception:
+                # execute_category reports broken modules; nothing to prefetch for them
+                continue
+            names.append(getattr(module, "agent_name", agent_name))
+        return names
+
     @classmethod
     async def execute_category(
         cls, category: CategoryType, symbol: str, context: Dict = None # Context parameter is kept for signature compatibility but ignored
@@ -2,65 +2,22 @@
 
 import asyncio
 import functools
-import json
 import inspect
 from loguru import logger
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import (
+    CacheDecodeError,
+    decode_cache_value,
+    encode_cache_value,
+    robust_json_serializer,  # Re-exported for existing importers
+)
+from backend.utils.cache_batch import current_cache_batch
 from backend.monitor.tracker import get_tracker
-from datetime import datetime
-import numpy as np
-import pandas as pd
-from decimal import Decimal
-from pydantic import BaseModel
 
-# Helper function for robust JSON serialization
-def robust_json_serializer(obj):
-    if isinstance(obj, (datetime, pd.Timestamp)):
-        return obj.isoformat()
-    if isinstance(obj, np.integer):
-        return int(obj)
-    # Handle np.floating first, then Python floats for NaN/Infinity
-    if isinstance(obj, np.floating):
-        if np.isnan(obj):
-            return None
-        if np.isinf(obj):
-            # Represent infinity as a string, as JSON standard doesn't support Infinity literal
-            return "Infinity" if obj > 0 else "-Infinity"
-        return float(obj)
-    if isinstance(obj, float): # Handle standard Python floats for NaN/Infinity
-        if np.isnan(obj): # Use np.isnan for Python floats too for consistency
-            return None
-        if np.isinf(obj): # Use np.isinf for Python floats too
-            return "Infinity" if obj > 0 else "-Infinity"
-        return obj # Return the float if it's a normal number
-    if isinstance(obj, np.ndarray):
-        return obj.tolist()
-    if isinstance(obj, np.bool_):
-        return bool(obj)
-    if isinstance(obj, BaseModel): # Check for Pydantic models
-        try:
-            return obj.model_dump() # pydantic v2
-        except AttributeError:
-            return obj.dict() # pydantic v1
-    if isinstance(obj, Decimal): # Handle Decimal type
-        return float(obj)
-    
-    # If it's a standard Python type that json.dumps can handle, return it directly.
-    # This check should come after specific type handlers like float for NaN/Inf.
-    if isinstance(obj, (dict, list, str, int, bool, type(None))):
-        return obj
-        
-    # Last resort for any other unhandled type
-    try:
-        # It's generally safer to avoid str(obj) if it's not a known serializable structure,
-        # as str(obj) might not be a valid JSON component or could be misleading.
-        # However, if we must serialize, provide a clear indication of type.
-        logger.warning(f"robust_json_serializer: Attempting to convert unhandled type {type(obj)} to string. Value snippet: {str(obj)[:100]}")
-        return f"UNSERIALIZABLE_TYPE_{type(obj).__name__}:{str(obj)}"
-    except Exception as e:
-        logger.error(f"robust_json_serializer: Failed to convert object of type {type(obj)} to string: {e}")
-        # Raising TypeError here will be caught by the caller of json.dumps
-        raise TypeError(f"Object of type {type(obj).__name__} could not be converted to string for JSON serialization by robust_json_serializer")
+
+def agent_cache_key(agent_name: str, symbol: str) -> str:
+    """Cache key under which an agent's result for ``symbol`` is stored."""
+    return f"{agent_name}:{symbol}"
 
 
 def standard_agent_execution(agent_name: str, category: str, cache_ttl: int = 3600):
@@ -89,8 +46,10 @@ def standard_agent_execution(agent_name: str, category: str, cache_ttl: int = 36
                 }
 
             symbol = args[0]
-            cache_key = f"{agent_name}:{symbol}"
+            cache_key = agent_cache_key(agent_name, symbol)
             result = None
+            # Set when the orchestrator batches this run's reads and writes
+            batch = current_cache_batch()
             
             try:
                 # Get Redis client instance - always use the synchronous version in test mode
@@ -105,7 +64,10 @@ def standard_agent_execution(agent_name: str, category: str, cache_ttl: int = 36
                 # client_to_use = await redis_client if asyncio.iscoroutine(redis_client) else redis_client
                 client_to_use = redis_client # Assuming get_redis_client already returned an awaited client instance
 
-                if hasattr(client_to_use.get, "__await__"): # Check if the 'get' method itself is awaitable
+                if batch is not None and batch.is_prefetched(cache_key):
+                    # Already fetched by the run's MGET; no round trip needed
+                    _raw_cache_val = batch.lookup(cache_key)
+                elif hasattr(client_to_use.get, "__await__"): # Check if the 'get' method itself is awaitable
                     _raw_cache_val = await client_to_use.get(cache_key)
                 else: # 'get' method is synchronous (but might return a coroutine)
                     _raw_cache_val = client_to_use.get(cache_key)
@@ -116,30 +78,20 @@ def standard_agent_execution(agent_name: str, category: str, cache_ttl: int = 36
                 else:
                     _resolved_cache_val = _raw_cache_val
                 
-                # Proceed if _resolved_cache_val is not None (could be empty string, which is handled by json.loads)
+                # Proceed if _resolved_cache_val is not None (could be empty string, which the codec rejects)
                 if _resolved_cache_val is not None:
-                    _data_to_load = _resolved_cache_val
-                    if isinstance(_data_to_load, bytes): # Decode if cache returned bytes
-                        _data_to_load = _data_to_load.decode('utf-8') 
-
-                    if isinstance(_data_to_load, str): # Ensure it's a string for json.loads
-                        try:
-                            cached_result = json.loads(_data_to_load)
-                            logger.debug(f"Cache hit for {cache_key}")
-                            # Note: Original code's tracker update for cache hit might be elsewhere or in finally block
-                            return cached_result 
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Failed to decode cached JSON for {cache_key}. Data: '{_data_to_load!r}'. Error: {e}. Fetching fresh data.")
-                            # Fall through to treat as cache miss
-                    else:
-                        # If _resolved_cache_val was not None, but not bytes or str after processing
-                        logger.warning(f"Cached data for {cache_key} is of unexpected type: {type(_data_to_load)}. Value: '{_data_to_load!r}'. Fetching fresh data.")
+                    try:
+                        cached_result = decode_cache_value(_resolved_cache_val)
+                        logger.debug(f"Cache hit for {cache_key}")
+                        # Note: Original code's tracker update for cache hit might be elsewhere or in finally block
+                        return cached_result
+                    except CacheDecodeError as e:
+                        logger.warning(f"Failed to decode cached value for {cache_key}. Data: '{_resolved_cache_val!r}'. Error: {e}. Fetching fresh data.")
                         # Fall through to treat as cache miss
-                
+
                 # If we reach here, it implies a cache miss:
                 # - _resolved_cache_val was None initially
-                # - Or, it was not a string/bytes
-                # - Or, json.loads failed
+                # - Or, the cached payload could not be decoded
                 logger.debug(f"Cache miss for {cache_key}")
                 # 2. Execute Core Logic
                 # Attempt to execute the agent function
@@ -162,16 +114,20 @@ def standard_agent_execution(agent_name: str, category: str, cache_ttl: int = 36
                         if result and result.get("verdict") not in ["ERROR", "NO_DATA", None]:
                             try:
                                 # Handle both sync and async set methods
-                                cache_data = json.dumps(result, default=robust_json_serializer)
+                                cache_data = encode_cache_value(result, default=robust_json_serializer)
                                 
-                                # Call the method, then check if the result is awaitable
-                                set_operation_result = redis_client.set(cache_key, cache_data, ex=cache_ttl)
-                                if inspect.isawaitable(set_operation_result):
-                                    await set_operation_result
+                                if batch is not None:
+                                    # Written in one pipeline when the batch is flushed
+                                    batch.stage(cache_key, cache_data, ex=cache_ttl)
+                                else:
+                                    # Call the method, then check if the result is awaitable
+                                    set_operation_result = redis_client.set(cache_key, cache_data, ex=cache_ttl)
+                                    if inspect.isawaitable(set_operation_result):
+                                        await set_operation_result
                                 
                                 logger.debug(f"Cached result for {cache_key} with TTL {cache_ttl}s")
                             except TypeError as json_err:
-                                logger.error(f"Failed to serialize result for {cache_key} to JSON using robust_json_serializer: {json_err}. Result not cached.")
+                                logger.error(f"Failed to serialize result for {cache_key} using the cache codec: {json_err}. Result not cached.")
                             except Exception as cache_err:
                                 logger.error(f"Failed to set cache for {cache_key}: {cache_err}. Result not cached.")                        # 4. Update Tracker
                         try:
@@ -1,14 +1,16 @@
-from backend.utils.cache_utils import redis_client
+from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.esg.utils import fetch_esg_breakdown, tracker
 
 agent_name = "composite_esg_agent"
 
 
 async def run(symbol: str, agent_outputs: dict) -> dict:
-    cache_key = f"{agent_name}:{{symbol}}"
+    redis_client = await get_redis_client()
+    cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     try:
         # Fetch breakdown or use sub-agent outputs
@@ -55,7 +57,7 @@ async def run(symbol: str, agent_outputs: dict) -> dict:
                 "agent_name": agent_name,
             }
 
-        await redis_client.set(cache_key, result, ex=3600)
+        await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
         tracker.update("esg", agent_name, "implemented")
         return result
 
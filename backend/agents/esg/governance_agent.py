@@ -1,4 +1,5 @@
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.esg.utils import fetch_esg_breakdown, tracker
 
 agent_name = "governance_agent"
@@ -10,7 +11,7 @@ async def run(symbol: str) -> dict:
     # Cache check
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch ESG breakdown
     scores = await fetch_esg_breakdown(symbol)
@@ -47,6 +48,6 @@ async def run(symbol: str) -> dict:
         }
 
     # Cache & track
-    await redis_client.set(cache_key, result, ex=3600)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
     tracker.update("esg", agent_name, "implemented")
     return result
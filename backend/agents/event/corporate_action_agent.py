@@ -1,5 +1,6 @@
 import httpx
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.event.utils import tracker
 
 agent_name = "corporate_action_agent"
@@ -10,7 +11,7 @@ async def run(symbol: str) -> dict:
     cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch corporate actions from an API or scrape data
     actions = []
@@ -57,6 +58,6 @@ async def run(symbol: str) -> dict:
             "agent_name": agent_name,
         }
 
-    await redis_client.set(cache_key, result, ex=86400)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=86400)
     tracker.update("event", agent_name, "implemented")
     return result
@@ -1,6 +1,7 @@
 import httpx
 import datetime
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.event.utils import tracker
 # Import the specific data provider function
 from backend.utils.data_provider import fetch_corporate_actions
@@ -13,7 +14,7 @@ async def run(symbol: str) -> dict:
     cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch corporate actions using the data_provider function
     actions = []
@@ -64,6 +65,6 @@ async def run(symbol: str) -> dict:
             "agent_name": agent_name,
         }
 
-    await redis_client.set(cache_key, result, ex=86400)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=86400)
     tracker.update("event", agent_name, "implemented")
     return result
@@ -1,16 +1,18 @@
 import datetime
 import pandas as pd
-from backend.utils.cache_utils import redis_client
+from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.event.utils import fetch_alpha_events, tracker
 
 agent_name = "dividend_declaration_agent"
 
 
 async def run(symbol: str) -> dict:
+    redis_client = await get_redis_client()
     cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # 1) Fetch dividend data via AlphaVantage TIME_SERIES_DAILY_ADJUSTED
     data = await fetch_alpha_events(symbol, "TIME_SERIES_DAILY_ADJUSTED")
@@ -55,6 +57,6 @@ async def run(symbol: str) -> dict:
             "agent_name": agent_name,
         }
 
-    await redis_client.set(cache_key, result, ex=86400)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=86400)
     tracker.update("event", agent_name, "implemented")
     return result
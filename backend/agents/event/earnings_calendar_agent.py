@@ -1,5 +1,6 @@
 import httpx
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.event.utils import tracker
 # Import the specific data provider function
 from backend.utils.data_provider import fetch_earnings_calendar
@@ -13,7 +14,7 @@ async def run(symbol: str) -> dict:
     redis_client = await get_redis_client() # Ensure redis client is awaited
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch earnings calendar data using the data_provider function
     earnings_data = None
@@ -56,6 +57,6 @@ async def run(symbol: str) -> dict:
             "agent_name": agent_name,
         }
 
-    await redis_client.set(cache_key, result, ex=86400)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=86400)
     tracker.update("event", agent_name, "implemented")
     return result
@@ -1,5 +1,6 @@
 import pandas as pd
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.utils.data_provider import fetch_eps_data
 from backend.agents.forecast.utils import tracker
 
@@ -11,7 +12,7 @@ async def run(symbol: str) -> dict:
     cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch EPS history
     eps_ts = await fetch_eps_data(symbol)
@@ -53,6 +54,6 @@ async def run(symbol: str) -> dict:
             "agent_name": agent_name,
         }
 
-    await redis_client.set(cache_key, result, ex=None)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=None)
     tracker.update("forecast", agent_name, "implemented")
     return result
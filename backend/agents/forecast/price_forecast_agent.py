@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.utils.data_provider import fetch_price_series
 from backend.agents.forecast.utils import tracker
 
@@ -12,7 +13,7 @@ async def run(symbol: str) -> dict:
     cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch price series (60 days)
     prices = await fetch_price_series(symbol, source_preference=["api", "scrape"])
@@ -49,6 +50,6 @@ async def run(symbol: str) -> dict:
             "agent_name": agent_name,
         }
 
-    await redis_client.set(cache_key, result, ex=None)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=None)
     tracker.update("forecast", agent_name, "implemented")
     return result
@@ -1,4 +1,6 @@
+from typing import Optional
 from backend.agents.base.category_bases import IntelligenceAgentBase
+from backend.quant.factor_model import get_factor_model
 import numpy as np
 from loguru import logger
 
@@ -6,24 +8,39 @@ agent_name = "factor_score_agent"
 
 
 class FactorScoreAgent(IntelligenceAgentBase):
+    SCORED_AGENTS = (
+        "pe_ratio_agent", "peg_ratio_agent", "pb_ratio_agent", "rsi_agent", "macd_agent",
+        "momentum_agent", "risk_core_agent", "liquidity_agent", "earnings_yield_agent",
+    )
+
     async def _execute(self, symbol: str, agent_outputs: dict) -> dict:
         try:
-            # Extract key factors from agent outputs
-            factors = {
-                "value": self._get_value_score(agent_outputs),
-                "momentum": self._get_momentum_score(agent_outputs),
-                "quality": self._get_quality_score(agent_outputs),
-                "growth": self._get_growth_score(agent_outputs),
-            }
-
-            # Calculate composite score with regime-aware weights
             market_context = await self.get_market_context(symbol)
             regime = market_context.get("regime", "NEUTRAL")
+            model_score = None
+            if not any(agent in agent_outputs for agent in self.SCORED_AGENTS):
+                # Run on its own (e.g. by the category registry): rank the symbol's
+                # factor-implied return across the universe, if the model is fitted
+                model_score = await self._get_factor_model_score(symbol)
+
+            if model_score is not None:
+                factors = model_score["exposures"]
+                weights = None
+                factor_score = model_score["composite_percentile"]
+            else:
+                # Extract key factors from agent outputs
+                factors = {
+                    "value": self._get_value_score(agent_outputs),
+                    "momentum": self._get_momentum_score(agent_outputs),
+                    "quality": self._get_quality_score(agent_outputs),
+                    "growth": self._get_growth_score(agent_outputs),
+                }
 
-            weights = self._get_regime_weights(regime)
-            factor_score = sum(
-                score * weights[factor] for factor, score in factors.items()
-            )
+                # Calculate composite score with regime-aware weights
+                weights = self._get_regime_weights(regime)
+                factor_score = sum(
+                    score * weights[factor] for factor, score in factors.items()
+                )
 
             if factor_score > 0.7:
                 verdict = "STRONG_FACTORS"
@@ -44,6 +61,7 @@ class FactorScoreAgent(IntelligenceAgentBase):
                     "factor_scores": {k: round(v, 4) for k, v in factors.items()},
                     "weights": weights,
                     "market_regime": regime,
+                    "factor_model": model_score,
                 },
                 "error": None,
                 "agent_name": agent_name,
@@ -53,6 +71,15 @@ class FactorScoreAgent(IntelligenceAgentBase):
             logger.error(f"Factor score calculation error: {e}")
             return self._error_response(symbol, str(e))
 
+    async def _get_factor_model_score(self, symbol: str) -> Optional[dict]:
+        """The symbol's row of the day's cross-sectional factor model, or None"""
+        try:
+            model = await get_factor_model()
+            return model.score(symbol) if model is not None else None
+        except Exception as e:
+            logger.warning(f"Factor model unavailable for {symbol}: {e}")
+            return None
+
     def _get_regime_weights(self, regime: str) -> dict:
         weights = {
             "BULL": {"value": 0.2, "momentum": 0.4, "quality": 0.2, "growth": 0.2},
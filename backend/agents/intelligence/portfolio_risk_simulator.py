@@ -1,39 +1,87 @@
 import numpy as np
-import pandas as pd
 from backend.utils.cache_utils import get_redis_client
-from backend.utils.data_provider import fetch_price_series
+from backend.utils.data_provider import fetch_price_panel
 from backend.agents.intelligence.utils import tracker
+from backend.config.settings import get_settings
+from backend.quant.risk import PortfolioRiskEngine
+from loguru import logger
+import hashlib
 import json # Import json
 
 agent_name = "portfolio_risk_simulator"
 
+# Positions listed in details, largest VaR contribution first
+TOP_CONTRIBUTORS = 10
+
+
+def _rounded(estimate: dict) -> dict:
+    return {"VaR": round(float(estimate["var"]), 4), "CVaR": round(float(estimate["cvar"]), 4)}
+
 
 async def run(symbols: list, weights: list = None) -> dict:
-    redis_client = get_redis_client()
-    cache_key = f"{agent_name}:{','.join(symbols)}"
+    settings = get_settings()
+    risk_settings = settings.agent_settings.portfolio_risk
+    redis_client = await get_redis_client()
+    weights_key = hashlib.sha1(json.dumps(weights).encode()).hexdigest()[:12] if weights is not None else "equal"
+    cache_key = f"{agent_name}:{','.join(symbols)}:{weights_key}"
     cached = await redis_client.get(cache_key)
     if cached:
         # Parse the JSON string from cache before returning
         return json.loads(cached)
 
-    # 1) Fetch price series for each symbol
-    data = {
-        sym: await fetch_price_series(sym, source_preference=["api", "scrape"])
-        for sym in symbols
-    }
-    prices_df = pd.DataFrame(data)
-    # 2) Compute log returns
-    returns = np.log(prices_df / prices_df.shift(1)).dropna()
-    # 3) Default equal weights
+    # 1) Fetch every position's prices concurrently into one date-aligned panel
+    panel = await fetch_price_panel(symbols, source_preference=["api", "scrape"])
+    skipped = [sym for sym in symbols if sym not in panel.symbols]
+    if skipped:
+        logger.warning(f"{agent_name}: no price history for {skipped}; excluded from the portfolio")
+
+    # 2) Weights for the positions that have prices (default equal weights)
     if weights is None:
-        weights = [1 / len(symbols)] * len(symbols)
-    # 4) Portfolio returns
-    port_r = returns.dot(weights)
-    var95 = np.percentile(port_r, 5)
-    cvar95 = port_r[port_r <= var95].mean()
-    # 5) Normalize
-    score = min(abs(cvar95) / abs(var95) if var95 != 0 else 0, 1.0)
-    # Verdict
+        position_weights = np.full(len(panel), 1 / max(len(panel), 1))
+    else:
+        by_symbol = dict(zip(symbols, weights))
+        position_weights = np.array([by_symbol[sym] for sym in panel.symbols], dtype=float)
+
+    engine = PortfolioRiskEngine(panel, position_weights, lookback=risk_settings.LOOKBACK_DAYS) if len(panel) else None
+    observations = engine.observations if engine is not None else 0
+    if observations < risk_settings.MIN_OBSERVATIONS:
+        return {
+            "symbol": ",".join(symbols),
+            "verdict": "NO_DATA",
+            "confidence": 0.0,
+            "value": None,
+            "details": {
+                "reason": f"Need {risk_settings.MIN_OBSERVATIONS} common return observations, got {observations}",
+                "skipped": skipped,
+            },
+            "score": 0.0,
+            "agent_name": agent_name,
+        }
+
+    # 3) VaR/CVaR three ways, plus the per-position decomposition
+    confidence = risk_settings.CONFIDENCE_LEVEL
+    historical = engine.historical_var(confidence)
+    parametric = engine.parametric_var(confidence)
+    monte_carlo = engine.monte_carlo_var(
+        confidence, n_paths=risk_settings.MONTE_CARLO_PATHS, seed=risk_settings.RANDOM_SEED
+    )
+    contributions = engine.var_contributions(confidence)
+    order = np.argsort(contributions["component_var"])[:TOP_CONTRIBUTORS]  # most negative = most risk
+    top_contributors = [
+        {
+            "symbol": panel.symbols[i],
+            "weight": round(float(engine.weights[i]), 4),
+            "marginal_var": round(float(contributions["marginal_var"][i]), 6),
+            "component_var": round(float(contributions["component_var"][i]), 6),
+            "percent_contribution": round(float(contributions["percent_contribution"][i]), 4),
+            "component_cvar_mc": round(float(monte_carlo["component_cvar"][i]), 6),
+        }
+        for i in order
+    ]
+
+    var_h, cvar_h = historical["var"], historical["cvar"]
+    # Verdict on the size of the expected tail loss
+    score = min(abs(cvar_h), 1.0)
     if score < 0.02:
         verdict = "LOW_RISK"
     elif score < 0.05:
@@ -41,17 +89,28 @@ async def run(symbols: list, weights: list = None) -> dict:
     else:
         verdict = "HIGH_RISK"
 
+    level = int(round(confidence * 100))
     result = {
         "symbol": ",".join(symbols),
         "verdict": verdict,
         "confidence": round(score, 4),
-        "value": {"VaR95": round(var95, 4), "CVaR95": round(cvar95, 4)},
-        "details": {},
+        "value": {f"VaR{level}": round(var_h, 4), f"CVaR{level}": round(cvar_h, 4)},
+        "details": {
+            "confidence_level": confidence,
+            "observations": engine.observations,
+            "positions": len(panel),
+            "skipped": skipped,
+            "historical": _rounded(historical),
+            "parametric": _rounded(parametric),
+            "monte_carlo": {**_rounded(monte_carlo), "paths": monte_carlo["paths"]},
+            "portfolio_volatility": round(engine.portfolio_volatility, 6),
+            "top_contributors": top_contributors,
+        },
         "score": score,
         "agent_name": agent_name,
     }
 
     # Convert result to JSON string before caching
-    await redis_client.set(cache_key, json.dumps(result), ex=None) # ex=None means no expiry, consider settings.agent_cache_ttl
+    await redis_client.set(cache_key, json.dumps(result), ex=settings.agent_cache_ttl)
     tracker.update("intelligence", agent_name, "implemented")
     return result
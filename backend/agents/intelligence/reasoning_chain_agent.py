@@ -7,7 +7,7 @@ agent_name = "reasoning_chain_agent"
 
 
 async def run(symbol: str, agent_outputs: dict) -> dict:
-    redis_client = get_redis_client()
+    redis_client = await get_redis_client()
     cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
@@ -1,4 +1,5 @@
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.utils.data_provider import fetch_inflation_rate
 from backend.agents.macro.utils import tracker
 
@@ -6,11 +7,11 @@ agent_name = "inflation_agent"
 
 
 async def run(symbol: str, country: str = "IND") -> dict:
-    redis_client = get_redis_client()
+    redis_client = await get_redis_client()
     cache_key = f"{agent_name}:{country}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     value = await fetch_inflation_rate(country)
     if value is None:
@@ -41,6 +42,6 @@ async def run(symbol: str, country: str = "IND") -> dict:
             "agent_name": agent_name,
         }
 
-    await redis_client.set(cache_key, result, ex=86400)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=86400)
     tracker.update("macro", agent_name, "implemented")
     return result
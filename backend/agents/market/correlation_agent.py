@@ -1,14 +1,17 @@
-from backend.utils.data_provider import fetch_price_series
+from backend.quant.market_model import get_market_model
 from backend.config.settings import get_settings
 import numpy as np
-import pandas as pd
-from loguru import logger
 from backend.agents.decorators import standard_agent_execution
 
 agent_name = "correlation_agent"
 AGENT_CATEGORY = "market"
 
 
+def _stat(model: dict, name: str) -> float:
+    value = model.get(name)
+    return np.nan if value is None else float(value)
+
+
 @standard_agent_execution(
     agent_name=agent_name, category=AGENT_CATEGORY, cache_ttl=3600
 )
@@ -27,18 +30,18 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
         - 60-day correlation between stock and market returns (if sufficient data)
 
     Logic:
-        1. Fetches price series for both the stock symbol and the configured market index.
-        2. Calculates daily percentage returns for both series.
-        3. Aligns the return series by date to ensure matching periods.
-        4. Calculates the correlation coefficient over 30-day and 60-day windows.
-        5. Determines a verdict based on the 30-day correlation level compared to configured thresholds:
+        1. Reads the symbol's row of the daily market model table (`get_market_model`), which
+           regresses every symbol's daily returns on the market index in one batch.
+        2. Takes the correlation coefficient over the 30-day and 60-day windows from it.
+        3. Reports the exponentially weighted correlation alongside them.
+        4. Determines a verdict based on the 30-day correlation level compared to configured thresholds:
            - HIGH_CORRELATION if correlation > settings.THRESHOLD_HIGH_CORRELATION
            - LOW_CORRELATION if correlation < settings.THRESHOLD_LOW_CORRELATION
            - NORMAL_CORRELATION otherwise
-        6. Sets a confidence score based on the strength/clarity of the correlation pattern.
+        5. Sets a confidence score based on the strength/clarity of the correlation pattern.
 
     Dependencies:
-        - Requires price series data for both the stock and market index.
+        - Requires price history for both the stock and market index (via `get_market_model`).
         - Uses the market index symbol defined in settings.data_provider.MARKET_INDEX_SYMBOL.
 
     Configuration Used:
@@ -54,7 +57,7 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
         - verdict (str): 'HIGH_CORRELATION', 'NORMAL_CORRELATION', 'LOW_CORRELATION', or 'NO_DATA'.
         - confidence (float): A fixed confidence value based on the verdict (0.0 to 1.0).
         - value (float | None): The calculated 30-day correlation coefficient, or None if unavailable.
-        - details (dict): Contains 30-day and 60-day correlations, and the market index used.
+        - details (dict): Contains 30-day, 60-day and exponentially weighted correlations, and the market index used.
         - agent_name (str): The name of this agent.
         - error (str | None): Error message if an issue occurred (handled by decorator).
     """
@@ -62,20 +65,13 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
     settings = get_settings()
     corr_settings = settings.agent_settings.correlation
 
-    # Get price data for symbol and market index
-    symbol_prices = await fetch_price_series(symbol)
-    # Use market index from config
+    # Correlations against the market index from the shared market model table
     market_symbol = settings.data_provider.MARKET_INDEX_SYMBOL
-    market_prices = await fetch_price_series(market_symbol)
+    model = (await get_market_model([symbol]))[symbol]
 
     # Use settings for minimum days required
     min_days = corr_settings.MIN_REQUIRED_DAYS
-    if (
-        symbol_prices is None or symbol_prices.empty
-        or market_prices is None or market_prices.empty
-        or len(symbol_prices) < min_days
-        or len(market_prices) < min_days
-    ):
+    if model is None:
         # Return NO_DATA format
         return {
             "symbol": symbol,
@@ -83,79 +79,48 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             "confidence": 0.0,
             "value": None,
             "details": {
-                "reason": f"Insufficient price history for {symbol} or market index {market_symbol} (need {min_days} days)"
+                "reason": f"No price history for {symbol} or market index {market_symbol}"
             },
             "agent_name": agent_name,
         }
 
-    # Calculate returns
-    # Handle 2D price arrays by extracting the closing price column (typically index 3 or 4)
-    # Price data format is typically [date, open, high, low, close, volume, ...]
-    try:
-        # Check if symbol_prices is a 2D array and extract closing prices
-        if isinstance(symbol_prices, np.ndarray) and len(symbol_prices.shape) > 1:
-            close_idx = 3  # Assuming 4th column (index 3) is close price
-            sym_series = pd.Series(symbol_prices[:, close_idx])
-        else:
-            sym_series = pd.Series(symbol_prices)
-            
-        # Similarly for market prices
-        if isinstance(market_prices, np.ndarray) and len(market_prices.shape) > 1:
-            close_idx = 3  # Assuming 4th column (index 3) is close price
-            mkt_series = pd.Series(market_prices[:, close_idx])
-        else:
-            mkt_series = pd.Series(market_prices)
-            
-        sym_ret = sym_series.pct_change().dropna()
-        mkt_ret = mkt_series.pct_change().dropna()
-    except Exception as e:
-        logger.error(f"Error processing price data: {e}")
-        return {
-            "symbol": symbol,
-            "verdict": "ERROR",
-            "confidence": 0.0,
-            "value": None,
-            "details": {"reason": f"Failed to process price data: {str(e)}"},
-            "agent_name": agent_name,
-        }
-
-    # Align returns (simple intersection)
-    common_index = sym_ret.index.intersection(mkt_ret.index)
-    if len(common_index) < min_days:
+    # Bars both traded, over the table's longest window
+    longest = max(settings.agent_settings.market_model.WINDOWS)
+    observations = int(model.get(f"observations_{longest}d") or 0)
+    if observations < min_days:
         return {
             "symbol": symbol,
             "verdict": "NO_DATA",
             "confidence": 0.0,
             "value": None,
             "details": {
-                "reason": f"Insufficient overlapping data points ({len(common_index)} < {min_days}) between {symbol} and {market_symbol}"
+                "reason": f"Insufficient overlapping data points ({observations} < {min_days}) between {symbol} and {market_symbol}"
             },
             "agent_name": agent_name,
         }
-    sym_ret = sym_ret.loc[common_index]
-    mkt_ret = mkt_ret.loc[common_index]
 
     # Use settings for minimum days for 30-day correlation
     min_days_30d = corr_settings.MIN_DAYS_FOR_30D_CORR
-    if len(sym_ret) < min_days_30d or len(mkt_ret) < min_days_30d:
+    if int(model.get("observations_30d") or 0) < min_days_30d:
         return {
             "symbol": symbol,
             "verdict": "NO_DATA",
             "confidence": 0.0,
             "value": None,
             "details": {
-                "reason": f"Insufficient aligned data points for 30d correlation ({len(sym_ret)} points)"
+                "reason": f"Insufficient aligned data points for 30d correlation ({int(model.get('observations_30d') or 0)} points)"
             },
             "agent_name": agent_name,
         }
 
-    # Calculate rolling correlations
-    # Use tail for recent data
-    correlation_30d = sym_ret.tail(30).corr(mkt_ret.tail(30))
+    # Trailing-window correlations
+    correlation_30d = _stat(model, "correlation_30d")
     correlation_60d = (
-        sym_ret.tail(60).corr(mkt_ret.tail(60)) if len(sym_ret) >= 60 else np.nan
+        _stat(model, "correlation_60d") if (model.get("observations_60d") or 0) >= 60 else np.nan
     )
 
+    correlation_ewm = _stat(model, "correlation_ewm")
+
     # Handle potential NaN correlations
     if np.isnan(correlation_30d):
         return {
@@ -196,6 +161,9 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             "correlation_60d": (
                 round(correlation_60d, 4) if not np.isnan(correlation_60d) else None
             ),
+            "correlation_ewm": (
+                round(correlation_ewm, 4) if not np.isnan(correlation_ewm) else None
+            ),
             "market_index_used": market_symbol,
             "config_used": {
                 "high_correlation_threshold": high_corr_threshold,
@@ -1,7 +1,8 @@
 import numpy as np
-from sklearn.mixture import GaussianMixture
-from backend.utils.data_provider import fetch_price_series
+from typing import Optional
+from backend.quant.regime import RegimeModel, get_regime_model
 from backend.utils.cache_utils import get_redis_client
+import json
 import logging
 
 # Adjust the import path as needed; for example, if 'utils.py' is in the same directory:
@@ -16,64 +17,51 @@ logger = logging.getLogger(__name__)  # Set up a logger for this module
 
 
 class MarketRegimeDetector:
-    def __init__(self, n_regimes: int = 3):
-        self.n_regimes = n_regimes
-        self.gmm = GaussianMixture(n_components=n_regimes, random_state=42)
+    """Classifies observations with the shared, already fitted regime model (no per-call refit)."""
 
-    def detect_regime(self, returns: np.array, volatility: np.array) -> dict:
-        """Detect market regime using returns and volatility"""
-        features = np.column_stack([returns, volatility])
-        regime = self.gmm.fit_predict(features)
+    def __init__(self, model: RegimeModel):
+        self.model = model
 
-        # Get latest regime
-        current_regime = regime[-1]
-        regime_probs = self.gmm.predict_proba(features)[-1]
+    def detect_regime(self, features: Optional[np.ndarray] = None) -> dict:
+        """Detect market regime for an observation of (annualised return, annualised volatility).
+
+        Defaults to the latest observation the model was fitted on.
+        """
+        if features is None:
+            features = self.model.latest_features
+        probabilities = self.model.predict_proba(features)
+        current_regime = int(np.argmax(probabilities))
 
         return {
-            "current_regime": int(current_regime),
-            "regime_probability": float(regime_probs[current_regime]),
-            "regime_volatility": float(self.gmm.covariances_[current_regime][1, 1]),
+            "current_regime": current_regime,
+            "regime_label": self.model.labels[current_regime],
+            "regime_probability": float(probabilities[current_regime]),
+            "regime_volatility": float(self.model.means[current_regime][1]),
         }
 
 
 async def run(symbol: str) -> dict:
     cache_key = f"{agent_name}:{symbol}"
-    cached = await (await get_redis_client()).get(cache_key)
+    redis_client = await get_redis_client()
+    cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return json.loads(cached)
 
     try:
-        # Fetch price series
-        prices = await fetch_price_series(symbol)
-        if not prices or len(prices) < 60:
+        # Regime is market-wide: one model fitted on the index serves every symbol
+        model = await get_regime_model()
+        if model is None or model.latest_features is None:
             return {
                 "symbol": symbol,
                 "verdict": "NO_DATA",
                 "confidence": 0.0,
                 "value": None,
-                "details": {},
+                "details": {"reason": "Regime model is not fitted (insufficient market index history)"},
                 "agent_name": agent_name,
             }
 
-        # Calculate returns and volatility
-        returns = np.diff(np.log(prices))
-        volatility = np.std(returns[-30:])
-
-        # Detect market regime
-        detector = MarketRegimeDetector()
-        regime_data = detector.detect_regime(returns, np.full_like(returns, volatility))
-
-        current_regime = regime_data.get("current_regime")
-        if current_regime is None:
-            logger.warning(f"[{agent_name}] Missing 'current_regime' in regime_data for {symbol}")
-            return {
-                "symbol": symbol,
-                "verdict": "NO_DATA",
-                "confidence": 0.0,
-                "value": None,
-                "details": {"reason": "Missing 'current_regime' in regime_data"},
-                "agent_name": agent_name,
-            }
+        regime_data = MarketRegimeDetector(model).detect_regime()
+        current_regime = regime_data["current_regime"]
 
         result = {
             "symbol": symbol,
@@ -84,7 +72,7 @@ async def run(symbol: str) -> dict:
             "agent_name": agent_name,
         }
 
-        await (await get_redis_client()).set(cache_key, result, ex=3600)
+        await redis_client.set(cache_key, json.dumps(result), ex=3600)
         # tracker.update("ml", agent_name, "implemented")  # Uncomment and fix import if tracker is needed
         return result
 
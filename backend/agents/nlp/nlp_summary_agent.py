@@ -1,5 +1,6 @@
 from transformers import pipeline
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 
 # Try importing tracker, fallback to a dummy tracker if not found
 import logging
@@ -18,17 +19,15 @@ except ImportError:
             pass
     tracker = DummyTracker()
 
-# Initialize redis client
-redis_client = get_redis_client()
-
 agent_name = "nlp_summary_agent"
 
 
 async def run(text: str) -> dict:
+    redis_client = await get_redis_client()
     cache_key = f"{agent_name}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     summarizer = pipeline("summarization")
     summary = summarizer(text, max_length=80)[0]["summary_text"]
@@ -43,6 +42,6 @@ async def run(text: str) -> dict:
         "agent_name": agent_name,
     }
 
-    await redis_client.set(cache_key, result, ex=None)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=None)
     tracker.update("nlp", agent_name, "implemented")
     return result
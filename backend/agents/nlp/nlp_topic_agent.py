@@ -1,5 +1,6 @@
 from gensim import corpora, models
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.utils.progress_tracker import ProgressTracker
 
 agent_name = "nlp_topic_agent"
@@ -9,11 +10,11 @@ tracker = ProgressTracker(filepath="backend/utils/progress.json")
 
 
 async def run(texts: list) -> dict:
-    redis_client = get_redis_client()
+    redis_client = await get_redis_client()
     cache_key = f"{agent_name}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     tokens = [t.split() for t in texts]
     dictionary = corpora.Dictionary(tokens)
@@ -31,6 +32,6 @@ async def run(texts: list) -> dict:
         "agent_name": agent_name,
     }
 
-    await redis_client.set(cache_key, result, ex=None)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=None)
     tracker.update("nlp", agent_name, "implemented")
     return result
@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
 import logging  # Import the logging module
-from backend.utils.data_provider import fetch_price_series
+from backend.quant.covariance import get_covariance_service
+from backend.quant.market_model import get_market_model
 from backend.config.settings import get_settings  # Use get_settings()
 from backend.agents.decorators import standard_agent_execution  # Import decorator
 
@@ -34,23 +35,25 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
         - Composite Risk Score: A weighted average of normalized scores derived from Beta, VaR, and Sharpe Ratio.
 
     Logic:
-        1. Fetches historical price series for the stock symbol and the configured market index.
-        2. Calculates daily percentage returns for both series.
-        3. Aligns the return series to ensure calculations are based on overlapping periods.
-        4. Calculates Beta using the covariance of stock/market returns divided by market return variance.
+        1. Reads the symbol's row of the daily market model table (`get_market_model`), which regresses
+           every symbol's daily returns on the market index in one batch.
+        2. Reads the symbol's daily returns over the longest regression window from the covariance service.
+        3. Takes Beta (covariance of stock/market returns divided by market return variance) from the table.
+        4. Reports the regression's R-squared and annualised idiosyncratic volatility alongside it.
         5. Calculates VaR using the percentile of the stock's return distribution based on the configured confidence level.
         6. Calculates the Sharpe Ratio using the mean excess return over the risk-free rate, adjusted for volatility and annualized.
-        7. Calculates the Pearson correlation coefficient between stock and market returns.
+        7. Takes the Pearson correlation coefficient between stock and market returns from the table.
         8. Normalizes Beta, VaR, and Sharpe Ratio into scores between 0 and 1.
         9. Computes a composite score using configured weights for each normalized metric.
         10. Assigns a verdict (LOW_RISK, MODERATE_RISK, HIGH_RISK) based on configured thresholds applied to the composite score.
 
     Dependencies:
         - Requires historical price data for both the target symbol and the market index symbol.
-        - Relies on `fetch_price_series` utility.
+        - Relies on `get_market_model` and `get_covariance_service`.
 
     Configuration Used (from settings.py):
         - `data_provider.MARKET_INDEX_SYMBOL`: The symbol for the market index (e.g., '\^NSEI').
+        - `agent_settings.market_model.WINDOWS`: The longest window is used for the regression, VaR and Sharpe Ratio.
         - `data_provider.RISK_FREE_RATE`: The annualized risk-free rate used for Sharpe Ratio calculation.
         - `agent_settings.beta.VAR_CONFIDENCE_LEVEL`: The confidence level for VaR calculation (e.g., 0.95 for 95%).
         - `agent_settings.beta.SHARPE_ANNUALIZATION_FACTOR`: The number of trading days in a year (e.g., 252) used for Sharpe Ratio annualization.
@@ -63,7 +66,8 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             - verdict (str): 'LOW_RISK', 'MODERATE_RISK', 'HIGH_RISK', 'NO_DATA', or 'ERROR'.
             - confidence (float): The composite risk score (0-100).
             - value (float | None): The calculated Beta value.
-            - details (dict): Contains the individual calculated metrics (beta, VaR, sharpe_ratio, market_correlation),
+            - details (dict): Contains the individual calculated metrics (beta, VaR, sharpe_ratio, market_correlation,
+              r_squared, idiosyncratic_vol),
               the component scores used for the composite calculation, and the configuration values used during the run.
             - error (str | None): Error message if execution failed.
             - agent_name (str): The name of the agent ('beta_agent').
@@ -73,19 +77,15 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
     settings = get_settings()  # Get settings instance
     beta_settings = settings.agent_settings.beta  # Access beta-specific settings
 
-    # Fetch price series for symbol and market index (Core Logic)
-    symbol_prices = await fetch_price_series(symbol)
-    # Use market index from config
-    market_symbol = settings.data_provider.MARKET_INDEX_SYMBOL
-    market_prices = await fetch_price_series(market_symbol)
+    # Beta and correlation come from the shared market model table; returns from the covariance service
+    market_symbol = settings.data_provider.MARKET_INDEX_SYMBOL  # Use market index from config
+    window = max(settings.agent_settings.market_model.WINDOWS)
+    model = (await get_market_model([symbol]))[symbol]
+    service = await get_covariance_service([symbol, market_symbol])
 
     # Validate data length (Core Logic)
-    if (
-        symbol_prices is None or symbol_prices.empty
-        or market_prices is None or market_prices.empty
-        or len(symbol_prices) < 2
-        or len(market_prices) < 2
-    ):
+    observations = (model or {}).get(f"observations_{window}d") or 0
+    if model is None or symbol not in service:
         # Return NO_DATA format (decorator won't cache this)
         return {
             "symbol": symbol,
@@ -97,41 +97,7 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             },
             "agent_name": agent_name,  # Decorator might overwrite this, but good practice
         }
-
-    # Calculate returns (Core Logic)
-    # Handle 2D price arrays by extracting the closing price column
-    try:
-        # Check if symbol_prices is a 2D array and extract closing prices
-        if isinstance(symbol_prices, np.ndarray) and len(symbol_prices.shape) > 1:
-            close_idx = 3  # Assuming 4th column (index 3) is close price
-            sym_series = pd.Series(symbol_prices[:, close_idx])
-        else:
-            sym_series = pd.Series(symbol_prices)
-            
-        # Similarly for market prices
-        if isinstance(market_prices, np.ndarray) and len(market_prices.shape) > 1:
-            close_idx = 3  # Assuming 4th column (index 3) is close price
-            mkt_series = pd.Series(market_prices[:, close_idx])
-        else:
-            mkt_series = pd.Series(market_prices)
-            
-        # A more robust approach would align based on dates if available
-        sym_ret = sym_series.pct_change().dropna()
-        mkt_ret = mkt_series.pct_change().dropna()
-    except Exception as e:
-        logger.error(f"Error processing price data in beta_agent: {e}")
-        return {
-            "symbol": symbol,
-            "verdict": "ERROR",
-            "confidence": 0.0,
-            "value": None,
-            "details": {"reason": f"Failed to process price data: {str(e)}"},
-            "agent_name": agent_name,
-        }
-
-    # Align returns if necessary (simple intersection for now)
-    common_index = sym_ret.index.intersection(mkt_ret.index)
-    if len(common_index) < 2:
+    if observations < 2:
         return {
             "symbol": symbol,
             "verdict": "NO_DATA",
@@ -142,16 +108,17 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             },
             "agent_name": agent_name,
         }
-    sym_ret = sym_ret.loc[common_index]
-    mkt_ret = mkt_ret.loc[common_index]
 
-    # Beta calculation (Core Logic)
-    # Check for zero variance in market returns
-    mkt_var = mkt_ret.var()
-    if mkt_var == 0:
-        beta = np.nan  # Or handle as appropriate (e.g., 1.0 or specific verdict)
-    else:
-        beta = float(sym_ret.cov(mkt_ret) / mkt_var)
+    # Daily returns over the regression window, for VaR and Sharpe
+    sym_ret = service.recent_returns([symbol], window)[0]
+    sym_ret = pd.Series(sym_ret[np.isfinite(sym_ret)])
+
+    def _stat(name):
+        value = model.get(f"{name}_{window}d")
+        return np.nan if value is None else float(value)
+
+    # Beta: cov(stock, market) / var(market) from the batch regression (Core Logic)
+    beta = _stat("beta")
 
     # Value at Risk (VaR) calculation (Core Logic)
     confidence_level = beta_settings.VAR_CONFIDENCE_LEVEL  # Use setting
@@ -177,11 +144,7 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
         )
 
     # Correlation analysis (Core Logic)
-    correlation = (
-        float(sym_ret.corr(mkt_ret))
-        if not sym_ret.empty and not mkt_ret.empty
-        else np.nan
-    )
+    correlation = _stat("correlation")
 
     # Risk scoring based on multiple metrics (Core Logic)
     # Handle potential NaN values from calculations
@@ -231,7 +194,16 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             "market_correlation": (
                 round(correlation, 2) if not np.isnan(correlation) else None
             ),
+            "r_squared": (
+                round(_stat("r_squared"), 4) if not np.isnan(_stat("r_squared")) else None
+            ),
+            "idiosyncratic_vol": (
+                round(_stat("idiosyncratic_vol"), 4)
+                if not np.isnan(_stat("idiosyncratic_vol"))
+                else None
+            ),
             "market_index_used": market_symbol,
+            "regression_window_days": window,
             "risk_scores": {
                 "beta_component": round(beta_score, 2),
                 "var_component": round(var_score, 2),
@@ -1,11 +1,41 @@
-from backend.utils.data_provider import fetch_price_series
+from backend.utils.data_provider import fetch_price_frame
 import numpy as np
 import pandas as pd
-from loguru import logger
 from backend.agents.decorators import standard_agent_execution  # Import decorator
+from backend.config.settings import get_settings
+from backend.quant.sketches import TDigest, load_quantile_sketch, refresh_quantile_sketch
+from backend.utils.cache_utils import get_redis_client
 
 agent_name = "var_agent"
 AGENT_CATEGORY = "risk"  # Define category for the decorator
+# Days of already-sketched bars refetched with the new ones, to check the history is unchanged
+OVERLAP_DAYS = 7
+
+
+async def _cached_distribution(symbol: str, sketch_settings):
+    """The symbol's cached return sketch, extended with the bars since its last one.
+
+    Returns None on a cache miss, or when the recent bars disagree with the
+    sketch (e.g. a split adjustment), so the caller rebuilds from the full history.
+    """
+    cache = await get_redis_client()
+    sketch = await load_quantile_sketch(cache, f"log_returns:{symbol}")
+    if sketch is None or sketch.window_days != sketch_settings.RETURN_WINDOW_DAYS or sketch.last_timestamp is None:
+        return None
+    days = (pd.Timestamp.now() - pd.Timestamp(sketch.last_timestamp)).days + OVERLAP_DAYS
+    recent = await fetch_price_frame(symbol, period=f"{days}d")
+    if not recent.has_index or len(recent) < 2:
+        # No bars since the sketch's last one (weekend or holiday)
+        return sketch
+    finite = np.isfinite(recent.log_returns)
+    stamps, returns = recent.index[1:][finite], recent.log_returns[finite]
+    if not sketch.agrees_with(stamps, returns):
+        return None
+    return await refresh_quantile_sketch(
+        cache, f"log_returns:{symbol}", stamps, returns, window_days=sketch_settings.RETURN_WINDOW_DAYS,
+        sketch=sketch, bucket_days=sketch_settings.BUCKET_DAYS, compression=sketch_settings.COMPRESSION,
+        ex=sketch_settings.CACHE_TTL,
+    )
 
 
 # Apply the decorator to the standalone run function
@@ -18,53 +48,52 @@ async def run(
     # Boilerplate (cache check, try/except, cache set, tracker, error handling) is handled by decorator
     # Core logic moved from the previous _execute method
 
-    prices = await fetch_price_series(symbol)
-    # Use a reasonable lookback period, e.g., 252 trading days (1 year)
-    min_days = 60  # Keep minimum requirement
-    if prices is None or prices.empty or len(prices) < min_days:
-        # Return NO_DATA format
-        return {
-            "symbol": symbol,
-            "verdict": "NO_DATA",
-            "confidence": 0.0,
-            "value": None,
-            "details": {
-                "reason": f"Insufficient price history for VaR calculation (need {min_days}, got {len(prices) if prices else 0})"
-            },
-            "agent_name": agent_name,
-        }
-
-    # Calculate log returns
-    # Ensure prices are numeric and handle potential issues
-    try:
-        numeric_prices = pd.to_numeric(prices, errors="coerce").dropna()
-        if len(numeric_prices) < 2:
-            raise ValueError("Not enough numeric price points after cleaning.")
-        returns = np.diff(np.log(numeric_prices))
-    except Exception as e:
-        logger.error(f"Error calculating returns for {symbol}: {e}")
-        return {
-            "symbol": symbol,
-            "verdict": "ERROR",
-            "confidence": 0.0,
-            "value": None,
-            "details": {"reason": f"Failed to calculate returns: {str(e)}"},
-            "agent_name": agent_name,
-        }
-
-    if len(returns) == 0:
-        return {
-            "symbol": symbol,
-            "verdict": "NO_DATA",
-            "confidence": 0.0,
-            "value": None,
-            "details": {"reason": "Could not calculate returns from price data"},
-            "agent_name": agent_name,
-        }
-
-    # Calculate Value at Risk (VaR)
-    var_95 = np.percentile(returns, 5)  # 5th percentile for 95% VaR
-    var_99 = np.percentile(returns, 1)  # 1st percentile for 99% VaR
+    # Calculate Value at Risk (VaR) from the symbol's rolling return sketch. Once it is
+    # cached only the bars since its last one are fetched; its tails match np.percentile.
+    sketch_settings = get_settings().agent_settings.quantile_sketch
+    distribution = await _cached_distribution(symbol, sketch_settings)
+    if distribution is None:
+        prices = await fetch_price_frame(symbol)
+        # Use a reasonable lookback period, e.g., 252 trading days (1 year)
+        min_days = 60  # Keep minimum requirement
+        if prices.empty or len(prices) < min_days:
+            # Return NO_DATA format
+            return {
+                "symbol": symbol,
+                "verdict": "NO_DATA",
+                "confidence": 0.0,
+                "value": None,
+                "details": {
+                    "reason": f"Insufficient price history for VaR calculation (need {min_days}, got {len(prices)})"
+                },
+                "agent_name": agent_name,
+            }
+
+        # Log returns are computed once by the PriceFrame; drop non-finite values from non-positive prices
+        finite = np.isfinite(prices.log_returns)
+        returns = prices.log_returns[finite]
+
+        if len(returns) == 0:
+            return {
+                "symbol": symbol,
+                "verdict": "NO_DATA",
+                "confidence": 0.0,
+                "value": None,
+                "details": {"reason": "Could not calculate returns from price data"},
+                "agent_name": agent_name,
+            }
+
+        if prices.has_index:
+            distribution = await refresh_quantile_sketch(
+                await get_redis_client(), f"log_returns:{symbol}", prices.index[1:][finite], returns,
+                window_days=sketch_settings.RETURN_WINDOW_DAYS, bucket_days=sketch_settings.BUCKET_DAYS,
+                compression=sketch_settings.COMPRESSION, ex=sketch_settings.CACHE_TTL,
+            )
+        else:
+            distribution = TDigest(sketch_settings.COMPRESSION)
+            distribution.extend(returns)
+    var_95 = distribution.quantile(0.05)  # 5th percentile for 95% VaR
+    var_99 = distribution.quantile(0.01)  # 1st percentile for 99% VaR
 
     # Annualize VaR (optional, depends on interpretation preference)
     # Scaling by sqrt(252) assumes returns are normally distributed and i.i.d., which might not hold.
@@ -102,7 +131,7 @@ async def run(
         "details": {
             "daily_var_95_percent": round(-daily_var_95 * 100, 2),
             "daily_var_99_percent": round(-var_99 * 100, 2),
-            "calculation_period_days": len(prices),
+            "calculation_period_days": distribution.count + 1,  # Prices behind the returns in the window
         },
         "agent_name": agent_name,
     }
@@ -1,33 +1,42 @@
+import inspect
 import httpx
 from backend.config.settings import settings
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
+from backend.utils.conditional_fetch import conditional_get
 from backend.agents.sentiment.utils import analyzer, normalize_compound, tracker
 
 agent_name = "news_sentiment_agent"
 
 
+async def _parse_headlines(resp) -> list:
+    headlines = []
+    if resp.status_code == 200:
+        data = resp.json()
+        if inspect.isawaitable(data):  # async clients/mocks
+            data = await data
+        for article in data.get("articles", []):
+            title = article.get("title")
+            if title:
+                headlines.append(title)
+    return headlines
+
+
 async def run(symbol: str) -> dict:
     cache_key = f"{agent_name}:{symbol}"
     # 1) Cache check
     redis_client = await get_redis_client()
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # 2) Fetch recent news headlines via NewsAPI
     api_key = settings.news_api_key
     url = "https://newsapi.org/v2/everything"
     params = {"q": symbol, "apiKey": api_key, "pageSize": 5, "sortBy": "publishedAt"}
     async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(url, params=params)
-    headlines = []
-    if resp.status_code == 200:
-        # Await the json() coroutine
-        data = await resp.json()
-        for article in data.get("articles", []):
-            title = article.get("title")
-            if title:
-                headlines.append(title)
+        fetched = await conditional_get(client, url, _parse_headlines, params=params)
+    headlines = fetched.value or []
     if not headlines:
         result = {
             "symbol": symbol,
@@ -61,6 +70,6 @@ async def run(symbol: str) -> dict:
 
     # 5) Cache result for 1 hour and track progress
     redis_client = await get_redis_client()
-    await redis_client.set(cache_key, result, ex=3600)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
     tracker.update("sentiment", agent_name, "implemented")
     return result
@@ -1,29 +1,34 @@
 import httpx
 from backend.config.settings import settings
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
+from backend.utils.conditional_fetch import conditional_get
 from backend.agents.sentiment.utils import tracker
 
 agent_name = "news_volume_spike_agent"
 
 
+def _count_articles(resp) -> int:
+    if resp.status_code != 200:
+        return 0
+    return len(resp.json().get("articles", []))
+
+
 async def run(symbol: str, window_hours: int = 24) -> dict:
     cache_key = f"{agent_name}:{symbol}:{window_hours}"
     # Cache check
     redis_client = await get_redis_client()
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch recent news count via NewsAPI
     api_key = settings.news_api_key
     url = "https://newsapi.org/v2/everything"
     params = {"q": symbol, "apiKey": api_key, "from": None, "pageSize": 100}
     async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(url, params=params)
-    count = 0
-    if resp.status_code == 200:
-        data = resp.json()
-        count = len(data.get("articles", []))
+        fetched = await conditional_get(client, url, _count_articles, params=params)
+    count = fetched.value or 0
     # Normalize volume: >50 articles => score 1.0, <10 => 0.0, else linear
     if count >= 50:
         score = 1.0
@@ -48,6 +53,6 @@ async def run(symbol: str, window_hours: int = 24) -> dict:
 
     # Cache & track
     redis_client = await get_redis_client()
-    await redis_client.set(cache_key, result, ex=3600)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
     tracker.update("sentiment", agent_name, "implemented")
     return result
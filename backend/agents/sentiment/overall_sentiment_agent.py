@@ -1,4 +1,5 @@
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.utils.data_provider import fetch_news, fetch_social_sentiment, fetch_news_sentiment
 from backend.agents.sentiment.utils import tracker
 
@@ -10,7 +11,7 @@ async def run(symbol: str) -> dict:
     cache_key = f"{agent_name}:{symbol}"
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     news_sent = await fetch_news_sentiment(symbol)
     social_sent = await fetch_social_sentiment(symbol)
@@ -34,6 +35,6 @@ async def run(symbol: str) -> dict:
         "agent_name": agent_name,
     }
 
-    await redis_client.set(cache_key, result, ex=None)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=None)
     tracker.update("sentiment", agent_name, "implemented")
     return result
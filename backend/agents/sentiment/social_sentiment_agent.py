@@ -1,6 +1,7 @@
 import httpx
 from backend.config.settings import settings
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.sentiment.utils import analyzer, normalize_compound, tracker
 
 agent_name = "social_sentiment_agent"
@@ -12,7 +13,7 @@ async def run(symbol: str) -> dict:
     # Cache check
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
     # Fetch recent tweets using Twitter v2 API
     bearer = settings.twitter_bearer_token
@@ -55,6 +56,6 @@ async def run(symbol: str) -> dict:
         }
 
     # Cache and update progress
-    await redis_client.set(cache_key, result, ex=3600)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
     tracker.update("sentiment", agent_name, "implemented")
     return result
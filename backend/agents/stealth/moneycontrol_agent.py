@@ -1,6 +1,7 @@
 from backend.agents.stealth.base import StealthAgentBase
 import httpx, numpy as np
-from bs4 import BeautifulSoup
+from backend.utils.conditional_fetch import conditional_get
+from backend.utils.html_parsing import parse_off_loop
 from sklearn.ensemble import IsolationForest
 from loguru import logger
 
@@ -135,14 +136,20 @@ class MoneyControlAgent(StealthAgentBase):
         url = f"https://www.moneycontrol.com/india/stockpricequote/{symbol}"
         headers = {"User-Agent": "Mozilla/5.0"}
         async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, "html.parser")
+            fetched = await conditional_get(
+                client,
+                url,
+                lambda response: parse_off_loop(response.text, self._parse_page, source="moneycontrol"),
+                headers=headers,
+            )
+        return fetched.value
 
-            return {
-                "ratings": self._extract_ratings(soup),
-                "technicals": self._extract_technicals(soup),
-                "sentiment": self._extract_sentiment(soup),
-            }
+    def _parse_page(self, soup) -> dict:
+        return {
+            "ratings": self._extract_ratings(soup),
+            "technicals": self._extract_technicals(soup),
+            "sentiment": self._extract_sentiment(soup),
+        }
 
     def _extract_ratings(self, soup) -> dict:
         ratings = {}
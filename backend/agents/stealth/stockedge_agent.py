@@ -1,6 +1,7 @@
 from backend.agents.stealth.base import StealthAgentBase
 import httpx
-from bs4 import BeautifulSoup
+from backend.utils.conditional_fetch import conditional_get
+from backend.utils.html_parsing import parse_off_loop
 from loguru import logger
 
 agent_name = "stockedge_agent"
@@ -36,9 +37,12 @@ class StockEdgeAgent(StealthAgentBase):
     async def _fetch_stealth_data(self, symbol: str) -> dict:
         url = f"https://web.stockedge.com/share/{symbol}/overview"
         async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url)
-        soup = BeautifulSoup(resp.text, "html.parser")
+            fetched = await conditional_get(
+                client, url, lambda resp: parse_off_loop(resp.text, self._parse_page, source="stockedge")
+            )
+        return fetched.value
 
+    def _parse_page(self, soup) -> dict:
         return {
             "quality_score": self._extract_quality_score(soup),
             "technicals": self._extract_technicals(soup),
@@ -1,7 +1,8 @@
 from backend.agents.stealth.base import StealthAgentBase
 from backend.utils.data_provider import fetch_price_alpha_vantage
 import httpx
-from bs4 import BeautifulSoup
+from backend.utils.conditional_fetch import conditional_get
+from backend.utils.html_parsing import parse_off_loop
 from loguru import logger
 
 agent_name = "tijori_agent"
@@ -44,16 +45,22 @@ class TijoriAgent(StealthAgentBase):
     async def _fetch_stealth_data(self, symbol: str) -> dict:
         url = f"https://www.tijorifinance.com/stock/{symbol.lower()}/"
         async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url)
+            fetched = await conditional_get(client, url, self._parse_response)
+        return fetched.value
+
+    async def _parse_response(self, resp) -> dict:
         if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, "html.parser")
-            price_elem = soup.find("span", class_="price-text")
-            if price_elem:
-                try:
-                    price = float(price_elem.text.replace(",", "").strip())
-                    return {"price": price}
-                except (ValueError, TypeError):
-                    pass
+            return await parse_off_loop(resp.text, self._extract_price, source="tijori")
+        return {}
+
+    def _extract_price(self, soup) -> dict:
+        price_elem = soup.select_one("span.price-text")
+        if price_elem:
+            try:
+                price = float(price_elem.text.replace(",", "").strip())
+                return {"price": price}
+            except (ValueError, TypeError):
+                pass
         return {}
 
     def _get_verdict(self, price: float) -> str:
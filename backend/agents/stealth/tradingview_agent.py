@@ -1,6 +1,5 @@
 from backend.agents.stealth.base import StealthAgentBase
 import httpx, numpy as np
-from bs4 import BeautifulSoup
 import pandas_ta as ta
 from loguru import logger
 
@@ -1,6 +1,7 @@
 from backend.agents.stealth.base import StealthAgentBase
 import httpx
-from bs4 import BeautifulSoup
+from backend.utils.conditional_fetch import conditional_get
+from backend.utils.html_parsing import parse_off_loop
 from loguru import logger
 
 agent_name = "trendlyne_agent"
@@ -34,9 +35,12 @@ class TrendlyneAgent(StealthAgentBase):
     async def _fetch_stealth_data(self, symbol: str) -> dict:
         url = f"https://trendlyne.com/equity/{symbol}/"
         async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url)
-        soup = BeautifulSoup(resp.text, "html.parser")
+            fetched = await conditional_get(
+                client, url, lambda resp: parse_off_loop(resp.text, self._parse_page, source="trendlyne")
+            )
+        return fetched.value
 
+    def _parse_page(self, soup) -> dict:
         return {
             "price": self._extract_price(soup),
             "technicals": self._extract_technicals(soup),
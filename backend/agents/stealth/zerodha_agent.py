@@ -1,7 +1,7 @@
 from backend.agents.stealth.base import StealthAgentBase
 import httpx
-from bs4 import BeautifulSoup
-import lxml  # Faster parser
+from backend.utils.conditional_fetch import conditional_get
+from backend.utils.html_parsing import parse_off_loop
 from loguru import logger
 
 agent_name = "zerodha_agent"
@@ -45,13 +45,19 @@ class ZerodhaAgent(StealthAgentBase):
         url = f"https://kite.zerodha.com/quote/{symbol}"
         headers = {"User-Agent": "Mozilla/5.0"}
         async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, "lxml")
-
-            return {
-                "metrics": self._extract_metrics(soup),
-                "margins": self._extract_margins(soup),
-            }
+            fetched = await conditional_get(
+                client,
+                url,
+                lambda response: parse_off_loop(response.text, self._parse_page, source="zerodha"),
+                headers=headers,
+            )
+        return fetched.value
+
+    def _parse_page(self, soup) -> dict:
+        return {
+            "metrics": self._extract_metrics(soup),
+            "margins": self._extract_margins(soup),
+        }
 
     def _analyze_data(self, data: dict) -> float:
         metrics = data.get("metrics", {})
@@ -1,9 +1,8 @@
-import pandas as pd
-from backend.utils.data_provider import fetch_ohlcv_series
+from backend.utils.data_provider import fetch_technical_ohlcv
+from backend.quant.indicators import get_indicators
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.technical.utils import tracker
-import datetime
-from dateutil.relativedelta import relativedelta
 
 agent_name = "adx_agent"
 
@@ -14,19 +13,10 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
     # 1) Cache check
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
-    # 2) Define date range (e.g., 7 months for daily data)
-    end_date = datetime.date.today()
-    start_date = end_date - relativedelta(months=7)
-
-    # 3) Fetch OHLCV with start/end dates and interval
-    df = await fetch_ohlcv_series(
-        symbol=symbol,
-        start_date=start_date,
-        end_date=end_date,
-        interval='1d' # Assuming daily interval is needed
-    )
+    # 2-3) Daily OHLCV shared with the other technical agents in the run
+    df = await fetch_technical_ohlcv(symbol)
     if df is None or df.empty:
         result = {
             "symbol": symbol,
@@ -37,33 +27,10 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             "agent_name": agent_name,
         }
     else:
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
-        prev_close = close.shift(1)
-
-        # 4) True Range and ATR
-        tr = pd.concat(
-            [high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1
-        ).max(axis=1)
-        atr = tr.rolling(window=14, min_periods=14).mean()
-
-        # 5) Directional Movements
-        up_move = high - high.shift(1)
-        down_move = low.shift(1) - low
-        plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
-        minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
-
-        # 6) Directional Indicators
-        plus_di = 100 * plus_dm.rolling(window=14, min_periods=14).mean() / atr
-        minus_di = 100 * minus_dm.rolling(window=14, min_periods=14).mean() / atr
-
-        # 7) DX and ADX
-        dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
-        adx = dx.rolling(window=14, min_periods=14).mean().iloc[-1]
-        adx = float(adx)
+        # 4) ADX (rolling-mean ATR, DIs and DX smoothing) from the shared indicator set
+        adx = float(get_indicators(symbol, df).adx(14)["adx"][-1])
 
-        # 8) Normalize & Verdict
+        # 5) Normalize & Verdict
         if adx > 25:
             score = 1.0
             verdict = "STRONG_TREND"
@@ -84,9 +51,9 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
             "agent_name": agent_name,
         }
 
-    # 9) Cache result for 1 hour
-    await redis_client.set(cache_key, result, ex=3600)
-    # 10) Update progress tracker
+    # 6) Cache result for 1 hour
+    await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
+    # 7) Update progress tracker
     tracker.update("technical", agent_name, "implemented")
 
     return result
@@ -1,8 +1,9 @@
-import pandas as pd
-from backend.utils.data_provider import fetch_ohlcv_series
+from backend.utils.data_provider import fetch_technical_ohlcv
+from backend.quant.indicators import get_indicators, last
+from backend.quant.streaming import DEFAULT_PARAMS, cached_indicator_snapshot
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.technical.utils import tracker
-from datetime import datetime, timedelta
 
 agent_name = "bollinger_agent"
 
@@ -13,12 +14,10 @@ async def run(symbol: str, agent_outputs: dict = None, window: int = 20, num_std
     # 1) Cache check
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
-    # 2) Fetch OHLCV data
-    end_date = datetime.now().strftime("%Y-%m-%d")
-    start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
-    df = await fetch_ohlcv_series(symbol, start_date, end_date)
+    # 2) Fetch OHLCV data (shared with the other technical agents in the run)
+    df = await fetch_technical_ohlcv(symbol)
     if df is None or df.empty or len(df) < window:
         result = {
             "symbol": symbol,
@@ -29,17 +28,27 @@ async def run(symbol: str, agent_outputs: dict = None, window: int = 20, num_std
             "agent_name": agent_name,
         }
     else:
-        close = df["close"]
-        # 3) Compute moving average and standard deviation
-        ma = close.rolling(window=window, min_periods=window).mean()
-        std = close.rolling(window=window, min_periods=window).std()
+        # 3) Moving average and standard deviation from the cached streaming state
+        # when it carries these bands, else from the shared indicator set
+        snapshot = None
+        if window == DEFAULT_PARAMS["bollinger_window"] and num_std == DEFAULT_PARAMS["bollinger_std"]:
+            snapshot = await cached_indicator_snapshot(symbol, df)
+        if snapshot and snapshot["bollinger_upper"] is not None:
+            last_ma = snapshot["bollinger_middle"]
+            upper_band = snapshot["bollinger_upper"]
+            lower_band = snapshot["bollinger_lower"]
+            last_std = (upper_band - last_ma) / num_std
+            last_close = snapshot["close"]
+        else:
+            indicators = get_indicators(symbol, df)
+            bands = indicators.bollinger(window, num_std)
 
-        last_ma = ma.iloc[-1]
-        last_std = std.iloc[-1]
-        last_close = close.iloc[-1]
+            last_ma = last(bands["middle"])
+            last_std = last(bands["std"])
+            last_close = indicators.frame.last
 
-        upper_band = last_ma + num_std * last_std
-        lower_band = last_ma - num_std * last_std
+            upper_band = last(bands["upper"])
+            lower_band = last(bands["lower"])
 
         # 4) Normalize and map verdict
         if last_close < lower_band:
@@ -69,7 +78,7 @@ async def run(symbol: str, agent_outputs: dict = None, window: int = 20, num_std
         }
 
     # 5) Cache result for 1 hour
-    await redis_client.set(cache_key, result, ex=3600)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
     # 6) Update progress tracker
     tracker.update("technical", agent_name, "implemented")
 
@@ -1,8 +1,8 @@
-import pandas as pd
-from backend.utils.data_provider import fetch_ohlcv_series
+from backend.utils.data_provider import fetch_technical_ohlcv
+from backend.quant.indicators import get_indicators
 from backend.utils.cache_utils import get_redis_client
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
 from backend.agents.technical.utils import tracker
-from datetime import datetime, timedelta # Added
 
 agent_name = "ma_crossover_agent"
 
@@ -13,12 +13,10 @@ async def run(symbol: str, agent_outputs: dict = None, short_window: int = 50, l
     # 1) Cache check
     cached = await redis_client.get(cache_key)
     if cached:
-        return cached
+        return decode_cache_value(cached)
 
-    # 2) Fetch OHLCV data
-    end_date = datetime.now().strftime("%Y-%m-%d") # Added
-    start_date = (datetime.now() - timedelta(days=long_window + 50)).strftime("%Y-%m-%d") # Added, ensure enough data for longest window + buffer
-    df = await fetch_ohlcv_series(symbol, start_date, end_date) # Modified
+    # 2) Fetch OHLCV data (shared with the other technical agents in the run)
+    df = await fetch_technical_ohlcv(symbol)
     if df is None or df.empty or len(df) < long_window:
         result = {
             "symbol": symbol,
@@ -29,15 +27,15 @@ async def run(symbol: str, agent_outputs: dict = None, short_window: int = 50, l
             "agent_name": agent_name,
         }
     else:
-        close = df["close"]
-        # 3) Compute moving averages
-        short_ma = close.rolling(window=short_window, min_periods=short_window).mean()
-        long_ma = close.rolling(window=long_window, min_periods=long_window).mean()
+        # 3) Moving averages from the shared indicator set
+        indicators = get_indicators(symbol, df)
+        short_ma = indicators.sma(short_window)
+        long_ma = indicators.sma(long_window)
 
-        last_short = short_ma.iloc[-1]
-        last_long = long_ma.iloc[-1]
-        prev_short = short_ma.iloc[-2]
-        prev_long = long_ma.iloc[-2]
+        last_short = float(short_ma[-1])
+        last_long = float(long_ma[-1])
+        prev_short = float(short_ma[-2])
+        prev_long = float(long_ma[-2])
 
         # 4) Determine crossover
         if prev_short <= prev_long and last_short > last_long:
@@ -64,7 +62,7 @@ async def run(symbol: str, agent_outputs: dict = None, short_window: int = 50, l
         }
 
     # 5) Cache result for 1 hour
-    await redis_client.set(cache_key, result, ex=3600)
+    await redis_client.set(cache_key, encode_cache_value(result), ex=3600)
     # 6) Update progress tracker
     tracker.update("technical", agent_name, "implemented")
 
@@ -1,9 +1,9 @@
 from backend.agents.technical.base import TechnicalAgent
-from backend.utils.data_provider import fetch_ohlcv_series
+from backend.utils.data_provider import fetch_technical_ohlcv
+from backend.quant.indicators import get_indicators, last
+from backend.quant.streaming import cached_indicator_snapshot
 import pandas as pd
-import numpy as np
 from loguru import logger
-import datetime # Import datetime
 
 agent_name = "macd_agent"
 
@@ -11,28 +11,25 @@ agent_name = "macd_agent"
 class MACDAgent(TechnicalAgent):
     async def _execute(self, symbol: str, agent_outputs: dict) -> dict:
         try:
-            # Define date range (e.g., 1 year back from today)
-            end_date = datetime.date.today()
-            start_date = end_date - datetime.timedelta(days=365)
-
-            # Add await here and pass dates
-            df = await fetch_ohlcv_series(symbol, start_date=start_date, end_date=end_date)
+            # A year of daily bars, fetched once per run for all technical agents
+            df = await fetch_technical_ohlcv(symbol)
             # Add check for DataFrame type and emptiness
             if not isinstance(df, pd.DataFrame) or df.empty:
                 logger.warning(f"[{agent_name}] Insufficient or invalid data for {symbol}. Type: {type(df)}")
                 return self._error_response(symbol, f"Insufficient or invalid OHLCV data received. Type: {type(df)}")
 
-            # Calculate MACD
-            exp1 = df["close"].ewm(span=12, adjust=False).mean()
-            exp2 = df["close"].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-            histogram = macd - signal
-
-            # Get latest values
-            current_macd = macd.iloc[-1]
-            current_signal = signal.iloc[-1]
-            current_hist = histogram.iloc[-1]
+            # MACD (12/26 EMA, 9 EMA signal) from the cached streaming state,
+            # or from the shared indicator set when nothing is cached
+            snapshot = await cached_indicator_snapshot(symbol, df)
+            if snapshot and snapshot["macd_histogram"] is not None:
+                current_macd = snapshot["macd"]
+                current_signal = snapshot["macd_signal"]
+                current_hist = snapshot["macd_histogram"]
+            else:
+                macd = get_indicators(symbol, df).macd(12, 26, 9)
+                current_macd = last(macd["macd"])
+                current_signal = last(macd["signal"])
+                current_hist = last(macd["histogram"])
 
             # Market regime adjustment
             market_context = await self.get_market_context(symbol)
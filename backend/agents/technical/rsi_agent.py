@@ -1,11 +1,12 @@
 from backend.agents.technical.base import TechnicalAgent
 # Correct the import path
-from backend.utils.data_provider import fetch_ohlcv_series
+from backend.utils.data_provider import fetch_technical_ohlcv
 from backend.agents.decorators import standard_agent_execution  # Corrected import path
+from backend.quant.indicators import IndicatorSet, get_indicators, last
+from backend.quant.streaming import DEFAULT_PARAMS, cached_indicator_snapshot
+from backend.utils.price_frame import PriceFrame
 import pandas as pd
 import logging
-import numpy as np # Import numpy
-import datetime # Import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +16,8 @@ agent_name = "RSIAgent"
 class RSIAgent(TechnicalAgent):
     async def _execute(self, symbol: str, agent_outputs: dict) -> dict:
         try:
-            # Define date range (e.g., 1 year back from today)
-            end_date = datetime.date.today()
-            start_date = end_date - datetime.timedelta(days=365)
-
-            # Add await here and pass dates
-            df = await fetch_ohlcv_series(symbol, start_date=start_date, end_date=end_date)
+            # A year of daily bars, fetched once per run for all technical agents
+            df = await fetch_technical_ohlcv(symbol)
             # Add check for DataFrame type and emptiness
             if not isinstance(df, pd.DataFrame) or df.empty:
                 logger.warning(f"[{self.__class__.__name__}] Insufficient or invalid data for {symbol}. Type: {type(df)}")
@@ -36,10 +33,13 @@ class RSIAgent(TechnicalAgent):
             volatility = market_context.get("volatility", 0.2)
             adjustments = self.get_volatility_adjustments(volatility)
 
-            # Calculate RSI using the new method
-            rsi_value = self._calculate_rsi(
-                df["close"], period=int(14 * adjustments["period_adj"])
-            )
+            # The cached streaming state carries the default period; others recompute from the bars
+            period = int(14 * adjustments["period_adj"])
+            snapshot = await cached_indicator_snapshot(symbol, df) if period == DEFAULT_PARAMS["rsi_period"] else None
+            if snapshot and snapshot["rsi"] is not None:
+                rsi_value = snapshot["rsi"]
+            else:
+                rsi_value = self._calculate_rsi(get_indicators(symbol, df), period=period)
 
             # Check if RSI calculation was successful
             if rsi_value is None:
@@ -69,35 +69,14 @@ class RSIAgent(TechnicalAgent):
             return self._error_response(symbol, str(e))
 
     # --- Added _calculate_rsi method ---
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float | None:
-        """Calculates the Relative Strength Index (RSI) for a given price series."""
+    def _calculate_rsi(self, prices, period: int = 14) -> float | None:
+        """Latest RSI from an IndicatorSet or any price series PriceFrame accepts."""
         if prices is None or len(prices) < period + 1:
             return None # Not enough data
 
-        delta = prices.diff()
-
-        # Separate gains (positive changes) and losses (absolute value of negative changes)
-        gain = delta.where(delta > 0, 0.0)
-        loss = -delta.where(delta < 0, 0.0) # Use -delta to make losses positive
-
-        # Calculate the exponential moving average (EMA) of gains and losses
-        # Use adjust=False to match common RSI implementations (like TradingView)
-        avg_gain = gain.ewm(com=period - 1, min_periods=period, adjust=False).mean()
-        avg_loss = loss.ewm(com=period - 1, min_periods=period, adjust=False).mean()
-
-        # Avoid division by zero
-        if avg_loss.iloc[-1] == 0:
-            # If avg loss is 0, RSI is 100 (unless avg gain is also 0)
-            return 100.0 if avg_gain.iloc[-1] > 0 else 50.0 # Or 50 if both are 0
-
-        # Calculate Relative Strength (RS)
-        rs = avg_gain.iloc[-1] / avg_loss.iloc[-1]
-
-        # Calculate RSI
-        rsi = 100.0 - (100.0 / (1.0 + rs))
-
-        # Return the latest RSI value, checking for NaN
-        return rsi if not np.isnan(rsi) else None
+        indicators = prices if isinstance(prices, IndicatorSet) else IndicatorSet(PriceFrame.from_any(prices))
+        # Wilder smoothing (ewm adjust=False, like TradingView); 100 with no losses, 50 if flat
+        return last(indicators.rsi(period))
     # --- End Added Method ---
 
     def _get_regime_signals(self, rsi: float, regime: str) -> dict:
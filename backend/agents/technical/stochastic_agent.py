@@ -1,11 +1,9 @@
-import pandas as pd
-import numpy as np
-from backend.utils.data_provider import fetch_ohlcv_series
+from backend.utils.data_provider import fetch_technical_ohlcv
+from backend.quant.indicators import get_indicators
+from backend.quant.streaming import DEFAULT_PARAMS, cached_indicator_snapshot
 from backend.utils.cache_utils import get_redis_client
 from backend.agents.technical.utils import tracker
 from backend.config.settings import settings
-import datetime
-from dateutil.relativedelta import relativedelta
 from backend.agents.decorators import standard_agent_execution # Import decorator
 
 agent_name = "stochastic_agent"
@@ -21,17 +19,8 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
     # if cached:
     #     return cached
 
-    # Define date range (e.g., 7 months for daily data)
-    end_date = datetime.date.today()
-    start_date = end_date - relativedelta(months=7)
-
-    # Fetch OHLCV series with fallback
-    df = await fetch_ohlcv_series(
-        symbol=symbol,
-        start_date=start_date,
-        end_date=end_date,
-        interval='1d' # Assuming daily interval is needed
-    )
+    # Daily OHLCV shared with the other technical agents in the run
+    df = await fetch_technical_ohlcv(symbol)
     if df is None or df.empty:
         # Decorator handles error formatting/caching if configured
         # Return a structure the decorator expects for errors
@@ -50,16 +39,18 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
         oversold_level = getattr(settings, 'STOCHASTIC_OVERSOLD', 20) # Default 20
         overbought_level = getattr(settings, 'STOCHASTIC_OVERBOUGHT', 80) # Default 80
 
-        low_min = df["low"].rolling(k_window).min()
-        high_max = df["high"].rolling(k_window).max()
-        # Avoid division by zero
-        high_low_diff = high_max - low_min
-        k = 100 * ((df["close"] - low_min) / high_low_diff.replace(0, np.nan)) # Replace 0 diff with NaN
-        k = k.fillna(50) # Fill potential NaNs if high_low_diff was 0
-
-        d = k.rolling(d_window).mean()
-        latest_k = float(k.iloc[-1])
-        latest_d = float(d.iloc[-1])
+        # %K reads 50 where the high-low range is flat; %D is its rolling mean.
+        # The cached streaming state carries the default windows; others recompute
+        snapshot = None
+        if (k_window, d_window) == (DEFAULT_PARAMS["stochastic_k"], DEFAULT_PARAMS["stochastic_d"]):
+            snapshot = await cached_indicator_snapshot(symbol, df)
+        if snapshot and snapshot["stochastic_d"] is not None:
+            latest_k = snapshot["stochastic_k"]
+            latest_d = snapshot["stochastic_d"]
+        else:
+            stochastic = get_indicators(symbol, df).stochastic(k_window, d_window)
+            latest_k = float(stochastic["k"][-1])
+            latest_d = float(stochastic["d"][-1])
 
         # Verdict mapping using fallback settings
         if latest_k <= oversold_level:
@@ -1,10 +1,7 @@
 from backend.agents.technical.base import TechnicalAgent
-from backend.utils.data_provider import fetch_ohlcv_series
-import pandas as pd
-import numpy as np
+from backend.utils.data_provider import fetch_technical_ohlcv
+from backend.quant.indicators import get_indicators
 from loguru import logger
-import datetime
-from dateutil.relativedelta import relativedelta
 from backend.agents.decorators import standard_agent_execution # Import decorator
 
 agent_name = "supertrend_agent"
@@ -13,17 +10,8 @@ agent_name = "supertrend_agent"
 class SupertrendAgent(TechnicalAgent):
     async def _execute(self, symbol: str, agent_outputs: dict) -> dict:
         try:
-            # Define date range (e.g., 7 months for daily data)
-            end_date = datetime.date.today() # Use current date
-            start_date = end_date - relativedelta(months=7) # Use relativedelta
-
-            # Fetch OHLCV data with start_date and end_date
-            df = await fetch_ohlcv_series(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date,
-                interval='1d' # Assuming daily interval is needed
-            )
+            # Daily OHLCV shared with the other technical agents in the run
+            df = await fetch_technical_ohlcv(symbol)
             if df is None or df.empty:
                 return self._error_response(symbol, "No data available")
 
@@ -36,50 +24,14 @@ class SupertrendAgent(TechnicalAgent):
             period = int(10 * adjustments["period_adj"])
             multiplier = 3.0 * adjustments["signal_mult"]
 
-            # ATR Calculation
-            df["tr"] = pd.DataFrame(
-                {
-                    "hl": df["high"] - df["low"],
-                    "hc": abs(df["high"] - df["close"].shift(1)),
-                    "lc": abs(df["low"] - df["close"].shift(1)),
-                }
-            ).max(axis=1)
-
-            df["atr"] = df["tr"].rolling(period).mean()
-
-            # Supertrend bands
-            hl2 = (df["high"] + df["low"]) / 2
-            df["upper_band"] = hl2 + multiplier * df["atr"]
-            df["lower_band"] = hl2 - multiplier * df["atr"]
-
-            # Initialize Supertrend
-            df["supertrend"] = df["upper_band"]
-            df["uptrend"] = True
-
-            # Calculate Supertrend direction
-            for i in range(period, len(df)):
-                curr, prev = df.iloc[i], df.iloc[i - 1]
-
-                if curr["close"] > prev["upper_band"]:
-                    df.loc[df.index[i], "uptrend"] = True
-                elif curr["close"] < prev["lower_band"]:
-                    df.loc[df.index[i], "uptrend"] = False
-                else:
-                    df.loc[df.index[i], "uptrend"] = prev["uptrend"]
-
-                if df.loc[df.index[i], "uptrend"]:
-                    df.loc[df.index[i], "supertrend"] = df.loc[
-                        df.index[i], "lower_band"
-                    ]
-                else:
-                    df.loc[df.index[i], "supertrend"] = df.loc[
-                        df.index[i], "upper_band"
-                    ]
+            # Band/trend recursion runs as one tight loop over numpy arrays
+            indicators = get_indicators(symbol, df)
+            trend = indicators.supertrend(period, multiplier)
 
             # Generate signals
-            current_price = df["close"].iloc[-1]
-            current_supertrend = df["supertrend"].iloc[-1]
-            is_uptrend = df["uptrend"].iloc[-1]
+            current_price = indicators.frame.last
+            current_supertrend = float(trend["supertrend"][-1])
+            is_uptrend = bool(trend["uptrend"][-1])
 
             regime = market_context.get("regime", "NEUTRAL")
 
@@ -103,7 +55,7 @@ class SupertrendAgent(TechnicalAgent):
                     "supertrend": float(round(current_supertrend, 2)), # Ensure float
                     # Ensure boolean is standard Python bool
                     "is_uptrend": bool(is_uptrend),
-                    "atr": float(round(df["atr"].iloc[-1], 2)), # Ensure float
+                    "atr": float(round(trend["atr"][-1], 2)), # Ensure float
                     "market_regime": regime,
                 },
                 "error": None,
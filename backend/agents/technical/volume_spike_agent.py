@@ -1,9 +1,7 @@
 from backend.agents.technical.base import TechnicalAgent
-from backend.utils.data_provider import fetch_ohlcv_series
-import numpy as np
+from backend.utils.data_provider import fetch_technical_ohlcv
+from backend.quant.indicators import get_indicators
 from loguru import logger
-from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
 from typing import Dict # Import Dict
 from backend.agents.decorators import standard_agent_execution # Import decorator
 
@@ -18,29 +16,18 @@ class VolumeSpikeAgent(TechnicalAgent):
 
     async def _execute(self, symbol: str, agent_outputs: dict) -> dict:
         try:
-            # Define date range (e.g., last 60 days)
-            end_date = datetime.today().date() # Correct usage
-            start_date = end_date - relativedelta(months=7) # Use relativedelta
-
-            # Fetch OHLCV data with start_date and end_date
-            df = await fetch_ohlcv_series(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date,
-                interval='1d' # Assuming daily interval is needed
-            )
+            # Daily OHLCV shared with the other technical agents in the run
+            df = await fetch_technical_ohlcv(symbol)
             if df is None or df.empty:
                 return self._error_response(symbol, "No data available")
 
-            # Calculate volume metrics
-            avg_volume = df["volume"].rolling(window=20).mean()
-            volume_ratio = df["volume"] / avg_volume
-            latest_ratio = volume_ratio.iloc[-1]
+            # Volume relative to its 20-bar mean, from the shared indicator set
+            indicators = get_indicators(symbol, df)
+            latest_ratio = float(indicators.volume_ratio(20)[-1])
 
             # Determine if price moved with volume
-            price_change = (df["close"].iloc[-1] - df["open"].iloc[-1]) / df[
-                "open"
-            ].iloc[-1]
+            last_open = float(indicators.frame.open[-1])
+            price_change = (indicators.frame.last - last_open) / last_open
 
             # Market regime context
             market_context = await self.get_market_context(symbol)
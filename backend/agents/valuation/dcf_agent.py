@@ -9,40 +9,82 @@ agent_name = "dcf_agent"
 AGENT_CATEGORY = "valuation"  # Define category for the decorator
 
 
-# Helper function remains the same, but ensure it uses settings correctly if needed
+DCF_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def simulate_dcf_batch(
+    base_eps: float,
+    stage_growth: np.ndarray,
+    terminal_growth: np.ndarray,
+    discount_rates: np.ndarray,
+    terminal_pe: float,
+    stage_years: tuple = (5, 5),
+) -> np.ndarray:
+    """Intrinsic value of every simulated (growth, discount) scenario in one pass.
+
+    ``stage_growth`` holds one row of per-stage growth rates per path, lasting
+    ``stage_years`` years each; ``terminal_growth`` and ``discount_rates`` hold
+    one rate per path. EPS paths and the discount-factor matrix are both
+    (years, paths), so the present values reduce to one weighted column sum. Paths
+    whose discount rate does not exceed terminal growth come back as NaN.
+    """
+    stage_growth = np.atleast_2d(np.asarray(stage_growth, dtype=np.float64))
+    terminal_growth = np.asarray(terminal_growth, dtype=np.float64)
+    discount_rates = np.asarray(discount_rates, dtype=np.float64)
+
+    years = np.arange(1, sum(stage_years) + 1)
+    starts = np.cumsum((0,) + tuple(stage_years[:-1]))
+    # Years each stage has compounded by the end of every projection year: (years, stages)
+    exposure = np.stack([np.clip(years - start, 0, length) for start, length in zip(starts, stage_years)], axis=1)
+    # (years, paths) keeps every operation on contiguous runs of paths
+    projected_eps = base_eps * np.exp(exposure @ np.log1p(stage_growth).T)
+    discount_factors = np.exp(-np.multiply.outer(years, np.log1p(discount_rates)))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terminal_value = projected_eps[-1] * (1 + terminal_growth) * terminal_pe / (discount_rates - terminal_growth)
+    values = np.einsum("yp,yp->p", projected_eps, discount_factors) + terminal_value * discount_factors[-1]
+    return np.where(discount_rates > terminal_growth, values, np.nan)
+
+
 def simulate_dcf(
     base_eps: float, growth_rates: list, discount_rate: float, terminal_pe: float
 ) -> float:
-    """Helper function for DCF Monte Carlo simulation"""
-    projected_eps = []
-    current_eps = base_eps
-
-    # Stage 1 & 2
-    for i in range(5):
-        current_eps *= 1 + growth_rates[0]
-        projected_eps.append(current_eps)
-    for i in range(5):
-        current_eps *= 1 + growth_rates[1]
-        projected_eps.append(current_eps)
-
-    # Terminal value calculation needs to handle potential zero or negative denominator
-    terminal_growth_rate = growth_rates[2]
-    if discount_rate <= terminal_growth_rate:
-        # Handle case where discount rate is not sufficiently above terminal growth
-        # Return NaN or raise an error, or use a very high PE as approximation
-        # For now, let's return NaN to indicate an issue in this simulation run
-        return np.nan
-
-    terminal_eps = current_eps * (1 + terminal_growth_rate)
-    terminal_value = terminal_eps * terminal_pe / (discount_rate - terminal_growth_rate)
-
-    # Present values
-    present_values = [
-        eps / ((1 + discount_rate) ** (i + 1)) for i, eps in enumerate(projected_eps)
-    ]
-    terminal_pv = terminal_value / ((1 + discount_rate) ** len(projected_eps))
+    """Single-path DCF: five years at ``growth_rates[0]``, five at ``growth_rates[1]``, then terminal growth."""
+    value = simulate_dcf_batch(
+        base_eps, [growth_rates[:2]], [growth_rates[2]], [discount_rate], terminal_pe
+    )
+    return float(value[0])
 
-    return sum(present_values) + terminal_pv
+
+def draw_dcf_scenarios(
+    n_paths: int,
+    growth_stages: list,
+    discount_rate: float,
+    growth_volatility: float,
+    discount_volatility: float,
+    rng: np.random.Generator,
+) -> tuple:
+    """Perturbed (stage growth, terminal growth, discount rate) arrays for ``n_paths`` paths.
+
+    Growth rates are floored at zero and discount rates at 1%.
+    """
+    shocks = rng.standard_normal((len(growth_stages) + 1, n_paths))
+    growth = np.maximum(0.0, np.asarray(growth_stages)[:, None] + growth_volatility * shocks[:-1]).T
+    discount = np.maximum(0.01, discount_rate + discount_volatility * shocks[-1])
+    return growth[:, :-1], growth[:, -1], discount
+
+
+def summarize_simulation(values: np.ndarray, percentiles: tuple = DCF_PERCENTILES) -> dict:
+    """Mean, standard deviation and percentiles of the valid simulated values."""
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {"count": 0}
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "std_dev": float(values.std()),
+        "percentiles": dict(zip(percentiles, np.percentile(values, percentiles).tolist())),
+    }
 
 
 @standard_agent_execution(
@@ -122,38 +164,35 @@ async def run(
         }
 
     # DCF Parameters (Core Logic)
+    valuation_settings = settings.agent_settings.valuation
+    stage_years = (valuation_settings.DCF_GROWTH_STAGE1, valuation_settings.DCF_GROWTH_STAGE2)
     growth_stages = [
-        settings.agent_settings.valuation.DCF_GROWTH_STAGE1,  # High growth (1-5 years) # Corrected path
-        settings.agent_settings.valuation.DCF_GROWTH_STAGE2,  # Medium growth (6-10 years) # Corrected path
-        settings.agent_settings.valuation.DCF_TERMINAL_GROWTH_RATE,  # Terminal growth # Corrected path
+        valuation_settings.DCF_STAGE1_GROWTH_RATE,  # High growth
+        valuation_settings.DCF_STAGE2_GROWTH_RATE,  # Stable growth
+        valuation_settings.DCF_TERMINAL_GROWTH_RATE,  # Terminal growth
     ]
     risk_free_rate = settings.data_provider.RISK_FREE_RATE
-    # Assuming MARKET_RISK_PREMIUM and DCF_DEFAULT_TERMINAL_PE are also in ValuationAgentSettings
-    market_premium = settings.agent_settings.valuation.MARKET_RISK_PREMIUM # Corrected path
+    market_premium = valuation_settings.MARKET_RISK_PREMIUM
     discount_rate = risk_free_rate + beta * market_premium
-    terminal_pe = settings.agent_settings.valuation.DCF_DEFAULT_TERMINAL_PE # Corrected path
-
-    # Monte Carlo Simulation (Core Logic)
-    n_simulations = settings.agent_settings.valuation.DCF_SIMULATION_RUNS # Corrected path
-    simulation_results = []
-
-    for _ in range(n_simulations):
-        # Randomize growth rates and discount rate
-        # Use truncated normal or ensure rates are reasonable (e.g., growth < discount)
-        perturbed_growth = [
-            max(0, np.random.normal(g, 0.02))
-            for g in growth_stages  # Ensure non-negative growth
-        ]
-        perturbed_discount = max(
-            0.01, np.random.normal(discount_rate, 0.01)
-        )  # Ensure positive discount rate
-
-        # Run DCF simulation
-        sim_value = simulate_dcf(eps, perturbed_growth, perturbed_discount, terminal_pe)
-        if not np.isnan(sim_value):  # Exclude invalid simulation runs
-            simulation_results.append(sim_value)
-
-    if not simulation_results:
+    terminal_pe = valuation_settings.DCF_DEFAULT_TERMINAL_PE
+
+    # Monte Carlo Simulation (Core Logic): all paths drawn and valued as arrays
+    n_simulations = valuation_settings.DCF_SIMULATION_RUNS
+    rng = np.random.default_rng(valuation_settings.DCF_RANDOM_SEED)
+    stage_growth, terminal_growth, discount_rates = draw_dcf_scenarios(
+        n_simulations,
+        growth_stages,
+        discount_rate,
+        valuation_settings.DCF_GROWTH_RATE_VOLATILITY,
+        valuation_settings.DCF_DISCOUNT_RATE_VOLATILITY,
+        rng,
+    )
+    simulated_values = simulate_dcf_batch(
+        eps, stage_growth, terminal_growth, discount_rates, terminal_pe, stage_years
+    )
+    summary = summarize_simulation(simulated_values)
+
+    if not summary["count"]:
         return {
             "symbol": symbol,
             "verdict": "ERROR",
@@ -166,10 +205,11 @@ async def run(
         }
 
     # Statistical analysis (Core Logic)
-    mean_value = np.mean(simulation_results)
-    std_dev = np.std(simulation_results)
-    percentile_5 = np.percentile(simulation_results, 5)
-    percentile_95 = np.percentile(simulation_results, 95)
+    mean_value = summary["mean"]
+    std_dev = summary["std_dev"]
+    percentiles = summary["percentiles"]
+    percentile_5 = percentiles[5]
+    percentile_95 = percentiles[95]
 
     # Verdict based on mean intrinsic value (Core Logic)
     intrinsic_value = mean_value
@@ -224,13 +264,14 @@ async def run(
             "intrinsic_value_mean": round(mean_value, 2),
             "margin_of_safety": round(margin_of_safety, 4), # Store MoS as decimal
             "simulation_summary": {
-                "count": len(simulation_results),
+                "count": summary["count"],
                 "std_dev": round(std_dev, 2),
                 "relative_std_dev": (
                     round(relative_std_dev, 4) if mean_value != 0 else None
                 ),
                 "5th_percentile": round(percentile_5, 2),
                 "95th_percentile": round(percentile_95, 2),
+                "percentiles": {f"p{p}": round(v, 2) for p, v in percentiles.items()},
             },
             "inputs": {
                 "base_eps": round(eps, 4),
@@ -239,6 +280,7 @@ async def run(
                 "beta_source": beta_source,
                 "discount_rate_avg": round(discount_rate * 100, 2),
                 "growth_stages_avg": [round(g * 100, 1) for g in growth_stages],
+                "stage_years": list(stage_years),
                 "terminal_pe": terminal_pe,
             },
         },
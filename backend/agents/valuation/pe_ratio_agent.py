@@ -9,6 +9,8 @@ from backend.utils.data_provider import (
 from loguru import logger
 from backend.agents.decorators import standard_agent_execution
 from backend.config.settings import get_settings
+from backend.quant.sketches import TDigest, load_quantile_sketch, refresh_quantile_sketch
+from backend.utils.cache_utils import get_redis_client
 from datetime import datetime, timedelta
 
 agent_name = "pe_ratio_agent"
@@ -79,13 +81,24 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
     try:
         price_task = fetch_price_point(symbol)
         eps_task = fetch_latest_eps(symbol)  # Corrected call
-        
+
+        # Historical P/E uses the current EPS, so its distribution is the price history's.
+        # A cached rolling sketch of prices holds it; once it exists, only the bars
+        # from its last one onwards are fetched.
+        window_days = pe_settings.HISTORICAL_YEARS * 365
+        price_sketch = await load_quantile_sketch(await get_redis_client(), f"prices:{symbol}")
+        if price_sketch is not None and price_sketch.window_days != window_days:
+            price_sketch = None
+
         # Convert years to start_date and end_date
         end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=pe_settings.HISTORICAL_YEARS * 365)).strftime("%Y-%m-%d")
-        
+        start_date = (datetime.now() - timedelta(days=window_days)).strftime("%Y-%m-%d")
+        fetch_from = start_date
+        if price_sketch is not None and price_sketch.last_timestamp is not None:
+            fetch_from = max(start_date, pd.Timestamp(price_sketch.last_timestamp).strftime("%Y-%m-%d"))
+
         hist_price_task = fetch_historical_price_series(
-            symbol, start_date=start_date, end_date=end_date
+            symbol, start_date=fetch_from, end_date=end_date
         )
         price_data, current_eps_data, historical_prices = await asyncio.gather(  # Renamed variable
             price_task, eps_task, hist_price_task
@@ -183,7 +196,6 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
     current_pe = current_price / current_eps
 
     # Calculate Historical P/E Analysis
-    historical_pe_series = None
     mean_hist_pe = None
     std_hist_pe = None
     percentile_rank = None
@@ -191,6 +203,7 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
     data_source = "calculated_fundamental"
 
     # First, check if historical_prices exists
+    fetched_history = historical_prices is not None
     if historical_prices is not None:
         # Ensure historical_prices is a pandas Series
         if not isinstance(historical_prices, pd.Series):
@@ -211,52 +224,52 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
                 )
                 historical_prices = None  # Invalidate if conversion fails
 
-        # Now check if conversion was successful and series is not empty
-        if historical_prices is not None and not historical_prices.empty:
-            # Calculate historical P/E using historical prices and CURRENT EPS (simplification!)
-            historical_pe_series = historical_prices / current_eps
-            historical_pe_series = historical_pe_series.dropna()  # Drop NaNs
-            data_source = "calculated_fundamental + historical_prices"
-
-            if not historical_pe_series.empty:
-                mean_hist_pe = historical_pe_series.mean()
-                std_hist_pe = historical_pe_series.std()
-
-                # Check for zero standard deviation BEFORE calculating percentile/z-score
-                if std_hist_pe is None or std_hist_pe < 1e-9:
-                    logger.warning(f"[{agent_name}] Historical P/E std dev is zero or None for {symbol}. Cannot calculate percentile/z-score.")
-                    percentile_rank = None # Ensure these are None
-                    z_score = None
-                    data_source += " (historical std dev zero)" # Add note to data source
-                else:
-                    # Calculate percentile rank of current P/E relative to history
-                    try:
-                        # Use scipy if available for potentially more accurate percentileofscore
-                        from scipy import stats
-
-                        percentile_rank = stats.percentileofscore(
-                            historical_pe_series, current_pe, kind="rank"
-                        )
-                    except ImportError:
-                        # Fallback numpy/pandas calculation (less precise for ties)
-                        percentile_rank = (historical_pe_series < current_pe).mean() * 100
-
-                    # Calculate Z-score (already checked std_hist_pe > 1e-9)
-                    z_score = (current_pe - mean_hist_pe) / std_hist_pe
+    # Now check if conversion was successful and series is not empty
+    price_distribution = None
+    if historical_prices is not None and not historical_prices.empty:
+        # Historical P/E is historical prices over CURRENT EPS (simplification!), so
+        # its moments and ranks are the price distribution's scaled by 1 / EPS
+        price_distribution = await _price_distribution(
+            symbol, historical_prices, price_sketch, window_days, start_date, end_date, settings
+        )
+        data_source = "calculated_fundamental + historical_prices"
+    elif fetch_from != start_date and price_sketch.count:
+        # No bars since the sketch's last one (weekend or holiday); the cached
+        # sketch still holds the whole window
+        price_distribution = price_sketch
+        data_source = "calculated_fundamental + historical_prices"
+    elif historical_prices is not None: # It exists but is empty
+        logger.warning(f"[{agent_name}] Historical price series is empty for {symbol}")
+        data_source = "calculated_fundamental (empty historical data)"
+    elif fetched_history: # Conversion failed
+        logger.warning(
+            f"[{agent_name}] Invalid or missing historical price series format for {symbol}"
+        )
+        data_source = "calculated_fundamental (invalid/missing historical data)"
+
+    if price_distribution is not None:
+        if price_distribution.count:
+            mean_hist_pe = price_distribution.mean / current_eps
+            std_hist_pe = price_distribution.std / current_eps
+
+            # Check for zero (or undefined) standard deviation BEFORE calculating percentile/z-score
+            if not std_hist_pe >= 1e-9:
+                logger.warning(f"[{agent_name}] Historical P/E std dev is zero or None for {symbol}. Cannot calculate percentile/z-score.")
+                percentile_rank = None # Ensure these are None
+                z_score = None
+                data_source += " (historical std dev zero)" # Add note to data source
             else:
-                logger.warning(
-                    f"[{agent_name}] Historical P/E series empty after calculation for {symbol}"
-                )
-                data_source = "calculated_fundamental (historical calc failed)"
-        # This else corresponds to the check after conversion attempt
-        elif historical_prices is not None: # It exists but is empty
-             logger.warning(f"[{agent_name}] Historical price series is empty for {symbol}")
-             data_source = "calculated_fundamental (empty historical data)"
-        else: # Conversion failed or original was None
+                # Percentile rank of current P/E relative to history, as
+                # scipy.stats.percentileofscore(kind="rank") on the P/E series
+                percentile_rank = price_distribution.percentile_rank(current_price)
+
+                # Calculate Z-score (already checked std_hist_pe > 1e-9)
+                z_score = (current_pe - mean_hist_pe) / std_hist_pe
+        else:
             logger.warning(
-                f"[{agent_name}] Invalid or missing historical price series format for {symbol}"
+                f"[{agent_name}] Historical P/E series empty after calculation for {symbol}"
             )
-            data_source = "calculated_fundamental (invalid/missing historical data)"
+            data_source = "calculated_fundamental (historical calc failed)"
 
     # Determine Verdict based on Percentile Rank
     # This logic remains largely the same, but now percentile_rank will be None if std dev was zero
@@ -316,3 +329,30 @@ async def run(symbol: str, agent_outputs: dict = None) -> dict:
         "agent_name": agent_name,
     }
     return result
+
+
+async def _price_distribution(symbol, historical_prices, sketch, window_days, start_date, end_date, settings):
+    """The symbol's rolling price sketch, extended with ``historical_prices``.
+
+    Prices without dates cannot extend a rolling window and get a one-off digest.
+    """
+    sketch_settings = settings.agent_settings.quantile_sketch
+    prices = historical_prices.dropna()
+    if not isinstance(prices.index, pd.DatetimeIndex):
+        digest = TDigest(sketch_settings.COMPRESSION)
+        digest.extend(prices.to_numpy(dtype=float))
+        return digest
+    prices = prices.sort_index()
+    if sketch is not None and not sketch.agrees_with(prices.index, prices.to_numpy(dtype=float)):
+        # Only the recent bars were fetched, but the history has changed (e.g. a split
+        # adjustment) or has a gap: rebuild the sketch from the whole window
+        logger.info(f"[{agent_name}] Price history for {symbol} changed; rebuilding its P/E distribution")
+        sketch = None
+        refetched = await fetch_historical_price_series(symbol, start_date=start_date, end_date=end_date)
+        if isinstance(refetched, pd.Series) and isinstance(refetched.index, pd.DatetimeIndex) and not refetched.dropna().empty:
+            prices = refetched.dropna().sort_index()
+    return await refresh_quantile_sketch(
+        await get_redis_client(), f"prices:{symbol}", prices.index, prices.to_numpy(dtype=float), window_days,
+        sketch=sketch, bucket_days=sketch_settings.BUCKET_DAYS, compression=sketch_settings.COMPRESSION,
+        ex=sketch_settings.CACHE_TTL,
+    )
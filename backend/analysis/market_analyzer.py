@@ -5,10 +5,10 @@ from backend.utils.metrics_collector import monitor_execution_time
 from backend.utils.validation import validate_input
 from backend.utils.cache_utils import cache_data, cleanup_cache
 from backend.monitoring.performance import track_memory_usage
+from backend.quant.regime import get_regime_model
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
-from sklearn.cluster import KMeans
 from scipy import stats
 from sklearn.linear_model import LinearRegression
 from functools import cached_property, lru_cache
@@ -25,8 +25,10 @@ class MarketState:
 
 
 class MarketAnalyzer:
-    def __init__(self, data_service):
+    def __init__(self, data_service, covariance_service=None, regime_model=None):
         self.data_service = data_service
+        self.covariance_service = covariance_service
+        self.regime_model = regime_model  # Fixed RegimeModel; None reads the shared one
         self.market_states = {}
         self._volatility_window = 252  # Configure as class constant
         self._sentiment_weights = {"roc": 0.4, "cci": 0.3, "ultimate_osc": 0.3}
@@ -54,34 +56,35 @@ class MarketAnalyzer:
             data, liquidity, sentiment = await asyncio.gather(
                 data_task, liquidity_task, sentiment_task
             )
+            regime_model = self.regime_model or await get_regime_model()
 
             # Vectorized calculations
             volatility = self._calculate_market_volatility(data)
             correlation = self._calculate_cross_correlation(data)
-            regime = self._classify_market_regime(volatility, correlation, liquidity)
+            regime = self._classify_market_regime(regime_model)
 
             return MarketState(regime, volatility, correlation, liquidity, sentiment)
         except Exception as e:
             logging.error(f"Market analysis failed: {e}", exc_info=True)
             return None
 
-    def _initialize_regime_model(self) -> KMeans:
-        return KMeans(n_clusters=4, random_state=42)
-
     @monitor_execution_time("regime_classification")
-    def _classify_market_regime(
-        self, volatility: float, correlation: float, liquidity: float
-    ) -> str:
-        features = np.array([[volatility, correlation, liquidity]])
-        regime = self.regime_model.predict(features)[0]
-        regimes = ["normal", "stress", "crisis", "recovery"]
-        return regimes[regime]
+    def _classify_market_regime(self, regime_model) -> str:
+        # Regime is market-wide: the index model's call on its latest bar, in the
+        # normal/stress/crisis vocabulary signal generation and monitoring use
+        if regime_model is None or regime_model.latest_features is None:
+            return "unknown"
+        return regime_model.market_state()
 
     def _calculate_market_volatility(self, data: pd.DataFrame) -> float:
         returns = data.pct_change().dropna()
         return float(returns.std() * np.sqrt(252))
 
     def _calculate_cross_correlation(self, data: pd.DataFrame) -> float:
+        # Read the universe correlation from the covariance service when it tracks every symbol
+        service = self.covariance_service
+        if service is not None and len(data.columns) and all(symbol in service for symbol in data.columns):
+            return float(np.nanmean(service.correlation_matrix(list(data.columns))))
         returns = data.pct_change().dropna()
         corr_matrix = returns.corr()
         return float(corr_matrix.mean().mean())
@@ -1,9 +1,15 @@
 # backend/api/endpoints/analysis.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 # Import the run_full_cycle function instead of the Orchestrator class directly
 from backend.orchestrator import run_full_cycle 
 from backend.security.jwt_auth import verify_token
 from backend.config.settings import Settings, get_settings
+from backend.db.analysis_history import get_snapshot, get_verdict_history
+from backend.db.session import get_db
+from backend.utils.cache_codec import CacheDecodeError, decode_cache_value
+from backend.utils.cache_utils import get_redis_client
 from loguru import logger
 
 router = APIRouter()
@@ -45,3 +51,45 @@ async def analyze_symbol(symbol: str, settings: Settings = Depends(get_settings)
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An internal error occurred during analysis for {symbol}."
         )
+
+
+@router.get("/analysis/{symbol}/history",
+            summary="Stored verdict history for a symbol",
+            dependencies=[Depends(verify_token)])
+async def analysis_history(
+    symbol: str,
+    agent: Optional[str] = Query(None, description="Agent name, or 'composite' for the overall verdict"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db=Depends(get_db),
+):
+    """Historical verdicts from the analysis_results table, newest first."""
+    results = await get_verdict_history(db, symbol, start=start, end=end, agent_name=agent, limit=limit)
+    return {"symbol": symbol, "count": len(results), "results": results}
+
+
+@router.get("/analysis/{symbol}/latest",
+            summary="Latest analysis snapshot for a symbol",
+            dependencies=[Depends(verify_token)])
+async def latest_analysis(symbol: str, as_of: Optional[datetime] = None, db=Depends(get_db)):
+    """
+    Latest analysis for a symbol. Served from Redis when the cached result is
+    still live, otherwise from the most recent stored run. ``as_of`` always
+    reads the stored history.
+    """
+    if as_of is None:
+        try:
+            redis_client = await get_redis_client()
+            cached = await redis_client.get(f"analysis:{symbol}")
+            if cached:
+                return {"source": "cache", "analysis": decode_cache_value(cached)}
+        except CacheDecodeError as e:
+            logger.warning(f"Ignoring undecodable cached analysis for {symbol}: {e}")
+        except Exception as e:
+            logger.warning(f"Redis lookup failed for {symbol}, falling back to history: {e}")
+
+    snapshot = await get_snapshot(db, symbol, as_of=as_of)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No stored analysis for {symbol}")
+    return {"source": "database", "analysis": snapshot}
@@ -4,6 +4,8 @@ from .endpoints.health import router as health_router
 from .endpoints.metrics import router as metrics_router
 # Import the analysis router
 from .endpoints.analysis import router as analysis_router 
+from backend.utils.cache_utils import close_redis_client
+from backend.db.analysis_history import close_history_writer
 
 app = FastAPI(title="Zion Market Analysis Platform")
 
@@ -21,3 +23,15 @@ app.include_router(health_router, prefix="/api", tags=["health"])
 app.include_router(metrics_router, prefix="/api/v1", tags=["metrics"])
 # Include the analysis router
 app.include_router(analysis_router, prefix="/api", tags=["analysis"])
+
+
+@app.on_event("shutdown")
+async def shutdown_redis():
+    """Release the shared Redis connection pool."""
+    await close_redis_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_history_writer():
+    """Write any analysis history rows still buffered."""
+    await close_history_writer()
@@ -1,5 +1,10 @@
+from math import sqrt
+
+import numpy as np
 import pandas as pd
 
+from backend.backtesting.engine import backtest
+
 
 def calculate_metrics(equity_curve):
     df = pd.DataFrame(equity_curve)
@@ -16,31 +21,19 @@ def calculate_metrics(equity_curve):
 
 
 def apply_strategy(verdicts: list, capital: float = 100000.0) -> dict:
-    equity_curve = []
-    cash = capital
-    shares = 0
-    last_price = 0
-
-    for entry in verdicts:
-        price = entry["price"]
-        verdict = entry["verdict"]
-
-        if verdict == "BUY" and cash > 0:
-            shares = cash / price
-            cash = 0
-        elif verdict == "SELL" and shares > 0:
-            cash = shares * price
-            shares = 0
-
-        portfolio_value = cash + shares * price
-        equity_curve.append({"date": entry["date"], "value": round(portfolio_value, 2)})
-        last_price = price
-
-    final_value = cash + shares * last_price
+    # BUY goes all in and SELL all to cash at that bar's price; other verdicts hold
+    prices = np.array([entry["price"] for entry in verdicts], dtype=float)
+    targets = np.array([{"BUY": 1.0, "SELL": 0.0}.get(entry["verdict"], np.nan) for entry in verdicts])
+    result = backtest(prices, targets, capital=capital, lag=0)
+
+    equity_curve = [
+        {"date": entry["date"], "value": round(float(value), 2)}
+        for entry, value in zip(verdicts, result.equity)
+    ]
     sharpe, max_dd = calculate_metrics(equity_curve)
 
     return {
-        "final_value": round(final_value, 2),
+        "final_value": round(float(result.equity[-1]), 2),
         "equity_curve": equity_curve,
         "sharpe_ratio": sharpe,
         "max_drawdown": max_dd,
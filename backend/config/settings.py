@@ -111,6 +111,82 @@ class DataProviderSettings(BaseSettings):
     # Added fields for Beta Agent
     MARKET_INDEX_SYMBOL: str = Field("^NSEI", json_schema_extra={"env":"MARKET_INDEX_SYMBOL"})
     RISK_FREE_RATE: float = Field(0.04, json_schema_extra={"env":"RISK_FREE_RATE"})
+    # Shared fundamentals snapshot (backend.data.fundamentals)
+    FUNDAMENTALS_CACHE_TTL: int = Field(86400, json_schema_extra={"env":"FUNDAMENTALS_CACHE_TTL"})  # seconds
+    FUNDAMENTALS_NEGATIVE_TTL: int = Field(300, json_schema_extra={"env":"FUNDAMENTALS_NEGATIVE_TTL"})  # seconds, for empty snapshots
+    # Scraping fallback (backend.utils.html_parsing)
+    HTML_PARSER: str = Field("auto", json_schema_extra={"env":"HTML_PARSER"})  # auto, selectolax, lxml or html.parser
+    HTML_PARSE_WORKERS: int = Field(4, json_schema_extra={"env":"HTML_PARSE_WORKERS"})
+    # ETag / Last-Modified validator cache (backend.utils.conditional_fetch)
+    CONDITIONAL_FETCH_ENABLED: bool = Field(True, json_schema_extra={"env":"CONDITIONAL_FETCH_ENABLED"})
+    CONDITIONAL_FETCH_TTL: int = Field(604800, json_schema_extra={"env":"CONDITIONAL_FETCH_TTL"})  # seconds
+    # Record/replay fixtures (backend.data.providers.replay_provider)
+    RECORD_FIXTURES: bool = Field(False, json_schema_extra={"env":"RECORD_FIXTURES"})
+    REPLAY_FIXTURE_DIR: str = Field("data/replay_fixtures", json_schema_extra={"env":"REPLAY_FIXTURE_DIR"})
+    REPLAY_LATENCY_MS: float = Field(0.0, json_schema_extra={"env":"REPLAY_LATENCY_MS"})
+    REPLAY_LATENCY_JITTER_MS: float = Field(0.0, json_schema_extra={"env":"REPLAY_LATENCY_JITTER_MS"})
+    REPLAY_ERROR_RATE: float = Field(0.0, json_schema_extra={"env":"REPLAY_ERROR_RATE"})  # 0.0 - 1.0
+
+
+class CacheSettings(BaseSettings):
+    """Serialization settings for cached payloads"""
+
+    CODEC: str = Field("json", json_schema_extra={"env":"CACHE_CODEC"})  # json, orjson or msgpack
+    COMPRESSION: str = Field("none", json_schema_extra={"env":"CACHE_COMPRESSION"})  # none, zlib or zstd
+    COMPRESSION_THRESHOLD: int = Field(4096, json_schema_extra={"env":"CACHE_COMPRESSION_THRESHOLD"})  # bytes
+    COMPRESSION_LEVEL: int = Field(3, json_schema_extra={"env":"CACHE_COMPRESSION_LEVEL"})
+
+    model_config = SettingsConfigDict(env_prefix="CACHE_", extra="ignore")
+
+
+class RedisSettings(BaseSettings):
+    """Connection pool settings for the shared Redis client"""
+
+    MAX_CONNECTIONS: int = Field(50, json_schema_extra={"env":"REDIS_MAX_CONNECTIONS"})
+    POOL_TIMEOUT: float = Field(5.0, json_schema_extra={"env":"REDIS_POOL_TIMEOUT"})  # seconds to wait for a free connection
+    SOCKET_TIMEOUT: float = Field(5.0, json_schema_extra={"env":"REDIS_SOCKET_TIMEOUT"})  # seconds
+    SOCKET_CONNECT_TIMEOUT: float = Field(5.0, json_schema_extra={"env":"REDIS_SOCKET_CONNECT_TIMEOUT"})  # seconds
+    HEALTH_CHECK_INTERVAL: int = Field(30, json_schema_extra={"env":"REDIS_HEALTH_CHECK_INTERVAL"})  # seconds, 0 disables
+    RETRY_ON_TIMEOUT: bool = Field(True, json_schema_extra={"env":"REDIS_RETRY_ON_TIMEOUT"})
+    RETRY_ATTEMPTS: int = Field(3, json_schema_extra={"env":"REDIS_RETRY_ATTEMPTS"})
+
+    model_config = SettingsConfigDict(env_prefix="REDIS_", extra="ignore")
+
+
+class WarmupSettings(BaseSettings):
+    """Pre-market and bar-close cache warm-up (backend.scheduler)"""
+
+    MARKET_TIMEZONE: str = Field("Asia/Kolkata", json_schema_extra={"env":"WARMUP_MARKET_TIMEZONE"})
+    MARKET_OPEN: str = Field("09:15", json_schema_extra={"env":"WARMUP_MARKET_OPEN"})  # HH:MM, exchange time
+    MARKET_CLOSE: str = Field("15:30", json_schema_extra={"env":"WARMUP_MARKET_CLOSE"})  # HH:MM, exchange time
+    PRE_MARKET_LEAD_MINUTES: int = Field(45, json_schema_extra={"env":"WARMUP_PRE_MARKET_LEAD_MINUTES"})
+    BAR_MINUTES: int = Field(15, json_schema_extra={"env":"WARMUP_BAR_MINUTES"})
+    # Upper bound; each pass is further capped to what PROVIDER_BUDGETS finish in its slot
+    MAX_SYMBOLS: int = Field(120, json_schema_extra={"env":"WARMUP_MAX_SYMBOLS"})
+    CONCURRENCY: int = Field(4, json_schema_extra={"env":"WARMUP_CONCURRENCY"})
+    # Bars fetched per pass to advance the streaming indicators
+    INDICATOR_REFRESH_PERIOD: str = Field("5d", json_schema_extra={"env":"WARMUP_INDICATOR_REFRESH_PERIOD"})
+    # Provider calls per minute the warm-up may spend, leaving headroom for live traffic
+    PROVIDER_BUDGETS: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "alpha_vantage": 3, "yahoo_finance": 60, "newsapi": 5, "twitter": 15, "web_scraper": 30,
+        },
+        json_schema_extra={"env":"WARMUP_PROVIDER_BUDGETS"},
+    )
+    # Estimated provider calls one symbol's full pre-market analysis makes
+    SYMBOL_COST: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "alpha_vantage": 1, "yahoo_finance": 6, "newsapi": 1, "twitter": 1, "web_scraper": 7,
+        },
+        json_schema_extra={"env":"WARMUP_SYMBOL_COST"},
+    )
+    # Bar-close passes refresh only the price-driven agents
+    BAR_CLOSE_SYMBOL_COST: Dict[str, int] = Field(
+        default_factory=lambda: {"yahoo_finance": 4},
+        json_schema_extra={"env":"WARMUP_BAR_CLOSE_SYMBOL_COST"},
+    )
+
+    model_config = SettingsConfigDict(env_prefix="WARMUP_", extra="ignore")
 
 
 class LoggingSettings(BaseSettings):
@@ -143,6 +219,11 @@ class DatabaseSettings(BaseSettings):
     URL: str = Field("sqlite:///./test.db", json_schema_extra={"env":"DATABASE_URL"})
     POOL_SIZE: int = Field(5, json_schema_extra={"env":"DATABASE_POOL_SIZE"})
     MAX_OVERFLOW: int = Field(10, json_schema_extra={"env":"DATABASE_MAX_OVERFLOW"})
+    # Append-only analysis_results history (backend.db.analysis_history)
+    HISTORY_ENABLED: bool = Field(True, json_schema_extra={"env":"DATABASE_HISTORY_ENABLED"})
+    HISTORY_BATCH_SIZE: int = Field(500, json_schema_extra={"env":"DATABASE_HISTORY_BATCH_SIZE"})  # rows per insert
+    HISTORY_FLUSH_INTERVAL: float = Field(2.0, json_schema_extra={"env":"DATABASE_HISTORY_FLUSH_INTERVAL"})  # seconds
+    HISTORY_MAX_PENDING: int = Field(50_000, json_schema_extra={"env":"DATABASE_HISTORY_MAX_PENDING"})  # rows buffered before dropping
 
     @field_validator("URL")
     def validate_database_url(cls, v):
@@ -248,6 +329,8 @@ class CorrelationAgentSettings(BaseSettings):
 class ValuationAgentSettings(BaseSettings):
     DCF_GROWTH_STAGE1: int = 5  # Years of high growth
     DCF_GROWTH_STAGE2: int = 5  # Years of stable growth
+    DCF_STAGE1_GROWTH_RATE: float = 0.10  # Annual EPS growth during the high-growth years
+    DCF_STAGE2_GROWTH_RATE: float = 0.05  # Annual EPS growth during the stable years
     DCF_DISCOUNT_RATE: float = 0.10  # WACC or required rate of return
     DCF_TERMINAL_GROWTH_RATE: float = 0.025  # Perpetual growth rate
     MARKET_RISK_PREMIUM: float = 0.06 # Added missing field (Example value)
@@ -256,10 +339,75 @@ class ValuationAgentSettings(BaseSettings):
     DCF_MARGIN_OF_SAFETY_BUY: float = 0.15  # 15% MoS for Buy
     DCF_MARGIN_OF_SAFETY_SELL: float = -0.10 # -10% MoS (overvalued) for Sell
     DCF_MARGIN_OF_SAFETY_STRONG_SELL: float = -0.25 # -25% MoS for Strong Sell
-    DCF_SIMULATION_RUNS: int = 1000 # Number of runs for Monte Carlo
+    DCF_SIMULATION_RUNS: int = 100_000 # Monte Carlo paths, evaluated as one numpy batch
+    DCF_GROWTH_RATE_VOLATILITY: float = 0.02 # Std dev of the simulated growth rates
+    DCF_DISCOUNT_RATE_VOLATILITY: float = 0.01 # Std dev of the simulated discount rate
+    DCF_RANDOM_SEED: Optional[int] = None # Fix for reproducible simulations
     DCF_UNCERTAINTY_PENALTY_FACTOR: float = 0.5 # How much relative std dev impacts confidence
 
 
+class PortfolioRiskSettings(BaseSettings):
+    CONFIDENCE_LEVEL: float = 0.95  # VaR/CVaR confidence
+    MONTE_CARLO_PATHS: int = 20_000  # Correlated scenarios per Monte Carlo run
+    RANDOM_SEED: Optional[int] = None  # Fix for reproducible Monte Carlo runs
+    LOOKBACK_DAYS: int = 252  # Return observations used for the estimates
+    MIN_OBSERVATIONS: int = 60  # Common return observations required across all positions
+
+
+class CovarianceServiceSettings(BaseSettings):
+    STATE_PATH: str = "data/covariance_state.npz"  # Where the shared covariance service persists
+    HALFLIFE_DAYS: float = 63.0  # Half-life of the exponential weights, in bars
+    HISTORY_PERIOD: str = "1y"  # Price history fetched when the universe is (re)built
+    RECENT_BARS: int = 252  # Raw returns kept for fixed-window statistics
+    MAX_AGE_SECONDS: int = 3600  # Roll the service forward when older than this
+
+
+class MarketModelSettings(BaseSettings):
+    WINDOWS: List[int] = [30, 60, 252]  # Regression windows against the market index, in bars
+    PERIODS_PER_YEAR: int = 252  # Annualises idiosyncratic volatility
+    CACHE_TTL: int = 86400  # The table is rebuilt at most once per day
+
+
+class RegimeModelSettings(BaseSettings):
+    STATE_PATH: str = "data/regime_model.npz"  # Where the fitted regime model persists
+    N_REGIMES: int = 3  # Mixture components, ordered from calmest to most volatile
+    FEATURE_WINDOW: int = 21  # Bars behind the trailing return and volatility features
+    HISTORY_PERIOD: str = "5y"  # Index history the model is fitted on
+    MIN_OBSERVATIONS: int = 250  # Feature rows required before fitting
+    REFIT_SECONDS: int = 86400  # Check the index for new bars (and refit) at most this often
+
+
+class QuantileSketchSettings(BaseSettings):
+    COMPRESSION: float = 200.0  # t-digest size/accuracy; a year of daily returns keeps exact 1% and 5% tails
+    BUCKET_DAYS: float = 30.0  # Span of each mergeable digest; the rolling window is exact to one bucket
+    RETURN_WINDOW_DAYS: float = 365.0  # Trailing window of returns behind VaR
+    CACHE_TTL: int = 7 * 86400  # Sketch state outlives a few days without new bars
+
+
+class FactorModelSettings(BaseSettings):
+    HISTORY_PERIOD: str = "2y"  # Momentum needs a year of bars before its first exposure
+    MOMENTUM_WINDOW: int = 252  # 12-1 month momentum: log return from 252 to 21 bars ago
+    MOMENTUM_SKIP: int = 21
+    VOLATILITY_WINDOW: int = 63  # Bars behind the low-volatility exposure
+    WINSORIZE: float = 3.0  # Exposures are clipped to this many cross-sectional standard deviations
+    MIN_SYMBOLS: int = 10  # Smallest cross-section a date is regressed on
+    PREMIA_WINDOW: int = 252  # Dates of factor returns behind the premia and specific volatility
+    PERIODS_PER_YEAR: int = 252
+    CACHE_TTL: int = 86400  # The model is refitted at most once per day
+
+
+class BacktestSettings(BaseSettings):
+    INITIAL_CAPITAL: float = 100000.0
+    COMMISSION_BPS: float = 10.0  # Brokerage, exchange charges and transaction taxes per unit traded
+    SLIPPAGE_BPS: float = 5.0  # Assumed gap between the close and the fill
+    EXECUTION_LAG: int = 1  # Signals from a bar's close trade on the next bar
+    REBALANCE: str = "on_change"  # "on_change", "always", or a bar count such as "21"
+    TREND_WINDOW: int = 200  # Moving average behind the default strategy
+    PERIODS_PER_YEAR: int = 252
+    HISTORY_PERIOD: str = "max"  # Fetched for symbols without a local CSV
+    DATA_DIR: str = "data/historical"  # Local {symbol}.csv histories take precedence over the provider
+
+
 class AgentSettings(BaseSettings):
     """Container for all agent-specific settings"""
 
@@ -278,6 +426,13 @@ class AgentSettings(BaseSettings):
         CorrelationAgentSettings()
     )  # Added correlation settings
     valuation: ValuationAgentSettings = ValuationAgentSettings() # Added valuation settings
+    portfolio_risk: PortfolioRiskSettings = PortfolioRiskSettings()
+    covariance: CovarianceServiceSettings = CovarianceServiceSettings()
+    market_model: MarketModelSettings = MarketModelSettings()
+    regime_model: RegimeModelSettings = RegimeModelSettings()
+    quantile_sketch: QuantileSketchSettings = QuantileSketchSettings()
+    factor_model: FactorModelSettings = FactorModelSettings()
+    backtest: BacktestSettings = BacktestSettings()
     # Add missing market_regime settings for tests/agents
     market_regime: dict = Field(default_factory=lambda: {"thresholds": {"bull": 0.7, "bear": 0.3}}) # Modified to use Field and default_factory
     sector_pe_averages: Dict[str, float] = Field(default_factory=dict, json_schema_extra={"env":"SECTOR_PE_AVERAGES"}) # Added
@@ -296,6 +451,9 @@ class Settings(BaseSettings):
     # Nested settings
     api_keys: APIKeys = APIKeys()
     data_provider: DataProviderSettings = DataProviderSettings()
+    cache: CacheSettings = CacheSettings()
+    redis: RedisSettings = RedisSettings()
+    warmup: WarmupSettings = WarmupSettings()
     logging: LoggingSettings = LoggingSettings()
     security: SecuritySettings = SecuritySettings()
     database: DatabaseSettings = DatabaseSettings()
@@ -363,7 +521,9 @@ class Settings(BaseSettings):
     @property
     def REDIS_URL(self) -> str:
         """Get Redis URL from various possible sources"""
-        return "redis://redis:6379"
+        if self.api_keys and self.api_keys.REDIS_URL:
+            return self.api_keys.REDIS_URL
+        return os.getenv("REDIS_URL") or "redis://redis:6379"
 
     def get_api_key(self, provider: str) -> Optional[str]:
         provider = provider.upper()
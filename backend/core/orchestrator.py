@@ -3,12 +3,15 @@ from backend.agents.categories import CategoryManager, CategoryType
 # Correct the import path for SystemMonitor
 from backend.utils.system_monitor import SystemMonitor
 from backend.utils.metrics_collector import MetricsCollector
+from backend.utils.cache_codec import CacheDecodeError, decode_cache_value, encode_cache_value, robust_json_serializer
+from backend.utils.cache_batch import CacheBatch, cache_batch
+from backend.agents.decorators import agent_cache_key
+from backend.db.analysis_history import AnalysisHistoryWriter
 from datetime import datetime
 import asyncio
 from loguru import logger
 import time # Ensure time is imported
-import json
-from datetime import datetime # Ensure datetime is imported
+import numpy as np
 
 # Helper function for JSON serialization
 def json_serializer(obj):
@@ -24,14 +27,20 @@ def json_serializer(obj):
     except ImportError:
         pass # Pandas is not installed or used, so no need to handle its Timestamp
 
+    # Freshly computed agent results (not round-tripped through the cache) carry numpy values
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return robust_json_serializer(obj)
+
     # Let other types raise TypeError to be caught by the caller if not handled
     raise TypeError(f"Object of type {type(obj).__name__} (value: {str(obj)[:100]}) is not JSON serializable")
 
 
 class SystemOrchestrator:
-    def __init__(self, cache_client):
+    def __init__(self, cache_client, history_writer: Optional[AnalysisHistoryWriter] = None):
         self.category_manager = CategoryManager()
         self.cache = cache_client
+        # Optional append-only verdict history; None keeps results in the cache only
+        self.history = history_writer
         self.category_dependencies: Dict[str, List[str]] = {}
         # Initialize internal monitor and metrics collector
         # These are now imported at the module level
@@ -69,87 +78,24 @@ class SystemOrchestrator:
         categories: Optional[List[str]] = None,
         force_refresh: bool = False,
         monitor: SystemMonitor = None,  # Accept monitor for compatibility
+        refresh_categories: Optional[List[str]] = None,
     ) -> Dict:
-        """Run full analysis with advanced caching and error recovery"""
+        """Run full analysis with advanced caching and error recovery
+
+        ``force_refresh`` skips the cached ``analysis:`` blob; the agents of
+        ``refresh_categories`` also recompute instead of serving cached results.
+        """
         analysis_id = f"{symbol}_{datetime.now().timestamp()}"
         start_time = time.perf_counter() # Record start time
         try:
             await self.system_monitor.start_analysis(analysis_id)
 
-            # Check cache if not forced refresh
-            if not force_refresh:
-                cached = await self._get_cached_analysis(symbol)
-                if cached:
-                    return cached
-
-            # Execute categories with dependency resolution
-            results = {}
-            executed_categories = set()
-            categories_to_run = categories or self._get_default_categories() # Use a different variable name
-
-            for category_value in self._get_execution_order(categories_to_run): # Use the correct variable
-                if category_value in executed_categories:
-                    continue
-
-                category_enum = CategoryType(category_value) # Get Enum member
-
-                try:
-                    # Execute category returns a List[Dict] of agent results
-                    agent_results_list = await self._execute_category_with_retry(
-                        category_enum, symbol, results # Pass Enum member
-                    )
-
-                    # Store the list of results directly
-                    # Check if any agent within the list reported an error
-                    category_had_errors = any(res.get("error") for res in agent_results_list)
-                    num_results = len(agent_results_list)
-
-                    # Store results in a standard dictionary format for the category
-                    results[category_value] = {
-                        "results": agent_results_list,
-                        "error": "Category executed with internal agent errors." if category_had_errors else None,
-                        "count": num_results
-                    }
-                    executed_categories.add(category_value)
-
-                    # Collect metrics based on whether any agent failed
-                    self.metrics_collector.record_category_execution(
-                        category_value,
-                        num_results,
-                        category_had_errors,
-                    )
-
-                except Exception as e:
-                    logger.error(f"Category {category_value} failed during execution: {e}", exc_info=True) # Add traceback
-                    # Store a category-level error
-                    results[category_value] = {"error": f"Category execution failed: {str(e)}", "results": []}
-                    executed_categories.add(category_value) # Mark as executed even if failed
-                    self.metrics_collector.record_category_execution(category_value, 0, True) # Record failure
-
-            # Generate final verdict
-            final_verdict = self._generate_composite_verdict(results)
-            system_health = await self.system_monitor.get_health_metrics() # Use internal monitor
-
-            # Record end time and duration BEFORE getting metrics
-            end_time = time.perf_counter() 
-            duration = end_time - start_time
-            self.metrics_collector.record_response_time(duration)
-
-            # Construct the full response before caching
-            successful_response = {
-                "symbol": symbol,
-                "analysis_id": analysis_id,
-                "verdict": final_verdict,
-                "category_results": results,
-                "system_health": system_health,
-                "execution_metrics": self.metrics_collector.get_metrics(), # Now get_metrics will include current duration
-            }
-
-            # Cache the full successful response
-            await self._cache_analysis(symbol, successful_response)
-
-            await self.system_monitor.end_analysis(analysis_id, "success") # Use internal monitor
-            return successful_response
+            # Reads for the whole run are prefetched with one MGET and agent
+            # writes are flushed in one pipeline when the batch closes.
+            async with cache_batch(self.cache) as batch:
+                return await self._run_analysis(
+                    symbol, analysis_id, start_time, categories, force_refresh, batch, refresh_categories
+                )
 
         except Exception as e:
             # Record end time and duration BEFORE getting metrics in error path too
@@ -175,6 +121,119 @@ class SystemOrchestrator:
                 "execution_metrics": self.metrics_collector.get_metrics(), # Include metrics on error
             }
 
+    async def _run_analysis(
+        self,
+        symbol: str,
+        analysis_id: str,
+        start_time: float,
+        categories: Optional[List[str]],
+        force_refresh: bool,
+        batch: CacheBatch,
+        refresh_categories: Optional[List[str]] = None,
+    ) -> Dict:
+        """Execute the categories for one analysis inside an open cache batch"""
+        categories_to_run = categories or self._get_default_categories() # Use a different variable name
+        execution_order = self._get_execution_order(categories_to_run)
+
+        # Pre-flight: fetch the analysis blob and every agent result in one round trip
+        cache_key = f"analysis:{symbol}"
+        agent_keys = self._get_agent_cache_keys(symbol, execution_order)
+        if refresh_categories:
+            batch.invalidate(self._get_agent_cache_keys(symbol, list(refresh_categories)))
+        preflight_keys = [] if force_refresh else [cache_key]
+        preflight_keys += agent_keys
+        prefetched = await batch.prefetch(preflight_keys)
+
+        # Check cache if not forced refresh
+        if not force_refresh:
+            if prefetched:
+                cached = self._decode_cached_analysis(symbol, batch.lookup(cache_key))
+            else:
+                cached = await self._get_cached_analysis(symbol)
+            if cached:
+                return cached
+
+        # Execute categories with dependency resolution
+        results = {}
+        executed_categories = set()
+
+        for category_value in execution_order:
+            if category_value in executed_categories:
+                continue
+
+            category_enum = CategoryType(category_value) # Get Enum member
+
+            try:
+                # Execute category returns a List[Dict] of agent results
+                agent_results_list = await self._execute_category_with_retry(
+                    category_enum, symbol, results # Pass Enum member
+                )
+
+                # Store the list of results directly
+                # Check if any agent within the list reported an error
+                category_had_errors = any(res.get("error") for res in agent_results_list)
+                num_results = len(agent_results_list)
+
+                # Store results in a standard dictionary format for the category
+                results[category_value] = {
+                    "results": agent_results_list,
+                    "error": "Category executed with internal agent errors." if category_had_errors else None,
+                    "count": num_results
+                }
+                executed_categories.add(category_value)
+
+                # Collect metrics based on whether any agent failed
+                self.metrics_collector.record_category_execution(
+                    category_value,
+                    num_results,
+                    category_had_errors,
+                )
+
+            except Exception as e:
+                logger.error(f"Category {category_value} failed during execution: {e}", exc_info=True) # Add traceback
+                # Store a category-level error
+                results[category_value] = {"error": f"Category execution failed: {str(e)}", "results": []}
+                executed_categories.add(category_value) # Mark as executed even if failed
+                self.metrics_collector.record_category_execution(category_value, 0, True) # Record failure
+
+        # Generate final verdict
+        final_verdict = self._generate_composite_verdict(results)
+        system_health = await self.system_monitor.get_health_metrics() # Use internal monitor
+
+        # Record end time and duration BEFORE getting metrics
+        end_time = time.perf_counter()
+        duration = end_time - start_time
+        self.metrics_collector.record_response_time(duration)
+
+        # Construct the full response before caching
+        successful_response = {
+            "symbol": symbol,
+            "analysis_id": analysis_id,
+            "verdict": final_verdict,
+            "category_results": results,
+            "system_health": system_health,
+            "execution_metrics": self.metrics_collector.get_metrics(), # Now get_metrics will include current duration
+        }
+
+        # Cache the full successful response (staged with the agent writes)
+        await self._cache_analysis(symbol, successful_response, batch)
+        self._record_history(symbol, successful_response)
+
+        await self.system_monitor.end_analysis(analysis_id, "success") # Use internal monitor
+        return successful_response
+
+    def _get_agent_cache_keys(self, symbol: str, category_values: List[str]) -> List[str]:
+        """Cache keys the agents of the given categories will read for symbol"""
+        keys = []
+        for category_value in category_values:
+            try:
+                agent_names = self.category_manager.get_agent_cache_names(CategoryType(category_value))
+            except Exception as e:
+                logger.warning(f"Could not resolve agent cache keys for {category_value}: {e}")
+                continue
+            keys.extend(agent_cache_key(name, symbol) for name in agent_names)
+        return keys
+
     async def _execute_category_with_retry(
         self, category: CategoryType, symbol: str, results: Dict, max_retries: int = 3 # Expect Enum member
     ) -> List[Dict]: # Return type is List[Dict]
@@ -240,28 +299,41 @@ class SystemOrchestrator:
         """Get cached analysis if available"""
         cache_key = f"analysis:{symbol}"
         cached_data = await self.cache.get(cache_key)
-        if cached_data:
-            # Assuming data is stored as JSON string
-            import json
+        return self._decode_cached_analysis(symbol, cached_data)
 
+    def _decode_cached_analysis(self, symbol: str, cached_data) -> Optional[Dict]:
+        """Decode a raw cached analysis payload"""
+        if cached_data:
             try:
-                return json.loads(cached_data)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to decode cached JSON for {symbol}")
+                return decode_cache_value(cached_data)
+            except CacheDecodeError as e:
+                logger.warning(f"Failed to decode cached analysis for {symbol}: {e}")
                 return None
         return None
 
-    async def _cache_analysis(self, symbol: str, full_analysis_result: Dict):
+    async def _cache_analysis(self, symbol: str, full_analysis_result: Dict, batch: Optional[CacheBatch] = None):
         """Cache analysis results"""
         cache_key = f"analysis:{symbol}"
-        # import json # Already imported at the top
 
         try:
             # Use the custom serializer for datetime objects
-            await self.cache.set(cache_key, json.dumps(full_analysis_result, default=json_serializer), ex=3600)  # 1 hour expiry
+            payload = encode_cache_value(full_analysis_result, default=json_serializer)
+            if batch is not None:
+                batch.stage(cache_key, payload, ex=3600)  # 1 hour expiry
+            else:
+                await self.cache.set(cache_key, payload, ex=3600)  # 1 hour expiry
         except Exception as e:
             logger.error(f"Failed to cache analysis for {symbol}: {e}")
 
+    def _record_history(self, symbol: str, full_analysis_result: Dict):
+        """Queue the run for the analysis history table (written in background batches)"""
+        if self.history is None:
+            return
+        try:
+            self.history.submit(symbol, full_analysis_result)
+        except Exception as e:
+            logger.error(f"Failed to queue analysis history for {symbol}: {e}")
+
     def _get_default_categories(self) -> List[str]:
         """Get default categories for analysis"""
         return [cat.value for cat in CategoryType]
@@ -1,8 +1,7 @@
 import yfinance as yf
 import pandas as pd
-import redis
 import logging
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Tuple, Union, Any
 import asyncio
 import aiohttp
 from datetime import datetime, timedelta
@@ -11,6 +10,8 @@ import json  # Added import for json operations
 
 from .providers.unified_provider import UnifiedDataProvider, get_unified_provider
 from backend.config.settings import get_settings
+from backend.utils.cache_batch import CacheBatch
+from backend.utils.cache_utils import get_redis_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -18,67 +19,87 @@ settings = get_settings()
 class DataService:
     def __init__(self):
         self.data_provider = get_unified_provider()
-        try:
-            self.cache = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=0,
-                decode_responses=True,
-            )
-        except Exception as e:
-            logger.error(f"Redis connection failed: {e}")
-            self.cache = None
+        # Shared pooled async client, resolved on first use
+        self.cache = None
         self.rate_limiter = asyncio.Semaphore(5)
 
     async def get_market_data(
         self, symbols: List[str], lookback_period: int = 252
     ) -> Dict[str, Any]:
-        """Enhanced resilient data collection that always returns data"""
-        results = {}
+        """Enhanced resilient data collection that always returns data.
+
+        Cached symbols are read with a single MGET. The rest are fetched
+        concurrently, at most ``rate_limiter`` at a time, and their results are
+        written back in one pipeline.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        cache_keys = {symbol: f"market_data_{symbol}" for symbol in symbols}
+        results: Dict[str, Any] = {}
         errors = []
 
-        for symbol in symbols:
-            try:
-                # Try to get from cache first
-                cache_key = f"market_data_{symbol}"
-                cached = self._get_from_cache(cache_key)
-                if cached:
-                    results[symbol] = cached
-                    continue
+        try:
+            cache = await self._get_cache()
+        except Exception as e:
+            logger.error(f"Cache unavailable, fetching all symbols: {e}")
+            cache = None
+        batch = CacheBatch(cache) if cache else None
+        prefetched = bool(batch) and await batch.prefetch(cache_keys.values())
+        for symbol, cache_key in cache_keys.items():
+            if prefetched:
+                cached = self._decode_cached(cache_key, batch.lookup(cache_key))
+            else:
+                cached = await self._get_from_cache(cache_key)
+            if cached:
+                results[symbol] = cached
 
-                # Get fresh data with fallbacks
-                data = await self.data_provider.fetch_data_resilient(symbol, "price")
-                if data["data"]:
-                    results[symbol] = {
-                        "price": data["data"].get("price", 0),
-                        "source": data["source"],
-                        "confidence": data["confidence"]
-                    }
-                    # Cache only high/medium confidence data
-                    if data["confidence"] in ["high", "medium"]:
-                        self._cache_data(cache_key, results[symbol])
-                else:
-                    results[symbol] = {
-                        "price": 0,
-                        "source": "none",
-                        "confidence": "none",
-                        "error": "No data available"
-                    }
-            except Exception as e:
-                errors.append(f"{symbol}: {str(e)}")
-                results[symbol] = {
-                    "price": 0,
-                    "source": "error",
-                    "confidence": "none",
-                    "error": str(e)
-                }
+        missing = [symbol for symbol in symbols if symbol not in results]
+        try:
+            fetched = await asyncio.gather(*(self._fetch_market_data(symbol) for symbol in missing))
+            for symbol, (result, error) in zip(missing, fetched):
+                results[symbol] = result
+                if error:
+                    errors.append(f"{symbol}: {error}")
+                # Cache only high/medium confidence data
+                elif result["confidence"] in ["high", "medium"]:
+                    if batch:
+                        batch.stage(cache_keys[symbol], json.dumps(result), ex=300)
+                    else:
+                        await self._cache_data(cache_keys[symbol], result)
+        finally:
+            if batch:
+                await batch.flush()
 
         return {
-            "data": results,
+            "data": {symbol: results[symbol] for symbol in symbols},
             "errors": errors if errors else None,
             "timestamp": datetime.now().isoformat()
         }
 
+    async def _fetch_market_data(self, symbol: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Fetch one symbol's price with fallbacks, bounded by ``rate_limiter``"""
+        try:
+            async with self.rate_limiter:
+                data = await self.data_provider.fetch_data_resilient(symbol, "price")
+        except Exception as e:
+            return {
+                "price": 0,
+                "source": "error",
+                "confidence": "none",
+                "error": str(e)
+            }, str(e)
+        if data["data"]:
+            return {
+                "price": data["data"].get("price", 0),
+                "source": data["source"],
+                "confidence": data["confidence"]
+            }, None
+        return {
+            "price": 0,
+            "source": "none",
+            "confidence": "none",
+            "error": "No data available"
+        }, None
+
     async def get_detailed_quote(self, symbol: str) -> Dict[str, Any]:
         """Get comprehensive quote data with fallbacks for each field"""
         async def get_field(field_type: str) -> Dict[str, Any]:
@@ -111,21 +132,33 @@ class DataService:
             }
         }
 
-    def _get_from_cache(self, key: str) -> Optional[Dict[str, Any]]:
+    async def _get_cache(self):
+        if self.cache is None:
+            self.cache = await get_redis_client()
+        return self.cache
+
+    def _decode_cached(self, key: str, cached) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(cached) if cached else None  # Use json.loads for safety
+        except Exception as e:
+            logger.error(f"Cache retrieval error for {key}: {e}")
+            return None
+
+    async def _get_from_cache(self, key: str) -> Optional[Dict[str, Any]]:
         """Retrieve data from cache"""
         try:
-            if self.cache:
-                cached = self.cache.get(key)
-                if cached:
-                    return json.loads(cached)  # Use json.loads for safety
+            cache = await self._get_cache()
+            if cache:
+                return self._decode_cached(key, await cache.get(key))
         except Exception as e:
             logger.error(f"Cache retrieval error: {e}")
         return None
 
-    def _cache_data(self, key: str, data: Dict[str, Any], expiry: int = 300):
+    async def _cache_data(self, key: str, data: Dict[str, Any], expiry: int = 300):
         """Cache market data with expiration"""
         try:
-            if self.cache:
-                self.cache.setex(key, expiry, json.dumps(data))  # Use json.dumps for serialization
+            cache = await self._get_cache()
+            if cache:
+                await cache.set(key, json.dumps(data), ex=expiry)  # Use json.dumps for serialization
         except Exception as e:
             logger.error(f"Cache storage error: {e}")
@@ -0,0 +1,233 @@
+"""Per-symbol fundamentals snapshot shared by the valuation agents.
+
+The valuation category used to call the Alpha Vantage OVERVIEW endpoint (or
+the resilient company-info fallback chain) once per agent. A
+``FundamentalsSnapshot`` is fetched once per symbol per day instead, cached in
+Redis under a versioned, dated key, and every fundamentals helper in
+``backend.utils.data_provider`` reads from it. OVERVIEW has no free cash
+flow, so ``fcf_per_share`` comes from the latest annual cash-flow statement
+(operating cash flow less capital expenditure, per share outstanding), or
+from the resilient ``company_info_fcf_per_share`` chain when that fails.
+
+Bump ``SNAPSHOT_VERSION`` whenever the snapshot fields change so old cache
+entries are ignored rather than misread.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from backend.config.settings import get_settings
+from backend.utils.cache_codec import CacheDecodeError, decode_cache_value, encode_cache_value
+from backend.utils.cache_utils import get_redis_client
+
+SNAPSHOT_VERSION = 2
+
+# Snapshot field -> Alpha Vantage OVERVIEW key
+_OVERVIEW_FIELDS = {
+    "eps": "EPS",
+    "book_value_per_share": "BookValue",
+    "sales_per_share": "RevenuePerShareTTM",
+    "beta": "Beta",
+    "pe_ratio": "PERatio",
+    "peg_ratio": "PEGRatio",
+    "dividend_yield": "DividendYield",
+    "dividend_per_share": "DividendPerShare",
+    "market_cap": "MarketCapitalization",
+    "shares_outstanding": "SharesOutstanding",
+    "revenue_ttm": "RevenueTTM",
+    "ebitda": "EBITDA",
+    "ev_to_ebitda": "EVToEBITDA",
+    "analyst_target_price": "AnalystTargetPrice",
+}
+
+# In-flight fetches, so concurrent agents for one symbol share a single request
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if not text or text.lower() in ("none", "-", "n/a", "nan"):
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+@dataclass
+class FundamentalsSnapshot:
+    """Point-in-time company fundamentals for one symbol."""
+
+    symbol: str
+    as_of: str
+    source: str = "none"
+    eps: Optional[float] = None
+    book_value_per_share: Optional[float] = None
+    sales_per_share: Optional[float] = None
+    fcf_per_share: Optional[float] = None
+    beta: Optional[float] = None
+    pe_ratio: Optional[float] = None
+    peg_ratio: Optional[float] = None
+    dividend_yield: Optional[float] = None
+    dividend_per_share: Optional[float] = None
+    market_cap: Optional[float] = None
+    shares_outstanding: Optional[float] = None
+    revenue_ttm: Optional[float] = None
+    ebitda: Optional[float] = None
+    ev_to_ebitda: Optional[float] = None
+    analyst_target_price: Optional[float] = None
+    # Full provider payload, for agents that read fields not modelled above
+    overview: Dict[str, Any] = field(default_factory=dict)
+    version: int = SNAPSHOT_VERSION
+
+    @property
+    def enterprise_value(self) -> Optional[float]:
+        if self.ev_to_ebitda is None or self.ebitda is None:
+            return None
+        return self.ev_to_ebitda * self.ebitda
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.overview and self.eps is None
+
+    @classmethod
+    def from_overview(cls, symbol: str, overview: Optional[Dict[str, Any]], source: str, as_of: Optional[str] = None) -> "FundamentalsSnapshot":
+        """Build a snapshot from an Alpha Vantage OVERVIEW-shaped dict."""
+        overview = dict(overview or {})
+        values = {name: _to_float(overview.get(key)) for name, key in _OVERVIEW_FIELDS.items()}
+        if values["sales_per_share"] is None and values["revenue_ttm"] and values["shares_outstanding"]:
+            values["sales_per_share"] = values["revenue_ttm"] / values["shares_outstanding"]
+        return cls(
+            symbol=symbol,
+            as_of=as_of or _today(),
+            source=source,
+            overview=overview,
+            **values,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FundamentalsSnapshot":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_overview(self) -> Dict[str, Any]:
+        """OVERVIEW-shaped dict, as returned by the legacy company-info helpers."""
+        overview = dict(self.overview)
+        for name, key in _OVERVIEW_FIELDS.items():
+            value = getattr(self, name)
+            if key not in overview and value is not None:
+                overview[key] = value
+        return overview
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def snapshot_cache_key(symbol: str, as_of: Optional[str] = None) -> str:
+    return f"fundamentals:v{SNAPSHOT_VERSION}:{symbol}:{as_of or _today()}"
+
+
+async def _read_cached(cache_key: str) -> Optional[FundamentalsSnapshot]:
+    try:
+        redis_client = await get_redis_client()
+        raw = await redis_client.get(cache_key)
+        if raw is None:
+            return None
+        data = decode_cache_value(raw)
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return FundamentalsSnapshot.from_dict(data)
+    except (CacheDecodeError, AttributeError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable fundamentals snapshot {cache_key}: {e}")
+    except Exception as e:
+        logger.warning(f"Fundamentals cache read failed for {cache_key}: {e}")
+    return None
+
+
+async def _write_cached(cache_key: str, snapshot: FundamentalsSnapshot):
+    provider_settings = get_settings().data_provider
+    ttl = provider_settings.FUNDAMENTALS_NEGATIVE_TTL if snapshot.is_empty else provider_settings.FUNDAMENTALS_CACHE_TTL
+    try:
+        redis_client = await get_redis_client()
+        await redis_client.set(cache_key, encode_cache_value(snapshot.to_dict()), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Fundamentals cache write failed for {cache_key}: {e}")
+
+
+async def _fetch_snapshot(symbol: str, provider, cache_key: str) -> FundamentalsSnapshot:
+    overview, source = None, "none"
+    try:
+        overview = await provider.fetch_company_overview(symbol)
+        source = "alpha_vantage"
+    except Exception as e:
+        logger.warning(f"OVERVIEW fetch failed for {symbol}: {e}")
+    if not overview:
+        logger.info(f"No OVERVIEW data for {symbol}, using resilient company info")
+        try:
+            result = await provider.fetch_data_resilient(symbol, "company_info")
+            overview, source = result.get("data") or {}, result.get("source", "fallback")
+        except Exception as e:
+            logger.error(f"Company info fallback failed for {symbol}: {e}")
+            overview = {}
+    snapshot = FundamentalsSnapshot.from_overview(symbol, overview if isinstance(overview, dict) else {}, source)
+    if snapshot.fcf_per_share is None and not snapshot.is_empty:
+        snapshot.fcf_per_share = await _fetch_fcf_per_share(symbol, provider, snapshot.shares_outstanding)
+    await _write_cached(cache_key, snapshot)
+    return snapshot
+
+
+def _free_cash_flow(cash_flow: Any) -> Optional[float]:
+    """Operating cash flow less capital expenditure from the latest annual report."""
+    reports = cash_flow.get("annualReports") if isinstance(cash_flow, dict) else None
+    if not reports:
+        return None
+    operating = _to_float(reports[0].get("operatingCashflow"))
+    capex = _to_float(reports[0].get("capitalExpenditures"))
+    if operating is None or capex is None:
+        return None
+    return operating - abs(capex)  # Capex is reported with either sign
+
+
+async def _fetch_fcf_per_share(symbol: str, provider, shares_outstanding: Optional[float]) -> Optional[float]:
+    if shares_outstanding:
+        try:
+            free_cash_flow = _free_cash_flow(await provider.fetch_cash_flow_data(symbol))
+            if free_cash_flow is not None:
+                return free_cash_flow / shares_outstanding
+        except Exception as e:
+            logger.warning(f"Cash flow fetch failed for {symbol}: {e}")
+    try:
+        result = await provider.fetch_company_info(symbol, "fcf_per_share")
+        return _to_float(result.get("fcf_per_share")) if isinstance(result, dict) else None
+    except Exception as e:
+        logger.warning(f"FCF per share fallback failed for {symbol}: {e}")
+        return None
+
+
+async def get_fundamentals_snapshot(symbol: str, provider, force_refresh: bool = False) -> FundamentalsSnapshot:
+    """Return today's snapshot for ``symbol``, fetching it through ``provider`` at most once."""
+    cache_key = snapshot_cache_key(symbol)
+    if not force_refresh:
+        cached = await _read_cached(cache_key)
+        if cached is not None:
+            return cached
+
+    loop = asyncio.get_running_loop()
+    task = _inflight.get(cache_key)
+    if task is None or task.done() or task.get_loop() is not loop:
+        task = loop.create_task(_fetch_snapshot(symbol, provider, cache_key))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda t, key=cache_key: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+    return await asyncio.shield(task)
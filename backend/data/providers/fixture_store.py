@@ -0,0 +1,154 @@
+"""On-disk store of recorded provider responses.
+
+``UnifiedDataProvider`` writes every public fetch into a ``FixtureStore`` when
+recording is enabled, and ``ReplayDataProvider`` serves them back, so the
+agent pipeline can be benchmarked without touching the network.
+
+Calls are keyed by method name and bound arguments (defaults applied), so
+``f(sym)`` and ``f(sym, interval="1d")`` are the same recording. Layout:
+``<root>/<method>/<symbol>/<call hash>.json`` per distinct call, plus a
+``latest-<params>.json`` keyed on the call's non-date arguments (data type,
+interval, ...). Replays fall back to that latest recording when the exact
+call was not recorded, which is common because callers derive date ranges
+from ``datetime.now()``. The fallback never crosses data types: replaying
+``fetch_data_resilient("TCS", "volume")`` does not serve the price record.
+
+DataFrames and Series round-trip through pandas' ``split`` JSON. Other values
+go through plain JSON with the cache codec's numpy-aware serializer.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
+from datetime import date, datetime
+from io import StringIO
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from loguru import logger
+
+from backend.utils.cache_codec import robust_json_serializer
+
+LATEST = "latest"
+
+
+class FixtureNotFoundError(KeyError):
+    """No recording matches the requested call."""
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def call_key(params: Dict[str, Any]) -> str:
+    canonical = json.dumps(_canonical(params), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _call_symbol(params: Dict[str, Any]) -> str:
+    symbol = params.get("symbol") or params.get("query")
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(symbol or "_"))
+
+
+def _is_date_param(name: str, value: Any) -> bool:
+    return isinstance(value, (datetime, date)) or "date" in name
+
+
+def latest_name(params: Dict[str, Any]) -> str:
+    """Name of the fallback recording for a call: its non-date, non-symbol arguments."""
+    parts = [str(_canonical(value)) for name, value in sorted(params.items())
+             if name not in ("symbol", "query") and not _is_date_param(name, value)]
+    if not parts:
+        return LATEST
+    return re.sub(r"[^A-Za-z0-9._-]", "_", "-".join([LATEST, *parts]))[:120]
+
+
+def encode_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, pd.DataFrame):
+        return {"kind": "frame", "data": value.to_json(orient="split", date_format="iso", date_unit="ns")}
+    if isinstance(value, pd.Series):
+        return {"kind": "series", "name": value.name, "data": value.to_json(orient="split", date_format="iso", date_unit="ns")}
+    return {"kind": "json", "data": json.loads(json.dumps(value, default=robust_json_serializer))}
+
+
+def decode_value(payload: Dict[str, Any]) -> Any:
+    kind = payload.get("kind")
+    if kind == "frame":
+        return pd.read_json(StringIO(payload["data"]), orient="split")
+    if kind == "series":
+        series = pd.read_json(StringIO(payload["data"]), orient="split", typ="series")
+        series.name = payload.get("name")
+        return series
+    return payload.get("data")
+
+
+class FixtureStore:
+    """Reads and writes recorded provider calls under ``root``."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, method: str, symbol: str, name: str) -> str:
+        return os.path.join(self.root, method, symbol, f"{name}.json")
+
+    def _write(self, path: str, record: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+    def save(self, method: str, params: Dict[str, Any], value: Any):
+        """Record ``value`` as the response to ``method(**params)``."""
+        symbol = _call_symbol(params)
+        record = {
+            "method": method,
+            "params": _canonical(params),
+            "recorded_at": datetime.utcnow().isoformat(),
+            "value": encode_value(value),
+        }
+        self._write(self._path(method, symbol, call_key(params)), record)
+        self._write(self._path(method, symbol, latest_name(params)), record)
+
+    def load(self, method: str, params: Dict[str, Any], exact: bool = False) -> Any:
+        """Return the recorded response, falling back to the latest with the same non-date arguments unless ``exact``."""
+        symbol = _call_symbol(params)
+        candidates = [self._path(method, symbol, call_key(params))]
+        if not exact:
+            candidates.append(self._path(method, symbol, latest_name(params)))
+        for path in candidates:
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    return decode_value(json.load(f)["value"])
+        raise FixtureNotFoundError(f"No recording for {method} {symbol} in {self.root}")
+
+
+def recorded(method):
+    """Record the decorated provider coroutine's results into ``self._recorder``, if set."""
+
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        result = await method(self, *args, **kwargs)
+        recorder: Optional[FixtureStore] = getattr(self, "_recorder", None)
+        if recorder is not None:
+            try:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                params = {name: value for name, value in bound.arguments.items() if name != "self"}
+                recorder.save(method.__name__, params, result)
+            except Exception as e:
+                logger.warning(f"Could not record {method.__name__}{args}: {e}")
+        return result
+
+    return wrapper
@@ -0,0 +1,128 @@
+"""Data provider that replays recorded responses, for offline benchmarks.
+
+Record a session by setting ``RECORD_FIXTURES=true`` (or calling
+``UnifiedDataProvider.enable_recording``), then swap a ``ReplayDataProvider``
+in for the shared provider:
+
+    from backend.utils import data_provider
+    data_provider.provider = ReplayDataProvider(latency_ms=40, error_rate=0.02)
+
+Synthetic latency and error injection are seeded, so two runs with the same
+settings see the same delays and failures.
+"""
+
+import asyncio
+import random
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pandas as pd
+from loguru import logger
+
+from backend.data.providers.base_provider import BaseDataProvider
+from backend.data.providers.fixture_store import FixtureNotFoundError, FixtureStore
+
+
+class InjectedProviderError(ConnectionError):
+    """Synthetic failure raised by ``ReplayDataProvider`` error injection."""
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+
+
+class ReplayDataProvider(BaseDataProvider):
+    """Serves recorded ``UnifiedDataProvider`` responses from a ``FixtureStore``."""
+
+    def __init__(
+        self,
+        fixture_dir: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+        latency_jitter_ms: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        strict: bool = False,
+        seed: int = 0,
+    ):
+        super().__init__()
+        self.store = FixtureStore(fixture_dir or self.settings.REPLAY_FIXTURE_DIR)
+        self.latency_ms = self.settings.REPLAY_LATENCY_MS if latency_ms is None else latency_ms
+        self.latency_jitter_ms = self.settings.REPLAY_LATENCY_JITTER_MS if latency_jitter_ms is None else latency_jitter_ms
+        self.error_rate = self.settings.REPLAY_ERROR_RATE if error_rate is None else error_rate
+        self.strict = strict
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.misses = 0
+        self.injected_errors = 0
+
+    async def _replay(self, method: str, params: Dict[str, Any], default: Callable[[], Any]) -> Any:
+        """Serve ``method(**params)`` from the store; ``params`` must mirror UnifiedDataProvider's signature."""
+        self.calls += 1
+        delay = self.latency_ms + self._rng.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.injected_errors += 1
+            raise InjectedProviderError(f"Injected failure for {method} {params}")
+        try:
+            return self.store.load(method, params)
+        except FixtureNotFoundError:
+            self.misses += 1
+            if self.strict:
+                raise
+            logger.debug(f"No recording for {method} {params}, returning empty result")
+            return default()
+
+    # --- UnifiedDataProvider surface used by backend.utils.data_provider ---
+    async def fetch_data_resilient(self, symbol: str, data_type: str) -> Dict[str, Any]:
+        return await self._replay(
+            "fetch_data_resilient", {"symbol": symbol, "data_type": data_type},
+            lambda: {"source": "replay", "data": {}, "confidence": "low"},
+        )
+
+    async def fetch_company_overview(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return await self._replay("fetch_company_overview", {"symbol": symbol}, lambda: None)
+
+    async def _fetch_alpha_vantage(self, symbol: str, data_type: str) -> Optional[Dict[str, Any]]:
+        return await self._replay("_fetch_alpha_vantage", {"symbol": symbol, "data_type": data_type}, lambda: None)
+
+    # --- BaseDataProvider interface ---
+    async def fetch_price_data(self, symbol: str, start_date: Optional[Union[str, datetime]] = None, end_date: Optional[Union[str, datetime]] = None, interval: str = "1d") -> pd.DataFrame:
+        params = {"symbol": symbol, "start_date": start_date, "end_date": end_date, "interval": interval}
+        return await self._replay("fetch_price_data", params, _empty_frame)
+
+    async def fetch_quote(self, symbol: str) -> Dict[str, Any]:
+        return await self._replay("fetch_quote", {"symbol": symbol}, dict)
+
+    async def search_symbols(self, query: str) -> List[Dict[str, Any]]:
+        return await self._replay("search_symbols", {"query": query}, list)
+
+    async def fetch_company_info(self, symbol: str, data_type: str = None) -> Dict[str, Any]:
+        return await self._replay("fetch_company_info", {"symbol": symbol, "data_type": data_type}, dict)
+
+    async def fetch_insider_trades(self, symbol: str) -> List[Dict[str, Any]]:
+        return await self._replay("fetch_insider_trades", {"symbol": symbol}, list)
+
+    async def fetch_corporate_actions(self, symbol: str) -> List[Dict[str, Any]]:
+        return await self._replay("fetch_corporate_actions", {"symbol": symbol}, list)
+
+    async def fetch_earnings_calendar(self, symbol: str) -> Dict[str, Any]:
+        return await self._replay("fetch_earnings_calendar", {"symbol": symbol}, dict)
+
+    async def fetch_management_info(self, symbol: str) -> Dict[str, Any]:
+        return await self._replay("fetch_management_info", {"symbol": symbol}, dict)
+
+    async def fetch_market_regime_data(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        return await self._replay("fetch_market_regime_data", {"symbol": symbol}, dict)
+
+    async def fetch_news_sentiment(self, symbol: str) -> Dict[str, Any]:
+        return await self._replay("fetch_news_sentiment", {"symbol": symbol}, dict)
+
+    async def fetch_wacc(self, symbol: str) -> Dict[str, Any]:
+        return await self._replay("fetch_wacc", {"symbol": symbol}, dict)
+
+    async def fetch_cash_flow_data(self, symbol: str) -> Union[pd.DataFrame, Dict[str, Any]]:
+        return await self._replay("fetch_cash_flow_data", {"symbol": symbol}, dict)
+
+    async def fetch_historical_data(self, symbol: str, data_type: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Union[pd.DataFrame, Dict[str, Any]]:
+        params = {"symbol": symbol, "data_type": data_type, "start_date": start_date, "end_date": end_date}
+        return await self._replay("fetch_historical_data", params, dict)
@@ -2,7 +2,6 @@ import time
 from typing import Dict, Any, List, Optional, Union
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
 from loguru import logger
 import httpx
 import yfinance as yf
@@ -24,7 +23,10 @@ from backend.monitoring.performance import (
     record_data_quality,
 )
 from backend.data.providers.base_provider import BaseDataProvider
+from backend.data.providers.fixture_store import FixtureStore, recorded
 from backend.utils.circuit_breaker import CircuitBreaker
+from backend.utils.conditional_fetch import conditional_get
+from backend.utils.html_parsing import parse_off_loop
 from backend.config.settings import get_settings
 
 class UnifiedDataProvider(BaseDataProvider):
@@ -50,7 +52,20 @@ class UnifiedDataProvider(BaseDataProvider):
             ("investing", "https://www.investing.com/equities/{symbol}"),
             ("google", "https://www.google.com/finance/quote/{symbol}"),
         ]
+        self._recorder: Optional[FixtureStore] = None
+        if self.settings.data_provider.RECORD_FIXTURES:
+            self.enable_recording()
 
+    def enable_recording(self, fixture_dir: Optional[str] = None) -> FixtureStore:
+        """Record every public fetch into a fixture store for ``ReplayDataProvider``."""
+        self._recorder = FixtureStore(fixture_dir or self.settings.data_provider.REPLAY_FIXTURE_DIR)
+        logger.info(f"Recording provider responses to {self._recorder.root}")
+        return self._recorder
+
+    def disable_recording(self):
+        self._recorder = None
+
+    @recorded
     async def fetch_data_resilient(self, symbol: str, data_type: str) -> Dict[str, Any]:
         """
         Fetch data with automatic fallback to web scraping.
@@ -154,16 +169,22 @@ class UnifiedDataProvider(BaseDataProvider):
 
     async def _scrape_single_site(self, client: httpx.AsyncClient, site: str, url: str, data_type: str) -> Optional[Dict[str, Any]]:
         """Scrape data from a single website"""
-        try:
-            response = await client.get(url)
+        async def parse(response):
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            return self._extract_data(site, soup, data_type)
+            # Parsing a full quote page takes tens of milliseconds; keep it off the event loop
+            return await parse_off_loop(
+                response.text, lambda soup: self._extract_data(site, soup, data_type), source=site
+            )
+
+        try:
+            # Unchanged pages come back as 304 and reuse the previous extraction
+            fetched = await conditional_get(client, url, parse, variant=data_type)
+            return fetched.value
         except Exception as e:
             increment_scraping_failure(site, str(e))
             return None
 
-    def _extract_data(self, site: str, soup: BeautifulSoup, data_type: str) -> Optional[Dict[str, Any]]:
+    def _extract_data(self, site: str, soup: Any, data_type: str) -> Optional[Dict[str, Any]]:
         """Extract specific data type from HTML based on site"""
         try:
             if site == "yahoo":
@@ -178,7 +199,7 @@ class UnifiedDataProvider(BaseDataProvider):
             increment_scraping_failure(site, f"parse_error: {str(e)}")
         return None
 
-    def _extract_yahoo(self, soup: BeautifulSoup, data_type: str) -> Optional[Dict[str, Any]]:
+    def _extract_yahoo(self, soup: Any, data_type: str) -> Optional[Dict[str, Any]]:
         """Extract data from Yahoo Finance"""
         result = {}
         
@@ -206,7 +227,7 @@ class UnifiedDataProvider(BaseDataProvider):
 
         return result if result else None
 
-    def _extract_marketwatch(self, soup: BeautifulSoup, data_type: str) -> Optional[Dict[str, Any]]:
+    def _extract_marketwatch(self, soup: Any, data_type: str) -> Optional[Dict[str, Any]]:
         """Extract data from MarketWatch"""
         result = {}
         
@@ -228,7 +249,7 @@ class UnifiedDataProvider(BaseDataProvider):
 
         return result if result else None
 
-    def _extract_investing(self, soup: BeautifulSoup, data_type: str) -> Optional[Dict[str, Any]]:
+    def _extract_investing(self, soup: Any, data_type: str) -> Optional[Dict[str, Any]]:
         """Extract data from Investing.com"""
         result = {}
         
@@ -250,7 +271,7 @@ class UnifiedDataProvider(BaseDataProvider):
 
         return result if result else None
 
-    def _extract_google(self, soup: BeautifulSoup, data_type: str) -> Optional[Dict[str, Any]]:
+    def _extract_google(self, soup: Any, data_type: str) -> Optional[Dict[str, Any]]:
         """Extract data from Google Finance"""
         result = {}
         
@@ -378,6 +399,7 @@ class UnifiedDataProvider(BaseDataProvider):
             logger.error(f"Yahoo Finance API error: {str(e)}")
             raise
 
+    @recorded
     async def _fetch_alpha_vantage(self, symbol: str, data_type: str) -> Optional[Dict[str, Any]]:
         """Fetch data from Alpha Vantage API"""
         api_key = self.settings.api_keys.ALPHA_VANTAGE_KEY
@@ -420,34 +442,46 @@ class UnifiedDataProvider(BaseDataProvider):
                          raise Exception(f"Alpha Vantage API rate limit hit for {symbol} (volume): {data['Note']}")
                     return None
 
-        elif data_type == "eps" or data_type.startswith("company_info_eps") or data_type == "overview":
-            params["function"] = "OVERVIEW"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(base_url, params=params)
-                if response.status_code != 200:
-                    logger.error(f"Alpha Vantage API error for OVERVIEW {symbol}: {response.status_code} {response.text}")
-                    response.raise_for_status()
-                data = response.json()
-                if "EPS" in data:
-                    try:
-                        eps_value_str = data["EPS"]
-                        if eps_value_str is None or str(eps_value_str).strip().lower() == "none":
-                            logger.warning(f"Alpha Vantage: EPS is None or 'None' string for {symbol}. Response: {data}")
-                            return {"EPS": None}
-                        return {"EPS": float(eps_value_str)}
-                    except (ValueError, TypeError) as e:
-                        logger.error(f"Alpha Vantage: Could not parse EPS '{data['EPS']}' as float for {symbol}. Error: {e}. Response: {data}")
-                        return {"EPS": None}
-                else:
-                    logger.warning(f"Alpha Vantage: 'EPS' not in OVERVIEW response for {symbol}. Response: {data}")
-                    if data.get("Note") and "API call frequency" in data["Note"]:
-                         raise Exception(f"Alpha Vantage API rate limit hit for {symbol} (EPS): {data['Note']}")
-                    return None
+        elif data_type == "overview":
+            return await self._fetch_alpha_vantage_overview(symbol, base_url, params)
+
+        elif data_type == "eps" or data_type.startswith("company_info_eps"):
+            data = await self._fetch_alpha_vantage_overview(symbol, base_url, params)
+            if data is None:
+                return None
+            if "EPS" not in data:
+                logger.warning(f"Alpha Vantage: 'EPS' not in OVERVIEW response for {symbol}. Response: {data}")
+                return None
+            try:
+                eps_value_str = data["EPS"]
+                if eps_value_str is None or str(eps_value_str).strip().lower() == "none":
+                    logger.warning(f"Alpha Vantage: EPS is None or 'None' string for {symbol}. Response: {data}")
+                    return {"EPS": None}
+                return {"EPS": float(eps_value_str)}
+            except (ValueError, TypeError) as e:
+                logger.error(f"Alpha Vantage: Could not parse EPS '{data['EPS']}' as float for {symbol}. Error: {e}. Response: {data}")
+                return {"EPS": None}
         else:
             logger.warning(f"Alpha Vantage: Unsupported data_type '{data_type}' for {symbol}")
 
         return None
 
+    async def _fetch_alpha_vantage_overview(self, symbol: str, base_url: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch the full Alpha Vantage OVERVIEW payload, or None if it is empty"""
+        params = {**params, "function": "OVERVIEW"}
+        async with httpx.AsyncClient() as client:
+            response = await client.get(base_url, params=params)
+            if response.status_code != 200:
+                logger.error(f"Alpha Vantage API error for OVERVIEW {symbol}: {response.status_code} {response.text}")
+                response.raise_for_status()
+            data = response.json()
+        if data.get("Note") and "API call frequency" in data["Note"]:
+            raise Exception(f"Alpha Vantage API rate limit hit for {symbol} (OVERVIEW): {data['Note']}")
+        if not data or "Error Message" in data or "Information" in data:
+            logger.warning(f"Alpha Vantage: no OVERVIEW data for {symbol}. Response: {data}")
+            return None
+        return data
+
     async def _fetch_polygon(self, symbol: str, data_type: str) -> Optional[Dict[str, Any]]:
         """Fetch data from Polygon.io API"""
         api_key = self.settings.api_keys.POLYGON_API_KEY
@@ -513,6 +547,7 @@ class UnifiedDataProvider(BaseDataProvider):
 
         return None
 
+    @recorded
     async def fetch_price_data(self, symbol: str, start_date: Optional[str] = None, end_date: Optional[str] = None, interval: str = "1d") -> pd.DataFrame:
         """
         Fetch historical price data for a given symbol.
@@ -577,6 +612,7 @@ class UnifiedDataProvider(BaseDataProvider):
             # Return empty DataFrame with expected columns on error
             return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
 
+    @recorded
     async def fetch_quote(self, symbol: str) -> Dict[str, Any]:
         """
         Fetch the latest quote for a given symbol using resilient fetching.
@@ -589,6 +625,7 @@ class UnifiedDataProvider(BaseDataProvider):
         return result.get("data", {})
 
 
+    @recorded
     async def search_symbols(self, query: str) -> List[Dict[str, Any]]:
         """
         Search for symbols matching a query.
@@ -596,6 +633,7 @@ class UnifiedDataProvider(BaseDataProvider):
         # Placeholder implementation
         return []
 
+    @recorded
     async def fetch_company_info(self, symbol: str, data_type: str = None) -> Dict[str, Any]:
         """
         Fetch company information (overview) for a given symbol.
@@ -638,7 +676,31 @@ class UnifiedDataProvider(BaseDataProvider):
         
         return data
 
+    @recorded
+    async def fetch_company_overview(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the full Alpha Vantage OVERVIEW payload for a symbol in one request.
+
+        Most callers should go through ``backend.data.fundamentals.get_fundamentals_snapshot``,
+        which caches this once per symbol per day.
+
+        Returns:
+            The OVERVIEW dictionary, or None if Alpha Vantage is unavailable or has no data
+        """
+        breaker = self._circuit_breakers["alpha_vantage"]
+        if not breaker.is_closed():
+            return None
+        try:
+            data = await self._fetch_from_provider("alpha_vantage", symbol, "overview")
+        except Exception as e:
+            breaker.record_failure()
+            logger.warning(f"Alpha Vantage OVERVIEW failed for {symbol}: {e}")
+            return None
+        breaker.record_success()
+        return data or None
+
     # --- Implementations for new abstract methods ---
+    @recorded
     async def fetch_insider_trades(self, symbol: str) -> List[Dict[str, Any]]:
         """
         Fetch insider trading data for a symbol using resilient fetching.
@@ -650,6 +712,7 @@ class UnifiedDataProvider(BaseDataProvider):
         data = result.get("data", [])
         return data if isinstance(data, list) else []
 
+    @recorded
     async def fetch_corporate_actions(self, symbol: str) -> List[Dict[str, Any]]:
         """
         Fetch corporate actions for a symbol using resilient fetching.
@@ -658,6 +721,7 @@ class UnifiedDataProvider(BaseDataProvider):
         data = result.get("data", [])
         return data if isinstance(data, list) else []
 
+    @recorded
     async def fetch_earnings_calendar(self, symbol: str) -> Dict[str, Any]:
         """
         Fetch earnings calendar data for a symbol using resilient fetching.
@@ -666,6 +730,7 @@ class UnifiedDataProvider(BaseDataProvider):
         data = result.get("data", {})
         return data if isinstance(data, dict) else {}
 
+    @recorded
     async def fetch_management_info(self, symbol: str) -> Dict[str, Any]:
         """
         Fetch management info for a symbol using resilient fetching.
@@ -674,6 +739,7 @@ class UnifiedDataProvider(BaseDataProvider):
         data = result.get("data", {})
         return data if isinstance(data, dict) else {}
 
+    @recorded
     async def fetch_market_regime_data(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """
         Fetch market regime data using resilient fetching.
@@ -683,6 +749,7 @@ class UnifiedDataProvider(BaseDataProvider):
         data = result.get("data", {})
         return data if isinstance(data, dict) else {}
 
+    @recorded
     async def fetch_news_sentiment(self, symbol: str) -> Dict[str, Any]:
         """
         Fetch news sentiment data for a symbol using resilient fetching.
@@ -691,6 +758,7 @@ class UnifiedDataProvider(BaseDataProvider):
         data = result.get("data", {})
         return data if isinstance(data, dict) else {} # Or adjust based on expected sentiment format
 
+    @recorded
     async def fetch_wacc(self, symbol: str) -> Dict[str, Any]:
         """
         Fetch WACC data for a symbol using resilient fetching.
@@ -701,6 +769,7 @@ class UnifiedDataProvider(BaseDataProvider):
         # WACC is often a single value, but return dict for consistency for now
         return data if isinstance(data, dict) else {}
 
+    @recorded
     async def fetch_cash_flow_data(self, symbol: str) -> Union[pd.DataFrame, Dict[str, Any]]:
         """
         Fetch cash flow data for a symbol using resilient fetching.
@@ -710,6 +779,7 @@ class UnifiedDataProvider(BaseDataProvider):
         # Need to determine if result['data'] is DataFrame or Dict based on provider
         return result.get("data", {}) # Return empty dict as default
 
+    @recorded
     async def fetch_historical_data(self, symbol: str, data_type: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Union[pd.DataFrame, Dict[str, Any]]:
         """
         Fetch generic historical data using resilient fetching.
@@ -724,3 +794,10 @@ class UnifiedDataProvider(BaseDataProvider):
         return result.get("data", {}) # Return empty dict as default
 
     # --- End of implementations for new abstract methods ---
+
+
+def get_unified_provider() -> BaseDataProvider:
+    """The process-wide provider shared with ``backend.utils.data_provider``."""
+    from backend.utils import data_provider
+
+    return data_provider.provider
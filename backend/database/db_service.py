@@ -1,12 +1,18 @@
-from typing import Dict, List, Any
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+import csv
+import io
+from typing import Dict, Iterable, List, Any, Optional, Union
+from sqlalchemy import create_engine, event, insert, select, Column, Index, Integer, String, Float, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
 Base = declarative_base()
 
+# Rows per executemany batch; keeps memory bounded for very large ingests
+BULK_CHUNK_SIZE = 50_000
+
 
 class MarketData(Base):
     __tablename__ = "market_data"
@@ -16,35 +22,125 @@ class MarketData(Base):
     price = Column(Float)
     volume = Column(Float)
 
+    # Range reads always filter on symbol and a timestamp window
+    __table_args__ = (Index("ix_market_data_symbol_timestamp", "symbol", "timestamp"),)
+
+
+def _to_datetime(value: Union[datetime, float, int, str]) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return datetime.fromtimestamp(value)
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def _enable_sqlite_wal(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a bulk ingest is writing; NORMAL sync is safe under WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 
 class DatabaseService:
     def __init__(self, connection_string: str = "sqlite:///market_data.db"):
         self.engine = create_engine(connection_string)
+        if self.engine.dialect.name == "sqlite" and self.engine.url.database not in (None, "", ":memory:"):
+            event.listen(self.engine, "connect", _enable_sqlite_wal)
         Base.metadata.create_all(self.engine)
         self.Session = sessionmaker(bind=self.engine)
 
     def save_market_data(self, data: Dict[str, float]):
-        session = self.Session()
+        self.save_market_data_bulk([data])
+
+    def save_market_data_bulk(self, rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]]) -> int:
+        """Insert many bars in one transaction.
+
+        ``rows`` is a DataFrame or an iterable of dicts with ``symbol``,
+        ``timestamp`` (datetime or epoch seconds), ``price`` and ``volume``.
+        PostgreSQL connections use ``COPY``; other databases use executemany.
+        Returns the number of rows written.
+        """
+        records = self._normalise_rows(rows)
+        if not records:
+            return 0
+        with self.engine.begin() as conn:
+            if self.engine.dialect.name == "postgresql" and self.engine.dialect.driver == "psycopg2":
+                self._copy_rows(conn, records)
+            else:
+                table = MarketData.__table__
+                for start in range(0, len(records), BULK_CHUNK_SIZE):
+                    conn.execute(insert(table), records[start:start + BULK_CHUNK_SIZE])
+        return len(records)
+
+    @staticmethod
+    def _normalise_rows(rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        if isinstance(rows, pd.DataFrame):
+            frame = rows[["symbol", "timestamp", "price", "volume"]]
+            timestamps = frame["timestamp"]
+            if pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = pd.DatetimeIndex(timestamps).to_pydatetime()
+            else:
+                timestamps = [_to_datetime(value) for value in timestamps]
+            return [
+                {"symbol": symbol, "timestamp": timestamp, "price": float(price), "volume": float(volume)}
+                for symbol, timestamp, price, volume in zip(
+                    frame["symbol"], timestamps, frame["price"].to_numpy(), frame["volume"].to_numpy()
+                )
+            ]
+        return [
+            {
+                "symbol": row["symbol"],
+                "timestamp": _to_datetime(row["timestamp"]),
+                "price": row["price"],
+                "volume": row["volume"],
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _copy_rows(conn, records: List[Dict[str, Any]]):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow((record["symbol"], record["timestamp"].isoformat(), record["price"], record["volume"]))
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
         try:
-            market_data = MarketData(
-                symbol=data["symbol"],
-                timestamp=datetime.fromtimestamp(data["timestamp"]),
-                price=data["price"],
-                volume=data["volume"],
+            cursor.copy_expert(
+                "COPY market_data (symbol, timestamp, price, volume) FROM STDIN WITH (FORMAT csv)", buffer
             )
-            session.add(market_data)
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
         finally:
-            session.close()
-
-    def get_historical_data(self, symbol: str, start_date: datetime) -> pd.DataFrame:
-        query = f"""
-        SELECT timestamp, price, volume 
-        FROM market_data 
-        WHERE symbol = '{symbol}' 
-        AND timestamp >= '{start_date}'
-        """
-        return pd.read_sql(query, self.engine)
+            cursor.close()
+
+    def _range_query(self, symbol: str, start_date: datetime, end_date: Optional[datetime]):
+        table = MarketData.__table__
+        stmt = (
+            select(table.c.timestamp, table.c.price, table.c.volume)
+            .where(table.c.symbol == symbol, table.c.timestamp >= start_date)
+            .order_by(table.c.timestamp)
+        )
+        if end_date is not None:
+            stmt = stmt.where(table.c.timestamp <= end_date)
+        return stmt
+
+    def get_historical_data(self, symbol: str, start_date: datetime, end_date: Optional[datetime] = None) -> pd.DataFrame:
+        with self.engine.connect() as conn:
+            return pd.read_sql(self._range_query(symbol, start_date, end_date), conn, parse_dates=["timestamp"])
+
+    def get_historical_arrays(self, symbol: str, start_date: datetime, end_date: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Same range as ``get_historical_data``, as ``timestamp``/``price``/``volume`` numpy arrays."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(self._range_query(symbol, start_date, end_date)).all()
+        if not rows:
+            return {
+                "timestamp": np.empty(0, dtype="datetime64[ns]"),
+                "price": np.empty(0),
+                "volume": np.empty(0),
+            }
+        timestamps, prices, volumes = zip(*rows)
+        return {
+            "timestamp": pd.to_datetime(list(timestamps)).to_numpy(dtype="datetime64[ns]"),
+            "price": np.asarray(prices, dtype=np.float64),
+            "volume": np.asarray(volumes, dtype=np.float64),
+        }
@@ -0,0 +1,275 @@
+"""Append-only history of analysis verdicts.
+
+Redis keeps only the latest analysis for an hour. Every completed run is also
+flattened into ``analysis_results`` rows: one per agent, plus a ``composite``
+row for the overall verdict. All rows from a run share its ``analysis_id`` and
+``as_of`` timestamp.
+
+Writes never block an analysis. ``AnalysisHistoryWriter.submit`` only buffers
+rows. A background task inserts them in batches of ``HISTORY_BATCH_SIZE``, or
+every ``HISTORY_FLUSH_INTERVAL`` seconds, whichever comes first.
+
+Reads go through the ``(symbol, as_of)`` and ``(symbol, agent_name, as_of)``
+indexes. ``get_snapshot`` answers "what did we say about X as of T" with one
+indexed max lookup followed by an equality scan.
+"""
+
+import asyncio
+import inspect
+import numbers
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config.settings import get_settings
+from backend.db.models import AnalysisResult
+from backend.monitoring.performance import record_analysis_history_rows
+
+COMPOSITE_AGENT = "composite"
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _as_float(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        return None
+    value = float(value)
+    return value if value == value else None  # drop NaN
+
+
+def analysis_rows(symbol: str, analysis: Dict[str, Any], as_of: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Flatten an orchestrator analysis result into ``analysis_results`` rows."""
+    as_of = _utc(as_of) or datetime.now(timezone.utc)
+    analysis_id = str(analysis.get("analysis_id") or f"{symbol}_{as_of.timestamp()}")
+    base = {"analysis_id": analysis_id, "symbol": symbol, "as_of": as_of}
+
+    rows = []
+    composite = analysis.get("verdict")
+    if isinstance(composite, dict):
+        rows.append({
+            **base,
+            "category": None,
+            "agent_name": COMPOSITE_AGENT,
+            "verdict": composite.get("verdict"),
+            "confidence": _as_float(composite.get("confidence")),
+            "value": None,
+        })
+    for category, payload in (analysis.get("category_results") or {}).items():
+        for result in (payload or {}).get("results") or []:
+            if not isinstance(result, dict) or not result.get("agent_name"):
+                continue
+            rows.append({
+                **base,
+                "category": category,
+                "agent_name": result["agent_name"],
+                "verdict": result.get("verdict"),
+                "confidence": _as_float(result.get("confidence")),
+                "value": _as_float(result.get("value")),
+            })
+    return rows
+
+
+def _default_session_factory():
+    from backend.db import session as db_session
+
+    return getattr(db_session, "AsyncSessionLocal", None) or db_session.SessionLocal
+
+
+async def _execute(session, stmt):
+    result = session.execute(stmt)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class AnalysisHistoryWriter:
+    """Buffers analysis rows and appends them to ``analysis_results`` in batches."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        settings = get_settings().database
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.HISTORY_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.HISTORY_FLUSH_INTERVAL
+        self.max_pending = max_pending or settings.HISTORY_MAX_PENDING
+        self._pending: List[Dict[str, Any]] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, symbol: str, analysis: Dict[str, Any], as_of: Optional[datetime] = None) -> int:
+        """Queue one analysis run for writing. Returns the number of rows queued."""
+        rows = analysis_rows(symbol, analysis, as_of)
+        if len(self._pending) + len(rows) > self.max_pending:
+            logger.warning(f"Analysis history buffer full; dropping {len(rows)} rows for {symbol}")
+            record_analysis_history_rows("dropped", len(rows))
+            return 0
+        self._pending.extend(rows)
+        self._ensure_task()
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+        return len(rows)
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every buffered row now. Returns the number of rows written."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        written = 0
+        async with self._lock:
+            while self._pending:
+                rows = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    await self._write(rows)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(rows)} analysis history rows: {e}")
+                    record_analysis_history_rows("failed", len(rows))
+                    continue
+                record_analysis_history_rows("written", len(rows))
+                written += len(rows)
+        return written
+
+    async def _write(self, rows: List[Dict[str, Any]]):
+        factory = self._session_factory or _default_session_factory()
+        session = factory()
+        try:
+            if isinstance(session, AsyncSession):
+                await session.execute(insert(AnalysisResult), rows)
+                await session.commit()
+            else:
+                await asyncio.to_thread(self._write_sync, session, rows)
+        finally:
+            closed = session.close()
+            if inspect.isawaitable(closed):
+                await closed
+
+    @staticmethod
+    def _write_sync(session, rows: List[Dict[str, Any]]):
+        session.execute(insert(AnalysisResult), rows)
+        session.commit()
+
+    async def close(self):
+        """Stop the background task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+_writer: Optional[AnalysisHistoryWriter] = None
+
+
+def get_history_writer() -> Optional[AnalysisHistoryWriter]:
+    """Process-wide writer, or None when ``DATABASE_HISTORY_ENABLED`` is off."""
+    global _writer
+    if not get_settings().database.HISTORY_ENABLED:
+        return None
+    if _writer is None:
+        _writer = AnalysisHistoryWriter()
+    return _writer
+
+
+async def close_history_writer():
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
+
+
+def _row_dict(row: AnalysisResult) -> Dict[str, Any]:
+    return {
+        "analysis_id": row.analysis_id,
+        "category": row.category,
+        "agent_name": row.agent_name,
+        "verdict": row.verdict,
+        "confidence": row.confidence,
+        "value": row.value,
+        "as_of": _utc(row.as_of).isoformat(),
+    }
+
+
+async def get_verdict_history(
+    session,
+    symbol: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    agent_name: Optional[str] = None,
+    limit: int = 1000,
+) -> List[Dict[str, Any]]:
+    """Stored verdicts for ``symbol`` in ``[start, end]``, newest first.
+
+    ``agent_name`` narrows to one agent (``"composite"`` for the overall verdict).
+    ``session`` may be a sync ``Session`` or an ``AsyncSession``.
+    """
+    stmt = select(AnalysisResult).where(AnalysisResult.symbol == symbol)
+    if agent_name:
+        stmt = stmt.where(AnalysisResult.agent_name == agent_name)
+    if start is not None:
+        stmt = stmt.where(AnalysisResult.as_of >= _utc(start))
+    if end is not None:
+        stmt = stmt.where(AnalysisResult.as_of <= _utc(end))
+    stmt = stmt.order_by(AnalysisResult.as_of.desc(), AnalysisResult.id).limit(limit)
+    result = await _execute(session, stmt)
+    return [_row_dict(row) for row in result.scalars().all()]
+
+
+async def get_snapshot(session, symbol: str, as_of: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """The most recent stored run for ``symbol`` at or before ``as_of`` (default: now)."""
+    latest = select(func.max(AnalysisResult.as_of)).where(AnalysisResult.symbol == symbol)
+    if as_of is not None:
+        latest = latest.where(AnalysisResult.as_of <= _utc(as_of))
+    snapshot_time = (await _execute(session, latest)).scalar()
+    if snapshot_time is None:
+        return None
+
+    stmt = (
+        select(AnalysisResult)
+        .where(AnalysisResult.symbol == symbol, AnalysisResult.as_of == snapshot_time)
+        .order_by(AnalysisResult.id)
+    )
+    rows = [_row_dict(row) for row in (await _execute(session, stmt)).scalars().all()]
+    composite = next((row for row in rows if row["agent_name"] == COMPOSITE_AGENT), None)
+    return {
+        "symbol": symbol,
+        "analysis_id": rows[0]["analysis_id"],
+        "as_of": rows[0]["as_of"],
+        "verdict": {"verdict": composite["verdict"], "confidence": composite["confidence"]} if composite else None,
+        "agents": [row for row in rows if row["agent_name"] != COMPOSITE_AGENT],
+    }
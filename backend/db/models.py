@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Float, Text, JSON
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Float, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from typing import Optional, List, Dict, Any
@@ -145,4 +145,25 @@ class Alert(Base):
     last_triggered = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="alerts")
\ No newline at end of file
+    user = relationship("User", back_populates="alerts")
+
+
+class AnalysisResult(Base):
+    """Append-only history of agent verdicts, one row per agent per analysis run"""
+    __tablename__ = "analysis_results"
+
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(String, nullable=False)
+    symbol = Column(String, nullable=False)
+    category = Column(String, nullable=True)  # None for the composite verdict
+    agent_name = Column(String, nullable=False)
+    verdict = Column(String, nullable=True)
+    confidence = Column(Float, nullable=True)
+    value = Column(Float, nullable=True)  # Only numeric agent values are kept
+    as_of = Column(DateTime(timezone=True), nullable=False)
+
+    # Snapshots read by (symbol, as_of); per-agent history by (symbol, agent_name, as_of)
+    __table_args__ = (
+        Index("ix_analysis_results_symbol_as_of", "symbol", "as_of"),
+        Index("ix_analysis_results_symbol_agent_as_of", "symbol", "agent_name", "as_of"),
+    )
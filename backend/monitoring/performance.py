@@ -65,6 +65,88 @@ CACHE_MISSES = Counter(
     "cache_misses_total", "Total number of cache misses", ["cache_type"]
 )
 
+# Redis client metrics
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_latency_seconds",
+    "Latency of Redis commands issued through the shared client",
+    ["command"],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0],
+)
+
+REDIS_COMMAND_FAILURES = Counter(
+    "redis_command_failures_total",
+    "Total number of failed Redis commands",
+    ["command", "error_type"],
+)
+
+REDIS_POOL_CONNECTIONS = Gauge(
+    "redis_pool_connections",
+    "Connections in the shared Redis pool",
+    ["state"],  # in_use, available, max
+)
+
+REDIS_POOL_SATURATION = Gauge(
+    "redis_pool_saturation",
+    "Fraction of the Redis pool's max connections currently checked out",
+)
+
+HTML_PARSE_LATENCY = Histogram(
+    "html_parse_latency_seconds",
+    "Time spent parsing and extracting scraped pages, off the event loop",
+    ["source", "parser", "phase"],  # phase: parse or extract
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+HTML_PARSE_BYTES = Counter(
+    "html_parse_bytes_total",
+    "Characters of HTML parsed from scraped pages",
+    ["source"],
+)
+
+CONDITIONAL_FETCH_REQUESTS = Counter(
+    "conditional_fetch_requests_total",
+    "Conditional GETs by domain and outcome",
+    ["domain", "outcome"],  # not_modified, modified, uncacheable
+)
+
+CONDITIONAL_FETCH_BYTES_SAVED = Counter(
+    "conditional_fetch_bytes_saved_total",
+    "Response body bytes not downloaded thanks to 304 Not Modified",
+    ["domain"],
+)
+
+CONDITIONAL_FETCH_PARSE_SAVED = Counter(
+    "conditional_fetch_parse_seconds_saved_total",
+    "Parse time avoided by reusing cached results on 304 Not Modified",
+    ["domain"],
+)
+
+WARMUP_SYMBOLS = Counter(
+    "cache_warmup_symbols_total",
+    "Symbols pre-computed by the cache warm-up scheduler",
+    ["reason", "status"],  # reason: pre_market, bar_close; status: warmed, failed
+)
+
+WARMUP_DURATION = Histogram(
+    "cache_warmup_duration_seconds",
+    "Wall time of one cache warm-up pass",
+    ["reason"],
+    buckets=[1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600],
+)
+
+WARMUP_BUDGET_WAIT = Histogram(
+    "cache_warmup_budget_wait_seconds",
+    "Time the warm-up scheduler waited for provider rate budget",
+    ["provider"],
+    buckets=[0.01, 0.1, 0.5, 1, 5, 15, 30, 60],
+)
+
+ANALYSIS_HISTORY_ROWS = Counter(
+    "analysis_history_rows_total",
+    "Agent verdict rows handled by the analysis history writer",
+    ["status"],  # written, dropped (buffer full), failed (write error)
+)
+
 # System health metrics
 SYSTEM_HEALTH = Gauge(
     "system_health",
@@ -119,6 +201,54 @@ def record_cache_miss(cache_type: str = "redis"):
     CACHE_MISSES.labels(cache_type=cache_type).inc()
 
 
+def record_redis_command(command: str, duration: float, error_type: str = None):
+    """Record the latency (and failure, if any) of a Redis command"""
+    REDIS_COMMAND_LATENCY.labels(command=command).observe(duration)
+    if error_type:
+        REDIS_COMMAND_FAILURES.labels(command=command, error_type=error_type).inc()
+
+
+def update_redis_pool_usage(in_use: int, available: int, max_connections: int):
+    """Update Redis connection pool occupancy"""
+    REDIS_POOL_CONNECTIONS.labels(state="in_use").set(in_use)
+    REDIS_POOL_CONNECTIONS.labels(state="available").set(available)
+    REDIS_POOL_CONNECTIONS.labels(state="max").set(max_connections)
+    REDIS_POOL_SATURATION.set(in_use / max_connections if max_connections else 0)
+
+
+def record_html_parse(source: str, parser: str, parse_duration: float, extract_duration: float, size: int):
+    """Record parse and extraction time for one scraped page"""
+    HTML_PARSE_LATENCY.labels(source=source, parser=parser, phase="parse").observe(parse_duration)
+    HTML_PARSE_LATENCY.labels(source=source, parser=parser, phase="extract").observe(extract_duration)
+    HTML_PARSE_BYTES.labels(source=source).inc(size)
+
+
+def record_conditional_fetch(domain: str, outcome: str, bytes_saved: int = 0, parse_seconds_saved: float = 0.0):
+    """Record the outcome of a conditional GET and what a 304 saved"""
+    CONDITIONAL_FETCH_REQUESTS.labels(domain=domain, outcome=outcome).inc()
+    if bytes_saved:
+        CONDITIONAL_FETCH_BYTES_SAVED.labels(domain=domain).inc(bytes_saved)
+    if parse_seconds_saved:
+        CONDITIONAL_FETCH_PARSE_SAVED.labels(domain=domain).inc(parse_seconds_saved)
+
+
+def record_warmup_pass(reason: str, warmed: int, failed: int, duration: float):
+    """Record the outcome of one cache warm-up pass"""
+    WARMUP_SYMBOLS.labels(reason=reason, status="warmed").inc(warmed)
+    WARMUP_SYMBOLS.labels(reason=reason, status="failed").inc(failed)
+    WARMUP_DURATION.labels(reason=reason).observe(duration)
+
+
+def record_warmup_budget_wait(provider: str, duration: float):
+    """Record time spent waiting for a provider's warm-up rate budget"""
+    WARMUP_BUDGET_WAIT.labels(provider=provider).observe(duration)
+
+
+def record_analysis_history_rows(status: str, count: int):
+    """Record rows written, dropped or failed by the analysis history writer"""
+    ANALYSIS_HISTORY_ROWS.labels(status=status).inc(count)
+
+
 def update_system_health(component: str, healthy: bool):
     """Update system health status"""
     SYSTEM_HEALTH.labels(component=component).set(1 if healthy else 0)
@@ -6,12 +6,21 @@ from typing import Dict, List, Tuple
 
 class QuantCore:
     @staticmethod
-    def calculate_factors(returns: pd.DataFrame) -> pd.DataFrame:
-        """Fama-French 3-factor model implementation"""
-        mkt = returns["SPY"].mean()  # Market factor
-        size = returns[returns.columns].std()  # Size factor
-        value = returns.skew()  # Value factor
-        return pd.DataFrame({"market": mkt, "size": size, "value": value})
+    def calculate_factors(returns: pd.DataFrame, fundamentals: Dict[str, object] = None) -> pd.DataFrame:
+        """Daily factor returns (market, value, momentum, size, quality, low volatility) of a universe.
+
+        ``returns`` has one column per symbol. ``fundamentals`` maps symbols to
+        snapshots; without them value, size and quality returns are zero.
+        """
+        from backend.quant.factor_model import FactorModel
+
+        close = (1 + returns.fillna(0.0)).cumprod().where(returns.notna().cumsum() > 0)
+        fundamentals = fundamentals or {}
+        model = FactorModel.fit(
+            close.to_numpy().T, list(returns.columns), returns.index,
+            [fundamentals.get(symbol) for symbol in returns.columns],
+        )
+        return model.factor_return_frame()
 
     @staticmethod
     def calculate_risk_metrics(returns: pd.Series) -> Dict[str, float]:
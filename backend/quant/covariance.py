@@ -0,0 +1,401 @@
+"""Universe covariance service with incremental per-bar updates.
+
+The correlation, beta and market-state code each used to refetch prices and
+estimate a covariance from scratch. ``CovarianceService`` keeps the running
+statistics of a whole universe of daily simple returns instead:
+
+* an exponentially weighted mean and co-moment matrix, updated with a
+  rank-one step per bar (O(N^2)), so a pairwise covariance, correlation or beta
+  is an O(1) lookup and a ``k``-symbol submatrix is an O(k^2) slice;
+* the weighted fourth moments Ledoit-Wolf needs, so any submatrix can be
+  shrunk toward a scaled identity without revisiting the history;
+* a ring buffer of the most recent returns (and their dates) for
+  fixed-window statistics and for adding symbols later.
+
+Covariances are unbiased in the same sense as ``pandas``' ``ewm(...).cov()``.
+With ``halflife=None`` every bar has equal weight and they match ``np.cov``.
+A symbol's bars before it lists are skipped pairwise, so a late listing only
+shares the bars both symbols traded.
+
+    service = CovarianceService.from_panel(panel, halflife=63)
+    service.update_from_panel(newer_panel)      # applies only the new bars
+    service.add_from_panel(panel_of_new_symbols)  # new rows from the recent window
+    service.correlation("INFY.NS", "^NSEI")
+    service.submatrix(["INFY.NS", "TCS.NS"])    # Ledoit-Wolf shrunk
+    service.save(path)
+
+``get_covariance_service`` keeps one shared instance on disk and in memory
+for the agents. It fetches prices only for symbols it does not track yet
+and remembers, for the day, symbols that came back without history.
+"""
+
+import asyncio
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.utils.price_panel import PricePanel
+
+STATE_VERSION = 2
+
+
+class CovarianceService:
+    """Exponentially weighted covariance of a fixed universe of symbols."""
+
+    def __init__(self, symbols: Iterable[str], halflife: Optional[float] = None, history: int = 252):
+        self.symbols: Tuple[str, ...] = tuple(symbols)
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.halflife = halflife
+        self.decay = 0.5 ** (1.0 / halflife) if halflife else 1.0
+        self.history = history
+        self.mean = np.zeros(n)
+        self._weights = np.zeros((n, n))  # decayed count of bars each pair shares
+        self._squared_weights = np.zeros((n, n))
+        self._comoments = np.zeros((n, n))
+        self._fourth_moments = np.zeros((n, n))
+        self._recent = np.full((n, history), np.nan)
+        self._recent_stamps = np.full(history, np.datetime64("NaT", "ns"))
+        self.bars = 0
+        self.last_timestamp: Optional[np.datetime64] = None
+        self.updated_at: Optional[float] = None
+        self._shrinkage: Dict[Tuple[str, ...], float] = {}
+
+    @classmethod
+    def from_panel(cls, panel: PricePanel, halflife: Optional[float] = None, history: int = 252) -> "CovarianceService":
+        service = cls(panel.symbols, halflife, history)
+        service.update_from_panel(panel)
+        return service
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def __repr__(self) -> str:
+        return f"CovarianceService({len(self)} symbols, {self.bars} bars, halflife={self.halflife})"
+
+    # -- updates ---------------------------------------------------------------
+
+    def update(self, returns: Sequence[float], timestamp: Optional[np.datetime64] = None):
+        """Fold one bar of returns (one per symbol, NaN when not traded) into the estimates."""
+        x = np.asarray(returns, dtype=np.float64)
+        if x.shape != self.mean.shape:
+            raise ValueError(f"Expected {len(self)} returns, got {x.shape}")
+        observed = np.isfinite(x)
+        pairs = np.outer(observed, observed).astype(np.float64)
+        self._weights *= self.decay
+        self._weights += pairs
+        self._squared_weights *= self.decay ** 2
+        self._squared_weights += pairs
+
+        own = np.diag(self._weights)
+        delta = np.where(observed, x - self.mean, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.mean += np.where(observed, delta / own, 0.0)
+            # Weighted Welford step: delta (x - new mean) == delta^2 (1 - 1/W)
+            scaled = delta * np.sqrt(np.where(observed, 1.0 - 1.0 / own, 0.0))
+        self._comoments *= self.decay
+        self._comoments += np.outer(scaled, scaled)
+        squared = scaled * scaled
+        self._fourth_moments *= self.decay
+        self._fourth_moments += np.outer(squared, squared)
+
+        self._recent[:, self.bars % self.history] = x
+        self._recent_stamps[self.bars % self.history] = np.datetime64("NaT", "ns") if timestamp is None else timestamp
+        self.bars += 1
+        if timestamp is not None:
+            self.last_timestamp = np.datetime64(timestamp, "ns")
+        self.updated_at = time.time()
+        self._shrinkage.clear()
+
+    def update_from_panel(self, panel: PricePanel) -> int:
+        """Apply the panel's bars after ``last_timestamp``; returns how many were applied.
+
+        Symbols the panel lacks count as not traded. An unindexed panel cannot
+        be lined up with earlier updates, so all of its bars are applied.
+        """
+        returns = np.full((len(self), max(panel.bars - 1, 0)), np.nan)
+        present = [(i, panel.row(symbol)) for i, symbol in enumerate(self.symbols) if symbol in panel.symbols]
+        if present and panel.bars > 1:
+            mine, theirs = map(list, zip(*present))
+            close = panel.close[theirs]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns[mine] = close[:, 1:] / close[:, :-1] - 1.0
+        stamps = panel._index[1:] if panel._index is not None else None
+        start = 0
+        if stamps is not None and self.last_timestamp is not None:
+            start = int(np.searchsorted(stamps, self.last_timestamp, side="right"))
+        for t in range(start, returns.shape[1]):
+            self.update(returns[:, t], stamps[t] if stamps is not None else None)
+        return returns.shape[1] - start
+
+    def add_from_panel(self, panel: PricePanel) -> Tuple[str, ...]:
+        """Start tracking the panel's symbols that are not tracked yet; returns them.
+
+        Their rows are estimated over the recent window (``history`` bars)
+        against the tracked symbols' kept returns. That is what a rebuild from
+        a ``history``-bar panel gives, without refetching the tracked symbols.
+        Panel bars are matched to the window by date, or by position when
+        either side has no dates. The rows of symbols already tracked are left
+        as they are.
+
+        Each symbol's Welford step depends only on its own returns, so the
+        window's scaled deviations are replayed per symbol in O(N) per bar. The
+        new rows are then weighted sums over the window, O(N) per added symbol
+        and bar, with no N x N update.
+        """
+        added = tuple(symbol for symbol in panel.symbols if symbol not in self._rows)
+        if not added:
+            return added
+        kept = min(self.bars, self.history)
+        columns = np.arange(self.bars - kept, self.bars) % self.history
+        new_returns = np.full((len(added), kept), np.nan)
+        if panel.bars > 1 and kept:
+            close = panel.close[[panel.row(symbol) for symbol in added]]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns = close[:, 1:] / close[:, :-1] - 1.0
+            stamps = self._recent_stamps[columns]
+            if panel._index is not None and not np.isnat(stamps).any():
+                positions = np.clip(np.searchsorted(panel._index[1:], stamps), 0, returns.shape[1] - 1)
+                matched = panel._index[1:][positions] == stamps
+                new_returns[:, matched] = returns[:, positions[matched]]
+            else:
+                width = min(kept, returns.shape[1])
+                new_returns[:, kept - width:] = returns[:, returns.shape[1] - width:]
+
+        window = np.vstack([self._recent[:, columns], new_returns])
+        observed = np.isfinite(window)
+        scaled = np.zeros_like(window)
+        mean, own = np.zeros(len(window)), np.zeros(len(window))
+        for t in range(kept):
+            seen = observed[:, t]
+            own = own * self.decay + seen
+            delta = np.where(seen, window[:, t] - mean, 0.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mean += np.where(seen, delta / own, 0.0)
+                scaled[:, t] = delta * np.sqrt(np.where(seen, 1.0 - 1.0 / own, 0.0))
+
+        n, total = len(self), len(window)
+        decays = self.decay ** np.arange(kept - 1, -1, -1, dtype=np.float64)
+        counts = observed.astype(np.float64)
+        rows = {
+            "_weights": (counts[n:] * decays) @ counts.T,
+            "_squared_weights": (counts[n:] * decays ** 2) @ counts.T,
+            "_comoments": (scaled[n:] * decays) @ scaled.T,
+            "_fourth_moments": (scaled[n:] ** 2 * decays) @ (scaled ** 2).T,
+        }
+        grown = {}
+        for name, new_rows in rows.items():
+            matrix = np.zeros((total, total))
+            matrix[:n, :n] = getattr(self, name)
+            matrix[n:, :] = new_rows
+            matrix[:, n:] = new_rows.T
+            grown[name] = matrix
+        recent = np.full((total, self.history), np.nan)
+        recent[:n] = self._recent
+        recent[n:, columns] = new_returns
+
+        # Swap the grown state in at the end; existing row numbers stay valid throughout
+        for name, matrix in grown.items():
+            setattr(self, name, matrix)
+        self.mean = np.concatenate([self.mean, mean[n:]])
+        self._recent = recent
+        self._rows = {symbol: i for i, symbol in enumerate((*self.symbols, *added))}
+        self.symbols = (*self.symbols, *added)
+        self._shrinkage.clear()
+        return added
+
+    # -- queries ---------------------------------------------------------------
+
+    def _row(self, symbol: str) -> int:
+        try:
+            return self._rows[symbol]
+        except KeyError:
+            raise KeyError(f"{symbol} is not tracked by the covariance service") from None
+
+    def _block(self, symbols: Optional[Sequence[str]]) -> np.ndarray:
+        if symbols is None:
+            return np.arange(len(self))
+        return np.array([self._row(symbol) for symbol in symbols], dtype=np.intp)
+
+    @staticmethod
+    def _unbiased(comoment, weight, squared_weight):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(weight * weight > squared_weight, comoment * weight / (weight * weight - squared_weight), np.nan)
+
+    def covariance(self, a: str, b: str) -> float:
+        i, j = self._row(a), self._row(b)
+        return float(self._unbiased(self._comoments[i, j], self._weights[i, j], self._squared_weights[i, j]))
+
+    def volatility(self, symbol: str) -> float:
+        return math.sqrt(max(self.covariance(symbol, symbol), 0.0))
+
+    def correlation(self, a: str, b: str) -> float:
+        denominator = self.volatility(a) * self.volatility(b)
+        return float(np.clip(self.covariance(a, b) / denominator, -1.0, 1.0)) if denominator > 0 else float("nan")
+
+    def beta(self, symbol: str, index: str) -> float:
+        variance = self.covariance(index, index)
+        return self.covariance(symbol, index) / variance if variance > 0 else float("nan")
+
+    def observations(self, a: str, b: Optional[str] = None) -> float:
+        """Effective number of bars behind a pair's estimate (Kish's ``W^2 / sum w^2``)."""
+        i, j = self._row(a), self._row(b if b is not None else a)
+        return float(self._weights[i, j] ** 2 / self._squared_weights[i, j]) if self._squared_weights[i, j] else 0.0
+
+    def covariance_matrix(self, symbols: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Sample covariance of ``symbols`` (default all), without shrinkage."""
+        block = np.ix_(*(self._block(symbols),) * 2)
+        return self._unbiased(self._comoments[block], self._weights[block], self._squared_weights[block])
+
+    def shrinkage(self, symbols: Optional[Sequence[str]] = None) -> float:
+        """Ledoit-Wolf intensity toward a scaled identity for the ``symbols`` block.
+
+        This is the Ledoit-Wolf (2004) estimator. Sample averages become weighted
+        averages, and the sample size becomes the block's smallest effective
+        number of bars. The intensity is cached until the next update.
+        """
+        key = tuple(symbols) if symbols is not None else self.symbols
+        if key in self._shrinkage:
+            return self._shrinkage[key]
+        rows = self._block(symbols)
+        block = np.ix_(rows, rows)
+        weights = self._weights[block]
+        if len(rows) == 0 or not (weights > 0).all():
+            return 1.0
+        sample = self._comoments[block] / weights
+        p, observations = len(rows), float((weights ** 2 / self._squared_weights[block]).min())
+        mu = np.trace(sample) / p
+        dispersion = ((sample - mu * np.eye(p)) ** 2).sum() / p
+        noise = ((self._fourth_moments[block] / weights).sum() - (sample ** 2).sum()) / (p * observations)
+        intensity = 0.0 if dispersion <= 0 else float(min(max(noise, 0.0), dispersion) / dispersion)
+        self._shrinkage[key] = intensity
+        return intensity
+
+    def submatrix(self, symbols: Optional[Sequence[str]] = None, shrink: bool = True) -> np.ndarray:
+        """Covariance of ``symbols`` in the given order, Ledoit-Wolf shrunk unless ``shrink=False``."""
+        covariance = self.covariance_matrix(symbols)
+        if not shrink or not len(covariance):
+            return covariance
+        intensity = self.shrinkage(symbols)
+        target = np.trace(covariance) / len(covariance) * np.eye(len(covariance))
+        return (1.0 - intensity) * covariance + intensity * target
+
+    def correlation_matrix(self, symbols: Optional[Sequence[str]] = None, shrink: bool = False) -> np.ndarray:
+        covariance = self.submatrix(symbols, shrink=shrink)
+        scale = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.clip(covariance / np.outer(scale, scale), -1.0, 1.0)
+
+    def recent_returns(self, symbols: Optional[Sequence[str]] = None, bars: Optional[int] = None) -> np.ndarray:
+        """The last ``bars`` returns of ``symbols`` as ``(symbols, bars)``, oldest first (NaN if not traded)."""
+        kept = min(self.bars, self.history)
+        bars = kept if bars is None else min(bars, kept)
+        columns = (np.arange(self.bars - bars, self.bars) % self.history) if bars else np.arange(0)
+        return self._recent[np.ix_(self._block(symbols), columns)]
+
+    # -- persistence -----------------------------------------------------------
+
+    def save(self, path):
+        """Write the state to ``path`` (``.npz``) atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as handle:
+            np.savez(
+                handle,
+                version=STATE_VERSION,
+                symbols=np.array(self.symbols, dtype=str),
+                halflife=np.nan if self.halflife is None else self.halflife,
+                history=self.history,
+                mean=self.mean,
+                weights=self._weights,
+                squared_weights=self._squared_weights,
+                comoments=self._comoments,
+                fourth_moments=self._fourth_moments,
+                recent=self._recent,
+                recent_stamps=self._recent_stamps,
+                bars=self.bars,
+                last_timestamp=np.datetime64("NaT", "ns") if self.last_timestamp is None else self.last_timestamp,
+                updated_at=np.nan if self.updated_at is None else self.updated_at,
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path) -> "CovarianceService":
+        with np.load(path, allow_pickle=False) as state:
+            if int(state["version"]) != STATE_VERSION:
+                raise ValueError(f"Unsupported covariance state version {int(state['version'])}")
+            halflife = float(state["halflife"])
+            service = cls(state["symbols"].tolist(), None if math.isnan(halflife) else halflife, int(state["history"]))
+            service.mean = state["mean"].copy()
+            service._weights = state["weights"].copy()
+            service._squared_weights = state["squared_weights"].copy()
+            service._comoments = state["comoments"].copy()
+            service._fourth_moments = state["fourth_moments"].copy()
+            service._recent = state["recent"].copy()
+            service._recent_stamps = state["recent_stamps"].copy()
+            service.bars = int(state["bars"])
+            stamp = state["last_timestamp"][()]
+            service.last_timestamp = None if np.isnat(stamp) else stamp
+            updated_at = float(state["updated_at"])
+            service.updated_at = None if math.isnan(updated_at) else updated_at
+        return service
+
+
+_service: Optional[CovarianceService] = None
+_service_lock = asyncio.Lock()
+_unavailable: Dict[str, float] = {}  # symbol -> when a fetch last returned no history
+UNAVAILABLE_RETRY_SECONDS = 86400
+
+
+async def get_covariance_service(symbols: Iterable[str] = (), max_age: Optional[float] = None) -> CovarianceService:
+    """The shared service, tracking at least ``symbols`` and no older than ``max_age`` seconds.
+
+    The state is loaded from ``COVARIANCE_STATE_PATH`` on first use. Symbols
+    it does not track are fetched on their own and folded in with
+    ``add_from_panel``; a symbol whose fetch returns no history is not
+    retried for a day. Otherwise a stale service is rolled forward with only
+    the bars it has not seen yet. Either way the result is written back to disk.
+    """
+    global _service
+    from backend.config.settings import get_settings
+    from backend.utils.data_provider import fetch_price_panel
+
+    config = get_settings().agent_settings.covariance
+    max_age = config.MAX_AGE_SECONDS if max_age is None else max_age
+    symbols = list(dict.fromkeys(symbols))
+    async with _service_lock:
+        if _service is None and os.path.exists(config.STATE_PATH):
+            try:
+                _service = CovarianceService.load(config.STATE_PATH)
+            except (OSError, KeyError, ValueError):
+                _service = None  # Unreadable or outdated state; rebuilt below
+        now = time.time()
+        missing = [
+            symbol for symbol in symbols
+            if (_service is None or symbol not in _service)
+            and now - _unavailable.get(symbol, -math.inf) > UNAVAILABLE_RETRY_SECONDS
+        ]
+        if _service is None:
+            panel = await fetch_price_panel(missing, period=config.HISTORY_PERIOD)
+            _service = CovarianceService.from_panel(panel, config.HALFLIFE_DAYS, config.RECENT_BARS)
+        elif missing:
+            panel = await fetch_price_panel(missing, period=config.HISTORY_PERIOD)
+            # O(N) per added symbol and bar, but large universes still take a while
+            await asyncio.to_thread(_service.add_from_panel, panel)
+        elif _service.updated_at is None or now - _service.updated_at > max_age:
+            panel = await fetch_price_panel(list(_service.symbols), period=config.HISTORY_PERIOD)
+            _service.update_from_panel(panel)
+            _service.updated_at = time.time()
+        else:
+            return _service
+        _unavailable.update({symbol: now for symbol in missing if symbol not in _service})
+        _service.save(config.STATE_PATH)
+        return _service
@@ -0,0 +1,313 @@
+"""Cross-sectional factor model for a whole universe, every date in one pass.
+
+``factor_exposures`` builds value, momentum, size, quality and low-volatility
+exposures for every symbol and bar of a ``(symbols, bars)`` close matrix.
+Momentum and low volatility come from prices alone. Value (earnings and book
+yield), size (log market cap) and quality (return on equity) combine the
+prices with each symbol's fundamentals snapshot. Each factor is z-scored
+across the universe per bar and winsorised. Missing exposures are set to the
+cross-sectional mean, zero.
+
+``cross_sectional_regression`` regresses each bar's next-bar returns on that
+bar's exposures plus an intercept (the market). The regressions for all bars
+are solved together: the masked normal equations are stacked into one
+``(bars, factors + 1, factors + 1)`` array and pseudo-inverted in one call. The
+result is the same minimum-norm solution ``np.linalg.lstsq`` gives per date.
+
+Snapshots hold today's fundamentals, so historical value, size and quality
+exposures pair today's EPS, book value and share count with historical
+prices, as ``pe_ratio_agent`` does for historical P/E.
+
+The pre-market warm-up fits the model over the shared covariance universe
+with ``get_factor_model(fit=True)`` and caches it for the day, so a symbol's
+factor scores are a lookup:
+
+    model = await get_factor_model()
+    model.score("INFY.NS")["exposures"]["momentum"], model.score("INFY.NS")["composite_percentile"]
+"""
+
+import asyncio
+import datetime
+import json
+import math
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.cache_utils import get_redis_client
+
+FACTORS = ("value", "momentum", "size", "quality", "low_volatility")
+
+
+def _field(snapshot: Any, name: str) -> Optional[float]:
+    """A numeric field of a ``FundamentalsSnapshot`` or a plain dict, or None."""
+    if snapshot is None:
+        return None
+    value = snapshot.get(name) if isinstance(snapshot, Mapping) else getattr(snapshot, name, None)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def cross_sectional_zscore(values: np.ndarray, winsorize: float = 3.0) -> np.ndarray:
+    """Standardise each row of ``(bars, symbols)`` across symbols; missing or constant rows become 0."""
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    count = finite.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(finite, values, 0.0).sum(axis=1, keepdims=True) / count
+        centred = np.where(finite, values - mean, 0.0)
+        std = np.sqrt((centred * centred).sum(axis=1, keepdims=True) / (count - 1))
+        scores = np.where(std > 0, centred / std, 0.0)
+    return np.clip(np.nan_to_num(scores), -winsorize, winsorize)
+
+
+def factor_exposures(close: np.ndarray, fundamentals: Sequence[Any] = (), momentum_window: int = 252,
+                     momentum_skip: int = 21, volatility_window: int = 63, winsorize: float = 3.0) -> np.ndarray:
+    """``(bars, symbols, len(FACTORS))`` standardised exposures.
+
+    ``fundamentals`` holds one snapshot (or dict, or None) per row of
+    ``close``. Momentum is the log return from ``momentum_window`` to
+    ``momentum_skip`` bars ago. Low volatility is minus the trailing
+    ``volatility_window``-bar standard deviation of log returns.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n_symbols, bars = close.shape
+    snapshots = list(fundamentals) + [None] * (n_symbols - len(fundamentals))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_close = np.log(np.where(close > 0, close, np.nan))
+
+        momentum = np.full(close.shape, np.nan)
+        if bars > momentum_window:
+            momentum[:, momentum_window:] = (log_close[:, momentum_window - momentum_skip:bars - momentum_skip]
+                                             - log_close[:, :bars - momentum_window])
+
+        log_returns = np.full(close.shape, np.nan)
+        log_returns[:, 1:] = np.diff(log_close, axis=1)
+        volatility = pd.DataFrame(log_returns.T).rolling(volatility_window).std().to_numpy().T
+
+        eps = np.array([_field(s, "eps") for s in snapshots], dtype=np.float64)
+        book = np.array([_field(s, "book_value_per_share") for s in snapshots], dtype=np.float64)
+        shares = np.array([_field(s, "shares_outstanding") for s in snapshots], dtype=np.float64)
+        market_cap = np.array([_field(s, "market_cap") for s in snapshots], dtype=np.float64)
+        # Without a share count, infer it from the snapshot's market cap at the latest close
+        latest = pd.DataFrame(close.T).ffill().to_numpy()[-1] if bars else np.full(n_symbols, np.nan)
+        shares = np.where(np.isfinite(shares), shares, market_cap / latest)
+
+        earnings_yield = cross_sectional_zscore((eps[:, None] / close).T, winsorize)
+        book_yield = cross_sectional_zscore(np.where(book[:, None] > 0, book[:, None] / close, np.nan).T, winsorize)
+        has_earnings = np.isfinite(eps)[None, :] & np.isfinite(close.T)
+        has_book = (book > 0)[None, :] & np.isfinite(close.T)
+        value = (earnings_yield + book_yield) / np.maximum(has_earnings.astype(int) + has_book, 1)
+        value = np.where(has_earnings | has_book, value, np.nan)
+        size = np.log(np.where(shares > 0, shares, np.nan)[:, None] * close)
+        quality = np.where(book > 0, eps / book, np.nan)
+        quality = np.broadcast_to(quality[None, :], (bars, n_symbols))
+
+    columns = [value, momentum.T, size.T, quality, -volatility.T]
+    return np.stack([cross_sectional_zscore(column, winsorize) for column in columns], axis=2)
+
+
+def cross_sectional_regression(returns: np.ndarray, exposures: np.ndarray, min_symbols: int = 10) -> Dict[str, np.ndarray]:
+    """Per-bar OLS of ``returns`` ``(bars, symbols)`` on ``exposures`` ``(bars, symbols, factors)`` plus an intercept.
+
+    Returns ``coefficients`` ``(bars, factors + 1)`` with the intercept first,
+    ``r_squared`` and ``residuals``. A symbol enters a bar's regression only
+    when its return there is finite. Bars with fewer than ``min_symbols`` such
+    symbols are NaN.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    bars, n_symbols, _ = exposures.shape
+    design = np.concatenate([np.ones((bars, n_symbols, 1)), exposures], axis=2)
+    mask = np.isfinite(returns) & np.isfinite(design).all(axis=2)
+    x = np.where(mask[:, :, None], design, 0.0)
+    y = np.where(mask, returns, 0.0)
+    gram = np.einsum("tnk,tnj->tkj", x, x)
+    moments = np.einsum("tnk,tn->tk", x, y)
+    coefficients = np.matmul(np.linalg.pinv(gram, hermitian=True), moments[:, :, None])[:, :, 0]
+
+    residuals = np.where(mask, returns - np.einsum("tnk,tk->tn", x, coefficients), np.nan)
+    count = mask.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = y.sum(axis=1) / count
+        total = np.where(mask, (returns - mean[:, None]) ** 2, 0.0).sum(axis=1)
+        r_squared = 1.0 - np.nansum(residuals ** 2, axis=1) / total
+    enough = count >= max(min_symbols, coefficients.shape[1] + 1)
+    return {
+        "coefficients": np.where(enough[:, None], coefficients, np.nan),
+        "r_squared": np.where(enough, r_squared, np.nan),
+        "residuals": np.where(enough[:, None], residuals, np.nan),
+    }
+
+
+class FactorModel:
+    """Latest exposures, factor return history and per-symbol scores of a fitted factor model."""
+
+    def __init__(self, symbols: Sequence[str], dates: Sequence[str], exposures: np.ndarray,
+                 factor_returns: np.ndarray, r_squared: np.ndarray, specific_volatility: np.ndarray,
+                 premia_window: int = 252, periods_per_year: int = 252):
+        self.symbols = tuple(symbols)
+        self.dates = tuple(dates)
+        self.exposures = np.asarray(exposures, dtype=np.float64)  # (symbols, factors), latest bar
+        self.factor_returns = np.asarray(factor_returns, dtype=np.float64)  # (dates, 1 + factors)
+        self.r_squared = np.asarray(r_squared, dtype=np.float64)
+        self.specific_volatility = np.asarray(specific_volatility, dtype=np.float64)
+        self.premia_window = premia_window
+        self.periods_per_year = periods_per_year
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._scores: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def factor_names(self):
+        return ("market",) + FACTORS
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    @classmethod
+    def fit(cls, close: np.ndarray, symbols: Sequence[str], dates: Iterable, fundamentals: Sequence[Any] = (),
+            momentum_window: int = 252, momentum_skip: int = 21, volatility_window: int = 63,
+            winsorize: float = 3.0, min_symbols: int = 10, premia_window: int = 252,
+            periods_per_year: int = 252) -> "FactorModel":
+        """Fit on a ``(symbols, bars)`` close matrix (e.g. ``PricePanel.close``) with one snapshot per symbol."""
+        close = np.asarray(close, dtype=np.float64)
+        dates = [pd.Timestamp(date).date().isoformat() for date in dates]
+        exposures = factor_exposures(close, fundamentals, momentum_window, momentum_skip,
+                                     volatility_window, winsorize)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            next_returns = (close[:, 1:] / close[:, :-1] - 1.0).T
+        # Exposures at bar t explain the return realised at t + 1, which labels the factor return
+        fit = cross_sectional_regression(next_returns, exposures[:-1], min_symbols)
+        fitted = np.isfinite(fit["coefficients"]).all(axis=1)
+        residuals = fit["residuals"][fitted][-premia_window:]
+        with np.errstate(invalid="ignore"):
+            specific = np.sqrt(np.nanvar(residuals, axis=0, ddof=1) * periods_per_year) if len(residuals) > 1 \
+                else np.full(len(symbols), np.nan)
+        return cls(
+            symbols, [date for date, keep in zip(dates[1:], fitted) if keep], exposures[-1],
+            fit["coefficients"][fitted], fit["r_squared"][fitted], specific, premia_window, periods_per_year,
+        )
+
+    def premia(self, window: Optional[int] = None) -> Dict[str, float]:
+        """Annualised mean factor returns over the last ``window`` dates (default ``premia_window``)."""
+        recent = self.factor_returns[-(window or self.premia_window):]
+        means = recent.mean(axis=0) * self.periods_per_year if len(recent) else np.full(len(self.factor_names), np.nan)
+        return dict(zip(self.factor_names, means.tolist()))
+
+    def scores(self) -> Dict[str, Dict[str, Any]]:
+        """Every symbol's exposures and factor-implied return, ranked across the universe."""
+        if self._scores is None:
+            premia = np.array([self.premia()[name] for name in FACTORS])
+            composite = self.exposures @ np.nan_to_num(premia)
+            ranks = pd.Series(composite).rank(pct=True).to_numpy()
+            self._scores = {
+                symbol: {
+                    "exposures": dict(zip(FACTORS, np.round(self.exposures[i], 4).tolist())),
+                    "composite": round(float(composite[i]), 6),
+                    "composite_percentile": round(float(ranks[i]), 4),
+                    "specific_volatility": None if not np.isfinite(self.specific_volatility[i])
+                    else round(float(self.specific_volatility[i]), 6),
+                }
+                for i, symbol in enumerate(self.symbols)
+            }
+        return self._scores
+
+    def score(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.scores().get(symbol)
+
+    def factor_return_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.factor_returns, index=pd.DatetimeIndex(self.dates), columns=self.factor_names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def clean(values):
+            return [None if not np.isfinite(v) else float(v) for v in np.ravel(values)]
+
+        return {
+            "symbols": list(self.symbols),
+            "dates": list(self.dates),
+            "exposures": clean(self.exposures),
+            "factor_returns": clean(self.factor_returns),
+            "r_squared": clean(self.r_squared),
+            "specific_volatility": clean(self.specific_volatility),
+            "premia_window": self.premia_window,
+            "periods_per_year": self.periods_per_year,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FactorModel":
+        def array(values, shape):
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64).reshape(shape)
+
+        n_symbols, n_dates = len(data["symbols"]), len(data["dates"])
+        return cls(
+            data["symbols"], data["dates"],
+            array(data["exposures"], (n_symbols, len(FACTORS))),
+            array(data["factor_returns"], (n_dates, len(FACTORS) + 1)),
+            array(data["r_squared"], (n_dates,)),
+            array(data["specific_volatility"], (n_symbols,)),
+            data["premia_window"], data["periods_per_year"],
+        )
+
+
+def factor_model_cache_key(day: Optional[datetime.date] = None) -> str:
+    return f"factor_model:{(day or datetime.date.today()).isoformat()}"
+
+
+async def _fetch_snapshots(symbols: Sequence[str], concurrency: int = 16) -> list:
+    from backend.utils.data_provider import fetch_fundamentals_snapshot
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(symbol):
+        async with semaphore:
+            try:
+                return await fetch_fundamentals_snapshot(symbol)
+            except Exception:
+                return None  # Price factors still apply; value, size and quality fall back to the mean
+
+    return await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+
+
+async def get_factor_model(symbols: Iterable[str] = (), fit: bool = False) -> Optional[FactorModel]:
+    """The day's factor model from Redis, or None when it has not been fitted today.
+
+    Lookups never fit. With ``fit=True`` (the scheduler's pre-market warm-up)
+    a day without a cached result fits the model over the shared covariance
+    universe, which first gains ``symbols``. A universe smaller than
+    ``MIN_SYMBOLS`` is cached as None for the day too, so it is not refetched
+    on every call.
+    """
+    from backend.config.settings import get_settings
+    from backend.quant.covariance import get_covariance_service
+    from backend.utils.data_provider import fetch_price_panel
+
+    settings = get_settings()
+    config = settings.agent_settings.factor_model
+    redis_client = await get_redis_client()
+    cache_key = factor_model_cache_key()
+    cached = await redis_client.get(cache_key)
+    if cached:
+        try:
+            state = json.loads(cached)
+            return FactorModel.from_dict(state) if state is not None else None
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            pass  # Refit if the cache is corrupt or outdated
+    if not fit:
+        return None
+
+    service = await get_covariance_service(list(dict.fromkeys(symbols)))
+    universe = [symbol for symbol in service.symbols if symbol != settings.data_provider.MARKET_INDEX_SYMBOL]
+    panel = await fetch_price_panel(universe, period=config.HISTORY_PERIOD)
+    model = None
+    if len(panel) >= config.MIN_SYMBOLS and panel.index is not None:
+        model = FactorModel.fit(
+            panel.close, panel.symbols, panel.index,
+            await _fetch_snapshots(panel.symbols), config.MOMENTUM_WINDOW, config.MOMENTUM_SKIP,
+            config.VOLATILITY_WINDOW, config.WINSORIZE, config.MIN_SYMBOLS, config.PREMIA_WINDOW,
+            config.PERIODS_PER_YEAR,
+        )
+    await redis_client.set(cache_key, json.dumps(model.to_dict() if model is not None else None), ex=config.CACHE_TTL)
+    return model
@@ -1,46 +1,370 @@
+"""Vectorized technical indicator engine.
+
+The technical agents used to fetch OHLCV separately and each rebuild the
+same rolling windows and EMAs in pandas. ``IndicatorSet`` computes indicators
+straight from a ``PriceFrame``'s numpy columns. Shared intermediates such as
+true range, SMAs and EMAs are memoised, so asking for ATR after ADX or an SMA
+after Bollinger costs nothing extra.
+
+``get_indicators(symbol, frame)`` memoises one ``IndicatorSet`` per symbol
+and bar. The agents read their bars from ``fetch_technical_ohlcv``, which
+fetches one window per symbol and analysis run, so every agent in the run
+reads the same set.
+
+All series are float64 arrays aligned with ``frame.close`` and NaN-padded
+where the window is not yet full, matching the pandas formulas they replace:
+``rolling(n, min_periods=n)`` and ``ewm(adjust=False)``.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
 import numpy as np
 import pandas as pd
-from typing import Dict, List
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
 
+from backend.utils.price_frame import PriceFrame
 
-class TechnicalIndicators:
-    @staticmethod
-    def calculate_all(data: pd.DataFrame) -> Dict[str, pd.Series]:
-        """Calculate comprehensive technical indicators"""
-        results = {}
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+    njit = None
+
+# IndicatorSets kept by get_indicators; one per (symbol, bar) recently analysed
+MAX_CACHED_SETS = 256
+
+
+def _rolling(values: np.ndarray, window: int, reduce, min_window: int = 0) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if min_window < window <= values.shape[-1]:
+        out[..., window - 1:] = reduce(sliding_window_view(values, window, axis=-1))
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """``Series.rolling(window, min_periods=window).mean()`` along the last axis."""
+    return _rolling(values, window, lambda w: w.mean(axis=-1))
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """``Series.rolling(window, min_periods=window).std()`` (sample std by default)."""
+    return _rolling(values, window, lambda w: w.std(axis=-1, ddof=ddof), min_window=ddof)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(values, window, lambda w: w.min(axis=-1))
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(values, window, lambda w: w.max(axis=-1))
+
+
+def lag(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """``Series.shift(periods)`` along the last axis."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if 0 < periods < values.shape[-1]:
+        out[..., periods:] = values[..., :-periods]
+    return out
+
+
+def _leading(values: np.ndarray) -> np.ndarray:
+    """Mask of the NaNs before the first finite value along the last axis."""
+    return np.logical_and.accumulate(np.isnan(values), axis=-1)
+
+
+def ewm_mean(values: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """``Series.ewm(alpha=alpha, adjust=False, min_periods=...).mean()`` along the last axis.
+
+    Leading NaNs are skipped, as pandas does; each row's recursion starts at
+    its first finite value. All rows run through one IIR filter pass.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not values.shape[-1]:
+        return np.full(values.shape, np.nan)
+    leading = _leading(values)
+    start = leading.sum(axis=-1, keepdims=True)
+    first = np.take_along_axis(values, np.minimum(start, values.shape[-1] - 1), axis=-1)
+    # Holding the first value over the leading gap leaves the recursion at that value
+    filled = np.where(leading, first, values)
+    decay = 1.0 - alpha
+    out, _ = lfilter([alpha], [1.0, -decay], filled, axis=-1, zi=decay * filled[..., :1])
+    out[leading] = np.nan
+    if min_periods > 1:
+        out[np.arange(values.shape[-1]) < start + min_periods - 1] = np.nan
+    return out
+
+
+def ema(values: np.ndarray, span: int, min_periods: int = 0) -> np.ndarray:
+    """``Series.ewm(span=span, adjust=False).mean()``."""
+    return ewm_mean(values, 2.0 / (span + 1.0), min_periods)
+
+
+# --- formulas ------------------------------------------------------------
+# Shared by IndicatorSet (one symbol) and backend.quant.panel (symbols x bars);
+# every input is an array whose last axis is time.
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = lag(close)
+    # fmax skips the NaN previous close on the first bar, like DataFrame.max(axis=1)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def wilder_rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI; 100 when there are no losses, 50 on a flat window."""
+    delta = close - lag(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    # The first bar of each series enters as a zero change; bars before it stay empty
+    unlisted = _leading(close)
+    gain[unlisted] = loss[unlisted] = np.nan
+    avg_gain = ewm_mean(gain, 1.0 / period, min_periods=period)
+    avg_loss = ewm_mean(loss, 1.0 / period, min_periods=period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    no_loss = avg_loss == 0
+    rsi[no_loss] = np.where(avg_gain[no_loss] > 0, 100.0, 50.0)
+    return rsi
+
+
+def directional_index(high: np.ndarray, low: np.ndarray, atr: np.ndarray, window: int = 14) -> Dict[str, np.ndarray]:
+    """ADX with simple rolling means for the DIs and DX smoothing over a precomputed ATR."""
+    up_move = high - lag(high)
+    down_move = lag(low) - low
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100 * rolling_mean(plus_dm, window) / atr
+        minus_di = 100 * rolling_mean(minus_dm, window) / atr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return {"plus_di": plus_di, "minus_di": minus_di, "dx": dx, "adx": rolling_mean(dx, window)}
+
+
+def stochastic_oscillator(high: np.ndarray, low: np.ndarray, close: np.ndarray, k_window: int = 14,
+                          d_window: int = 3, smoothing: int = 1) -> Dict[str, np.ndarray]:
+    """%K (optionally smoothed) and %D; a flat or unfilled window reads 50."""
+    low_min = rolling_min(low, k_window)
+    high_max = rolling_max(high, k_window)
+    span = high_max - low_min
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fast_k = np.where(span != 0, 100 * (close - low_min) / span, np.nan)
+    fast_k[np.isnan(fast_k) & ~_leading(close)] = 50.0
+    k = fast_k if smoothing <= 1 else rolling_mean(fast_k, smoothing)
+    return {"k": k, "d": rolling_mean(k, d_window)}
 
-        # Momentum indicators
-        results["rsi"] = TechnicalIndicators.rsi(data["close"])
-        results["macd"] = TechnicalIndicators.macd(data["close"])
-        results["adx"] = TechnicalIndicators.adx(data)
 
-        # Volume indicators
-        results["obv"] = TechnicalIndicators.on_balance_volume(data)
-        results["vwap"] = TechnicalIndicators.vwap(data)
+def _supertrend_loop(close, upper, lower, start, uptrend, supertrend):
+    """Band/trend recursion of Supertrend over plain sequences, filled in place.
 
-        # Volatility indicators
-        results["bbands"] = TechnicalIndicators.bollinger_bands(data["close"])
-        results["atr"] = TechnicalIndicators.average_true_range(data)
+    From ``start`` on, the trend flips up when the close breaks the previous
+    upper band, down when it breaks the previous lower band, and otherwise
+    carries over; the line follows the lower band in an uptrend and the upper
+    band in a downtrend. Comparisons against NaN bands never flip the trend.
+    """
+    up = True
+    for i in range(start, len(close)):
+        if close[i] > upper[i - 1]:
+            up = True
+        elif close[i] < lower[i - 1]:
+            up = False
+        uptrend[i] = up
+        supertrend[i] = lower[i] if up else upper[i]
 
-        # Mean reversion
-        results["hurst"] = TechnicalIndicators.hurst_exponent(data["close"])
-        results["half_life"] = TechnicalIndicators.half_life(data["close"])
 
+# Compiled kernel when numba is installed; same code path otherwise
+_supertrend_kernel = njit(cache=True, nogil=True)(_supertrend_loop) if njit is not None else None
+
+
+def supertrend(close: np.ndarray, upper: np.ndarray, lower: np.ndarray, start: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Supertrend line and trend direction for precomputed bands.
+
+    Bars before ``start`` keep the initial state: the upper band and an uptrend.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    upper = np.ascontiguousarray(upper, dtype=np.float64)
+    lower = np.ascontiguousarray(lower, dtype=np.float64)
+    start = max(int(start), 1)
+    if _supertrend_kernel is not None:
+        uptrend = np.ones(len(close), dtype=np.bool_)
+        line = upper.copy()
+        _supertrend_kernel(close, upper, lower, start, uptrend, line)
+        return line, uptrend
+    # Python floats in lists beat per-element numpy indexing by an order of magnitude
+    upper_values = upper.tolist()
+    uptrend = [True] * len(close)
+    line = list(upper_values)
+    _supertrend_loop(close.tolist(), upper_values, lower.tolist(), start, uptrend, line)
+    return np.asarray(line, dtype=np.float64), np.asarray(uptrend, dtype=np.bool_)
+
+
+class IndicatorSet:
+    """Memoised indicators over one ``PriceFrame``."""
+
+    def __init__(self, frame: PriceFrame):
+        self.frame = frame
+        self._memo: Dict[Tuple[Hashable, ...], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _cached(self, key: Tuple[Hashable, ...], compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def _column(self, name: str) -> np.ndarray:
+        values = self.frame.column(name)
+        if values is None:
+            raise KeyError(f"PriceFrame has no '{name}' column")
+        return values
+
+    # --- building blocks -------------------------------------------------
+    def sma(self, window: int, column: str = "close") -> np.ndarray:
+        return self._cached(("sma", column, window), lambda: rolling_mean(self._column(column), window))
+
+    def rolling_std(self, window: int, column: str = "close") -> np.ndarray:
+        return self._cached(("std", column, window), lambda: rolling_std(self._column(column), window))
+
+    def ema(self, span: int, column: str = "close") -> np.ndarray:
+        return self._cached(("ema", column, span), lambda: ema(self._column(column), span))
+
+    def true_range(self) -> np.ndarray:
+        return self._cached(("true_range",), lambda: true_range(
+            self._column("high"), self._column("low"), self._column("close")))
+
+    def atr(self, window: int = 14) -> np.ndarray:
+        """Simple (rolling mean) average true range."""
+        return self._cached(("atr", window), lambda: rolling_mean(self.true_range(), window))
+
+    # --- indicators ------------------------------------------------------
+    def rsi(self, period: int = 14) -> np.ndarray:
+        """Wilder RSI; 100 when there are no losses, 50 on a flat window."""
+        return self._cached(("rsi", period), lambda: wilder_rsi(self._column("close"), period))
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            signal_line = ema(line, signal)
+            return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+        return self._cached(("macd", fast, slow, signal), compute)
+
+    def bollinger(self, window: int = 20, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+        def compute():
+            middle, std = self.sma(window), self.rolling_std(window)
+            return {"middle": middle, "std": std, "upper": middle + num_std * std, "lower": middle - num_std * std}
+        return self._cached(("bollinger", window, num_std), compute)
+
+    def adx(self, window: int = 14) -> Dict[str, np.ndarray]:
+        """ADX with simple rolling means for ATR, the DIs and DX smoothing."""
+        return self._cached(("adx", window), lambda: directional_index(
+            self._column("high"), self._column("low"), self.atr(window), window))
+
+    def stochastic(self, k_window: int = 14, d_window: int = 3, smoothing: int = 1) -> Dict[str, np.ndarray]:
+        """%K (optionally smoothed) and %D; a flat or unfilled window reads 50."""
+        return self._cached(("stochastic", k_window, d_window, smoothing), lambda: stochastic_oscillator(
+            self._column("high"), self._column("low"), self._column("close"), k_window, d_window, smoothing))
+
+    def supertrend(self, period: int = 10, multiplier: float = 3.0) -> Dict[str, np.ndarray]:
+        """Supertrend over a simple-ATR band of ``multiplier`` ATRs around the bar midpoint."""
+        def compute():
+            atr = self.atr(period)
+            mid = (self._column("high") + self._column("low")) / 2
+            upper, lower = mid + multiplier * atr, mid - multiplier * atr
+            line, uptrend = supertrend(self._column("close"), upper, lower, start=period)
+            return {"supertrend": line, "uptrend": uptrend, "atr": atr, "upper": upper, "lower": lower}
+        return self._cached(("supertrend", period, multiplier), compute)
+
+    def volume_ratio(self, window: int = 20) -> np.ndarray:
+        """Volume relative to its rolling mean."""
+        def compute():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return self._column("volume") / self.sma(window, column="volume")
+        return self._cached(("volume_ratio", window), compute)
+
+    def compute_all(self) -> Dict[str, Any]:
+        """Default parameter set for every indicator the engine provides."""
+        has_ohlc = all(self.frame.column(name) is not None for name in ("high", "low"))
+        result = {
+            "rsi": self.rsi(14),
+            "macd": self.macd(),
+            "bollinger": self.bollinger(),
+            "sma_50": self.sma(50),
+            "sma_200": self.sma(200),
+        }
+        if has_ohlc:
+            result.update(atr=self.atr(14), adx=self.adx(14), stochastic=self.stochastic(14, 3))
+        if self.frame.volume is not None:
+            result["volume_ratio"] = self.volume_ratio(20)
+        return result
+
+
+def last(values: np.ndarray) -> Optional[float]:
+    """Latest value of an indicator series, or None when it is empty or NaN."""
+    if not len(values):
+        return None
+    value = float(values[-1])
+    return None if np.isnan(value) else value
+
+
+def _bar_key(frame: PriceFrame) -> Tuple[Hashable, ...]:
+    close = frame.close
+    stamp = frame.index[-1].value if frame.has_index and len(frame) else None
+    # Hash the closes so revised history for the same last bar is not served stale
+    return len(frame), stamp, hash(close.tobytes())
+
+
+_sets: "OrderedDict[Tuple[Hashable, ...], IndicatorSet]" = OrderedDict()
+
+
+def get_indicators(symbol: str, data: Any) -> IndicatorSet:
+    """Memoised ``IndicatorSet`` for ``symbol`` over ``data`` (anything ``PriceFrame.from_any`` accepts)."""
+    frame = PriceFrame.from_any(data)
+    key = (symbol, *_bar_key(frame))
+    indicators = _sets.get(key)
+    if indicators is None:
+        indicators = _sets[key] = IndicatorSet(frame)
+        if len(_sets) > MAX_CACHED_SETS:
+            _sets.popitem(last=False)
+    else:
+        _sets.move_to_end(key)
+    return indicators
+
+
+def clear_indicator_cache():
+    _sets.clear()
+
+
+class TechnicalIndicators:
+    @staticmethod
+    def calculate_all(data: pd.DataFrame) -> Dict[str, Any]:
+        """Calculate comprehensive technical indicators"""
+        indicators = IndicatorSet(PriceFrame.from_any(data))
+        results = indicators.compute_all()
+        results["hurst"] = TechnicalIndicators.hurst_exponent(indicators.frame.close)
+        results["half_life"] = TechnicalIndicators.half_life(indicators.frame.close)
         return results
 
     @staticmethod
-    def hurst_exponent(series: pd.Series, lags: range = range(2, 100)) -> float:
+    def hurst_exponent(series, lags: range = range(2, 100)) -> float:
         """Calculate Hurst exponent for mean reversion analysis"""
-        tau = [np.std(np.subtract(series[lag:], series[:-lag])) for lag in lags]
+        values = np.asarray(series, dtype=np.float64)
+        lags = [lag for lag in lags if lag < len(values)]
+        if len(lags) < 2:
+            return float("nan")
+        tau = [np.std(values[lag:] - values[:-lag]) for lag in lags]
         reg = np.polyfit(np.log(lags), np.log(tau), 1)
-        return reg[0]
+        return float(reg[0])
 
     @staticmethod
-    def half_life(series: pd.Series) -> float:
+    def half_life(series) -> float:
         """Calculate mean reversion half-life"""
-        lag = series.shift(1)
-        delta = series - lag
-        lag2 = sm.add_constant(lag)
-        model = sm.OLS(delta[1:], lag2[1:])
-        res = model.fit()
-        return -np.log(2) / res.params[1]
+        values = np.asarray(series, dtype=np.float64)
+        if len(values) < 3:
+            return float("nan")
+        lag = values[:-1]
+        delta = np.diff(values)
+        # OLS of delta on [1, lag]; the slope is the mean-reversion speed
+        slope, _ = np.polyfit(lag, delta, 1)
+        return float(-np.log(2) / slope) if slope != 0 else float("inf")
@@ -0,0 +1,129 @@
+"""Single-index market model for a whole universe in one pass.
+
+``index_regression`` regresses every row of a ``(symbols, bars)`` return
+matrix on the market index's returns with closed-form least squares. The
+result covers beta, alpha, correlation, R-squared and idiosyncratic
+volatility for all symbols at once, with no per-symbol loop. Missing returns
+(bars before a listing) are masked per symbol.
+
+``get_market_model`` builds the table over the configured windows from the
+shared ``CovarianceService`` (so the index history is fetched once for the
+universe, not once per agent call) and caches it for the day.
+
+    rows = await get_market_model(["INFY.NS", "TCS.NS"])
+    rows["INFY.NS"]["beta_252d"], rows["INFY.NS"]["correlation_30d"]
+"""
+
+import datetime
+import json
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from backend.quant.covariance import CovarianceService, get_covariance_service
+from backend.utils.cache_utils import get_redis_client
+
+STATISTICS = ("beta", "alpha", "correlation", "r_squared", "idiosyncratic_vol", "observations")
+
+
+def index_regression(returns: np.ndarray, market: np.ndarray, window: Optional[int] = None,
+                     periods_per_year: int = 252) -> Dict[str, np.ndarray]:
+    """OLS of each row of ``returns`` on ``market`` over the last ``window`` bars.
+
+    ``alpha`` is the per-bar intercept. ``idiosyncratic_vol`` is the annualised
+    standard deviation of the residuals. Beta and correlation match
+    ``Series.cov(...) / var()`` and ``Series.corr`` on the bars both series
+    have; statistics with fewer than three such bars are NaN.
+    """
+    y = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    x = np.broadcast_to(np.asarray(market, dtype=np.float64), y.shape)
+    if window is not None:
+        y, x = y[:, -window:], x[:, -window:]
+    mask = np.isfinite(y) & np.isfinite(x)
+    n = mask.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = np.where(mask, x, 0.0).sum(axis=1) / n
+        mean_y = np.where(mask, y, 0.0).sum(axis=1) / n
+        dx = np.where(mask, x - mean_x[:, None], 0.0)
+        dy = np.where(mask, y - mean_y[:, None], 0.0)
+        sxx, syy, sxy = (dx * dx).sum(axis=1), (dy * dy).sum(axis=1), (dx * dy).sum(axis=1)
+        beta = sxy / sxx
+        correlation = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        residual = np.clip(syy - beta * sxy, 0.0, None)
+        result = {
+            "beta": beta,
+            "alpha": mean_y - beta * mean_x,
+            "correlation": correlation,
+            "r_squared": correlation ** 2,
+            "idiosyncratic_vol": np.sqrt(residual / (n - 2) * periods_per_year),
+        }
+    enough = n >= 3
+    result = {name: np.where(enough, values, np.nan) for name, values in result.items()}
+    result["observations"] = n
+    return result
+
+
+def market_model_table(service: CovarianceService, index_symbol: str, windows: Sequence[int],
+                       periods_per_year: int = 252) -> Dict[str, Dict[str, Optional[float]]]:
+    """Market model statistics of every symbol in ``service``, flattened to ``"{stat}_{window}d"`` keys.
+
+    Windows longer than the service's recent-return buffer use the whole
+    buffer. The service's exponentially weighted beta and correlation are
+    included as ``beta_ewm`` and ``correlation_ewm``.
+    """
+    returns = service.recent_returns()
+    market = returns[service.symbols.index(index_symbol)]
+    columns = {}
+    for window in windows:
+        for name, values in index_regression(returns, market, int(window), periods_per_year).items():
+            columns[f"{name}_{int(window)}d"] = values
+
+    def clean(value):
+        return None if value is None or not np.isfinite(value) else float(value)
+
+    table = {}
+    for row, symbol in enumerate(service.symbols):
+        entry = {name: clean(values[row]) for name, values in columns.items()}
+        entry["beta_ewm"] = clean(service.beta(symbol, index_symbol))
+        entry["correlation_ewm"] = clean(service.correlation(symbol, index_symbol))
+        table[symbol] = entry
+    return table
+
+
+def market_model_cache_key(index_symbol: str, day: Optional[datetime.date] = None) -> str:
+    return f"market_model:{index_symbol}:{(day or datetime.date.today()).isoformat()}"
+
+
+async def get_market_model(symbols: Iterable[str], windows: Optional[List[int]] = None) -> Dict[str, Optional[Dict]]:
+    """Cached market model rows for ``symbols`` (None when a symbol has no price history).
+
+    The day's table is shared through Redis. A symbol missing from it brings
+    that symbol into the covariance service, and the table is recomputed for
+    the whole service universe, so other symbols get answered too.
+    """
+    from backend.config.settings import get_settings
+
+    settings = get_settings()
+    config = settings.agent_settings.market_model
+    index_symbol = settings.data_provider.MARKET_INDEX_SYMBOL
+    windows = list(windows or config.WINDOWS)
+    symbols = list(dict.fromkeys(symbols))
+
+    redis_client = await get_redis_client()
+    cache_key = market_model_cache_key(index_symbol)
+    table = {}
+    cached = await redis_client.get(cache_key)
+    if cached:
+        try:
+            table = json.loads(cached)
+        except json.JSONDecodeError:
+            table = {}  # Recompute if cache is corrupt
+    wanted = {f"beta_{int(window)}d" for window in windows}
+    missing = [s for s in symbols if s not in table or (table[s] is not None and not wanted <= table[s].keys())]
+    if missing:
+        service = await get_covariance_service([*missing, index_symbol])
+        if index_symbol in service:
+            table.update(market_model_table(service, index_symbol, windows, config.PERIODS_PER_YEAR))
+        table.update({symbol: None for symbol in missing if symbol not in table})
+        await redis_client.set(cache_key, json.dumps(table), ex=config.CACHE_TTL)
+    return {symbol: table.get(symbol) for symbol in symbols}
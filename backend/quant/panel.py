@@ -0,0 +1,187 @@
+"""Cross-sectional indicators over a ``PricePanel``.
+
+Screening a universe through the per-symbol technical agents means running
+one pandas pipeline for each symbol. ``compute_indicators_panel`` runs the
+shared formulas from ``backend.quant.indicators`` once over the
+``(symbols, bars)`` matrices instead. Because every kernel works along the
+last axis, each row matches what ``IndicatorSet`` returns for that symbol
+alone.
+
+A spec maps output names to parameters. The ``kind`` entry picks the
+indicator and defaults to the name, so one spec can request the same kind
+more than once:
+
+    spec = {
+        "rsi": {"period": 14},
+        "rsi_fast": {"kind": "rsi", "period": 7},
+        "sma_cross": {"fast": 50, "slow": 200},
+        "momentum": {"lookbacks": [21, 63, 126]},
+    }
+    results = compute_indicators_panel(panel, spec)
+    latest_frame(results, panel)    # symbols x indicator values on the last bar
+"""
+
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.quant.indicators import (
+    directional_index, ema, lag, rolling_mean, rolling_std, stochastic_oscillator, true_range, wilder_rsi,
+)
+from backend.utils.price_panel import PricePanel
+
+Spec = Union[Mapping[str, Mapping[str, Any]], Iterable[str]]
+
+DEFAULT_PANEL_SPEC: Dict[str, Dict[str, Any]] = {
+    "rsi": {"period": 14},
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+    "sma_cross": {"fast": 50, "slow": 200},
+    "ema_cross": {"fast": 12, "slow": 26},
+    "bollinger": {"window": 20, "num_std": 2.0},
+    "adx": {"window": 14},
+    "momentum": {"lookbacks": [21, 63, 126, 252]},
+}
+
+
+def _require(panel: PricePanel, *names: str) -> list:
+    missing = [name for name in names if panel.column(name) is None]
+    if missing:
+        raise ValueError(f"PricePanel has no {', '.join(missing)} column(s)")
+    return [panel.column(name) for name in names]
+
+
+def _crossover(fast: np.ndarray, slow: np.ndarray) -> Dict[str, np.ndarray]:
+    """Fast and slow lines, their spread, and +1/-1 on the bar the spread turns positive/negative."""
+    spread = fast - slow
+    cross = np.zeros(spread.shape)
+    now, before = spread[..., 1:], spread[..., :-1]
+    cross[..., 1:][(now > 0) & (before <= 0)] = 1.0
+    cross[..., 1:][(now < 0) & (before >= 0)] = -1.0
+    return {"fast": fast, "slow": slow, "spread": spread, "cross": cross}
+
+
+def _rsi(panel, period=14):
+    return wilder_rsi(panel.close, period)
+
+
+def _macd(panel, fast=12, slow=26, signal=9):
+    line = ema(panel.close, fast) - ema(panel.close, slow)
+    signal_line = ema(line, signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def _sma(panel, window=20):
+    return rolling_mean(panel.close, window)
+
+
+def _ema(panel, span=20):
+    return ema(panel.close, span)
+
+
+def _sma_cross(panel, fast=50, slow=200):
+    return _crossover(rolling_mean(panel.close, fast), rolling_mean(panel.close, slow))
+
+
+def _ema_cross(panel, fast=12, slow=26):
+    return _crossover(ema(panel.close, fast), ema(panel.close, slow))
+
+
+def _bollinger(panel, window=20, num_std=2.0):
+    close = panel.close
+    middle, std = rolling_mean(close, window), rolling_std(close, window)
+    upper, lower = middle + num_std * std, middle - num_std * std
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_b = (close - lower) / (upper - lower)
+    return {"middle": middle, "upper": upper, "lower": lower, "percent_b": percent_b}
+
+
+def _atr(panel, window=14):
+    high, low, close = _require(panel, "high", "low", "close")
+    return rolling_mean(true_range(high, low, close), window)
+
+
+def _adx(panel, window=14):
+    high, low, close = _require(panel, "high", "low", "close")
+    return directional_index(high, low, rolling_mean(true_range(high, low, close), window), window)
+
+
+def _stochastic(panel, k_window=14, d_window=3, smoothing=1):
+    high, low, close = _require(panel, "high", "low", "close")
+    return stochastic_oscillator(high, low, close, k_window, d_window, smoothing)
+
+
+def _momentum(panel, lookbacks=(21, 63, 126, 252)):
+    """Return over each lookback in bars; ``None`` measures from each symbol's first bar."""
+    close = panel.close
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for lookback in lookbacks:
+            if lookback is None:
+                first = np.take_along_axis(close, np.isnan(close).argmin(axis=-1)[..., None], axis=-1)
+                out["window"] = close / first - 1.0
+            else:
+                out[int(lookback)] = close / lag(close, int(lookback)) - 1.0
+    return out
+
+
+INDICATORS: Dict[str, Callable[..., Any]] = {
+    "rsi": _rsi,
+    "macd": _macd,
+    "sma": _sma,
+    "ema": _ema,
+    "sma_cross": _sma_cross,
+    "ema_cross": _ema_cross,
+    "bollinger": _bollinger,
+    "atr": _atr,
+    "adx": _adx,
+    "stochastic": _stochastic,
+    "momentum": _momentum,
+}
+
+
+def compute_indicators_panel(panel: PricePanel, spec: Optional[Spec] = None) -> Dict[str, Any]:
+    """Compute every indicator in ``spec`` for all symbols of ``panel`` at once.
+
+    ``spec`` is a mapping of output name to parameters (see module docstring)
+    or an iterable of kinds to run with default parameters; it defaults to
+    ``DEFAULT_PANEL_SPEC``. Each result is a ``(symbols, bars)`` array, or a
+    dict of them for multi-line indicators.
+    """
+    if spec is None:
+        spec = DEFAULT_PANEL_SPEC
+    elif not isinstance(spec, Mapping):
+        spec = {name: {} for name in spec}
+    results = {}
+    for name, params in spec.items():
+        params = dict(params or {})
+        kind = params.pop("kind", name)
+        compute = INDICATORS.get(kind)
+        if compute is None:
+            raise ValueError(f"Unknown panel indicator '{kind}'; expected one of {sorted(INDICATORS)}")
+        results[name] = compute(panel, **params)
+    return results
+
+
+def _last(series: np.ndarray) -> np.ndarray:
+    return series[..., -1] if series.shape[-1] else np.full(series.shape[:-1], np.nan)
+
+
+def latest_values(results: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    """Each indicator's value on the last bar, one entry per symbol.
+
+    Multi-line indicators are flattened to ``"name.line"`` keys.
+    """
+    latest = {}
+    for name, values in results.items():
+        if isinstance(values, Mapping):
+            for line, series in values.items():
+                latest[f"{name}.{line}"] = _last(series)
+        else:
+            latest[name] = _last(values)
+    return latest
+
+
+def latest_frame(results: Mapping[str, Any], panel: PricePanel) -> pd.DataFrame:
+    """``latest_values`` as a DataFrame indexed by symbol."""
+    return pd.DataFrame(latest_values(results), index=pd.Index(panel.symbols, name="symbol"))
@@ -0,0 +1,226 @@
+"""Market regime model fitted once on the index and served to every caller.
+
+A market regime describes the market, not a symbol. The model is a Gaussian
+mixture over two features of the market index, its trailing annualised
+return and its trailing annualised volatility. It is fitted on a schedule,
+persisted and then only evaluated. ``RegimeModel.predict_proba`` is a few
+numpy operations on a ``(regimes, 2, 2)`` array, taking microseconds where
+a refit takes a full EM run.
+
+Components are ordered by volatility, so regime ``0`` is always the calmest
+and the labels stay stable across refits. A refit starts EM from the
+previous weights, means and precisions, so it usually converges in a handful
+of iterations when a few new bars arrive.
+
+    model = await get_regime_model()
+    model.current()                        # label and probabilities for the latest bar
+    model.predict_proba([0.12, 0.18])      # any observation of (return, volatility)
+"""
+
+import asyncio
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from backend.quant.indicators import rolling_mean, rolling_std
+
+STATE_VERSION = 1
+# Labels by ascending volatility, shared with QuantStrategies.regime_detection
+REGIME_LABELS = {
+    2: ("low_volatility", "high_volatility"),
+    3: ("low_volatility", "normal", "high_volatility"),
+}
+
+
+def regime_features(close: np.ndarray, window: int = 21, periods_per_year: int = 252) -> np.ndarray:
+    """``(bars, 2)`` trailing annualised mean log return and volatility; the first ``window`` rows are dropped."""
+    close = np.asarray(close, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(close))
+    features = np.column_stack([
+        rolling_mean(returns, window) * periods_per_year,
+        rolling_std(returns, window) * math.sqrt(periods_per_year),
+    ])
+    return features[np.isfinite(features).all(axis=1)]
+
+
+class RegimeModel:
+    """Fitted Gaussian mixture parameters with a numpy ``predict_proba``."""
+
+    def __init__(self, weights, means, covariances, window: int = 21,
+                 latest_features: Optional[Sequence[float]] = None, last_timestamp: Optional[np.datetime64] = None,
+                 fitted_at: Optional[float] = None, observations: int = 0, iterations: int = 0):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.covariances = np.asarray(covariances, dtype=np.float64)
+        self.window = window
+        self.latest_features = None if latest_features is None else np.asarray(latest_features, dtype=np.float64)
+        self.last_timestamp = last_timestamp
+        self.fitted_at = fitted_at
+        self.observations = observations
+        self.iterations = iterations
+        # Everything predict_proba needs beyond the observation itself
+        self._precision_factors = np.linalg.inv(np.linalg.cholesky(self.covariances)).transpose(0, 2, 1)
+        self._whitened_means = np.matmul(self.means[:, None, :], self._precision_factors)[:, 0, :]
+        dimension = self.means.shape[1]
+        self._log_norm = (
+            np.log(self.weights)
+            + np.log(np.diagonal(self._precision_factors, axis1=1, axis2=2)).sum(axis=1)
+            - 0.5 * dimension * math.log(2 * math.pi)
+        )
+
+    @property
+    def n_regimes(self) -> int:
+        return len(self.weights)
+
+    @property
+    def labels(self):
+        return REGIME_LABELS.get(self.n_regimes, tuple(f"regime_{i}" for i in range(self.n_regimes)))
+
+    @classmethod
+    def fit(cls, features: np.ndarray, n_regimes: int = 3, previous: Optional["RegimeModel"] = None,
+            random_state: int = 42, max_iter: int = 200, **metadata) -> "RegimeModel":
+        """Fit a full-covariance mixture to ``features``, warm-started from ``previous`` when given."""
+        from sklearn.mixture import GaussianMixture
+
+        if previous is not None and previous.n_regimes == n_regimes:
+            mixture = GaussianMixture(
+                n_components=n_regimes, covariance_type="full", max_iter=max_iter, random_state=random_state,
+                weights_init=previous.weights, means_init=previous.means,
+                precisions_init=np.linalg.inv(previous.covariances),
+            )
+        else:
+            mixture = GaussianMixture(n_components=n_regimes, covariance_type="full", max_iter=max_iter,
+                                      n_init=3, random_state=random_state)
+        mixture.fit(features)
+        order = np.argsort(mixture.means_[:, 1], kind="stable")  # calmest first
+        return cls(
+            mixture.weights_[order], mixture.means_[order], mixture.covariances_[order],
+            latest_features=features[-1], fitted_at=time.time(), observations=len(features),
+            iterations=int(mixture.n_iter_), **metadata,
+        )
+
+    def predict_proba(self, features: Union[Sequence[float], np.ndarray]) -> np.ndarray:
+        """Regime probabilities of one observation ``(2,)`` or many ``(n, 2)``."""
+        x = np.asarray(features, dtype=np.float64)
+        # Whitened distance of x from each component: (x - mu_k) L_k
+        offsets = np.matmul(x[..., None, None, :], self._precision_factors)[..., 0, :] - self._whitened_means
+        log_prob = self._log_norm - 0.5 * (offsets * offsets).sum(axis=-1)
+        log_prob -= log_prob.max(axis=-1, keepdims=True)
+        probabilities = np.exp(log_prob)
+        return probabilities / probabilities.sum(axis=-1, keepdims=True)
+
+    def predict(self, features: Union[Sequence[float], np.ndarray]) -> str:
+        return self.labels[int(np.argmax(self.predict_proba(features)))]
+
+    def current(self) -> Dict[str, object]:
+        """Label and probabilities for the latest observation of the data the model was fitted on."""
+        probabilities = self.predict_proba(self.latest_features)
+        regime = int(np.argmax(probabilities))
+        return {
+            "regime": self.labels[regime],
+            "regime_index": regime,
+            "probability": float(probabilities[regime]),
+            "probabilities": dict(zip(self.labels, probabilities.round(6).tolist())),
+            "annualised_return": float(self.latest_features[0]),
+            "annualised_volatility": float(self.latest_features[1]),
+        }
+
+    def market_state(self, features: Optional[Sequence[float]] = None) -> str:
+        """The regime in the market-state vocabulary (``normal``/``stress``/``crisis``).
+
+        ``MarketAnalyzer`` reports this to signal generation and monitoring.
+        High volatility is a crisis while the trailing return is negative and
+        stress otherwise; calmer regimes are normal. Defaults to the latest observation.
+        """
+        features = self.latest_features if features is None else np.asarray(features, dtype=np.float64)
+        if self.predict(features) != self.labels[-1]:
+            return "normal"
+        return "crisis" if features[0] < 0 else "stress"
+
+    def save(self, path):
+        """Write the fitted parameters to ``path`` (``.npz``) atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as handle:
+            np.savez(
+                handle,
+                version=STATE_VERSION,
+                weights=self.weights,
+                means=self.means,
+                covariances=self.covariances,
+                window=self.window,
+                latest_features=np.full(2, np.nan) if self.latest_features is None else self.latest_features,
+                last_timestamp=np.datetime64("NaT", "ns") if self.last_timestamp is None else self.last_timestamp,
+                fitted_at=np.nan if self.fitted_at is None else self.fitted_at,
+                observations=self.observations,
+                iterations=self.iterations,
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path) -> "RegimeModel":
+        with np.load(path, allow_pickle=False) as state:
+            if int(state["version"]) != STATE_VERSION:
+                raise ValueError(f"Unsupported regime model version {int(state['version'])}")
+            latest = state["latest_features"]
+            stamp = state["last_timestamp"][()]
+            fitted_at = float(state["fitted_at"])
+            return cls(
+                state["weights"], state["means"], state["covariances"], int(state["window"]),
+                latest_features=None if np.isnan(latest).any() else latest,
+                last_timestamp=None if np.isnat(stamp) else stamp,
+                fitted_at=None if math.isnan(fitted_at) else fitted_at,
+                observations=int(state["observations"]),
+                iterations=int(state["iterations"]),
+            )
+
+
+_model: Optional[RegimeModel] = None
+_checked_at: Optional[float] = None
+_model_lock = asyncio.Lock()
+
+
+async def get_regime_model(max_age: Optional[float] = None, refit: bool = False) -> Optional[RegimeModel]:
+    """The shared regime model, refitted on the index when older than ``max_age`` seconds.
+
+    The fitted parameters persist at ``STATE_PATH``, so a restart does not
+    refit. A refit happens only when the index has bars the model has not
+    seen (or ``refit=True``), and it starts from the current parameters.
+    Returns None when there is no model and the index history is too short to
+    fit one.
+    """
+    global _model, _checked_at
+    from backend.config.settings import get_settings
+    from backend.utils.data_provider import fetch_price_frame
+
+    settings = get_settings()
+    config = settings.agent_settings.regime_model
+    max_age = config.REFIT_SECONDS if max_age is None else max_age
+    async with _model_lock:
+        if _model is None and os.path.exists(config.STATE_PATH):
+            try:
+                _model = RegimeModel.load(config.STATE_PATH)
+                _checked_at = _model.fitted_at
+            except (OSError, KeyError, ValueError):
+                _model = None  # Unreadable or outdated state; refitted below
+        if _model is not None and not refit and _checked_at is not None and time.time() - _checked_at <= max_age:
+            return _model
+
+        frame = await fetch_price_frame(settings.data_provider.MARKET_INDEX_SYMBOL, period=config.HISTORY_PERIOD)
+        _checked_at = time.time()
+        last_timestamp = frame._index[-1] if frame.has_index and len(frame) else None
+        if _model is not None and not refit and last_timestamp is not None and _model.last_timestamp == last_timestamp:
+            return _model  # No new bars since the last fit
+        features = regime_features(frame.close, config.FEATURE_WINDOW)
+        if len(features) < config.MIN_OBSERVATIONS:
+            return _model
+        _model = RegimeModel.fit(features, config.N_REGIMES, previous=_model,
+                                 window=config.FEATURE_WINDOW, last_timestamp=last_timestamp)
+        _model.save(config.STATE_PATH)
+        return _model
@@ -0,0 +1,219 @@
+"""Portfolio risk engine over a ``PricePanel``.
+
+``PortfolioRiskEngine`` measures a weighted portfolio's log returns on the
+dates where every position has a price. It estimates Value at Risk and
+Conditional VaR three ways:
+
+* historical: empirical quantiles of the realised portfolio returns;
+* parametric: normal quantiles from the mean vector and covariance matrix;
+* Monte Carlo: correlated scenarios ``mu + L z`` with ``L`` the Cholesky factor
+  of the covariance, drawn in fixed-size batches.
+
+VaR and CVaR are reported as return quantiles, in the same sign convention as
+``backend.agents.risk.risk_metrics``: a 95% VaR of -0.021 means a 2.1% loss
+on one day in twenty.
+
+``var_contributions`` gives marginal and component VaR (the Euler allocation,
+whose components sum to the portfolio VaR). ``monte_carlo_var`` also splits
+its CVaR into per-position contributions from the tail scenarios.
+
+The mean, covariance and Cholesky factor of a return window are memoised per
+window, so re-running a portfolio over the same panel with different weights,
+or at a different confidence level, skips the O(N^2 T) estimate and the
+O(N^3) factorisation.
+"""
+
+from collections import OrderedDict
+from functools import cached_property
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.stats import norm
+
+from backend.utils.price_panel import PricePanel
+
+# Covariance estimates kept by covariance_estimate; one per return window
+MAX_CACHED_COVARIANCES = 64
+MONTE_CARLO_BATCH_SIZE = 5_000
+
+
+def panel_log_returns(panel: PricePanel, lookback: Optional[int] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """``(symbols, observations)`` log returns on the dates every symbol has a price.
+
+    Returns the matrix and the dates of its columns (None for an unindexed panel).
+    """
+    close = panel.close
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(close), axis=1)
+    common = np.isfinite(returns).all(axis=0)
+    if lookback is not None:
+        common[: max(len(common) - lookback, 0)] = False
+    stamps = panel._index[1:][common] if panel._index is not None else None
+    return np.ascontiguousarray(returns[:, common]), stamps
+
+
+class CovarianceEstimate:
+    """Mean vector, covariance matrix and a square-root factor of one return window."""
+
+    def __init__(self, returns: np.ndarray):
+        self.observations = returns.shape[1]
+        self.mean = returns.mean(axis=1)
+        self.covariance = np.atleast_2d(np.cov(returns)) if self.observations > 1 else np.zeros((len(returns),) * 2)
+
+    @cached_property
+    def factor(self) -> np.ndarray:
+        """``L`` with ``L @ L.T == covariance``: Cholesky, with a diagonal jitter when needed.
+
+        A covariance estimated from fewer observations than positions is
+        singular. If jitter cannot make it positive definite, the factor comes
+        from the eigen-decomposition with negative eigenvalues clipped to zero.
+        """
+        covariance = self.covariance
+        scale = max(float(np.trace(covariance)) / max(len(covariance), 1), 1e-12)
+        for jitter in (0.0, 1e-10, 1e-8, 1e-6):
+            try:
+                return np.linalg.cholesky(covariance + jitter * scale * np.eye(len(covariance)))
+            except np.linalg.LinAlgError:
+                continue
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+_estimates: "OrderedDict[Tuple[Hashable, ...], CovarianceEstimate]" = OrderedDict()
+
+
+def covariance_estimate(returns: np.ndarray, key: Optional[Tuple[Hashable, ...]] = None) -> CovarianceEstimate:
+    """Memoised ``CovarianceEstimate`` for a return window.
+
+    ``key`` should identify the window, e.g. symbols plus its last date. The
+    hash of the returns is always part of the key, so revised data is never
+    served stale.
+    """
+    key = (key, returns.shape, hash(returns.tobytes()))
+    estimate = _estimates.get(key)
+    if estimate is None:
+        estimate = _estimates[key] = CovarianceEstimate(returns)
+        if len(_estimates) > MAX_CACHED_COVARIANCES:
+            _estimates.popitem(last=False)
+    else:
+        _estimates.move_to_end(key)
+    return estimate
+
+
+def clear_covariance_cache():
+    _estimates.clear()
+
+
+def _tail(values: np.ndarray, confidence: float) -> Dict[str, float]:
+    var = float(np.percentile(values, (1 - confidence) * 100))
+    return {"var": var, "cvar": float(values[values <= var].mean())}
+
+
+class PortfolioRiskEngine:
+    """VaR/CVaR of a weighted portfolio of the symbols in ``panel``."""
+
+    def __init__(self, panel: PricePanel, weights: Optional[Sequence[float]] = None, lookback: Optional[int] = None):
+        self.symbols = panel.symbols
+        if weights is None:
+            weights = np.full(len(self.symbols), 1.0 / max(len(self.symbols), 1))
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (len(self.symbols),):
+            raise ValueError(f"Expected {len(self.symbols)} weights, got {self.weights.shape}")
+        self.returns, stamps = panel_log_returns(panel, lookback)
+        last = stamps[-1] if stamps is not None and len(stamps) else None
+        self._window_key = (self.symbols, last)
+
+    @property
+    def observations(self) -> int:
+        return self.returns.shape[1]
+
+    @cached_property
+    def estimate(self) -> CovarianceEstimate:
+        return covariance_estimate(self.returns, self._window_key)
+
+    @cached_property
+    def portfolio_returns(self) -> np.ndarray:
+        return self.weights @ self.returns
+
+    @property
+    def portfolio_mean(self) -> float:
+        return float(self.weights @ self.estimate.mean)
+
+    @property
+    def portfolio_volatility(self) -> float:
+        return float(np.sqrt(max(self.weights @ self.estimate.covariance @ self.weights, 0.0)))
+
+    def historical_var(self, confidence: float = 0.95, horizon: int = 1) -> Dict[str, float]:
+        """Empirical VaR/CVaR; multi-day horizons use overlapping ``horizon``-day returns."""
+        returns = self.portfolio_returns
+        if horizon > 1:
+            returns = sliding_window_view(returns, horizon).sum(axis=1)
+        return _tail(returns, confidence)
+
+    def parametric_var(self, confidence: float = 0.95, horizon: int = 1) -> Dict[str, float]:
+        """Normal VaR/CVaR from the portfolio mean and volatility, scaled by ``horizon`` days."""
+        z = norm.ppf(1 - confidence)
+        mean, volatility = self.portfolio_mean * horizon, self.portfolio_volatility * np.sqrt(horizon)
+        return {
+            "var": mean + z * volatility,
+            "cvar": mean - volatility * norm.pdf(z) / (1 - confidence),
+        }
+
+    def var_contributions(self, confidence: float = 0.95) -> Dict[str, np.ndarray]:
+        """Parametric marginal VaR (dVaR/dw) and component VaR per position.
+
+        Component VaRs sum to the portfolio's parametric VaR.
+        """
+        z = norm.ppf(1 - confidence)
+        volatility = self.portfolio_volatility
+        marginal = self.estimate.mean + (
+            z * (self.estimate.covariance @ self.weights) / volatility if volatility > 0 else 0.0
+        )
+        component = self.weights * marginal
+        total = component.sum()
+        return {
+            "marginal_var": marginal,
+            "component_var": component,
+            "percent_contribution": component / total if total else np.zeros_like(component),
+        }
+
+    def monte_carlo_var(
+        self,
+        confidence: float = 0.95,
+        n_paths: int = 20_000,
+        horizon: int = 1,
+        seed: Optional[int] = None,
+        batch_size: int = MONTE_CARLO_BATCH_SIZE,
+    ) -> Dict[str, object]:
+        """VaR/CVaR from ``n_paths`` correlated normal scenarios.
+
+        A path's portfolio return is ``w.mu + (L.T w).z``, so a batch costs one
+        matrix-vector product. Each batch keeps only its worst shocks. The
+        positions' CVaR contributions ``w_i (mu_i + (L z_tail)_i)`` come from
+        the mean tail shock, and they sum to the CVaR.
+        """
+        rng = np.random.default_rng(seed)
+        mean = self.estimate.mean * horizon
+        factor = self.estimate.factor * np.sqrt(horizon)
+        loading = factor.T @ self.weights
+        portfolio_mean = float(self.weights @ mean)
+        keep = min(int(np.ceil(n_paths * (1 - confidence))) + 1, n_paths)
+
+        outcomes, tail_values, tail_shocks = [], [], []
+        for start in range(0, n_paths, batch_size):
+            shocks = rng.standard_normal((min(batch_size, n_paths - start), len(loading)))
+            values = portfolio_mean + shocks @ loading
+            worst = np.argpartition(values, keep - 1)[:keep] if keep < len(values) else np.arange(len(values))
+            outcomes.append(values)
+            tail_values.append(values[worst])
+            tail_shocks.append(shocks[worst])
+        outcomes = np.concatenate(outcomes)
+        result = _tail(outcomes, confidence)
+
+        tail_values, tail_shocks = np.concatenate(tail_values), np.concatenate(tail_shocks)
+        in_tail = tail_values <= result["var"]
+        mean_shock = tail_shocks[in_tail].mean(axis=0)
+        result["component_cvar"] = self.weights * (mean + factor @ mean_shock)
+        result["paths"] = n_paths
+        return result
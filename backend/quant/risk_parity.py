@@ -0,0 +1,94 @@
+"""Risk-parity (risk budgeting) weights from a covariance matrix.
+
+The weights ``w`` give each asset a set share ``b_i`` of portfolio risk,
+``w_i (S w)_i / w'S w = b_i``. They follow from Spinu's (2013) convex problem
+
+    minimise  f(y) = 1/2 y'S y - sum_i b_i log y_i    over y > 0
+
+by normalising its minimiser, ``w = y / sum(y)``. The gradient
+``S y - b / y`` is zero exactly at the risk-budget point, and the Hessian
+``S + diag(b / y^2)`` is positive definite. Damped Newton steps on them
+therefore converge in about ten Cholesky solves, whatever the number of
+assets. The step is ``1 / (1 + lambda)`` while the Newton decrement
+``lambda`` is large, which keeps ``y`` positive because ``f`` is
+self-concordant; after that the full step converges quadratically. There is
+no numeric differentiation and no constraint handling, unlike SLSQP on the
+squared risk-contribution gaps.
+
+A previous allocation can be passed as a warm start. It is rescaled to the
+best multiple along its own direction, so a small change in the covariance
+usually needs only a few steps.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+
+@dataclass
+class RiskParityResult:
+    weights: np.ndarray
+    risk_contributions: np.ndarray  # Fraction of portfolio variance from each asset
+    iterations: int
+    converged: bool
+
+
+def _budget(n: int, budget: Optional[Sequence[float]]) -> np.ndarray:
+    if budget is None:
+        return np.full(n, 1.0 / n)
+    budget = np.asarray(budget, dtype=np.float64)
+    if budget.shape != (n,) or (budget <= 0).any():
+        raise ValueError(f"Risk budget must be {n} positive numbers")
+    return budget / budget.sum()
+
+
+def _start(covariance: np.ndarray, budget: np.ndarray, x0: Optional[Sequence[float]]) -> np.ndarray:
+    """``x0`` (or inverse-volatility weights) scaled to minimise ``f`` along its direction."""
+    if x0 is None:
+        y = 1.0 / np.sqrt(np.diag(covariance))
+    else:
+        y = np.asarray(x0, dtype=np.float64)
+        if y.shape != budget.shape:
+            raise ValueError(f"Warm start must have {len(budget)} weights, got {y.shape}")
+        # A zero weight would sit on the log barrier; nudge it inside
+        y = np.clip(y, 1e-6 * max(y.max(), 1e-12), None)
+    return y * np.sqrt(budget.sum() / (y @ covariance @ y))
+
+
+def _newton(covariance, budget, y, tol, max_iter):
+    for iteration in range(1, max_iter + 1):
+        gradient = covariance @ y - budget / y
+        hessian = covariance + np.diag(budget / (y * y))
+        step = cho_solve(cho_factor(hessian, check_finite=False), gradient, check_finite=False)
+        decrement = np.sqrt(max(gradient @ step, 0.0))
+        y = y - (step / (1.0 + decrement) if decrement > 0.25 else step)
+        if decrement < tol:
+            return y, iteration, True
+    return y, max_iter, False
+
+
+def risk_parity_weights(
+    covariance: np.ndarray,
+    budget: Optional[Sequence[float]] = None,
+    x0: Optional[Sequence[float]] = None,
+    tol: float = 1e-10,
+    max_iter: int = 50,
+) -> RiskParityResult:
+    """Long-only weights summing to one whose risk contributions match ``budget`` (default equal).
+
+    ``x0`` warm-starts from a previous allocation of the same assets.
+    """
+    covariance = np.ascontiguousarray(covariance, dtype=np.float64)
+    n = len(covariance)
+    if covariance.shape != (n, n) or n == 0:
+        raise ValueError(f"Covariance must be a non-empty square matrix, got {covariance.shape}")
+    if not (np.diag(covariance) > 0).all():
+        raise ValueError("Every asset needs a positive variance")
+    budget = _budget(n, budget)
+    y, iterations, converged = _newton(covariance, budget, _start(covariance, budget, x0), tol, max_iter)
+
+    weights = y / y.sum()
+    contributions = weights * (covariance @ weights)
+    return RiskParityResult(weights, contributions / contributions.sum(), iterations, converged)
@@ -0,0 +1,341 @@
+"""Mergeable quantile sketches for rolling return and ratio distributions.
+
+``var_agent`` used to take ``np.percentile`` over the whole return history on
+every request. ``pe_ratio_agent`` likewise ranked the current P/E against its
+full history. A ``TDigest`` summarises a distribution in a bounded number of
+centroids (a small multiple of ``compression``). Its rank error is smallest
+in the tails, which is where VaR reads it. A short history (under about
+``compression * 2 / pi`` values) keeps every value as its own centroid.
+Quantiles and percentile ranks are then exact, matching ``np.percentile``
+and ``scipy.stats.percentileofscore(kind="rank")``.
+
+Digests cannot forget values, but they can be merged. ``RollingQuantileSketch``
+keeps one digest per ``bucket_days`` of bars and drops a bucket once all of
+it is older than ``window_days``. It also keeps the merge of every bucket but
+the one still filling, so a query merges just two digests. Each new bar costs
+one insertion into the open bucket.
+
+The sketches serialise to plain dicts with ``to_state`` and ``from_state``, so
+they live in the cache between requests:
+
+    sketch = await refresh_quantile_sketch(cache, "returns:ABC", timestamps, returns, window_days=365)
+    sketch.quantile(0.05)           # 95% daily VaR
+    sketch.percentile_rank(22.5)    # 0-100, as percentileofscore(kind="rank")
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from backend.utils.cache_codec import CacheDecodeError, decode_cache_value, encode_cache_value
+
+STATE_VERSION = 1
+NANOSECONDS_PER_DAY = 86_400 * 10**9
+
+
+class TDigest:
+    """Merging t-digest (Dunning) with exact moments and a numpy-compatible quantile."""
+
+    def __init__(self, compression: float = 200.0):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._buffer = []
+
+    def add(self, value: float, weight: float = 1.0):
+        if math.isnan(value):
+            return
+        self._buffer.append((value, weight))
+        # Welford update keeps the mean and variance exact however much the centroids merge
+        self.count += weight
+        delta = value - self.mean
+        self.mean += weight * delta / self.count
+        self.m2 += weight * delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._flush()
+
+    def extend(self, values: Iterable[float]):
+        for value in values:
+            self.add(float(value))
+
+    @classmethod
+    def merge(cls, digests: Sequence["TDigest"], compression: Optional[float] = None) -> "TDigest":
+        """A digest of the union of ``digests`` (none of them change)."""
+        merged = cls(compression or max((d.compression for d in digests), default=200.0))
+        parts = [d for d in digests if d.count]
+        for digest in parts:
+            digest._flush()
+            # Chan et al. pairwise combination of the moments
+            total = merged.count + digest.count
+            delta = digest.mean - merged.mean
+            merged.m2 += digest.m2 + delta * delta * merged.count * digest.count / total
+            merged.mean += delta * digest.count / total
+            merged.count = total
+            merged.minimum = min(merged.minimum, digest.minimum)
+            merged.maximum = max(merged.maximum, digest.maximum)
+        if parts:
+            merged._compress(np.concatenate([d.means for d in parts]), np.concatenate([d.weights for d in parts]))
+        return merged
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        values, weights = np.array(self._buffer).T
+        self._buffer = []
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # k1 scale: a centroid may span at most one unit of k(q) = delta / (2 pi) * asin(2q - 1)
+        scale = self.compression / (2 * math.pi)
+        merged_means, merged_weights = [], []
+        current_mean, current_weight = means[0], weights[0]
+        cumulative = 0.0
+        k_lower = scale * math.asin(-1.0)
+        for mean, weight in zip(means[1:].tolist(), weights[1:].tolist()):
+            q = min((cumulative + current_weight + weight) / total, 1.0)
+            if scale * math.asin(2 * q - 1) - k_lower <= 1.0:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                cumulative += current_weight
+                k_lower = scale * math.asin(2 * min(cumulative / total, 1.0) - 1)
+                current_mean, current_weight = mean, weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+        self.means, self.weights = np.array(merged_means), np.array(merged_weights)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (``ddof=1``), as ``pd.Series.std`` squares."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    def quantile(self, q: float) -> float:
+        """The ``q``-quantile (0-1) with ``np.percentile``'s linear interpolation between ranks."""
+        self._flush()
+        if not self.count:
+            return math.nan
+        # Rank of each centroid's centre on numpy's 0..n-1 scale; singletons sit on integer ranks
+        ranks = np.cumsum(self.weights) - self.weights + (self.weights - 1) / 2
+        values = self.means
+        if self.weights[0] > 1:
+            ranks, values = np.concatenate([[0.0], ranks]), np.concatenate([[self.minimum], values])
+        if self.weights[-1] > 1:
+            ranks, values = np.concatenate([ranks, [self.count - 1]]), np.concatenate([values, [self.maximum]])
+        return float(np.interp(q * (self.count - 1), ranks, values))
+
+    def percentile_rank(self, value: float) -> float:
+        """Percentage of the distribution at or below ``value``, as ``percentileofscore(kind="rank")``.
+
+        Singletons count as points; a merged centroid spreads its weight evenly
+        between the midpoints to its neighbours.
+        """
+        self._flush()
+        if not self.count:
+            return math.nan
+        means, weights = self.means, self.weights
+        edges = np.concatenate([[self.minimum], (means[1:] + means[:-1]) / 2, [self.maximum]])
+        lower, upper = edges[:-1], edges[1:]
+        spread = np.clip((value - lower) / np.where(upper > lower, upper - lower, 1.0), 0.0, 1.0)
+        point = weights == 1
+        below = np.where(point, means < value, spread).dot(weights)
+        at_or_below = np.where(point, means <= value, spread).dot(weights)
+        return float((below + at_or_below + (at_or_below > below)) * 50.0 / self.count)
+
+    def to_state(self) -> Dict[str, Any]:
+        self._flush()
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "count": self.count,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None,
+            "mean": self.mean,
+            "m2": self.m2,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "TDigest":
+        digest = cls(state["compression"])
+        digest.means = np.asarray(state["means"], dtype=np.float64)
+        digest.weights = np.asarray(state["weights"], dtype=np.float64)
+        digest.count = state["count"]
+        digest.minimum = math.inf if state["min"] is None else state["min"]
+        digest.maximum = -math.inf if state["max"] is None else state["max"]
+        digest.mean, digest.m2 = state["mean"], state["m2"]
+        return digest
+
+
+class RollingQuantileSketch:
+    """Quantiles over the trailing ``window_days`` of a series, bucketed into mergeable digests.
+
+    The window is exact to within one bucket: a bucket is dropped only when
+    its newest value is older than the window.
+    """
+
+    def __init__(self, window_days: float, bucket_days: float = 30.0, compression: float = 200.0):
+        self.window_days = window_days
+        self.bucket_days = bucket_days
+        self.compression = compression
+        self.buckets = deque()  # [start_ns, end_ns, TDigest], oldest first
+        self.closed = TDigest(compression)  # Merge of every bucket but the newest
+        self.last_timestamp: Optional[int] = None  # Nanoseconds since the epoch
+        self.last_value = math.nan
+        self._window: Optional[TDigest] = None
+
+    @classmethod
+    def from_series(cls, timestamps, values, window_days: float, **params) -> "RollingQuantileSketch":
+        sketch = cls(window_days, **params)
+        sketch.update_from_series(timestamps, values)
+        return sketch
+
+    def update(self, value: float, timestamp) -> None:
+        """Append one bar; bars at or before the last one are ignored."""
+        stamp = int(np.datetime64(timestamp, "ns").astype(np.int64))
+        if self.last_timestamp is not None and stamp <= self.last_timestamp:
+            return
+        self.last_timestamp, self.last_value = stamp, value
+        self._window = None
+        if not self.buckets or stamp >= self.buckets[-1][0] + self.bucket_days * NANOSECONDS_PER_DAY:
+            if self.buckets:
+                self.closed = TDigest.merge([self.closed, self.buckets[-1][2]], self.compression)
+            self.buckets.append([stamp, stamp, TDigest(self.compression)])
+        self.buckets[-1][1] = stamp
+        self.buckets[-1][2].add(value)
+
+        cutoff = stamp - self.window_days * NANOSECONDS_PER_DAY
+        if len(self.buckets) > 1 and self.buckets[0][1] < cutoff:
+            while len(self.buckets) > 1 and self.buckets[0][1] < cutoff:
+                self.buckets.popleft()
+            # Digests cannot forget values, so the closed merge is rebuilt once per expired bucket
+            self.closed = TDigest.merge([bucket[2] for bucket in list(self.buckets)[:-1]], self.compression)
+
+    def update_from_series(self, timestamps, values) -> int:
+        """Apply the bars after ``last_timestamp``; returns how many were new."""
+        stamps = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        start = 0 if self.last_timestamp is None else int(np.searchsorted(stamps, self.last_timestamp, side="right"))
+        applied = 0
+        for stamp, value in zip(stamps[start:], values[start:]):
+            if not math.isnan(value):
+                self.update(float(value), np.datetime64(int(stamp), "ns"))
+                applied += 1
+        return applied
+
+    def agrees_with(self, timestamps, values) -> bool:
+        """Whether the series still holds the last bar this sketch saw, unchanged.
+
+        A split adjustment or a restated history changes past values, so the
+        sketch has to be rebuilt rather than extended.
+        """
+        if self.last_timestamp is None:
+            return False
+        stamps = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+        position = int(np.searchsorted(stamps, self.last_timestamp))
+        return position < len(stamps) and stamps[position] == self.last_timestamp \
+            and math.isclose(float(np.asarray(values)[position]), self.last_value, rel_tol=1e-9, abs_tol=1e-12)
+
+    @property
+    def window(self) -> TDigest:
+        if self._window is None:
+            self._window = TDigest.merge([self.closed, self.buckets[-1][2]] if self.buckets else [], self.compression)
+        return self._window
+
+    @property
+    def count(self) -> int:
+        return int(self.window.count)
+
+    @property
+    def mean(self) -> float:
+        return self.window.mean if self.window.count else math.nan
+
+    @property
+    def std(self) -> float:
+        return self.window.std
+
+    def quantile(self, q: float) -> float:
+        return self.window.quantile(q)
+
+    def percentile_rank(self, value: float) -> float:
+        return self.window.percentile_rank(value)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "window_days": self.window_days,
+            "bucket_days": self.bucket_days,
+            "compression": self.compression,
+            "buckets": [[start, end, digest.to_state()] for start, end, digest in self.buckets],
+            "closed": self.closed.to_state(),
+            "last_timestamp": self.last_timestamp,
+            "last_value": None if math.isnan(self.last_value) else self.last_value,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RollingQuantileSketch":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported quantile sketch state version: {state.get('version')}")
+        sketch = cls(state["window_days"], state["bucket_days"], state["compression"])
+        sketch.buckets = deque([start, end, TDigest.from_state(digest)] for start, end, digest in state["buckets"])
+        sketch.closed = TDigest.from_state(state["closed"])
+        sketch.last_timestamp = state["last_timestamp"]
+        sketch.last_value = math.nan if state["last_value"] is None else state["last_value"]
+        return sketch
+
+
+def sketch_cache_key(name: str) -> str:
+    return f"quantile_sketch:{name}"
+
+
+async def load_quantile_sketch(cache, name: str) -> Optional[RollingQuantileSketch]:
+    """Restore a sketch from the cache, or None when absent or unreadable."""
+    raw = await cache.get(sketch_cache_key(name))
+    if not raw:
+        return None
+    try:
+        return RollingQuantileSketch.from_state(decode_cache_value(raw))
+    except (CacheDecodeError, KeyError, TypeError, ValueError):
+        return None
+
+
+async def save_quantile_sketch(cache, name: str, sketch: RollingQuantileSketch, ex: int = 7 * 86400):
+    await cache.set(sketch_cache_key(name), encode_cache_value(sketch.to_state()), ex=ex)
+
+
+async def refresh_quantile_sketch(cache, name: str, timestamps, values, window_days: float,
+                                  sketch: Optional[RollingQuantileSketch] = None, ex: int = 7 * 86400,
+                                  **params) -> RollingQuantileSketch:
+    """Extend the cached sketch with the bars it has not seen, rebuilding when the history disagrees.
+
+    ``timestamps`` and ``values`` may cover only the recent bars, as long as
+    they include the last bar the sketch saw. Pass ``sketch`` when it was
+    already loaded (e.g. to decide how much history to fetch).
+    """
+    if sketch is None:
+        sketch = await load_quantile_sketch(cache, name)
+    if (sketch is None or sketch.window_days != window_days
+            or any(getattr(sketch, key) != value for key, value in params.items())
+            or not sketch.agrees_with(timestamps, values)):
+        sketch = RollingQuantileSketch.from_series(timestamps, values, window_days, **params)
+        await save_quantile_sketch(cache, name, sketch, ex=ex)
+    elif sketch.update_from_series(timestamps, values):
+        await save_quantile_sketch(cache, name, sketch, ex=ex)
+    return sketch
@@ -1,7 +1,12 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
-from scipy.optimize import minimize
+from typing import Dict, List, Optional, Tuple
+
+from backend.quant.risk_parity import risk_parity_weights
+
+# Latest risk-parity allocation per column set, used to warm-start the next solve
+MAX_WARM_STARTS = 128
+_last_allocation: Dict[Tuple[str, ...], Dict[str, float]] = {}
 
 
 class QuantStrategies:
@@ -18,29 +23,34 @@ class QuantStrategies:
 
     @staticmethod
     def risk_parity_allocation(
-        returns: pd.DataFrame, risk_target: float = 0.15
+        returns: pd.DataFrame,
+        risk_target: float = 0.15,
+        previous: Optional[Dict[str, float]] = None,
+        covariance_service=None,
     ) -> Dict[str, float]:
-        cov_matrix = returns.cov() * 252
-        n_assets = len(returns.columns)
-
-        def objective(weights):
-            portfolio_vol = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-            risk_contrib = weights * (np.dot(cov_matrix, weights)) / portfolio_vol
-            return np.sum((risk_contrib - portfolio_vol / n_assets) ** 2)
-
-        constraints = [
-            {"type": "eq", "fun": lambda x: np.sum(x) - 1},
-            {"type": "ineq", "fun": lambda x: x},
-        ]
-
-        result = minimize(
-            objective,
-            x0=np.ones(n_assets) / n_assets,
-            method="SLSQP",
-            constraints=constraints,
-        )
-
-        return dict(zip(returns.columns, result.x))
+        """Equal-risk-contribution weights for the columns of ``returns``.
+
+        ``previous`` warm-starts the solver; by default it is the last allocation
+        computed for the same columns. When ``covariance_service`` tracks every
+        column, its shrunk covariance is used instead of the sample covariance
+        of ``returns``.
+        """
+        columns = tuple(returns.columns)
+        if covariance_service is not None and all(c in covariance_service for c in columns):
+            cov_matrix = covariance_service.submatrix(list(columns)) * 252
+        else:
+            cov_matrix = returns.cov().to_numpy() * 252
+
+        previous = previous if previous is not None else _last_allocation.get(columns)
+        x0 = [previous.get(c, 0.0) for c in columns] if previous else None
+        if x0 is not None and not any(x0):
+            x0 = None
+        allocation = dict(zip(columns, risk_parity_weights(cov_matrix, x0=x0).weights.tolist()))
+        _last_allocation.pop(columns, None)
+        _last_allocation[columns] = allocation
+        if len(_last_allocation) > MAX_WARM_STARTS:
+            _last_allocation.pop(next(iter(_last_allocation)))
+        return allocation
 
     @staticmethod
     def regime_detection(returns: pd.DataFrame, vix_data: pd.Series) -> str:
@@ -0,0 +1,585 @@
+"""Incremental technical indicators with O(1) updates per bar.
+
+``backend.quant.indicators`` recomputes a full year of history whenever the
+bars change. Intraday refreshes append a single bar, so these objects keep the
+recurrence state instead. That state is EMA values, Wilder averages, rolling
+means and variances, and monotonic min/max queues. Each new bar costs a
+constant amount of work.
+
+Every indicator serialises to a plain dict with ``to_state`` and
+``from_state``, so a ``StreamingIndicatorSet`` can live in Redis between
+refreshes. The warm-up scheduler keeps each followed symbol's set there with
+``advance_streaming_indicators``. Each pass fetches only the last few bars.
+It folds in the completed bars the set has not seen, by date, previews the
+bar still forming, and publishes the snapshot under
+``indicator_snapshot:<symbol>``.
+
+The technical agents read the same state through ``cached_indicator_snapshot``.
+They fold in any bar the scheduler has not, and recompute from their bars
+only when nothing usable is cached.
+
+    indicators = StreamingIndicatorSet.bootstrap(frame)   # once, from history
+    indicators.update({"high": h, "low": l, "close": c, "volume": v})
+    indicators.snapshot()                                # latest values
+    indicators.preview(bar)                              # values for a bar still forming
+
+Values follow the same definitions and warm-up rules as ``IndicatorSet``, so
+the streaming and vectorized paths agree bar for bar.
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Mapping, Optional
+
+import pandas as pd
+from loguru import logger
+
+from backend.utils.cache_batch import current_cache_batch
+from backend.utils.cache_codec import CacheDecodeError, decode_cache_value, encode_cache_value
+from backend.utils.price_frame import PriceFrame
+
+NAN = float("nan")
+STATE_VERSION = 2
+# Parameters of the cached set; agents asking for others recompute from bars
+DEFAULT_PARAMS = {"rsi_period": 14, "bollinger_window": 20, "bollinger_std": 2.0, "atr_window": 14,
+                  "stochastic_k": 14, "stochastic_d": 3}
+
+
+def _finite(value: float) -> Optional[float]:
+    return None if value is None or math.isnan(value) else value
+
+
+def _load(value: Optional[float]) -> float:
+    # Cache codecs write NaN as null (orjson) or NaN (json); both come back as NaN
+    return NAN if value is None else value
+
+
+class StreamingEMA:
+    """``ewm(alpha, adjust=False, min_periods)`` one value at a time."""
+
+    def __init__(self, alpha: float, min_periods: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.mean = NAN
+        self.count = 0
+
+    @classmethod
+    def from_span(cls, span: int, min_periods: int = 0) -> "StreamingEMA":
+        return cls(2.0 / (span + 1.0), min_periods)
+
+    def update(self, value: float) -> float:
+        if math.isnan(value):
+            return self.value
+        self.mean = value if self.count == 0 else self.mean + self.alpha * (value - self.mean)
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.mean if self.count >= max(self.min_periods, 1) else NAN
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"alpha": self.alpha, "min_periods": self.min_periods, "mean": _finite(self.mean), "count": self.count}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingEMA":
+        ema = cls(state["alpha"], state["min_periods"])
+        ema.mean, ema.count = _load(state["mean"]), state["count"]
+        return ema
+
+
+class StreamingRollingStats:
+    """Rolling mean and sample standard deviation over the last ``window`` values."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+
+    def update(self, value: float) -> float:
+        if len(self.values) < self.window:
+            # Welford's online update while the window fills
+            self.values.append(value)
+            delta = value - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (value - self.mean)
+        else:
+            # Replace the oldest value without revisiting the window
+            oldest = self.values[0]
+            self.values.append(value)
+            old_mean = self.mean
+            self.mean += (value - oldest) / self.window
+            self.m2 += (value - oldest) * (value - self.mean + oldest - old_mean)
+        return self.value
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def value(self) -> float:
+        return self.mean if self.full else NAN
+
+    @property
+    def std(self) -> float:
+        if not self.full or self.window < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"window": self.window, "values": [_finite(v) for v in self.values], "mean": _finite(self.mean),
+                "m2": _finite(self.m2)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingRollingStats":
+        stats = cls(state["window"])
+        stats.values.extend(_load(v) for v in state["values"])
+        stats.mean, stats.m2 = _load(state["mean"]), _load(state["m2"])
+        return stats
+
+
+class StreamingExtremum:
+    """Rolling max (or min) of the last ``window`` values via a monotonic queue."""
+
+    def __init__(self, window: int, maximum: bool = True):
+        self.window = window
+        self.maximum = maximum
+        self.count = 0
+        self.queue: deque = deque()  # (position, value), values monotonic from the front
+
+    def update(self, value: float) -> float:
+        position = self.count
+        self.count += 1
+        queue = self.queue
+        if self.maximum:
+            while queue and queue[-1][1] <= value:
+                queue.pop()
+        else:
+            while queue and queue[-1][1] >= value:
+                queue.pop()
+        queue.append((position, value))
+        if queue[0][0] <= position - self.window:
+            queue.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.queue[0][1] if self.count >= self.window else NAN
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"window": self.window, "maximum": self.maximum, "count": self.count,
+                "queue": [list(item) for item in self.queue]}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingExtremum":
+        extremum = cls(state["window"], state["maximum"])
+        extremum.count = state["count"]
+        extremum.queue.extend(tuple(item) for item in state["queue"])
+        return extremum
+
+
+class StreamingRSI:
+    """Wilder RSI; 100 when there are no losses, 50 on a flat window."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = NAN
+        self.avg_gain = StreamingEMA(1.0 / period, min_periods=period)
+        self.avg_loss = StreamingEMA(1.0 / period, min_periods=period)
+
+    def update(self, close: float) -> float:
+        # The first bar has no change; it enters the averages as a zero gain and loss
+        change = 0.0 if math.isnan(self.prev_close) else close - self.prev_close
+        self.prev_close = close
+        self.avg_gain.update(change if change > 0 else 0.0)
+        self.avg_loss.update(-change if change < 0 else 0.0)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        gain, loss = self.avg_gain.value, self.avg_loss.value
+        if math.isnan(gain) or math.isnan(loss):
+            return NAN
+        if loss == 0:
+            return 100.0 if gain > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"period": self.period, "prev_close": _finite(self.prev_close),
+                "avg_gain": self.avg_gain.to_state(), "avg_loss": self.avg_loss.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingRSI":
+        rsi = cls(state["period"])
+        rsi.prev_close = _load(state["prev_close"])
+        rsi.avg_gain = StreamingEMA.from_state(state["avg_gain"])
+        rsi.avg_loss = StreamingEMA.from_state(state["avg_loss"])
+        return rsi
+
+
+class StreamingMACD:
+    """MACD line, signal and histogram from three running EMAs."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA.from_span(fast)
+        self.slow = StreamingEMA.from_span(slow)
+        self.signal = StreamingEMA.from_span(signal)
+
+    def update(self, close: float) -> Dict[str, float]:
+        line = self.fast.update(close) - self.slow.update(close)
+        self.signal.update(line)
+        return self.value
+
+    @property
+    def value(self) -> Dict[str, float]:
+        line = self.fast.value - self.slow.value
+        return {"macd": line, "signal": self.signal.value, "histogram": line - self.signal.value}
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"fast": self.fast.to_state(), "slow": self.slow.to_state(), "signal": self.signal.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingMACD":
+        macd = cls.__new__(cls)
+        macd.fast = StreamingEMA.from_state(state["fast"])
+        macd.slow = StreamingEMA.from_state(state["slow"])
+        macd.signal = StreamingEMA.from_state(state["signal"])
+        return macd
+
+
+class StreamingBollinger:
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        self.num_std = num_std
+        self.stats = StreamingRollingStats(window)
+
+    def update(self, close: float) -> Dict[str, float]:
+        self.stats.update(close)
+        return self.value
+
+    @property
+    def value(self) -> Dict[str, float]:
+        middle, std = self.stats.value, self.stats.std
+        return {"middle": middle, "std": std, "upper": middle + self.num_std * std, "lower": middle - self.num_std * std}
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"num_std": self.num_std, "stats": self.stats.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingBollinger":
+        bollinger = cls.__new__(cls)
+        bollinger.num_std = state["num_std"]
+        bollinger.stats = StreamingRollingStats.from_state(state["stats"])
+        return bollinger
+
+
+class StreamingATR:
+    """Simple (rolling mean) average true range."""
+
+    def __init__(self, window: int = 14):
+        self.prev_close = NAN
+        self.stats = StreamingRollingStats(window)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if not math.isnan(self.prev_close):
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.stats.update(true_range)
+
+    @property
+    def value(self) -> float:
+        return self.stats.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"prev_close": _finite(self.prev_close), "stats": self.stats.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingATR":
+        atr = cls.__new__(cls)
+        atr.prev_close = _load(state["prev_close"])
+        atr.stats = StreamingRollingStats.from_state(state["stats"])
+        return atr
+
+
+class StreamingStochastic:
+    """%K (optionally smoothed) and %D; a flat or unfilled window reads 50."""
+
+    def __init__(self, k_window: int = 14, d_window: int = 3, smoothing: int = 1):
+        self.highest = StreamingExtremum(k_window, maximum=True)
+        self.lowest = StreamingExtremum(k_window, maximum=False)
+        self.smooth = StreamingRollingStats(smoothing) if smoothing > 1 else None
+        self.d = StreamingRollingStats(d_window)
+        self.k = NAN
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        span = self.highest.update(high) - self.lowest.update(low)
+        fast_k = 100 * (close - self.lowest.value) / span if span and not math.isnan(span) else 50.0
+        self.k = self.smooth.update(fast_k) if self.smooth is not None else fast_k
+        self.d.update(self.k)
+        return self.value
+
+    @property
+    def value(self) -> Dict[str, float]:
+        return {"k": self.k, "d": self.d.value}
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"highest": self.highest.to_state(), "lowest": self.lowest.to_state(),
+                "smooth": self.smooth.to_state() if self.smooth is not None else None,
+                "d": self.d.to_state(), "k": _finite(self.k)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingStochastic":
+        stochastic = cls.__new__(cls)
+        stochastic.highest = StreamingExtremum.from_state(state["highest"])
+        stochastic.lowest = StreamingExtremum.from_state(state["lowest"])
+        stochastic.smooth = StreamingRollingStats.from_state(state["smooth"]) if state["smooth"] else None
+        stochastic.d = StreamingRollingStats.from_state(state["d"])
+        stochastic.k = _load(state["k"])
+        return stochastic
+
+
+class StreamingIndicatorSet:
+    """The default indicator set for one symbol, advanced one bar at a time."""
+
+    def __init__(self, rsi_period: int = 14, bollinger_window: int = 20, bollinger_std: float = 2.0,
+                 atr_window: int = 14, stochastic_k: int = 14, stochastic_d: int = 3):
+        self.rsi = StreamingRSI(rsi_period)
+        self.macd = StreamingMACD()
+        self.bollinger = StreamingBollinger(bollinger_window, bollinger_std)
+        self.atr = StreamingATR(atr_window)
+        self.stochastic = StreamingStochastic(stochastic_k, stochastic_d)
+        self.bars = 0
+        self.last_close = NAN
+        self.last_timestamp: Optional[str] = None  # ISO date of the latest dated bar
+
+    @classmethod
+    def bootstrap(cls, data: Any, **params) -> "StreamingIndicatorSet":
+        """Replay price history (anything ``PriceFrame.from_any`` accepts) into a fresh set."""
+        frame = PriceFrame.from_any(data)
+        indicators = cls(**params)
+        close = frame.close.tolist()
+        high = frame.high.tolist() if frame.high is not None else close
+        low = frame.low.tolist() if frame.low is not None else close
+        for h, l, c in zip(high, low, close):
+            indicators._advance(h, l, c)
+        if frame.has_index and len(frame):
+            indicators.last_timestamp = frame.index[-1].isoformat()
+        return indicators
+
+    def _advance(self, high: float, low: float, close: float):
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.atr.update(high, low, close)
+        self.stochastic.update(high, low, close)
+        self.bars += 1
+        self.last_close = close
+
+    def update(self, bar: Mapping[str, float], timestamp: Optional[Any] = None) -> Dict[str, Optional[float]]:
+        """Append one completed bar and return the new snapshot."""
+        close = float(bar["close"])
+        self._advance(float(bar.get("high", close)), float(bar.get("low", close)), close)
+        if timestamp is not None:
+            self.last_timestamp = pd.Timestamp(timestamp).isoformat()
+        return self.snapshot()
+
+    def preview(self, bar: Mapping[str, float]) -> Dict[str, Optional[float]]:
+        """Snapshot as if ``bar`` closed now, leaving this set unchanged (for a forming bar)."""
+        return self.from_state(self.to_state()).update(bar)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        macd, bands, stochastic = self.macd.value, self.bollinger.value, self.stochastic.value
+        return {
+            "bars": self.bars,
+            "close": _finite(self.last_close),
+            "rsi": _finite(self.rsi.value),
+            "macd": _finite(macd["macd"]),
+            "macd_signal": _finite(macd["signal"]),
+            "macd_histogram": _finite(macd["histogram"]),
+            "bollinger_middle": _finite(bands["middle"]),
+            "bollinger_upper": _finite(bands["upper"]),
+            "bollinger_lower": _finite(bands["lower"]),
+            "atr": _finite(self.atr.value),
+            "stochastic_k": _finite(stochastic["k"]),
+            "stochastic_d": _finite(stochastic["d"]),
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "bars": self.bars,
+            "last_close": _finite(self.last_close),
+            "last_timestamp": self.last_timestamp,
+            "rsi": self.rsi.to_state(),
+            "macd": self.macd.to_state(),
+            "bollinger": self.bollinger.to_state(),
+            "atr": self.atr.to_state(),
+            "stochastic": self.stochastic.to_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingIndicatorSet":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported streaming indicator state version: {state.get('version')}")
+        indicators = cls.__new__(cls)
+        indicators.bars = state["bars"]
+        indicators.last_close = _load(state["last_close"])
+        indicators.last_timestamp = state["last_timestamp"]
+        indicators.rsi = StreamingRSI.from_state(state["rsi"])
+        indicators.macd = StreamingMACD.from_state(state["macd"])
+        indicators.bollinger = StreamingBollinger.from_state(state["bollinger"])
+        indicators.atr = StreamingATR.from_state(state["atr"])
+        indicators.stochastic = StreamingStochastic.from_state(state["stochastic"])
+        return indicators
+
+
+def state_cache_key(symbol: str) -> str:
+    return f"indicator_state:{symbol}"
+
+
+def snapshot_cache_key(symbol: str) -> str:
+    return f"indicator_snapshot:{symbol}"
+
+
+async def load_streaming_indicators(cache, symbol: str) -> Optional[StreamingIndicatorSet]:
+    """Restore a symbol's indicator state from the cache, or None when absent or unreadable."""
+    raw = await cache.get(state_cache_key(symbol))
+    if not raw:
+        return None
+    try:
+        return StreamingIndicatorSet.from_state(decode_cache_value(raw))
+    except (CacheDecodeError, KeyError, TypeError, ValueError):
+        return None
+
+
+async def save_streaming_indicators(cache, symbol: str, indicators: StreamingIndicatorSet, ex: int = 86400):
+    await cache.set(state_cache_key(symbol), encode_cache_value(indicators.to_state()), ex=ex)
+
+
+async def refresh_streaming_indicators(cache, symbol: str, bar: Mapping[str, float], closed: bool = True,
+                                       ex: int = 86400) -> Dict[str, Optional[float]]:
+    """Advance a symbol's cached indicators by one bar, bootstrapping from history on a cache miss.
+
+    ``closed=False`` treats ``bar`` as still forming: the snapshot includes it but
+    the stored state does not, so the next tick replaces it rather than stacking.
+    """
+    indicators = await load_streaming_indicators(cache, symbol)
+    if indicators is None:
+        from backend.utils.data_provider import fetch_price_frame
+
+        indicators = StreamingIndicatorSet.bootstrap(await fetch_price_frame(symbol))
+        if not closed:
+            await save_streaming_indicators(cache, symbol, indicators, ex=ex)
+    if not closed:
+        return indicators.preview(bar)
+    snapshot = indicators.update(bar)
+    await save_streaming_indicators(cache, symbol, indicators, ex=ex)
+    return snapshot
+
+
+def _bar_at(frame: PriceFrame, i: int) -> Dict[str, float]:
+    bar = {"close": float(frame.close[i])}
+    for name in ("high", "low"):
+        if frame.column(name) is not None:
+            bar[name] = float(frame.column(name)[i])
+    return bar
+
+
+async def advance_streaming_indicators(cache, symbol: str, recent: Any, forming: bool = False,
+                                       ex: int = 86400) -> Dict[str, Optional[float]]:
+    """Fold a dated window of recent bars into the symbol's cached indicators and publish the snapshot.
+
+    ``recent`` (anything ``PriceFrame.from_any`` accepts) only needs the last
+    few bars. Completed bars newer than the stored state are applied once, so
+    repeated passes are idempotent. With ``forming=True`` the last bar is still
+    forming: it is previewed, not stored. The set is rebuilt from the full
+    history on a cache miss, or when the window no longer reaches back to the
+    stored bar.
+    """
+    frame = PriceFrame.from_any(recent)
+    completed = len(frame) - 1 if forming else len(frame)
+    indicators = await load_streaming_indicators(cache, symbol)
+    if frame.has_index and completed > 0:
+        seen = pd.Timestamp(indicators.last_timestamp) if indicators and indicators.last_timestamp else None
+        if seen is None or frame.index[0] > seen:
+            from backend.utils.data_provider import fetch_price_frame
+
+            history = (await fetch_price_frame(symbol)).to_frame()
+            if forming and isinstance(history.index, pd.DatetimeIndex):
+                history = history[history.index < frame.index[-1]]
+            indicators = StreamingIndicatorSet.bootstrap(history)
+            seen = pd.Timestamp(indicators.last_timestamp) if indicators.last_timestamp else None
+        high = frame.high if frame.high is not None else frame.close
+        low = frame.low if frame.low is not None else frame.close
+        for i in range(completed):
+            if seen is None or frame.index[i] > seen:
+                indicators.update({"high": high[i], "low": low[i], "close": frame.close[i]}, frame.index[i])
+    elif indicators is None:
+        from backend.utils.data_provider import fetch_price_frame
+
+        indicators = StreamingIndicatorSet.bootstrap(await fetch_price_frame(symbol))
+    await save_streaming_indicators(cache, symbol, indicators, ex=ex)
+
+    snapshot = indicators.snapshot()
+    if forming and len(frame):
+        snapshot = indicators.preview(_bar_at(frame, -1))
+    await cache.set(snapshot_cache_key(symbol), encode_cache_value(snapshot), ex=ex)
+    return snapshot
+
+
+async def read_streaming_indicators(cache, symbol: str, recent: Any,
+                                    ex: int = 86400) -> Optional[Dict[str, Optional[float]]]:
+    """The symbol's cached indicators advanced to the last bar of ``recent``, or None on a miss.
+
+    ``recent`` is a dated daily window whose last bar may be today's, still
+    forming. Completed bars the stored state has not seen are folded in and
+    saved; today's bar is only previewed. On a miss (nothing cached, or the
+    window no longer agrees with the stored bar) the caller recomputes from
+    ``recent``. When nothing was cached the state is first seeded from it, so
+    the next read hits.
+    """
+    frame = PriceFrame.from_any(recent)
+    if not frame.has_index or not len(frame):
+        return None
+    index = frame.index
+    completed = int(index.searchsorted(pd.Timestamp.now().normalize()))
+    indicators = await load_streaming_indicators(cache, symbol)
+    if indicators is None or not indicators.last_timestamp:
+        if completed:
+            seeded = StreamingIndicatorSet.bootstrap(frame.to_frame().iloc[:completed])
+            await save_streaming_indicators(cache, symbol, seeded, ex=ex)
+        return None
+
+    seen = pd.Timestamp(indicators.last_timestamp)
+    position = int(index.searchsorted(seen))
+    if (position >= completed or index[position] != seen
+            or not math.isclose(frame.close[position], indicators.last_close, rel_tol=1e-9)):
+        return None
+    for i in range(position + 1, completed):
+        indicators.update(_bar_at(frame, i), index[i])
+    if completed > position + 1:
+        await save_streaming_indicators(cache, symbol, indicators, ex=ex)
+    snapshot = indicators.preview(_bar_at(frame, -1)) if completed < len(frame) else indicators.snapshot()
+    await cache.set(snapshot_cache_key(symbol), encode_cache_value(snapshot), ex=ex)
+    return snapshot
+
+
+async def cached_indicator_snapshot(symbol: str, recent: Any) -> Optional[Dict[str, Optional[float]]]:
+    """``read_streaming_indicators`` on the shared cache, once per symbol and analysis run.
+
+    Returns None on a miss or when the cache is unreachable.
+    """
+    from backend.utils.cache_utils import get_redis_client
+
+    async def read():
+        try:
+            return await read_streaming_indicators(await get_redis_client(), symbol, recent)
+        except Exception as e:
+            logger.warning(f"Streaming indicators unavailable for {symbol}: {e}")
+            return None
+
+    batch = current_cache_batch()
+    if batch is None:
+        return await read()
+    return await batch.shared(("indicator_snapshot", symbol), read)
@@ -1,6 +1,318 @@
+"""Pre-market and bar-close cache warm-up.
+
+Without warm-up the first user to open a symbol after the open pays the full
+cold-cache cost. This scheduler takes the union of every watchlist and
+portfolio symbol, ordered by how many watchlists and portfolios contain it.
+It pre-computes the fundamentals snapshot, the market-data cache, the
+streaming indicators (backend.quant.streaming) and the full agent analysis:
+
+* ``pre_market``: once, ``PRE_MARKET_LEAD_MINUTES`` before the open, after
+  refitting the market regime model on the index and fitting the day's
+  factor model over the universe
+* ``bar_close``: after each ``BAR_MINUTES`` bar until the close
+
+A bar-close pass recomputes only the price-driven agents (``PRICE_CATEGORIES``);
+the rest keep serving their cached results until those expire.
+
+Each symbol spends an estimated ``SYMBOL_COST`` (``BAR_CLOSE_SYMBOL_COST`` on
+bar close) of provider calls, drawn from per-provider token buckets refilled
+at ``PROVIDER_BUDGETS`` calls per minute. A pass therefore slows down rather
+than exhausting a provider's quota. It covers only as many symbols as the
+budgets can pay for within its slot (the pre-market lead or one bar), most
+popular first, so it finishes before the next pass is due.
+
+    python -m backend.scheduler           # run forever
+    python -m backend.scheduler --once    # one pre-market pass now
+"""
+
+import argparse
 import asyncio
-from backend.orchestrator import run_full_cycle
+import inspect
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
 from loguru import logger
+from sqlalchemy import distinct, func, select
+
+from backend.config.settings import get_settings
+from backend.db.models import Holding, WatchlistSymbol
+from backend.monitoring.performance import record_warmup_budget_wait, record_warmup_pass
+
+PRE_MARKET = "pre_market"
+BAR_CLOSE = "bar_close"
+
+# Categories whose agents work from prices alone (CategoryType values)
+PRICE_CATEGORIES = ("technical", "market", "risk")
+
+
+class RateBudget:
+    """Token bucket allowing ``per_minute`` provider calls per minute."""
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic, sleep=asyncio.sleep):
+        self.capacity = max(1, per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """Wait until ``tokens`` calls are available and spend them. Returns seconds waited."""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                await self._sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= tokens
+        return waited
+
+
+async def collect_warmup_symbols(session, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+    """Union of watchlist and holding symbols as ``(symbol, popularity)``, most popular first.
+
+    Popularity is the number of watchlists plus the number of portfolios containing
+    the symbol. ``session`` may be a sync ``Session`` or an ``AsyncSession``.
+    """
+    queries = [
+        select(WatchlistSymbol.symbol, func.count(distinct(WatchlistSymbol.watchlist_id))).group_by(WatchlistSymbol.symbol),
+        select(Holding.symbol, func.count(distinct(Holding.portfolio_id))).group_by(Holding.symbol),
+    ]
+    popularity: Counter = Counter()
+    for stmt in queries:
+        result = session.execute(stmt)
+        if inspect.isawaitable(result):
+            result = await result
+        for symbol, count in result.all():
+            if symbol and symbol.strip():
+                popularity[symbol.strip().upper()] += count
+    ranked = sorted(popularity.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:limit] if limit else ranked
+
+
+def _parse_hhmm(value: str) -> Tuple[int, int]:
+    hours, minutes = value.split(":")
+    return int(hours), int(minutes)
+
+
+def next_warmup(now: datetime, settings=None) -> Tuple[datetime, str]:
+    """Next warm-up time at or after ``now`` and its reason, in exchange time."""
+    settings = settings or get_settings().warmup
+    tz = ZoneInfo(settings.MARKET_TIMEZONE)
+    now = now.astimezone(tz) if now.tzinfo else now.replace(tzinfo=tz)
+    day = now.replace(second=0, microsecond=0)
+    for _ in range(8):
+        if day.weekday() < 5:
+            open_hour, open_minute = _parse_hhmm(settings.MARKET_OPEN)
+            close_hour, close_minute = _parse_hhmm(settings.MARKET_CLOSE)
+            open_at = day.replace(hour=open_hour, minute=open_minute)
+            close_at = day.replace(hour=close_hour, minute=close_minute)
+            pre_market = open_at - timedelta(minutes=settings.PRE_MARKET_LEAD_MINUTES)
+            if now <= pre_market:
+                return pre_market, PRE_MARKET
+            bar = open_at + timedelta(minutes=settings.BAR_MINUTES)
+            while bar <= close_at:
+                if now <= bar:
+                    return bar, BAR_CLOSE
+                bar += timedelta(minutes=settings.BAR_MINUTES)
+        day = (day + timedelta(days=1)).replace(hour=0, minute=0)
+        now = day
+    raise ValueError("No trading session found in the next week; check warm-up market hours")
+
+
+class WarmupScheduler:
+    """Keeps agent results and price data warm for the symbols users follow."""
+
+    def __init__(self, orchestrator=None, data_service=None, session_factory=None, budgets: Optional[Dict[str, RateBudget]] = None):
+        self.settings = get_settings().warmup
+        self._orchestrator = orchestrator
+        self._data_service = data_service
+        self._session_factory = session_factory
+        self.budgets = budgets or {
+            provider: RateBudget(per_minute) for provider, per_minute in self.settings.PROVIDER_BUDGETS.items()
+        }
+
+    async def _get_orchestrator(self):
+        if self._orchestrator is None:
+            from backend.core.orchestrator import SystemOrchestrator
+            from backend.db.analysis_history import get_history_writer
+            from backend.utils.cache_utils import get_redis_client
+            from backend.utils.system_monitor import SystemMonitor
+
+            # Warm-up passes produce most analyses; record them like API runs
+            self._orchestrator = SystemOrchestrator(
+                cache_client=await get_redis_client(), history_writer=get_history_writer()
+            )
+            await self._orchestrator.initialize(SystemMonitor())
+        return self._orchestrator
+
+    def _get_data_service(self):
+        if self._data_service is None:
+            from backend.data.data_service import DataService
+
+            self._data_service = DataService()
+        return self._data_service
+
+    async def load_symbols(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        if self._session_factory is not None:
+            session = self._session_factory()
+        else:
+            from backend.db import session as db_session
+
+            session = db_session.AsyncSessionLocal() if hasattr(db_session, "AsyncSessionLocal") else db_session.SessionLocal()
+        try:
+            return await collect_warmup_symbols(session, limit or self.settings.MAX_SYMBOLS)
+        finally:
+            closed = session.close()
+            if inspect.isawaitable(closed):
+                await closed
+
+    def symbol_cost(self, reason: str) -> Dict[str, int]:
+        return self.settings.BAR_CLOSE_SYMBOL_COST if reason == BAR_CLOSE else self.settings.SYMBOL_COST
+
+    def symbol_capacity(self, reason: str) -> int:
+        """Symbols the provider budgets can pay for within the pass's slot, capped at ``MAX_SYMBOLS``."""
+        minutes = self.settings.BAR_MINUTES if reason == BAR_CLOSE else self.settings.PRE_MARKET_LEAD_MINUTES
+        capacity = self.settings.MAX_SYMBOLS
+        for provider, cost in self.symbol_cost(reason).items():
+            budget = self.budgets.get(provider)
+            if budget is not None and cost > 0:
+                capacity = min(capacity, int(budget.capacity * minutes // cost))
+        return max(1, capacity)
+
+    async def _spend_budget(self, reason: str):
+        for provider, cost in self.symbol_cost(reason).items():
+            budget = self.budgets.get(provider)
+            if budget is not None and cost > 0:
+                waited = await budget.acquire(cost)
+                if waited:
+                    record_warmup_budget_wait(provider, waited)
+
+    async def warm_symbol(self, symbol: str, reason: str):
+        """Refresh the caches one symbol's first request would otherwise fill."""
+        await self._spend_budget(reason)
+        if reason == PRE_MARKET:
+            from backend.utils.data_provider import fetch_fundamentals_snapshot
+
+            await fetch_fundamentals_snapshot(symbol)
+        await self._get_data_service().get_market_data([symbol])
+        await self.refresh_indicators(symbol, reason)
+        orchestrator = await self._get_orchestrator()
+        # Per-agent results are cached for an hour. After a bar closes, recompute the
+        # price-driven ones; by pre-market every agent's cache has expired anyway
+        result = await orchestrator.analyze_symbol(
+            symbol, force_refresh=True, refresh_categories=list(PRICE_CATEGORIES) if reason == BAR_CLOSE else None
+        )
+        if isinstance(result, dict) and result.get("error"):
+            raise RuntimeError(result["error"])
+
+    async def refresh_indicators(self, symbol: str, reason: str):
+        """Fold the latest bars into the symbol's cached streaming indicators.
+
+        Only ``INDICATOR_REFRESH_PERIOD`` of bars is fetched. On a bar-close pass
+        the session's own bar is still forming, so it is previewed, not stored.
+        """
+        from backend.quant.streaming import advance_streaming_indicators
+        from backend.utils.cache_utils import get_redis_client
+        from backend.utils.data_provider import fetch_price_frame
+
+        recent = await fetch_price_frame(symbol, period=self.settings.INDICATOR_REFRESH_PERIOD)
+        await advance_streaming_indicators(await get_redis_client(), symbol, recent, forming=reason == BAR_CLOSE)
+
+    async def run_once(self, reason: str = PRE_MARKET) -> Dict[str, int]:
+        """Warm the most popular tracked symbols once, as many as the budgets cover in the pass's slot."""
+        start = time.perf_counter()
+        symbols = [symbol for symbol, _ in await self.load_symbols(self.symbol_capacity(reason))]
+        failed = 0
+        # Hand symbols out in popularity order; workers pick up the next as they finish
+        queue = iter(symbols)
+
+        async def worker():
+            nonlocal failed
+            for symbol in queue:
+                try:
+                    await self.warm_symbol(symbol, reason)
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Warm-up ({reason}) failed for {symbol}: {e}")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, self.settings.CONCURRENCY))))
+        duration = time.perf_counter() - start
+        record_warmup_pass(reason, len(symbols) - failed, failed, duration)
+        logger.info(f"Warm-up ({reason}) covered {len(symbols) - failed}/{len(symbols)} symbols in {duration:.1f}s")
+        return {"symbols": len(symbols), "warmed": len(symbols) - failed, "failed": failed}
+
+    async def refit_regime_model(self):
+        """Refit the shared regime model on the latest index history (warm-started)."""
+        from backend.quant.regime import get_regime_model
+
+        model = await get_regime_model(refit=True)
+        if model is not None:
+            logger.info(f"Regime model refitted in {model.iterations} EM iterations: {model.current()['regime']}")
+
+    async def fit_factor_model(self):
+        """Fit the day's cross-sectional factor model over the warmed symbols."""
+        from backend.quant.factor_model import get_factor_model
+
+        symbols = [symbol for symbol, _ in await self.load_symbols()]
+        model = await get_factor_model(symbols, fit=True)
+        if model is not None:
+            logger.info(f"Factor model fitted over {len(model.symbols)} symbols")
+
+    async def run_forever(self):
+        last_run: Optional[datetime] = None
+        while True:
+            now = datetime.now(ZoneInfo(self.settings.MARKET_TIMEZONE))
+            # A pass that finished within its own slot must not fire that slot again
+            when, reason = next_warmup(max(now, last_run + timedelta(seconds=1)) if last_run else now, self.settings)
+            delay = (when - now).total_seconds()
+            logger.info(f"Next warm-up ({reason}) at {when.isoformat()}")
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if reason == PRE_MARKET:
+                try:
+                    await self.refit_regime_model()
+                except Exception as e:
+                    logger.warning(f"Regime model refit failed: {e}")
+                try:
+                    await self.fit_factor_model()
+                except Exception as e:
+                    logger.warning(f"Factor model fit failed: {e}")
+            try:
+                await self.run_once(reason)
+            except Exception as e:
+                logger.error(f"Warm-up ({reason}) pass failed: {e}")
+            last_run = when
+
+
+async def main(once: bool = False):
+    """Run one pre-market pass or the forever loop, flushing buffered history rows on exit."""
+    from backend.db.analysis_history import close_history_writer
+
+    scheduler = WarmupScheduler()
+    try:
+        if once:
+            await scheduler.run_once()
+        else:
+            await scheduler.run_forever()
+    finally:
+        await close_history_writer()
+
 
 if __name__ == "__main__":
-    asyncio.run(run_full_cycle())
+    parser = argparse.ArgumentParser(description="Pre-market and bar-close cache warm-up")
+    parser.add_argument("--once", action="store_true", help="run a single pre-market pass and exit")
+    args = parser.parse_args()
+    asyncio.run(main(once=args.once))
@@ -4,6 +4,7 @@ from backend.core.orchestrator import SystemOrchestrator
 from backend.utils.system_monitor import SystemMonitor
 # Assuming redis_client is the cache client needed by Orchestrator
 from backend.utils.cache_utils import get_redis_client
+from backend.db.analysis_history import get_history_writer
 from backend.config.settings import settings
 from backend.config.logging_config import setup_logging
 from loguru import logger
@@ -22,7 +23,9 @@ async def initialize_system():
         # Initialize core components first
         system_monitor = SystemMonitor()
         # Instantiate Orchestrator, passing dependencies
-        orchestrator = SystemOrchestrator(cache_client=await get_redis_client())
+        orchestrator = SystemOrchestrator(
+            cache_client=await get_redis_client(), history_writer=get_history_writer()
+        )
 
         # Register components first, setting them to initializing
         await register_components(system_monitor) # Registers orchestrator, redis, api, cache
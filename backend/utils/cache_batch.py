@@ -0,0 +1,156 @@
+"""Run-scoped batching of Redis reads and writes.
+
+A full analysis touches one cache key per agent. Instead of a GET and a SET
+round trip for every agent, the orchestrator opens a ``cache_batch`` for the
+run, prefetches every key it expects to need with a single ``MGET`` and lets
+the agent decorator stage its writes, which are flushed in one pipeline when
+the batch closes.
+
+The active batch lives in a ``ContextVar`` so concurrent analyses (separate
+asyncio tasks) never see each other's batch. Code running outside a batch
+behaves exactly as before. ``invalidate`` marks keys as misses up front, so a
+refreshing run recomputes those agents instead of serving their cached results.
+``shared`` memoises upstream fetches for the run, so agents that need the same
+data (one symbol's OHLCV, say) await a single request.
+"""
+
+import asyncio
+import inspect
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+_current_batch: ContextVar[Optional["CacheBatch"]] = ContextVar("cache_batch", default=None)
+
+# Sentinel distinguishing "prefetched, key absent" from "not prefetched"
+_MISSING = object()
+
+
+async def _resolve(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+class CacheBatch:
+    """Prefetched reads and staged writes for one analysis run."""
+
+    def __init__(self, client):
+        self.client = client
+        self._prefetched: Dict[str, Any] = {}
+        self._pending: Dict[str, Tuple[Any, Optional[int]]] = {}
+        self._shared: Dict[Hashable, "asyncio.Future"] = {}
+        self.round_trips = 0
+
+    async def prefetch(self, keys: Iterable[str]) -> bool:
+        """Fetch ``keys`` with one ``MGET``.
+
+        Returns False (and records nothing) when the client does not support
+        ``MGET``; callers then fall back to per-key lookups.
+        """
+        keys = [key for key in dict.fromkeys(keys) if key not in self._prefetched]
+        if not keys:
+            return True
+        mget = getattr(self.client, "mget", None)
+        if mget is None:
+            return False
+        try:
+            values = await _resolve(mget(keys))
+        except Exception as e:
+            logger.warning(f"Cache batch MGET of {len(keys)} keys failed: {e}")
+            return False
+        self.round_trips += 1
+        if not isinstance(values, (list, tuple)) or len(values) != len(keys):
+            logger.debug("Cache client returned an unexpected MGET reply; batch prefetch disabled")
+            return False
+        for key, value in zip(keys, values):
+            self._prefetched[key] = _MISSING if value is None else value
+        return True
+
+    def invalidate(self, keys: Iterable[str]):
+        """Treat ``keys`` as cache misses for this run, without a round trip.
+
+        Agents behind them recompute, and their fresh results are staged over
+        the stale ones when the batch is flushed.
+        """
+        for key in keys:
+            self._prefetched[key] = _MISSING
+
+    def shared(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> "asyncio.Future":
+        """Start ``factory()`` once per ``key`` for this run and hand every caller the same task."""
+        task = self._shared.get(key)
+        if task is None:
+            task = self._shared[key] = asyncio.ensure_future(factory())
+        return task
+
+    def is_prefetched(self, key: str) -> bool:
+        return key in self._pending or key in self._prefetched
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """Return the staged or prefetched raw value for ``key`` (None on a miss)."""
+        if key in self._pending:
+            return self._pending[key][0]
+        value = self._prefetched.get(key, _MISSING)
+        return None if value is _MISSING else value
+
+    def stage(self, key: str, value: Any, ex: Optional[int] = None):
+        """Queue a SET to be written when the batch is flushed."""
+        self._pending[key] = (value, ex)
+
+    @property
+    def pending_keys(self) -> List[str]:
+        return list(self._pending)
+
+    async def flush(self) -> int:
+        """Write all staged values in one pipeline. Returns the number of keys written."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        pipeline_factory = getattr(self.client, "pipeline", None)
+        pipe = None
+        if pipeline_factory is not None:
+            try:
+                pipe = pipeline_factory(transaction=False)
+            except Exception as e:
+                logger.debug(f"Cache client pipeline unavailable: {e}")
+            if inspect.isawaitable(pipe):
+                # Async-mocked or non-standard clients: pipeline() must be synchronous
+                if inspect.iscoroutine(pipe):
+                    pipe.close()
+                pipe = None
+
+        try:
+            if pipe is not None:
+                for key, (value, ex) in pending.items():
+                    pipe.set(key, value, ex=ex)
+                await _resolve(pipe.execute())
+                self.round_trips += 1
+            else:
+                for key, (value, ex) in pending.items():
+                    await _resolve(self.client.set(key, value, ex=ex))
+                    self.round_trips += 1
+        except Exception as e:
+            logger.error(f"Failed to flush {len(pending)} batched cache writes: {e}")
+            return 0
+        logger.debug(f"Flushed {len(pending)} batched cache writes")
+        return len(pending)
+
+
+def current_cache_batch() -> Optional[CacheBatch]:
+    """The batch opened by the current task, if any."""
+    return _current_batch.get()
+
+
+@asynccontextmanager
+async def cache_batch(client):
+    """Open a batch for the current task and flush its writes on exit."""
+    batch = CacheBatch(client)
+    token = _current_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _current_batch.reset(token)
+        await batch.flush()
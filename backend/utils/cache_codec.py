@@ -0,0 +1,349 @@
+"""Pluggable serialization codecs for cached payloads.
+
+Agent results and full analysis blobs are written to Redis through
+``encode_cache_value`` and read back through ``decode_cache_value``.
+
+Payloads written by the legacy ``json`` codec are plain, untagged JSON strings,
+byte-for-byte identical to what the cache held before codecs existed. Every
+other codec (and any compressed payload) is framed with a small header::
+
+    magic (3 bytes) | format version (1) | codec id (1) | compression id (1)
+
+Readers understand every codec and both framings, so a rollout is done by
+deploying readers first and then switching ``CACHE_CODEC`` on the writers.
+Decoded values are always plain JSON-compatible structures (dicts, lists,
+strings, numbers, None) regardless of the codec that produced them.
+"""
+
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+
+CACHE_CODEC_MAGIC = b"\x00ZC"
+CACHE_CODEC_VERSION = 1
+_HEADER_SIZE = len(CACHE_CODEC_MAGIC) + 3
+
+# msgpack extension type used for raw numpy arrays
+_MSGPACK_NDARRAY_EXT = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+_COMPRESSION_IDS = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+
+
+class CacheDecodeError(ValueError):
+    """Raised when a cached payload cannot be decoded."""
+
+
+def robust_json_serializer(obj):
+    """``default`` hook that makes numpy, pandas, pydantic and Decimal values JSON-safe."""
+    if isinstance(obj, (datetime, pd.Timestamp)):
+        return obj.isoformat()
+    if isinstance(obj, np.integer):
+        return int(obj)
+    # Handle np.floating first, then Python floats for NaN/Infinity
+    if isinstance(obj, np.floating):
+        if np.isnan(obj):
+            return None
+        if np.isinf(obj):
+            # Represent infinity as a string, as JSON standard doesn't support Infinity literal
+            return "Infinity" if obj > 0 else "-Infinity"
+        return float(obj)
+    if isinstance(obj, float): # Handle standard Python floats for NaN/Infinity
+        if np.isnan(obj): # Use np.isnan for Python floats too for consistency
+            return None
+        if np.isinf(obj): # Use np.isinf for Python floats too
+            return "Infinity" if obj > 0 else "-Infinity"
+        return obj # Return the float if it's a normal number
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, BaseModel): # Check for Pydantic models
+        try:
+            return obj.model_dump() # pydantic v2
+        except AttributeError:
+            return obj.dict() # pydantic v1
+    if isinstance(obj, Decimal): # Handle Decimal type
+        return float(obj)
+
+    # If it's a standard Python type that json.dumps can handle, return it directly.
+    # This check should come after specific type handlers like float for NaN/Inf.
+    if isinstance(obj, (dict, list, str, int, bool, type(None))):
+        return obj
+
+    # Last resort for any other unhandled type
+    try:
+        # It's generally safer to avoid str(obj) if it's not a known serializable structure,
+        # as str(obj) might not be a valid JSON component or could be misleading.
+        # However, if we must serialize, provide a clear indication of type.
+        logger.warning(f"robust_json_serializer: Attempting to convert unhandled type {type(obj)} to string. Value snippet: {str(obj)[:100]}")
+        return f"UNSERIALIZABLE_TYPE_{type(obj).__name__}:{str(obj)}"
+    except Exception as e:
+        logger.error(f"robust_json_serializer: Failed to convert object of type {type(obj)} to string: {e}")
+        # Raising TypeError here will be caught by the caller of json.dumps
+        raise TypeError(f"Object of type {type(obj).__name__} could not be converted to string for JSON serialization by robust_json_serializer")
+
+
+class CacheCodec:
+    """Base class for cache codecs. Subclasses turn objects into bytes and back."""
+
+    name: str = ""
+    codec_id: int = -1
+    # Legacy codecs write untagged payloads that pre-codec readers understand.
+    legacy: bool = False
+
+    def dumps(self, obj: Any, default: Callable[[Any], Any] = robust_json_serializer) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(CacheCodec):
+    """Standard-library JSON. Kept as the default for backwards compatibility."""
+
+    name = "json"
+    codec_id = 0
+    legacy = True
+
+    def dumps(self, obj: Any, default: Callable[[Any], Any] = robust_json_serializer) -> bytes:
+        return json.dumps(obj, default=default).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(CacheCodec):
+    """orjson with native numpy and datetime serialization."""
+
+    name = "orjson"
+    codec_id = 1
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        self._options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, default: Callable[[Any], Any] = robust_json_serializer) -> bytes:
+        return orjson.dumps(obj, default=default, option=self._options)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(CacheCodec):
+    """msgpack with numpy arrays packed as raw buffers."""
+
+    name = "msgpack"
+    codec_id = 2
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is not installed")
+
+    @staticmethod
+    def _pack_default(default: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        def _default(obj):
+            if isinstance(obj, np.ndarray) and obj.dtype.kind in "biuf":
+                array = np.ascontiguousarray(obj)
+                header = json.dumps([array.dtype.str, list(array.shape)]).encode("utf-8")
+                return msgpack.ExtType(
+                    _MSGPACK_NDARRAY_EXT,
+                    len(header).to_bytes(2, "big") + header + array.tobytes(),
+                )
+            if isinstance(obj, np.generic):
+                return obj.item()
+            if isinstance(obj, (datetime, date)):
+                return obj.isoformat()
+            return default(obj)
+
+        return _default
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes):
+        if code == _MSGPACK_NDARRAY_EXT:
+            header_len = int.from_bytes(data[:2], "big")
+            dtype, shape = json.loads(data[2:2 + header_len])
+            array = np.frombuffer(data[2 + header_len:], dtype=np.dtype(dtype)).reshape(shape)
+            # Decode to lists so callers see the same structure as the JSON codecs
+            return array.tolist()
+        return msgpack.ExtType(code, data)
+
+    def dumps(self, obj: Any, default: Callable[[Any], Any] = robust_json_serializer) -> bytes:
+        return msgpack.packb(obj, default=self._pack_default(default), use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+_CODEC_CLASSES = {cls.name: cls for cls in (JsonCodec, OrjsonCodec, MsgpackCodec)}
+_CODECS_BY_ID = {cls.codec_id: cls for cls in (JsonCodec, OrjsonCodec, MsgpackCodec)}
+_codec_instances: Dict[str, CacheCodec] = {}
+
+
+def available_codecs() -> Dict[str, bool]:
+    """Map of codec name to whether its backing library is importable."""
+    return {"json": True, "orjson": orjson is not None, "msgpack": msgpack is not None}
+
+
+def get_cache_codec(name: Optional[str] = None) -> CacheCodec:
+    """Return the codec named ``name`` (defaults to ``settings.cache.CODEC``).
+
+    Falls back to the JSON codec, with a warning, if the requested codec's
+    library is not installed.
+    """
+    if name is None:
+        name = _cache_settings().CODEC
+    name = (name or "json").lower()
+    if name in _codec_instances:
+        return _codec_instances[name]
+    codec_cls = _CODEC_CLASSES.get(name)
+    if codec_cls is None:
+        logger.warning(f"Unknown cache codec '{name}', falling back to json")
+        codec_cls = JsonCodec
+    try:
+        codec = codec_cls()
+    except ImportError as e:
+        logger.warning(f"Cache codec '{name}' unavailable ({e}), falling back to json")
+        codec = JsonCodec()
+    _codec_instances[name] = codec
+    return codec
+
+
+def _cache_settings():
+    from backend.config.settings import get_settings
+
+    return get_settings().cache
+
+
+def _compress(payload: bytes, compression: str, level: int) -> tuple:
+    if compression == "zstd":
+        if zstandard is not None:
+            return COMPRESSION_ZSTD, zstandard.ZstdCompressor(level=level).compress(payload)
+        # zstd not installed: zlib is always available and still a large win
+        compression = "zlib"
+    if compression == "zlib":
+        return COMPRESSION_ZLIB, zlib.compress(payload, min(max(level, 1), 9))
+    return COMPRESSION_NONE, payload
+
+
+def _decompress(payload: bytes, compression_id: int) -> bytes:
+    if compression_id == COMPRESSION_NONE:
+        return payload
+    if compression_id == COMPRESSION_ZLIB:
+        return zlib.decompress(payload)
+    if compression_id == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise CacheDecodeError("Payload is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise CacheDecodeError(f"Unknown compression id {compression_id}")
+
+
+def encode_cache_value(
+    obj: Any,
+    codec: Optional[Union[str, CacheCodec]] = None,
+    compression: Optional[str] = None,
+    compression_threshold: Optional[int] = None,
+    default: Callable[[Any], Any] = robust_json_serializer,
+) -> Union[str, bytes]:
+    """Serialize ``obj`` for the cache using the configured codec.
+
+    Returns a ``str`` for uncompressed legacy JSON (so existing readers keep
+    working) and framed ``bytes`` otherwise. Raises ``TypeError`` when the
+    object cannot be serialized.
+    """
+    cache_settings = _cache_settings()
+    if not isinstance(codec, CacheCodec):
+        codec = get_cache_codec(codec)
+    compression = (compression or cache_settings.COMPRESSION or "none").lower()
+    if compression_threshold is None:
+        compression_threshold = cache_settings.COMPRESSION_THRESHOLD
+
+    try:
+        payload = codec.dumps(obj, default=default)
+    except TypeError:
+        raise
+    except Exception as e:
+        # orjson/msgpack raise their own error types; normalize for callers
+        raise TypeError(f"{codec.name} codec failed to serialize payload: {e}") from e
+
+    compression_id = COMPRESSION_NONE
+    if compression != "none" and len(payload) >= compression_threshold:
+        compression_id, payload = _compress(payload, compression, cache_settings.COMPRESSION_LEVEL)
+
+    if codec.legacy and compression_id == COMPRESSION_NONE:
+        return payload.decode("utf-8")
+
+    header = CACHE_CODEC_MAGIC + bytes((CACHE_CODEC_VERSION, codec.codec_id, compression_id))
+    return header + payload
+
+
+def decode_cache_value(raw: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Decode a value previously produced by ``encode_cache_value``.
+
+    Accepts both tagged payloads and legacy untagged JSON (as ``str`` or
+    ``bytes``). Dicts and lists are returned as-is, since in-process clients
+    may hand back already-decoded values. Raises ``CacheDecodeError`` for
+    corrupt or unsupported payloads.
+    """
+    if isinstance(raw, (dict, list)):
+        return raw
+    if isinstance(raw, str):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise CacheDecodeError(f"Invalid legacy JSON payload: {e}") from e
+    if isinstance(raw, (bytearray, memoryview)):
+        raw = bytes(raw)
+    if not isinstance(raw, bytes):
+        raise CacheDecodeError(f"Unsupported cached value type {type(raw).__name__}")
+
+    if not raw.startswith(CACHE_CODEC_MAGIC):
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise CacheDecodeError(f"Invalid legacy JSON payload: {e}") from e
+
+    if len(raw) < _HEADER_SIZE:
+        raise CacheDecodeError("Truncated cache payload header")
+    version, codec_id, compression_id = raw[len(CACHE_CODEC_MAGIC):_HEADER_SIZE]
+    if version != CACHE_CODEC_VERSION:
+        raise CacheDecodeError(f"Unsupported cache payload version {version}")
+    codec_cls = _CODECS_BY_ID.get(codec_id)
+    if codec_cls is None:
+        raise CacheDecodeError(f"Unknown cache codec id {codec_id}")
+    codec = get_cache_codec(codec_cls.name)
+    if codec.codec_id != codec_id:
+        raise CacheDecodeError(f"Cache codec '{codec_cls.name}' is not installed on this host")
+
+    try:
+        return codec.loads(_decompress(raw[_HEADER_SIZE:], compression_id))
+    except CacheDecodeError:
+        raise
+    except Exception as e:
+        raise CacheDecodeError(f"Failed to decode {codec.name} payload: {e}") from e
@@ -1,21 +1,33 @@
-from unittest.mock import AsyncMock, MagicMock
+"""Shared Redis client.
+
+Every caller gets the same ``redis.asyncio`` client, backed by one
+``BlockingConnectionPool`` built from ``settings.REDIS_URL`` and
+``settings.redis``. The client is created lazily on first use.
+
+Under pytest (or when ``set_redis_client`` is called) an ``InMemoryRedis``
+stand-in is used instead, so tests never need a Redis server.
+
+Responses are not decoded: cached payloads may be binary (see
+``backend.utils.cache_codec``), so callers receive ``bytes``.
+"""
+
+import fnmatch
 import os
 import sys
-import inspect
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-# Create an AsyncMock instance for the Redis client
-_redis_client = AsyncMock()
+import redis.asyncio as aioredis
+from loguru import logger
+from redis.asyncio.client import Pipeline
+from redis.asyncio.connection import BlockingConnectionPool
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
-# Configure the mock methods with AsyncMock
-_redis_client.get = AsyncMock(return_value=None)
-_redis_client.set = AsyncMock(return_value=True)
-_redis_client.ping = AsyncMock(return_value=True)
-
-# Create a non-async mock for test environments
-_redis_client_sync = MagicMock()
-_redis_client_sync.get = MagicMock(return_value=None)
-_redis_client_sync.set = MagicMock(return_value=True)
-_redis_client_sync.ping = MagicMock(return_value=True)
+from backend.config.settings import get_settings
+from backend.monitoring.performance import record_redis_command, update_redis_pool_usage
 
 # Determine if we're running in a test environment - more comprehensive check
 _in_test_mode = any([
@@ -26,19 +38,244 @@ _in_test_mode = any([
     os.path.basename(sys.argv[0]).startswith('test_')  # Check if main script is a test
 ])
 
-# This function will always return a synchronous client - no awaiting needed
-def get_redis_client():
-    """
-    Returns a Redis client (mocked for testing).
-    In test mode: returns a synchronous mock to avoid 'coroutine not awaited' warnings.
-    In prod mode: returns the async mock that should be awaited.
+_redis_client = None
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """Blocking pool that publishes its occupancy as metrics."""
+
+    def _publish_usage(self):
+        in_use = len(getattr(self, "_in_use_connections", ()))
+        available = len(getattr(self, "_available_connections", ()))
+        update_redis_pool_usage(in_use, available, self.max_connections)
+
+    async def get_connection(self, command_name, *keys, **options):
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            self._publish_usage()
+
+    async def release(self, connection):
+        await super().release(connection)
+        self._publish_usage()
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline that records one latency sample per executed batch."""
+
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        error_type = None
+        try:
+            return await super().execute(raise_on_error=raise_on_error)
+        except Exception as e:
+            error_type = type(e).__name__
+            raise
+        finally:
+            record_redis_command("PIPELINE", time.perf_counter() - start, error_type)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """``redis.asyncio.Redis`` that records per-command latency."""
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        start = time.perf_counter()
+        error_type = None
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception as e:
+            error_type = type(e).__name__
+            raise
+        finally:
+            record_redis_command(command, time.perf_counter() - start, error_type)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def create_redis_client(url: Optional[str] = None) -> InstrumentedRedis:
+    """Build a pooled async client from settings. Most callers want ``get_redis_client``."""
+    settings = get_settings()
+    redis_settings = settings.redis
+    retry = None
+    if redis_settings.RETRY_ON_TIMEOUT and redis_settings.RETRY_ATTEMPTS > 0:
+        retry = Retry(ExponentialBackoff(cap=1.0, base=0.05), redis_settings.RETRY_ATTEMPTS)
+    pool = InstrumentedConnectionPool.from_url(
+        url or settings.REDIS_URL,
+        max_connections=redis_settings.MAX_CONNECTIONS,
+        timeout=redis_settings.POOL_TIMEOUT,
+        socket_timeout=redis_settings.SOCKET_TIMEOUT,
+        socket_connect_timeout=redis_settings.SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=redis_settings.HEALTH_CHECK_INTERVAL,
+        retry_on_timeout=redis_settings.RETRY_ON_TIMEOUT,
+        retry=retry,
+        retry_on_error=[RedisConnectionError, RedisTimeoutError] if retry else [],
+    )
+    return InstrumentedRedis.from_pool(pool)
+
+
+class _InMemoryPipeline:
+    """Buffers commands and runs them against an ``InMemoryRedis`` on execute."""
+
+    def __init__(self, client: "InMemoryRedis"):
+        self._client = client
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name):
+        if not hasattr(self._client, name):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self, raise_on_error: bool = True):
+        commands, self._commands = self._commands, []
+        results = []
+        for name, args, kwargs in commands:
+            try:
+                results.append(await getattr(self._client, name)(*args, **kwargs))
+            except Exception as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._commands = []
+
+
+class InMemoryRedis:
+    """Process-local stand-in for the subset of the Redis API the backend uses.
+
+    Values are stored and returned as ``bytes`` like a client created with
+    ``decode_responses=False``. Expiry is honoured lazily on access.
     """
-    # Always return a sync client to avoid any need for awaiting
-    return _redis_client_sync
-
-# If we're not in test mode, redefine as async function for production
-if not _in_test_mode:
-    async def get_redis_client():  # type: ignore
-        """Returns the Redis client instance for production."""
-        # In a real application, this would initialize and return a real Redis client
-        return _redis_client
+
+    def __init__(self):
+        self._data: Dict[str, bytes] = {}
+        self._expiry: Dict[str, float] = {}
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, (bytearray, memoryview)):
+            return bytes(value)
+        if isinstance(value, (str, int, float)):
+            return str(value).encode("utf-8")
+        raise TypeError(f"Invalid input of type: '{type(value).__name__}'. Convert to a bytes, string, int or float first.")
+
+    def _alive(self, key: str) -> bool:
+        deadline = self._expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._data[key] if self._alive(key) else None
+
+    async def mget(self, keys: Iterable[str], *args) -> List[Optional[bytes]]:
+        keys = list(keys) if not isinstance(keys, str) else [keys]
+        keys.extend(args)
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False, xx: bool = False, **kwargs) -> Optional[bool]:
+        exists = self._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self._data[key] = self._encode(value)
+        self._expiry.pop(key, None)
+        if ex is not None:
+            self._expiry[key] = time.monotonic() + ex
+        elif px is not None:
+            self._expiry[key] = time.monotonic() + px / 1000
+        return True
+
+    async def setex(self, key: str, time_seconds: int, value: Any) -> bool:
+        return await self.set(key, value, ex=time_seconds)
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expiry[key] = time.monotonic() + seconds
+        return True
+
+    async def ttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        deadline = self._expiry.get(key)
+        return -1 if deadline is None else max(int(deadline - time.monotonic()), 0)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        value = int(await self.get(key) or 0) + amount
+        self._data[key] = self._encode(value)
+        return value
+
+    async def keys(self, pattern: str = "*") -> List[bytes]:
+        return [key.encode("utf-8") for key in list(self._data) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    async def flushdb(self) -> bool:
+        self._data.clear()
+        self._expiry.clear()
+        return True
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> _InMemoryPipeline:
+        return _InMemoryPipeline(self)
+
+    async def aclose(self):
+        return None
+
+
+def set_redis_client(client) -> None:
+    """Replace the shared client (e.g. with ``InMemoryRedis()`` in tests). ``None`` resets it."""
+    global _redis_client
+    _redis_client = client
+
+
+async def get_redis_client():
+    """Return the shared Redis client, creating the pool on first use."""
+    global _redis_client
+    # Creation never awaits, so concurrent first calls cannot race
+    if _redis_client is None:
+        if _in_test_mode:
+            _redis_client = InMemoryRedis()
+        else:
+            _redis_client = create_redis_client()
+            logger.info(f"Created shared Redis client (max_connections={get_settings().redis.MAX_CONNECTIONS})")
+    return _redis_client
+
+
+async def close_redis_client() -> None:
+    """Close the shared client and its pool. Called on application shutdown."""
+    global _redis_client
+    client, _redis_client = _redis_client, None
+    if client is not None and hasattr(client, "aclose"):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing Redis client: {e}")
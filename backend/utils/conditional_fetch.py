@@ -0,0 +1,145 @@
+"""Conditional HTTP GETs backed by a per-URL validator cache.
+
+Scraped pages and news payloads are polled far more often than they change.
+``conditional_get`` remembers the ``ETag`` and ``Last-Modified`` validators of
+each response together with the *parsed* result. The next request for the same
+URL is sent with ``If-None-Match`` / ``If-Modified-Since``, and on
+``304 Not Modified`` the stored result is returned without downloading or
+parsing the body again.
+
+Entries live in Redis (see ``backend.utils.cache_utils``) so all workers share
+them. Parsed results therefore have to be serializable by the cache codec.
+Bytes and parse time saved are exported per domain as Prometheus metrics and
+summarised by ``conditional_fetch_stats()``.
+"""
+
+import hashlib
+import inspect
+import json
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from backend.config.settings import get_settings
+from backend.monitoring.performance import record_conditional_fetch
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
+from backend.utils.cache_utils import get_redis_client
+
+# Per-domain totals since process start, for diagnostics
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+@dataclass
+class ConditionalResponse:
+    """Result of ``conditional_get``. ``response`` is the raw HTTP response."""
+
+    status_code: int
+    value: Any
+    not_modified: bool
+    response: Any
+
+
+def validator_cache_key(url: str, params: Optional[Dict[str, Any]] = None, variant: str = "") -> str:
+    """Cache key for a URL, its query parameters and the parse ``variant``."""
+    canonical = json.dumps([url, sorted((params or {}).items()), variant], default=str)
+    return f"http_validators:{hashlib.sha1(canonical.encode('utf-8')).hexdigest()}"
+
+
+def _header(response, name: str) -> Optional[str]:
+    headers = getattr(response, "headers", None)
+    value = headers.get(name) if isinstance(headers, Mapping) else None
+    return value if isinstance(value, str) else None
+
+
+def _body_size(response) -> int:
+    content = getattr(response, "content", None)
+    return len(content) if isinstance(content, (bytes, bytearray)) else 0
+
+
+def _update_stats(domain: str, outcome: str, bytes_saved: int = 0, parse_seconds_saved: float = 0.0):
+    stats = _stats.setdefault(domain, {"requests": 0, "not_modified": 0, "bytes_saved": 0, "parse_seconds_saved": 0.0})
+    stats["requests"] += 1
+    if outcome == "not_modified":
+        stats["not_modified"] += 1
+    stats["bytes_saved"] += bytes_saved
+    stats["parse_seconds_saved"] += parse_seconds_saved
+    record_conditional_fetch(domain, outcome, bytes_saved, parse_seconds_saved)
+
+
+def conditional_fetch_stats() -> Dict[str, Dict[str, float]]:
+    """Per-domain requests, 304s, bytes saved and parse seconds saved in this process."""
+    return {domain: dict(stats) for domain, stats in _stats.items()}
+
+
+async def _load_entry(cache_key: str) -> Optional[Dict[str, Any]]:
+    try:
+        raw = await (await get_redis_client()).get(cache_key)
+        return decode_cache_value(raw) if raw is not None else None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable validator entry {cache_key}: {e}")
+        return None
+
+
+async def _store_entry(cache_key: str, entry: Dict[str, Any]):
+    try:
+        ttl = get_settings().data_provider.CONDITIONAL_FETCH_TTL
+        await (await get_redis_client()).set(cache_key, encode_cache_value(entry), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Could not store validator entry {cache_key}: {e}")
+
+
+async def conditional_get(
+    client,
+    url: str,
+    parse: Callable[[Any], Any],
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    variant: str = "",
+) -> ConditionalResponse:
+    """GET ``url`` with ``client``, reusing the stored parse result on 304.
+
+    ``parse`` receives the response and may be sync or async. It is only called
+    when a body was downloaded. ``variant`` distinguishes different parses of
+    the same URL (e.g. price vs volume extraction).
+    """
+    domain = urlparse(url).hostname or "unknown"
+    enabled = get_settings().data_provider.CONDITIONAL_FETCH_ENABLED
+    cache_key = validator_cache_key(url, params, variant)
+    entry = await _load_entry(cache_key) if enabled else None
+
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = await client.get(url, params=params, headers=request_headers or None)
+
+    if response.status_code == 304 and entry:
+        _update_stats(domain, "not_modified", entry.get("size", 0), entry.get("parse_seconds", 0.0))
+        return ConditionalResponse(304, entry.get("value"), True, response)
+
+    start = time.perf_counter()
+    value = parse(response)
+    if inspect.isawaitable(value):
+        value = await value
+    parse_seconds = time.perf_counter() - start
+
+    etag, last_modified = _header(response, "ETag"), _header(response, "Last-Modified")
+    if enabled and response.status_code == 200 and (etag or last_modified):
+        await _store_entry(cache_key, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "value": value,
+            "size": _body_size(response),
+            "parse_seconds": parse_seconds,
+        })
+        _update_stats(domain, "modified")
+    else:
+        _update_stats(domain, "uncacheable")
+    return ConditionalResponse(response.status_code, value, False, response)
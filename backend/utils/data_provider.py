@@ -2,6 +2,10 @@ import asyncio
 import aiohttp
 import logging
 from backend.data.providers.unified_provider import UnifiedDataProvider
+from backend.data.fundamentals import get_fundamentals_snapshot
+from backend.utils.price_frame import PriceFrame
+from backend.utils.price_panel import PricePanel
+from backend.utils.cache_batch import current_cache_batch
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -9,6 +13,24 @@ logging.basicConfig(level=logging.INFO) # Or use logging.DEBUG for more verbose
 logger = logging.getLogger(__name__)
 
 provider = UnifiedDataProvider()
+MAX_HISTORY_START = "1970-01-01"  # Start date requested for period="max"
+TECHNICAL_LOOKBACK_DAYS = 365  # Window fetched once per run for all technical agents
+
+async def fetch_fundamentals_snapshot(symbol: str, force_refresh: bool = False):
+    """
+    Fetch the shared fundamentals snapshot for a given symbol.
+
+    The snapshot is fetched at most once per symbol per day and cached in Redis;
+    the EPS, book value, sales, FCF, EV/EBITDA and company-info helpers below all read from it.
+
+    Args:
+        symbol: Ticker symbol to fetch fundamentals for.
+        force_refresh: Bypass the cached snapshot.
+
+    Returns:
+        FundamentalsSnapshot for the symbol.
+    """
+    return await get_fundamentals_snapshot(symbol, provider, force_refresh=force_refresh)
 
 async def fetch_esg_data(symbol: str):
     """
@@ -48,6 +70,9 @@ async def fetch_alpha_vantage(symbol: str, data_type: str = "price"):
     Returns:
         Dictionary with Alpha Vantage data.
     """
+    if data_type == "overview":
+        snapshot = await fetch_fundamentals_snapshot(symbol)
+        return snapshot.to_overview()
     return await provider._fetch_alpha_vantage(symbol, data_type)
 
 async def fetch_latest_bvps(symbol: str):
@@ -60,7 +85,8 @@ async def fetch_latest_bvps(symbol: str):
     Returns:
         Dictionary with BVPS data.
     """
-    return await provider.fetch_company_info(symbol)
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {**snapshot.to_overview(), "bookValuePerShare": snapshot.book_value_per_share}
 
 async def fetch_eps_data(symbol: str):
     """
@@ -72,7 +98,8 @@ async def fetch_eps_data(symbol: str):
     Returns:
         Dictionary with EPS data.
     """
-    return await provider.fetch_company_info(symbol)
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return snapshot.to_overview()
 
 async def fetch_ohlcv_series(symbol: str, start_date: str, end_date: str, interval: str = "1d"):
     """
@@ -89,6 +116,31 @@ async def fetch_ohlcv_series(symbol: str, start_date: str, end_date: str, interv
     """
     return await provider.fetch_price_data(symbol, start_date, end_date, interval)
 
+async def fetch_technical_ohlcv(symbol: str):
+    """
+    Fetch the daily OHLCV window shared by the technical agents.
+
+    Inside an analysis run (an open cache batch) the window is fetched once per
+    symbol and every agent reads the same frame, so their ``get_indicators``
+    calls share one ``IndicatorSet``. Outside a run it is a plain fetch.
+
+    Args:
+        symbol: Ticker symbol to fetch OHLCV data for.
+
+    Returns:
+        DataFrame with the last ``TECHNICAL_LOOKBACK_DAYS`` of daily OHLCV data.
+    """
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=TECHNICAL_LOOKBACK_DAYS)
+
+    def fetch():
+        return fetch_ohlcv_series(symbol, start_date=start_date, end_date=end_date)
+
+    batch = current_cache_batch()
+    if batch is None:
+        return await fetch()
+    return await batch.shared(("technical_ohlcv", symbol, end_date), fetch)
+
 async def fetch_price_point(symbol: str):
     """
     Fetch the latest price point for a given symbol.
@@ -108,7 +160,8 @@ async def fetch_price_series(symbol: str, source_preference: list = None, period
     Args:
         symbol: Ticker symbol to fetch data for.
         source_preference: List of preferred data sources (e.g., ["api", "scrape"]).
-        period: Time period for the price series (e.g., "1y" for one year).
+        period: Time period for the price series (e.g., "1y" for one year, or
+            "max" for all available history).
 
     Returns:
         DataFrame with price series data.
@@ -122,7 +175,9 @@ async def fetch_price_series(symbol: str, source_preference: list = None, period
     end_date = datetime.now().strftime("%Y-%m-%d")
     
     # Calculate start_date based on period
-    if period.endswith('y'):
+    if period == "max":
+        start_date = MAX_HISTORY_START
+    elif period.endswith('y'):
         years = int(period[:-1])
         start_date = (datetime.now() - timedelta(days=years*365)).strftime("%Y-%m-%d")
     elif period.endswith('m'):
@@ -164,6 +219,53 @@ async def fetch_price_series(symbol: str, source_preference: list = None, period
     logger.error(f"Failed to fetch price series for {symbol} from all sources: {source_preference}")
     raise ValueError(f"Failed to fetch price series for {symbol} from all sources.")
 
+async def fetch_price_frame(symbol: str, source_preference: list = None, period: str = "1y") -> PriceFrame:
+    """
+    Fetch price history for a given symbol as a canonical PriceFrame.
+
+    Agents should prefer this over fetch_price_series: the frame exposes close,
+    returns and log returns as read-only float64 arrays, so no per-agent
+    conversion is needed.
+
+    Args:
+        symbol: Ticker symbol to fetch data for.
+        source_preference: List of preferred data sources (e.g., ["api", "scrape"]).
+        period: Time period for the price series (e.g., "1y" for one year).
+
+    Returns:
+        PriceFrame with the symbol's price history.
+    """
+    return PriceFrame.from_any(await fetch_price_series(symbol, source_preference, period))
+
+async def fetch_price_panel(symbols: list, source_preference: list = None, period: str = "1y",
+                            concurrency: int = 16) -> PricePanel:
+    """
+    Fetch price history for many symbols concurrently as a date-aligned PricePanel.
+
+    Symbols whose history cannot be fetched are logged and left out of the panel.
+
+    Args:
+        symbols: Ticker symbols to fetch.
+        source_preference: List of preferred data sources (e.g., ["api", "scrape"]).
+        period: Time period for each price series (e.g., "1y" for one year).
+        concurrency: Maximum number of fetches in flight at once.
+
+    Returns:
+        PricePanel with one row per successfully fetched symbol.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(symbol):
+        async with semaphore:
+            try:
+                return symbol, await fetch_price_frame(symbol, source_preference, period)
+            except Exception as e:
+                logger.warning(f"Skipping {symbol} in price panel: {e}")
+                return symbol, None
+
+    fetched = await asyncio.gather(*(fetch(symbol) for symbol in dict.fromkeys(symbols)))
+    return PricePanel.from_frames({symbol: frame for symbol, frame in fetched if frame is not None})
+
 async def fetch_book_value(symbol: str):
     """
     Fetch the book value for a given symbol.
@@ -174,7 +276,8 @@ async def fetch_book_value(symbol: str):
     Returns:
         Dictionary with book value data.
     """
-    return await provider.fetch_company_info(symbol, "book_value")
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {"book_value": snapshot.book_value_per_share}
 
 async def fetch_latest_eps(symbol: str):
     """
@@ -186,7 +289,8 @@ async def fetch_latest_eps(symbol: str):
     Returns:
         Dictionary with EPS data.
     """
-    return await provider.fetch_company_info(symbol, "eps")
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {"eps": snapshot.eps}
 
 async def fetch_iex(symbol: str):
     """
@@ -210,7 +314,8 @@ async def fetch_sales_per_share(symbol: str):
     Returns:
         Dictionary with sales per share data.
     """
-    return await provider.fetch_company_info(symbol, "sales_per_share")
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {"sales_per_share": snapshot.sales_per_share}
 
 async def fetch_fcf_per_share(symbol: str):
     """
@@ -222,7 +327,8 @@ async def fetch_fcf_per_share(symbol: str):
     Returns:
         Dictionary with FCF per share data.
     """
-    return await provider.fetch_company_info(symbol, "fcf_per_share")
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {"fcf_per_share": snapshot.fcf_per_share}
 
 # --- Added missing fetch functions ---
 
@@ -334,8 +440,8 @@ async def fetch_company_info(symbol: str, data_type: str = None):
     Returns:
         Dictionary with company information.
     """
-    # UnifiedDataProvider handles fetching specific parts if data_type is provided
-    return await provider.fetch_company_info(symbol)
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return snapshot.to_overview()
 
 async def fetch_cash_flow_data(symbol: str):
     """
@@ -392,7 +498,8 @@ async def fetch_eps(symbol: str):
     Returns:
         Dictionary with EPS data.
     """
-    return await provider.fetch_company_info(symbol, "eps")
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {"eps": snapshot.eps}
 
 async def fetch_latest_ev(symbol: str):
     """
@@ -404,7 +511,8 @@ async def fetch_latest_ev(symbol: str):
     Returns:
         Dictionary with EV data.
     """
-    return await provider.fetch_company_info(symbol, "enterprise_value")
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {"enterprise_value": snapshot.enterprise_value}
 
 async def fetch_price_tickertape(symbol: str):
     """
@@ -428,7 +536,8 @@ async def fetch_latest_ebitda(symbol: str):
     Returns:
         Dictionary with EBITDA data.
     """
-    return await provider.fetch_company_info(symbol, "ebitda")
+    snapshot = await fetch_fundamentals_snapshot(symbol)
+    return {"ebitda": snapshot.ebitda}
 
 async def fetch_price_moneycontrol(symbol: str):
     """
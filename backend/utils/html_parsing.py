@@ -0,0 +1,123 @@
+"""Off-loop HTML parsing for the scraping fallbacks.
+
+Scraped finance pages run to several hundred KB, and parsing them with the
+pure-Python ``html.parser`` on the event loop stalls every other coroutine.
+``parse_off_loop`` parses in a worker thread with the fastest available parser
+and runs the caller's extractor there as well, so only the small extracted
+result crosses back to the loop.
+
+Parsers, fastest first: ``selectolax`` (lexbor), ``lxml`` (via BeautifulSoup)
+and the stdlib ``html.parser``. The compiled ones are optional; the choice can be
+pinned with ``settings.data_provider.HTML_PARSER``.
+
+Whatever the parser, extractors receive a document supporting ``select_one(css)``
+and ``select(css)``, whose nodes expose the same two methods plus ``.text``.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from bs4 import BeautifulSoup
+from loguru import logger
+
+from backend.config.settings import get_settings
+from backend.monitoring.performance import record_html_parse
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - depends on installed extras
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:  # pragma: no cover - depends on installed extras
+    _HAS_LXML = False
+
+_PARSER_PREFERENCE = ("selectolax", "lxml", "html.parser")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class _LexborNode:
+    """Adapts a selectolax node to the BeautifulSoup subset extractors use."""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def text(self) -> str:
+        return self._node.text(deep=True)
+
+    def select_one(self, css: str) -> Optional["_LexborNode"]:
+        node = self._node.css_first(css)
+        return _LexborNode(node) if node is not None else None
+
+    def select(self, css: str) -> List["_LexborNode"]:
+        return [_LexborNode(node) for node in self._node.css(css)]
+
+
+def available_parsers() -> List[str]:
+    """Parsers usable in this environment, fastest first."""
+    available = {"html.parser"}
+    if LexborHTMLParser is not None:
+        available.add("selectolax")
+    if _HAS_LXML:
+        available.add("lxml")
+    return [name for name in _PARSER_PREFERENCE if name in available]
+
+
+def resolve_parser(name: Optional[str] = None) -> str:
+    """Return ``name`` if usable, else the fastest available parser."""
+    name = (name or get_settings().data_provider.HTML_PARSER or "auto").lower()
+    available = available_parsers()
+    if name == "auto":
+        return available[0]
+    if name not in available:
+        logger.warning(f"HTML parser '{name}' unavailable, using '{available[0]}'")
+        return available[0]
+    return name
+
+
+def parse_html(html: str, parser: Optional[str] = None) -> Any:
+    """Parse ``html`` into a document supporting ``select_one``/``select``."""
+    parser = resolve_parser(parser)
+    if parser == "selectolax":
+        return _LexborNode(LexborHTMLParser(html))
+    return BeautifulSoup(html, parser)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = get_settings().data_provider.HTML_PARSE_WORKERS
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="html-parse")
+    return _executor
+
+
+def parse_and_extract(html: str, extractor: Callable[..., Any], *args, source: str = "unknown", parser: Optional[str] = None) -> Any:
+    """Parse ``html`` and return ``extractor(document, *args)``, recording timings."""
+    parser = resolve_parser(parser)
+    start = time.perf_counter()
+    document = parse_html(html, parser)
+    parsed = time.perf_counter()
+    try:
+        return extractor(document, *args)
+    finally:
+        record_html_parse(source, parser, parsed - start, time.perf_counter() - parsed, len(html))
+
+
+async def parse_off_loop(html: str, extractor: Callable[..., Any], *args, source: str = "unknown", parser: Optional[str] = None) -> Any:
+    """Run ``parse_and_extract`` in the parse thread pool and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(),
+        lambda: parse_and_extract(html, extractor, *args, source=source, parser=parser),
+    )
@@ -0,0 +1,194 @@
+"""Canonical price container handed to agents.
+
+Price history reaches agents as a DataFrame, a Series, a 1-D or OHLCV 2-D
+ndarray or a plain list, depending on the provider path. ``PriceFrame``
+normalises all of these once, at the data-provider boundary, into contiguous
+float64 numpy columns plus an optional datetime index.
+
+The columns are exposed as read-only views. Derived series (returns, log
+returns) are computed on first access and memoised, so agents can share a
+frame without copying or recomputing anything.
+"""
+
+from functools import cached_property
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Column names accepted as the close price, in order of preference
+_CLOSE_ALIASES = ("close", "adj close", "adj_close", "adjclose", "price")
+# Positional OHLCV layout assumed for 2-D arrays
+_ARRAY_LAYOUT = {"open": 0, "high": 1, "low": 2, "close": 3, "volume": 4}
+
+
+def _readonly(values) -> np.ndarray:
+    array = np.ascontiguousarray(values, dtype=np.float64).view()
+    array.flags.writeable = False
+    return array
+
+
+def _numeric(values) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype.kind in "fiu":
+        return values
+    return pd.to_numeric(pd.Series(values, copy=False), errors="coerce").to_numpy(dtype=np.float64)
+
+
+class PriceFrame:
+    """Immutable OHLCV price history with memoised derived series."""
+
+    def __init__(self, columns: Dict[str, Any], index: Optional[Iterable] = None):
+        if "close" not in columns:
+            raise ValueError("PriceFrame requires a close column")
+        close = _numeric(columns["close"])
+        valid = ~np.isnan(close)
+        keep = None if valid.all() else valid
+        self._columns = {}
+        for name, values in columns.items():
+            values = _numeric(values)
+            self._columns[name] = _readonly(values if keep is None else values[keep])
+        self._index = None
+        if index is not None:
+            stamps = pd.DatetimeIndex(index).to_numpy(dtype="datetime64[ns]")
+            self._index = stamps if keep is None else stamps[keep]
+            self._index.flags.writeable = False
+
+    @classmethod
+    def empty_frame(cls) -> "PriceFrame":
+        return cls({"close": np.empty(0)})
+
+    @classmethod
+    def from_any(cls, data: Any) -> "PriceFrame":
+        """Build a frame from any price shape a provider returns."""
+        if isinstance(data, PriceFrame):
+            return data
+        if data is None:
+            return cls.empty_frame()
+        if isinstance(data, pd.DataFrame):
+            return cls._from_dataframe(data)
+        if isinstance(data, pd.Series):
+            index = data.index if isinstance(data.index, pd.DatetimeIndex) else None
+            return cls({"close": data.to_numpy()}, index)
+        array = np.asarray(data)
+        if array.ndim == 2:
+            if array.shape[1] <= _ARRAY_LAYOUT["close"]:
+                raise ValueError(f"Cannot locate close column in array of shape {array.shape}")
+            return cls({name: array[:, i] for name, i in _ARRAY_LAYOUT.items() if i < array.shape[1]})
+        return cls({"close": array.reshape(-1)})
+
+    @classmethod
+    def _from_dataframe(cls, frame: pd.DataFrame) -> "PriceFrame":
+        lowered = {str(column).lower(): column for column in frame.columns}
+        close = next((lowered[alias] for alias in _CLOSE_ALIASES if alias in lowered), None)
+        if close is None:
+            numeric = frame.select_dtypes("number").columns
+            if len(numeric) != 1:
+                raise ValueError(f"Cannot locate close column among {list(frame.columns)}")
+            close = numeric[0]
+        columns = {"close": frame[close].to_numpy()}
+        for name in ("open", "high", "low", "volume"):
+            if name in lowered:
+                columns[name] = frame[lowered[name]].to_numpy()
+
+        index = None
+        if isinstance(frame.index, pd.DatetimeIndex):
+            index = frame.index
+        else:
+            date_column = next((lowered[c] for c in ("date", "timestamp", "datetime") if c in lowered), None)
+            if date_column is not None:
+                index = pd.to_datetime(frame[date_column])
+        return cls(columns, index)
+
+    def __len__(self) -> int:
+        return len(self._columns["close"])
+
+    def __repr__(self) -> str:
+        span = f"{self.index[0].date()}..{self.index[-1].date()}" if self.has_index and len(self) else "no index"
+        return f"PriceFrame({len(self)} rows, {', '.join(self._columns)}, {span})"
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def has_index(self) -> bool:
+        return self._index is not None
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        return self._columns.get(name)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._columns["close"]
+
+    @property
+    def open(self) -> Optional[np.ndarray]:
+        return self._columns.get("open")
+
+    @property
+    def high(self) -> Optional[np.ndarray]:
+        return self._columns.get("high")
+
+    @property
+    def low(self) -> Optional[np.ndarray]:
+        return self._columns.get("low")
+
+    @property
+    def volume(self) -> Optional[np.ndarray]:
+        return self._columns.get("volume")
+
+    @property
+    def last(self) -> Optional[float]:
+        return float(self.close[-1]) if len(self) else None
+
+    @cached_property
+    def index(self) -> Optional[pd.DatetimeIndex]:
+        return pd.DatetimeIndex(self._index) if self._index is not None else None
+
+    @cached_property
+    def returns(self) -> np.ndarray:
+        """Simple returns, one shorter than ``close``."""
+        close = self.close
+        if len(close) < 2:
+            return _readonly(np.empty(0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _readonly(close[1:] / close[:-1] - 1.0)
+
+    @cached_property
+    def log_returns(self) -> np.ndarray:
+        """Log returns, one shorter than ``close``."""
+        close = self.close
+        if len(close) < 2:
+            return _readonly(np.empty(0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _readonly(np.diff(np.log(close)))
+
+    def tail(self, n: int) -> "PriceFrame":
+        """Last ``n`` rows, sharing memory with this frame."""
+        start = max(len(self) - n, 0) if n > 0 else len(self)
+        view = object.__new__(PriceFrame)
+        view._columns = {name: values[start:] for name, values in self._columns.items()}
+        view._index = self._index[start:] if self._index is not None else None
+        return view
+
+    def aligned_returns(self, other: "PriceFrame") -> Tuple[np.ndarray, np.ndarray]:
+        """Simple returns of both frames on their common dates.
+
+        Frames without an index are aligned on their most recent rows.
+        """
+        if self._index is None or other._index is None:
+            n = min(len(self.returns), len(other.returns))
+            return self.returns[len(self.returns) - n:], other.returns[len(other.returns) - n:]
+        _, mine, theirs = np.intersect1d(self._index[1:], other._index[1:], assume_unique=True, return_indices=True)
+        return self.returns[mine], other.returns[theirs]
+
+    def to_series(self, column: str = "close") -> pd.Series:
+        """Wrap a column in a Series without copying it."""
+        return pd.Series(self._columns[column], index=self.index, name=column, copy=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(dict(self._columns), index=self.index)
@@ -0,0 +1,132 @@
+"""Date-aligned price history for many symbols.
+
+``PricePanel`` is the cross-sectional counterpart of ``PriceFrame``. It holds
+one float64 matrix per OHLCV column with shape ``(symbols, bars)``, so the
+kernels in ``backend.quant.indicators`` can run along the last axis and
+compute every symbol in one pass.
+
+Frames are aligned on the union of their dates. A symbol's bars before its
+first close stay NaN; this covers listings that start later than others.
+Later gaps, such as suspensions and missing rows, carry the previous price
+forward and record zero volume.
+"""
+
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.price_frame import PriceFrame
+
+_PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+def _forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Carry the last finite value forward along each row; leading NaNs stay."""
+    positions = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    return matrix[np.arange(matrix.shape[0])[:, None], positions]
+
+
+class PricePanel:
+    """Immutable ``(symbols, bars)`` OHLCV matrices on a shared date axis."""
+
+    def __init__(self, symbols: Iterable[str], columns: Dict[str, Any], index: Optional[Iterable] = None):
+        self.symbols: Tuple[str, ...] = tuple(symbols)
+        if "close" not in columns:
+            raise ValueError("PricePanel requires a close column")
+        self._columns = {}
+        for name, values in columns.items():
+            matrix = np.ascontiguousarray(values, dtype=np.float64)
+            if matrix.shape != (len(self.symbols), np.shape(columns["close"])[1]):
+                raise ValueError(f"Column '{name}' has shape {matrix.shape}, expected (symbols, bars)")
+            matrix.flags.writeable = False
+            self._columns[name] = matrix
+        self._index = None
+        if index is not None:
+            self._index = pd.DatetimeIndex(index).to_numpy(dtype="datetime64[ns]")
+            self._index.flags.writeable = False
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, Any]) -> "PricePanel":
+        """Align per-symbol histories (anything ``PriceFrame.from_any`` accepts) into a panel.
+
+        Frames without a datetime index are aligned on their most recent bars.
+        A column is kept only when every frame has it.
+        """
+        frames = {symbol: PriceFrame.from_any(data) for symbol, data in frames.items()}
+        frames = {symbol: frame for symbol, frame in frames.items() if len(frame)}
+        symbols = list(frames)
+        if not symbols:
+            return cls([], {"close": np.empty((0, 0))})
+        names = [name for name in (*_PRICE_COLUMNS, "volume")
+                 if all(frame.column(name) is not None for frame in frames.values())]
+
+        if all(frame.has_index for frame in frames.values()):
+            index = np.unique(np.concatenate([frame._index for frame in frames.values()]))
+            placement = {symbol: np.searchsorted(index, frame._index) for symbol, frame in frames.items()}
+        else:
+            index = None
+            bars = max(len(frame) for frame in frames.values())
+            placement = {symbol: np.arange(bars - len(frame), bars) for symbol, frame in frames.items()}
+        bars = len(index) if index is not None else max(len(frame) for frame in frames.values())
+
+        columns = {}
+        for name in names:
+            matrix = np.full((len(symbols), bars), np.nan)
+            for row, symbol in enumerate(symbols):
+                matrix[row, placement[symbol]] = frames[symbol].column(name)
+            columns[name] = matrix
+        listed = ~np.logical_and.accumulate(np.isnan(columns["close"]), axis=1)
+        for name in names:
+            if name == "volume":
+                columns[name] = np.where(listed & np.isnan(columns[name]), 0.0, columns[name])
+            else:
+                columns[name] = _forward_fill(columns[name])
+        return cls(symbols, columns, index)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __repr__(self) -> str:
+        return f"PricePanel({len(self)} symbols x {self.bars} bars, {', '.join(self._columns)})"
+
+    @property
+    def bars(self) -> int:
+        return self._columns["close"].shape[1]
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        return self._columns.get(name)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._columns["close"]
+
+    @property
+    def high(self) -> Optional[np.ndarray]:
+        return self._columns.get("high")
+
+    @property
+    def low(self) -> Optional[np.ndarray]:
+        return self._columns.get("low")
+
+    @property
+    def volume(self) -> Optional[np.ndarray]:
+        return self._columns.get("volume")
+
+    @property
+    def index(self) -> Optional[pd.DatetimeIndex]:
+        return pd.DatetimeIndex(self._index) if self._index is not None else None
+
+    def row(self, symbol: str) -> int:
+        return self._rows[symbol]
+
+    def frame(self, symbol: str) -> PriceFrame:
+        """One symbol's history as a ``PriceFrame`` (bars before its listing dropped)."""
+        row = self._rows[symbol]
+        return PriceFrame({name: values[row] for name, values in self._columns.items()}, self._index)
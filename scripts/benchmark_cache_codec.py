@@ -0,0 +1,140 @@
+"""Benchmark cache codecs on analysis-sized payloads.
+
+Compares encode/decode time and stored size for every available codec and
+compression mode. Pass ``--payload`` with a JSON dump of a real
+``SystemOrchestrator.analyze_symbol`` response to benchmark production data;
+otherwise a payload with the same shape (a category of agent results per CategoryType with
+numpy-typed values, nested details and execution metrics) is generated.
+
+With ``--redis-url`` the payloads are also written to Redis and
+``MEMORY USAGE`` is reported per key.
+
+    python scripts/benchmark_cache_codec.py --iterations 500
+    python scripts/benchmark_cache_codec.py --payload analysis.json --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.utils.cache_codec import (  # noqa: E402
+    available_codecs,
+    decode_cache_value,
+    encode_cache_value,
+    get_cache_codec,
+)
+
+
+def build_analysis_payload(agents_per_category: int = 8, history: int = 250) -> dict:
+    """Build a payload shaped like a full SystemOrchestrator analysis result."""
+    rng = np.random.default_rng(7)
+    categories = [
+        "valuation", "technical", "market", "sentiment", "risk", "macro",
+        "event", "esg", "intelligence", "stealth", "automation",
+    ]
+    category_results = {}
+    for category in categories:
+        results = []
+        for i in range(agents_per_category):
+            results.append({
+                "symbol": "RELIANCE.NS",
+                "agent_name": f"{category}_agent_{i}",
+                "verdict": "BUY",
+                "confidence": np.float64(rng.random()),
+                "value": np.float64(rng.normal(100, 10)),
+                "details": {
+                    "window": np.int64(14),
+                    "series_tail": rng.normal(size=20).round(4),
+                    "percentiles": {str(p): np.float64(v) for p, v in zip((5, 25, 50, 75, 95), rng.random(5))},
+                    "signals": [{"date": datetime(2024, 1, d + 1).isoformat(), "strength": float(rng.random())} for d in range(5)],
+                },
+                "error": None,
+            })
+        category_results[category] = {"results": results, "error": None, "count": len(results)}
+
+    return {
+        "symbol": "RELIANCE.NS",
+        "analysis_id": "RELIANCE.NS_1700000000.0",
+        "verdict": {"verdict": "BUY", "confidence": 0.61, "details": {"contributing_categories": {c: 0.5 for c in categories}}},
+        "category_results": category_results,
+        "system_health": {"system": {"cpu_usage": 12.5, "memory_usage": 41.0}, "components": {}},
+        "execution_metrics": {
+            "response_times": rng.random(history).tolist(),
+            "category_executions": {c: {"count": 10, "errors": 0, "avg_size": 8.0} for c in categories},
+        },
+    }
+
+
+def time_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6  # microseconds
+
+
+async def redis_memory_usage(redis_url: str, encoded: dict) -> dict:
+    import redis.asyncio as aioredis
+
+    client = aioredis.from_url(redis_url)
+    usage = {}
+    try:
+        for label, value in encoded.items():
+            key = f"bench:cache_codec:{label}"
+            await client.set(key, value, ex=60)
+            usage[label] = await client.memory_usage(key)
+            await client.delete(key)
+    finally:
+        await client.aclose()
+    return usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payload", help="Path to a JSON dump of a real analysis result")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--redis-url", help="Optional Redis URL for MEMORY USAGE measurements")
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload) as f:
+            payload = json.load(f)
+    else:
+        payload = build_analysis_payload()
+
+    rows = []
+    encoded_values = {}
+    for codec_name, installed in available_codecs().items():
+        if not installed:
+            print(f"skipping {codec_name}: not installed")
+            continue
+        codec = get_cache_codec(codec_name)
+        for compression in ("none", "zlib", "zstd"):
+            label = f"{codec_name}+{compression}"
+            encode = lambda: encode_cache_value(payload, codec=codec, compression=compression, compression_threshold=0)
+            value = encode()
+            encoded_values[label] = value
+            encode_us = time_call(encode, args.iterations)
+            decode_us = time_call(lambda: decode_cache_value(value), args.iterations)
+            size = len(value.encode("utf-8") if isinstance(value, str) else value)
+            rows.append((label, encode_us, decode_us, size))
+
+    memory = {}
+    if args.redis_url:
+        memory = asyncio.run(redis_memory_usage(args.redis_url, encoded_values))
+
+    print(f"{'codec':<20}{'encode us':>12}{'decode us':>12}{'bytes':>10}{'redis bytes':>14}")
+    for label, encode_us, decode_us, size in rows:
+        redis_bytes = memory.get(label, "-")
+        print(f"{label:<20}{encode_us:>12.1f}{decode_us:>12.1f}{size:>10}{redis_bytes:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark HTML parsing for the scraping fallback, per site and parser.
+
+For each site handled by ``UnifiedDataProvider._extract_data`` this reports
+parse and extraction time for every available parser (selectolax, lxml,
+html.parser), then how long the event loop stalls when a burst of pages is
+parsed inline versus through ``parse_off_loop``.
+
+Pass ``--html-dir`` with saved pages named ``<site>.html`` (yahoo, marketwatch,
+investing, google) to benchmark real markup; otherwise pages of a realistic size
+are generated with the elements the extractors look for buried in filler.
+
+    python scripts/benchmark_html_parsing.py --iterations 20
+    python scripts/benchmark_html_parsing.py --html-dir saved_pages/ --burst 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.data.providers.unified_provider import UnifiedDataProvider  # noqa: E402
+from backend.utils.html_parsing import (  # noqa: E402
+    available_parsers,
+    parse_and_extract,
+    parse_html,
+    parse_off_loop,
+)
+
+SITE_MARKUP = {
+    "yahoo": '<fin-streamer data-test="qsp-price">2,456.30</fin-streamer>'
+             '<td data-test="TD_VOLUME-value">5,123,456</td>'
+             '<td data-test="MARKET_CAP-value">16.62T</td>',
+    "marketwatch": '<h2 class="intraday__price"><bg-quote class="value">2,456.30</bg-quote></h2>'
+                   '<span class="volume__value">5.12M</span>',
+    "investing": '<div class="instrument-price_last__KQzyA">2,456.30</div>'
+                 "<dd data-test='volume'>5.12M</dd>",
+    "google": '<div class="YMlKec fxKbKc">2,456.30</div>'
+              "<div data-metric='Market cap'><div class=\"P6K39c\">16.62T INR</div></div>",
+}
+DATA_TYPES = {"yahoo": "price", "marketwatch": "price", "investing": "price", "google": "price"}
+
+
+def build_page(site: str, size_kb: int) -> str:
+    """A page of roughly ``size_kb`` KB with the site's target elements near the end."""
+    row = (
+        '<div class="row"><span class="label">Metric</span>'
+        '<span class="val" data-x="1">123.45</span><a href="/q?s=X">link</a></div>\n'
+    )
+    filler = row * max(1, (size_kb * 1024) // len(row))
+    scripts = "<script>var cfg = {" + ",".join(f'"k{i}": {i}' for i in range(500)) + "};</script>"
+    return (
+        f"<!DOCTYPE html><html><head><title>{site}</title>{scripts}</head>"
+        f"<body><nav>{row * 50}</nav><main>{filler}{SITE_MARKUP[site]}</main></body></html>"
+    )
+
+
+def load_pages(html_dir: str, size_kb: int) -> dict:
+    pages = {}
+    for site in SITE_MARKUP:
+        path = os.path.join(html_dir, f"{site}.html") if html_dir else None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages[site] = f.read()
+        else:
+            pages[site] = build_page(site, size_kb)
+    return pages
+
+
+def time_site(provider: UnifiedDataProvider, site: str, html: str, parser: str, iterations: int):
+    extract = lambda soup: provider._extract_data(site, soup, DATA_TYPES[site])
+    parse_total = extract_total = 0.0
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        document = parse_html(html, parser)
+        parsed = time.perf_counter()
+        result = extract(document)
+        parse_total += parsed - start
+        extract_total += time.perf_counter() - parsed
+    return parse_total / iterations * 1e3, extract_total / iterations * 1e3, result
+
+
+async def measure_loop_stall(provider: UnifiedDataProvider, pages: dict, burst: int, off_loop: bool) -> float:
+    """Largest gap (ms) between ticks of a 1 ms heartbeat while ``burst`` pages are parsed."""
+    max_gap = 0.0
+    done = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal max_gap
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            max_gap = max(max_gap, now - last)
+            last = now
+
+    async def parse_one(site: str, html: str):
+        extract = lambda soup: provider._extract_data(site, soup, DATA_TYPES[site])
+        if off_loop:
+            return await parse_off_loop(html, extract, source=site)
+        await asyncio.sleep(0)
+        return parse_and_extract(html, extract, source=site, parser="html.parser")
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    items = list(pages.items())
+    await asyncio.gather(*(parse_one(*items[i % len(items)]) for i in range(burst)))
+    done.set()
+    await ticker
+    return max_gap * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--html-dir", help="Directory with saved <site>.html pages")
+    parser.add_argument("--size-kb", type=int, default=400, help="Size of generated pages")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--burst", type=int, default=8, help="Pages parsed concurrently in the stall test")
+    args = parser.parse_args()
+
+    provider = UnifiedDataProvider()
+    pages = load_pages(args.html_dir, args.size_kb)
+    parsers = available_parsers()
+    print(f"parsers available: {', '.join(parsers)}")
+
+    print(f"{'site':<14}{'parser':<14}{'KB':>8}{'parse ms':>12}{'extract ms':>12}  result")
+    for site, html in pages.items():
+        for name in parsers:
+            parse_ms, extract_ms, result = time_site(provider, site, html, name, args.iterations)
+            print(f"{site:<14}{name:<14}{len(html) / 1024:>8.0f}{parse_ms:>12.2f}{extract_ms:>12.3f}  {result}")
+
+    inline = asyncio.run(measure_loop_stall(provider, pages, args.burst, off_loop=False))
+    off_loop = asyncio.run(measure_loop_stall(provider, pages, args.burst, off_loop=True))
+    print(f"\nmax event-loop stall for {args.burst} pages: inline html.parser {inline:.1f} ms, "
+          f"parse_off_loop ({parsers[0]}) {off_loop:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
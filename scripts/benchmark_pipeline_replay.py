@@ -0,0 +1,126 @@
+"""Benchmark the agent pipeline offline against recorded provider responses.
+
+The shared ``data_provider.provider`` is swapped for a ``ReplayDataProvider``,
+so every agent reads fixtures from disk instead of yfinance, Alpha Vantage or
+the scraped sites. The script then reports throughput and per-symbol latency
+for ``SystemOrchestrator.analyze_symbol``. Agents that issue their own HTTP
+requests (stealth scrapers, news sentiment) bypass the provider and are not
+replayed.
+
+Record real fixtures first by running the app with ``RECORD_FIXTURES=true``.
+Alternatively, pass ``--synthesize`` to write geometric-Brownian-motion price
+histories and a minimal company overview for each symbol.
+
+    python scripts/benchmark_pipeline_replay.py --synthesize --symbols 20
+    python scripts/benchmark_pipeline_replay.py --fixture-dir data/replay_fixtures \\
+        --latency-ms 40 --jitter-ms 20 --error-rate 0.02 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.core.orchestrator import SystemOrchestrator  # noqa: E402
+from backend.data.providers.fixture_store import FixtureStore  # noqa: E402
+from backend.data.providers.replay_provider import ReplayDataProvider  # noqa: E402
+from backend.utils import data_provider  # noqa: E402
+from backend.utils.cache_utils import InMemoryRedis, set_redis_client  # noqa: E402
+from backend.utils.system_monitor import SystemMonitor  # noqa: E402
+
+
+def synthesize_fixtures(store: FixtureStore, symbols, days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+    for symbol in symbols:
+        returns = rng.normal(0.0004, 0.018, days)
+        close = 100 * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, 0.01, days)) * close
+        frame = pd.DataFrame(
+            {
+                "open": close * (1 + rng.normal(0, 0.004, days)),
+                "high": close + spread,
+                "low": close - spread,
+                "close": close,
+                "volume": rng.integers(100_000, 5_000_000, days).astype(float),
+            },
+            index=index,
+        )
+        store.save("fetch_price_data", {"symbol": symbol, "start_date": None, "end_date": None, "interval": "1d"}, frame)
+        store.save("fetch_quote", {"symbol": symbol}, {"symbol": symbol, "price": float(close[-1])})
+        store.save(
+            "fetch_company_overview",
+            {"symbol": symbol},
+            {"Symbol": symbol, "EPS": "42.5", "BookValue": "310.0", "PERatio": "24.1", "Beta": "1.05"},
+        )
+
+
+async def run(args):
+    symbols = [f"SYN{i:03d}" for i in range(args.symbols)]
+    if args.synthesize:
+        synthesize_fixtures(FixtureStore(args.fixture_dir), symbols, args.days, args.seed)
+    elif os.path.isdir(args.fixture_dir):
+        recorded = sorted(os.listdir(os.path.join(args.fixture_dir, "fetch_price_data")))
+        symbols = recorded[: args.symbols] or symbols
+
+    replay = ReplayDataProvider(
+        fixture_dir=args.fixture_dir,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    data_provider.provider = replay
+    cache = InMemoryRedis()
+    set_redis_client(cache)
+
+    orchestrator = SystemOrchestrator(cache_client=cache)
+    await orchestrator.initialize(SystemMonitor())
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, failures = [], 0
+
+    async def analyze(symbol):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            result = await orchestrator.analyze_symbol(symbol, force_refresh=True)
+            latencies.append(time.perf_counter() - start)
+            failures += "error" in result
+
+    start = time.perf_counter()
+    await asyncio.gather(*(analyze(symbol) for symbol in symbols))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    print(f"symbols={len(symbols)} concurrency={args.concurrency} latency={args.latency_ms}±{args.jitter_ms}ms "
+          f"error_rate={args.error_rate}")
+    print(f"wall {wall:8.2f}s   throughput {len(symbols) / wall:8.2f} symbols/s   failed runs {failures}")
+    print(f"latency p50 {statistics.median(latencies) * 1000:8.1f}ms   p95 {p95 * 1000:8.1f}ms   "
+          f"max {latencies[-1] * 1000:8.1f}ms")
+    print(f"provider calls {replay.calls}   misses {replay.misses}   injected errors {replay.injected_errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture-dir", default="data/replay_fixtures")
+    parser.add_argument("--synthesize", action="store_true", help="write synthetic fixtures before running")
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
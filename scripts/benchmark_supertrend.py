@@ -0,0 +1,117 @@
+"""Benchmark the Supertrend recursion: per-row pandas loop versus numpy kernel.
+
+``SupertrendAgent`` used to walk the frame with ``df.iloc[i]`` reads and
+``df.loc[...]`` writes. This script runs that original loop and
+``backend.quant.indicators.IndicatorSet.supertrend`` on synthetic daily
+histories of 1, 5 and 20 years. It reports the time for each and checks that
+the line and the trend direction agree bar for bar. The kernel is numba-compiled
+when numba is installed; the report says which path ran.
+
+    python scripts/benchmark_supertrend.py
+    python scripts/benchmark_supertrend.py --years 1 5 20 40 --iterations 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.quant import indicators as engine  # noqa: E402
+from backend.utils.price_frame import PriceFrame  # noqa: E402
+
+BARS_PER_YEAR = 252
+
+
+def synthetic_ohlcv(bars: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, bars)))
+    spread = close * rng.uniform(0.002, 0.02, bars)
+    return pd.DataFrame(
+        {"high": close + spread, "low": close - spread, "close": close},
+        index=pd.bdate_range("2000-01-03", periods=bars),
+    )
+
+
+def legacy_supertrend(df: pd.DataFrame, period: int, multiplier: float) -> pd.DataFrame:
+    """The per-row pandas implementation the agent used before the kernel."""
+    df = df.copy()
+    df["tr"] = pd.DataFrame(
+        {
+            "hl": df["high"] - df["low"],
+            "hc": abs(df["high"] - df["close"].shift(1)),
+            "lc": abs(df["low"] - df["close"].shift(1)),
+        }
+    ).max(axis=1)
+    df["atr"] = df["tr"].rolling(period).mean()
+    hl2 = (df["high"] + df["low"]) / 2
+    df["upper_band"] = hl2 + multiplier * df["atr"]
+    df["lower_band"] = hl2 - multiplier * df["atr"]
+    df["supertrend"] = df["upper_band"]
+    df["uptrend"] = True
+    for i in range(period, len(df)):
+        curr, prev = df.iloc[i], df.iloc[i - 1]
+        if curr["close"] > prev["upper_band"]:
+            df.loc[df.index[i], "uptrend"] = True
+        elif curr["close"] < prev["lower_band"]:
+            df.loc[df.index[i], "uptrend"] = False
+        else:
+            df.loc[df.index[i], "uptrend"] = prev["uptrend"]
+        if df.loc[df.index[i], "uptrend"]:
+            df.loc[df.index[i], "supertrend"] = df.loc[df.index[i], "lower_band"]
+        else:
+            df.loc[df.index[i], "supertrend"] = df.loc[df.index[i], "upper_band"]
+    return df
+
+
+def best_of(func, iterations: int) -> float:
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--period", type=int, default=10)
+    parser.add_argument("--multiplier", type=float, default=3.0)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--skip-legacy-above", type=int, default=20,
+                        help="only time the pandas loop up to this many years (it is slow)")
+    args = parser.parse_args()
+
+    kernel = "numba" if engine._supertrend_kernel is not None else "python lists"
+    print(f"Supertrend period={args.period} multiplier={args.multiplier} kernel={kernel}")
+    print(f"{'years':>6} {'bars':>7} {'pandas loop':>12} {'kernel':>10} {'speedup':>8}  match")
+
+    for years in args.years:
+        df = synthetic_ohlcv(years * BARS_PER_YEAR, seed=years)
+        frame = PriceFrame.from_any(df)
+        if engine._supertrend_kernel is not None:
+            engine.IndicatorSet(frame).supertrend(args.period, args.multiplier)  # JIT warm-up
+
+        fast = best_of(lambda: engine.IndicatorSet(frame).supertrend(args.period, args.multiplier), args.iterations)
+        result = engine.IndicatorSet(frame).supertrend(args.period, args.multiplier)
+
+        if years <= args.skip_legacy_above:
+            reference = legacy_supertrend(df, args.period, args.multiplier)
+            slow = best_of(lambda: legacy_supertrend(df, args.period, args.multiplier), 1)
+            match = (
+                np.allclose(result["supertrend"], reference["supertrend"].to_numpy(), equal_nan=True)
+                and np.array_equal(result["uptrend"], reference["uptrend"].to_numpy(dtype=bool))
+            )
+            print(f"{years:>6} {len(df):>7} {slow * 1000:>10.1f}ms {fast * 1000:>8.3f}ms "
+                  f"{slow / fast:>7.0f}x  {'yes' if match else 'NO'}")
+        else:
+            print(f"{years:>6} {len(df):>7} {'skipped':>12} {fast * 1000:>8.3f}ms {'-':>8}  -")
+
+
+if __name__ == "__main__":
+    main()
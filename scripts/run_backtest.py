@@ -3,7 +3,8 @@ import asyncio
 from backend.backtesting.engine import run_backtest
 
 if __name__ == "__main__":
-    symbol = "RELIANCE"  # Ensure this exists in data/historical/RELIANCE.csv
-    results = asyncio.run(run_backtest(symbol))
-    for entry in results[-10:]:
+    symbol = "RELIANCE"  # Read from data/historical/RELIANCE.csv when present, else fetched
+    result = asyncio.run(run_backtest(symbol))
+    print(result.metrics)
+    for entry in result.records()[-10:]:
         print(entry)
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock # Import MagicMock
 from backend.agents.automation.alert_engine_agent import run as alert_run, agent_name
+from backend.utils.price_frame import PriceFrame
 import json # Import json for cache serialization
 
 # Mock data
@@ -35,14 +36,14 @@ def mock_redis():
 @patch('backend.agents.automation.alert_engine_agent.corp_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.earnings_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.fetch_eps_data', new_callable=AsyncMock)
-@patch('backend.agents.automation.alert_engine_agent.fetch_price_series', new_callable=AsyncMock)
+@patch('backend.agents.automation.alert_engine_agent.fetch_price_frame', new_callable=AsyncMock)
 async def test_alert_engine_generates_alerts(
     mock_fetch_prices, mock_fetch_eps, mock_earnings, mock_corp, mock_redis # mock_redis is now injected by fixture
 ):
     # Arrange
     # mock_redis fixture handles cache miss setup
     # Mock data provider functions
-    mock_fetch_prices.return_value = MOCK_PRICES
+    mock_fetch_prices.return_value = PriceFrame.from_any(MOCK_PRICES)
     mock_fetch_eps.return_value = MOCK_EPS # Use adjusted EPS
     # Mock agent runs
     mock_earnings.return_value = MOCK_EARNINGS_OUTPUT
@@ -70,7 +71,7 @@ async def test_alert_engine_generates_alerts(
 @patch('backend.agents.automation.alert_engine_agent.corp_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.earnings_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.fetch_eps_data', new_callable=AsyncMock)
-@patch('backend.agents.automation.alert_engine_agent.fetch_price_series', new_callable=AsyncMock)
+@patch('backend.agents.automation.alert_engine_agent.fetch_price_frame', new_callable=AsyncMock)
 async def test_alert_engine_no_alerts(
     mock_fetch_prices, mock_fetch_eps, mock_earnings, mock_corp, mock_redis # mock_redis injected
 ):
@@ -82,7 +83,7 @@ async def test_alert_engine_no_alerts(
     earnings_far = {"details": {"days_to_event": 30}} # Define earnings_far here
     corp_none = {"details": {"actions": []}} # Define corp_none here
 
-    mock_fetch_prices.return_value = prices_below_ma
+    mock_fetch_prices.return_value = PriceFrame.from_any(prices_below_ma)
     mock_fetch_eps.return_value = eps_flat
     mock_earnings.return_value = earnings_far
     mock_corp.return_value = corp_none
@@ -104,7 +105,7 @@ async def test_alert_engine_no_alerts(
 @patch('backend.agents.automation.alert_engine_agent.corp_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.earnings_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.fetch_eps_data', new_callable=AsyncMock)
-@patch('backend.agents.automation.alert_engine_agent.fetch_price_series', new_callable=AsyncMock)
+@patch('backend.agents.automation.alert_engine_agent.fetch_price_frame', new_callable=AsyncMock)
 async def test_alert_engine_partial_data(
     mock_fetch_prices, mock_fetch_eps, mock_earnings, mock_corp, mock_redis # mock_redis injected
 ):
@@ -114,7 +115,7 @@ async def test_alert_engine_partial_data(
     earnings_far = {"details": {"days_to_event": 30}} # Define earnings_far here
     corp_none = {"details": {"actions": []}} # Define corp_none here
     # Simulate missing EPS data
-    mock_fetch_prices.return_value = MOCK_PRICES # Price triggers alert
+    mock_fetch_prices.return_value = PriceFrame.from_any(MOCK_PRICES) # Price triggers alert
     mock_fetch_eps.return_value = None # No EPS data
     mock_earnings.return_value = earnings_far # No earnings alert
     mock_corp.return_value = corp_none # No corp action alert
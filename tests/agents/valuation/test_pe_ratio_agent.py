@@ -10,6 +10,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 # Import the function to test and settings classes
 from backend.agents.valuation.pe_ratio_agent import run as pe_ratio_run, agent_name
 from backend.config.settings import Settings, AgentSettings, PeRatioAgentSettings
+from backend.utils.cache_utils import InMemoryRedis
 
 # Mock for get_redis_client
 @pytest.fixture
@@ -23,8 +24,11 @@ def mock_get_redis_client():
     async def fake_async_get_redis_client(*args, **kwargs):
         return mock_redis_instance
 
-    # Patch where get_redis_client is imported by the decorator
-    with patch("backend.agents.decorators.get_redis_client", new=fake_async_get_redis_client) as mock_func:
+    # Patch where get_redis_client is imported by the decorator; the agent's own
+    # price sketches get a fresh cache so no test sees another's history
+    sketch_cache = InMemoryRedis()
+    with patch("backend.agents.decorators.get_redis_client", new=fake_async_get_redis_client) as mock_func, \
+            patch("backend.agents.valuation.pe_ratio_agent.get_redis_client", AsyncMock(return_value=sketch_cache)):
         yield mock_func
 
 # Mock settings
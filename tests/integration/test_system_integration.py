@@ -267,7 +267,7 @@ class TestSystemIntegration:
             mock_get_redis_for_delete.return_value = mock_client_instance_for_delete
     
             # Get the client from the mock by calling the patched version
-            cache_client_for_deletion = mock_get_redis_for_delete()
+            cache_client_for_deletion = await mock_get_redis_for_delete()
     
             categories_str = ",".join(sorted([cat.value for cat in test_categories]))
             cache_key_to_delete = f"analysis:{symbol_to_test}:{categories_str}"
@@ -402,7 +402,7 @@ class TestSystemIntegration:
             mock_get_redis_for_delete.return_value = mock_client_instance_for_delete
     
             # Get the client from the mock by calling the patched version
-            cache_client_for_deletion = mock_get_redis_for_delete()
+            cache_client_for_deletion = await mock_get_redis_for_delete()
     
             # Correct cache key for deletion, assuming analyze_symbol defaults to all categories
             # as no specific categories are passed to it in this test.
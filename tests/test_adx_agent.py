@@ -4,21 +4,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import pytest
 import pandas as pd
 import numpy as np
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch
 from backend.agents.technical.adx_agent import run as adx_run, agent_name # Import agent_name
 import datetime
 
-# Store original pandas Rolling.mean method at module level
-_original_pandas_rolling_mean = pd.core.window.rolling.Rolling.mean
-
 @pytest.mark.asyncio
 # Patch dependencies in the correct order (innermost first)
 @patch('backend.agents.technical.adx_agent.tracker.update')
 @patch('backend.agents.technical.adx_agent.get_redis_client', new_callable=AsyncMock)
-@patch('backend.agents.technical.adx_agent.fetch_ohlcv_series', new_callable=AsyncMock)
-# Mock the final pandas calculation step to control the ADX value
-@patch('pandas.core.window.rolling.Rolling.mean', autospec=True) # Added autospec=True
-async def test_adx_agent_strong_trend(mock_pd_mean, mock_fetch, mock_get_redis, mock_tracker_update):
+@patch('backend.agents.technical.adx_agent.fetch_technical_ohlcv', new_callable=AsyncMock)
+async def test_adx_agent_strong_trend(mock_fetch, mock_get_redis, mock_tracker_update):
     # --- Mock Configuration ---
     symbol = 'TEST_SYMBOL'
     # 1. Mock fetch_ohlcv_series
@@ -41,28 +36,19 @@ async def test_adx_agent_strong_trend(mock_pd_mean, mock_fetch, mock_get_redis,
     mock_redis_instance.set = AsyncMock()
     mock_get_redis.return_value = mock_redis_instance
 
-    # 3. Mock the final pandas rolling mean calculation for ADX
-    # The agent calculates ATR mean, +DI mean, -DI mean, then ADX mean.
-    # We only want to mock the *last* call (the 4th one).
-    mock_adx_value = 30.0
-    mock_adx_series = MagicMock(spec=pd.Series)
-    mock_adx_series.iloc.__getitem__.return_value = mock_adx_value
-
-    # Use side_effect to pass through initial calls and mock the last one
-    call_count = 0
-    def mean_side_effect(*args, **kwargs): # args[0] should be the Rolling instance
-        nonlocal call_count
-        call_count += 1
-        if call_count == 4: # Mock the 4th call (ADX)
-            return mock_adx_series
-        else: # Pass through other calls to the original method
-            # args[0] is 'self' (the Rolling instance) due to autospec
-            # Call the *true* original method
-            if not args:
-                 raise AssertionError("mean_side_effect called with no args even with autospec")
-            return _original_pandas_rolling_mean(args[0], **kwargs) # Use the stored original
-
-    mock_pd_mean.side_effect = mean_side_effect
+    # 3. Reference ADX from the pandas formulas the indicator engine replaces
+    high, low, close = data_df['high'], data_df['low'], data_df['close']
+    prev_close = close.shift(1)
+    tr = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    atr = tr.rolling(window=14, min_periods=14).mean()
+    up_move, down_move = high - high.shift(1), low.shift(1) - low
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
+    plus_di = 100 * plus_dm.rolling(window=14, min_periods=14).mean() / atr
+    minus_di = 100 * minus_dm.rolling(window=14, min_periods=14).mean() / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    expected_adx = float(dx.rolling(window=14, min_periods=14).mean().iloc[-1])
+    assert expected_adx > 25  # a steady uptrend is a strong trend
 
     # 4. Mock Tracker (already patched)
     mock_tracker_update.return_value = None # Simple mock
@@ -73,27 +59,17 @@ async def test_adx_agent_strong_trend(mock_pd_mean, mock_fetch, mock_get_redis,
     # --- Assertions ---
     assert res['symbol'] == symbol
     assert res['agent_name'] == agent_name # Use imported name
-    assert res['value'] == mock_adx_value # Check the mocked ADX value
+    assert res['value'] == pytest.approx(expected_adx)
     assert res['verdict'] == 'STRONG_TREND' # Based on ADX > 25
     assert res['confidence'] == 1.0 # Based on ADX > 25
     assert res.get('error') is None
     assert 'details' in res
-    assert res['details']['adx'] == mock_adx_value
+    assert res['details']['adx'] == pytest.approx(expected_adx)
 
     # --- Verify Mocks ---
-    mock_fetch.assert_awaited_once()
-    # Check fetch call args
-    call_args, call_kwargs = mock_fetch.call_args
-    assert call_kwargs.get('symbol') == symbol
-    assert isinstance(call_kwargs.get('start_date'), datetime.date)
-    assert isinstance(call_kwargs.get('end_date'), datetime.date)
-    assert call_kwargs.get('interval') == '1d'
+    mock_fetch.assert_awaited_once_with(symbol)
 
     mock_get_redis.assert_awaited_once()
     mock_redis_instance.get.assert_awaited_once()
     mock_redis_instance.set.assert_awaited_once() # Should cache on success
     mock_tracker_update.assert_called_once_with("technical", agent_name, "implemented")
-    # Verify the mocked pandas mean was called 4 times
-    assert mock_pd_mean.call_count == 4
-    # Verify the iloc access on our mock series (called only on the 4th time)
-    mock_adx_series.iloc.__getitem__.assert_called_with(-1)
\ No newline at end of file
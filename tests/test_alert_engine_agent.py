@@ -8,6 +8,7 @@ import numpy as np # Import numpy
 import json # Import json
 from unittest.mock import AsyncMock, patch
 from backend.agents.automation.alert_engine_agent import run as alert_run, agent_name
+from backend.utils.price_frame import PriceFrame
 
 @pytest.mark.asyncio
 # Patch dependencies used by the agent and its decorators
@@ -16,7 +17,7 @@ from backend.agents.automation.alert_engine_agent import run as alert_run, agent
 @patch('backend.agents.automation.alert_engine_agent.corp_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.earnings_run', new_callable=AsyncMock)
 @patch('backend.agents.automation.alert_engine_agent.fetch_eps_data', new_callable=AsyncMock)
-@patch('backend.agents.automation.alert_engine_agent.fetch_price_series', new_callable=AsyncMock)
+@patch('backend.agents.automation.alert_engine_agent.fetch_price_frame', new_callable=AsyncMock)
 async def test_alert_engine_agent(
     mock_fetch_prices, 
     mock_fetch_eps, 
@@ -28,9 +29,9 @@ async def test_alert_engine_agent(
 ):
     # --- Mock Configuration ---
     symbol = 'ABC'
-    # 1. Mock fetch_price_series: Return a list of 60 prices, ending above MA50
+    # 1. Mock fetch_price_frame: Return 60 prices, ending above MA50
     prices = list(np.linspace(90, 105, 60)) # Ends at 105
-    mock_fetch_prices.return_value = prices
+    mock_fetch_prices.return_value = PriceFrame.from_any(prices)
     # Expected MA50 (approximate mean of last 50 points)
     expected_ma50 = np.mean(prices[-50:]) # ~ mean(93 to 105)
 
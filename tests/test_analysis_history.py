@@ -0,0 +1,100 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import AsyncMock, patch
+from backend.api.main import app
+from backend.db.analysis_history import AnalysisHistoryWriter, analysis_rows, get_snapshot, get_verdict_history
+from backend.db.base import Base
+from backend.db.session import get_db
+from backend.security.jwt_auth import verify_token
+
+T0 = datetime(2026, 10, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def _analysis(verdict: str, rsi: float) -> dict:
+    return {
+        "analysis_id": f"TCS_{verdict}",
+        "verdict": {"verdict": verdict, "confidence": 0.6},
+        "category_results": {
+            "technical": {"results": [
+                {"agent_name": "rsi_agent", "verdict": "BUY", "confidence": 0.7, "value": rsi},
+                {"agent_name": "pattern_agent", "verdict": "NO_DATA", "confidence": 0.0, "value": "n/a"},
+            ]},
+            "risk": {"error": "Category execution failed: boom", "results": []},
+        },
+    }
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_analysis_rows_flatten_agents_and_composite():
+    rows = analysis_rows("TCS", _analysis("BUY", 28.5), as_of=T0)
+    assert [(r["agent_name"], r["category"]) for r in rows] == [
+        ("composite", None), ("rsi_agent", "technical"), ("pattern_agent", "technical"),
+    ]
+    assert rows[1]["value"] == 28.5 and rows[2]["value"] is None
+    assert {r["as_of"] for r in rows} == {T0}
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_in_background_and_serves_as_of_queries(session_factory):
+    writer = AnalysisHistoryWriter(session_factory=session_factory, batch_size=4, flush_interval=60)
+    writer.submit("TCS", _analysis("HOLD", 50.0), as_of=T0)
+    assert writer.pending == 3  # below the batch size, nothing written yet
+    writer.submit("TCS", _analysis("BUY", 28.5), as_of=T0 + timedelta(days=1))
+    await writer.close()
+    assert writer.pending == 0
+
+    with session_factory() as db:
+        latest = await get_snapshot(db, "TCS")
+        earlier = await get_snapshot(db, "TCS", as_of=T0 + timedelta(hours=12))
+        rsi = await get_verdict_history(db, "TCS", agent_name="rsi_agent")
+        assert await get_snapshot(db, "TCS", as_of=T0 - timedelta(days=1)) is None
+
+    assert latest["verdict"] == {"verdict": "BUY", "confidence": 0.6}
+    assert earlier["verdict"]["verdict"] == "HOLD"
+    assert earlier["as_of"] == T0.isoformat()
+    assert [a["agent_name"] for a in latest["agents"]] == ["rsi_agent", "pattern_agent"]
+    assert [row["value"] for row in rsi] == [28.5, 50.0]
+
+
+def test_latest_endpoint_falls_back_to_history_when_redis_misses(session_factory):
+    with session_factory() as db:
+        AnalysisHistoryWriter._write_sync(db, analysis_rows("TCS", _analysis("BUY", 28.5), as_of=T0))
+
+    def override_db():
+        with session_factory() as db:
+            yield db
+
+    async def override_verify_token():
+        return {"sub": "testuser"}
+
+    app.dependency_overrides[verify_token] = override_verify_token
+    app.dependency_overrides[get_db] = override_db
+    redis_client = AsyncMock()
+    redis_client.get.return_value = None
+    try:
+        with patch("backend.api.endpoints.analysis.get_redis_client", AsyncMock(return_value=redis_client)):
+            client = TestClient(app)
+            latest = client.get("/api/analysis/TCS/latest")
+            history = client.get("/api/analysis/TCS/history", params={"agent": "composite"})
+            missing = client.get("/api/analysis/INFY/latest")
+    finally:
+        app.dependency_overrides = {}
+
+    assert latest.status_code == 200
+    assert latest.json()["source"] == "database"
+    assert latest.json()["analysis"]["verdict"]["verdict"] == "BUY"
+    assert [r["verdict"] for r in history.json()["results"]] == ["BUY"]
+    assert missing.status_code == 404
@@ -5,10 +5,11 @@ import pytest
 from unittest.mock import AsyncMock, patch
 import pandas as pd
 from backend.agents.automation.auto_watchlist_agent import run as aw_run
+from backend.utils.price_frame import PriceFrame
 
 @pytest.mark.asyncio
-# Patch fetch_price_series in the agent's namespace
-@patch('backend.agents.automation.auto_watchlist_agent.fetch_price_series', new_callable=AsyncMock)
+# Patch fetch_price_frame in the agent's namespace
+@patch('backend.agents.automation.auto_watchlist_agent.fetch_price_frame', new_callable=AsyncMock)
 @patch('backend.agents.automation.auto_watchlist_agent.get_redis_client', new_callable=AsyncMock) # Add this patch
 async def test_auto_watchlist_agent(mock_get_redis_client, mock_fetch_price_series, monkeypatch): # Add mock_get_redis_client
     # Simulate the redis client
@@ -18,7 +19,7 @@ async def test_auto_watchlist_agent(mock_get_redis_client, mock_fetch_price_seri
     mock_get_redis_client.return_value = mock_redis_instance
 
     # monkeypatch.setattr('backend.utils.data_provider.fetch_watchlist', lambda: []) # This mock seems unrelated to the failure
-    mock_fetch_price_series.return_value = pd.Series([100.0, 101.0])
+    mock_fetch_price_series.return_value = PriceFrame.from_any(pd.Series([100.0, 101.0]))
     res = await aw_run('ABC', {})
     assert isinstance(res, dict)
     assert 'verdict' in res
@@ -28,4 +29,26 @@ async def test_auto_watchlist_agent(mock_get_redis_client, mock_fetch_price_seri
     assert res['verdict'] == "WATCH"
 
     # Verify that cache set was called
-    mock_redis_instance.set.assert_awaited_once()
\ No newline at end of file
+    mock_redis_instance.set.assert_awaited_once()
+
+@pytest.mark.asyncio
+@patch('backend.agents.automation.auto_watchlist_agent.fetch_price_panel', new_callable=AsyncMock)
+@patch('backend.agents.automation.auto_watchlist_agent.fetch_price_frame', new_callable=AsyncMock)
+@patch('backend.agents.automation.auto_watchlist_agent.get_redis_client', new_callable=AsyncMock)
+async def test_auto_watchlist_agent_without_price_history(mock_get_redis_client, mock_fetch_price_frame, mock_fetch_price_panel):
+    from backend.agents.automation.auto_watchlist_agent import run_batch
+    from backend.utils.price_panel import PricePanel
+
+    mock_redis_instance = AsyncMock()
+    mock_redis_instance.get.return_value = None
+    mock_get_redis_client.return_value = mock_redis_instance
+
+    mock_fetch_price_frame.return_value = PriceFrame.empty_frame()
+    res = await aw_run('ABC', {})
+    assert res['verdict'] == "IGNORE"
+    assert res['details']['signals'] == []
+
+    mock_fetch_price_panel.return_value = PricePanel.from_frames({})
+    results = await run_batch(['ABC', 'XYZ'], {'XYZ': {'rsi': {'verdict': 'BUY'}}})
+    assert results['ABC']['verdict'] == "IGNORE"
+    assert results['XYZ']['details']['signals'] == ['rsi']
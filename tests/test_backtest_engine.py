@@ -0,0 +1,103 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+from backend.backtesting.engine import backtest, run_backtest, signal_weights, trend_signals
+from backend.backtesting.strategy import apply_strategy
+from backend.config.settings import get_settings
+from backend.utils.price_panel import PricePanel
+
+
+def _loop_backtest(prices, targets, capital, cost_rate, lag, rebalance):
+    """Bar-by-bar share and cash accounting the vectorised engine must reproduce."""
+    bars, assets = prices.shape
+    held = pd.DataFrame(targets).ffill().fillna(0.0).to_numpy()
+    shares, cash, previous, equity = np.zeros(assets), capital, None, []
+    for t in range(bars):
+        price = np.nan_to_num(prices[t])
+        listed = np.isfinite(prices[t])
+        target = np.where(listed, held[t - lag] if t >= lag else 0.0, 0.0)
+        value = cash + shares @ price
+        if previous is None or np.any(target != previous) or rebalance == "always" or \
+                (isinstance(rebalance, int) and t % rebalance == 0):
+            value -= cost_rate * np.abs(target - shares * price / value).sum() * value
+            shares = np.where(listed, target * value / np.where(listed, price, 1.0), 0.0)
+            cash = value - shares @ price
+        previous = target
+        equity.append(value)
+    return np.array(equity)
+
+
+@pytest.mark.parametrize("lag,rebalance", [(0, "on_change"), (1, "always"), (2, 21)])
+def test_vectorised_engine_matches_bar_by_bar_accounting(lag, rebalance):
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (500, 6)), axis=0))
+    prices[:40, 2] = np.nan  # Listed later; its targets are ignored until then
+    targets = rng.choice([0.0, 0.25, -0.1, np.nan], size=prices.shape, p=[0.02, 0.02, 0.01, 0.95])
+
+    result = backtest(prices, targets, 1e5, commission_bps=10, slippage_bps=5, lag=lag, rebalance=rebalance)
+    expected = _loop_backtest(prices, targets, 1e5, 15e-4, lag, rebalance)
+    np.testing.assert_allclose(result.equity, expected, rtol=1e-12)
+    np.testing.assert_allclose(result.cash + (result.positions * np.nan_to_num(prices)).sum(axis=1), result.equity)
+    assert np.all(result.positions[:40 + lag, 2] == 0)
+    assert result.metrics["final_value"] == pytest.approx(expected[-1])
+    assert result.metrics["total_costs"] == pytest.approx(result.costs.sum()) and result.costs.sum() > 0
+
+
+def test_signal_helpers_and_costs_on_a_single_asset():
+    weights = signal_weights([[1, 0, -1, 1], [0, 0, 0, 0], [np.nan, 1, 1, 1]])
+    np.testing.assert_allclose(weights[0], [1 / 3, 0, -1 / 3, 1 / 3])
+    assert np.all(weights[1] == 0) and np.isnan(weights[2, 0]) and weights[2, 1] == pytest.approx(1 / 3)
+
+    close = pd.Series(np.r_[np.linspace(100, 50, 250), np.linspace(50, 120, 250)],
+                      index=pd.bdate_range("2020-01-01", periods=500), name="XYZ")
+    signals = trend_signals(close.to_numpy(), window=50)
+    assert np.all(signals[:49] == 0) and signals[-1, 0] == 1.0
+    free = backtest(close, signals)
+    costly = backtest(close, signals, commission_bps=20, slippage_bps=10)
+    assert free.symbols == ["XYZ"] and free.index[0] == close.index[0]
+    assert costly.metrics["trades"] == free.metrics["trades"] > 0
+    assert costly.metrics["total_costs"] > 0 and costly.equity[-1] < free.equity[-1]
+    assert free.records()[-1] == {"date": "2021-11-30", "value": round(free.equity[-1], 2),
+                                  "cash": round(free.cash[-1], 2), "turnover": 0.0, "costs": 0.0}
+
+
+def test_apply_strategy_keeps_its_all_in_semantics():
+    verdicts = [{"date": f"d{i}", "price": price, "verdict": verdict} for i, (price, verdict) in enumerate(
+        [(10, "HOLD"), (10, "BUY"), (12, "HOLD"), (11, "BUY"), (15, "SELL"), (9, "SELL"), (8, "BUY"), (10, "HOLD")])]
+    result = apply_strategy(verdicts)
+    assert [entry["value"] for entry in result["equity_curve"]] == \
+        [100000.0, 100000.0, 120000.0, 110000.0, 150000.0, 150000.0, 150000.0, 187500.0]
+    assert result["final_value"] == 187500.0
+    assert result["max_drawdown"] == pytest.approx(-8.33) and result["sharpe_ratio"] > 0
+
+
+@pytest.mark.asyncio
+async def test_run_backtest_prefers_local_csv_histories(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings().agent_settings.backtest, "DATA_DIR", str(tmp_path))
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    pd.DataFrame({"date": dates, "Close": np.linspace(100, 160, 300)}).to_csv(tmp_path / "LOCAL.csv", index=False)
+    fetched = PricePanel(["REMOTE"], {"close": np.linspace(50, 40, 280)[None, :]}, dates[20:])
+    fetch_panel = AsyncMock(return_value=fetched)
+
+    with patch("backend.utils.data_provider.fetch_price_panel", fetch_panel):
+        result = await run_backtest(["LOCAL", "REMOTE"], strategy=lambda close: np.full(close.shape, 0.5))
+
+    assert fetch_panel.await_args.args[0] == ["REMOTE"]
+    assert result.symbols == ["LOCAL", "REMOTE"] and len(result.equity) == 300
+    assert np.all(result.weights[:20, 1] == 0) and result.weights[20, 1] > 0  # Bought on its first bar
+    assert result.metrics["total_costs"] > 0
+
+
+@pytest.mark.asyncio
+async def test_max_period_requests_the_full_history(monkeypatch):
+    from backend.utils import data_provider
+
+    assert get_settings().agent_settings.backtest.HISTORY_PERIOD == "max"
+    fetch = AsyncMock(return_value=pd.DataFrame({"close": [1.0, 2.0]}))
+    monkeypatch.setattr(data_provider.provider, "fetch_price_data", fetch)
+    await data_provider.fetch_price_series("XYZ", period="max")
+    assert fetch.await_args.args[1] == data_provider.MAX_HISTORY_START
@@ -5,7 +5,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import pytest
 import pandas as pd, numpy as np
 from backend.config.settings import get_settings # Import settings
-from backend.utils.data_provider import fetch_price_series
+from backend.quant.covariance import CovarianceService
+from backend.utils.price_panel import PricePanel
 from backend.agents.risk.beta_agent import run
 
 @pytest.fixture(autouse=True)
@@ -18,13 +19,17 @@ def mock_price_series(monkeypatch):
     settings = get_settings()
     market_symbol = settings.data_provider.MARKET_INDEX_SYMBOL
 
-    async def mock_fetch(sym, start_date=None, end_date=None): # Match expected signature
-        # Return the series if the symbol is the test symbol OR the market symbol
-        if sym == 'TEST' or sym == market_symbol:
-            return series
-        raise ValueError(f"Unexpected symbol {sym} in mock_fetch_price_series")
+    # The agent reads both histories through the shared covariance service
+    service = CovarianceService.from_panel(PricePanel.from_frames({'TEST': series, market_symbol: series}))
 
-    monkeypatch.setattr('backend.utils.data_provider.fetch_price_series', mock_fetch)
+    async def mock_service(symbols=(), max_age=None): # Match expected signature
+        unexpected = set(symbols) - {'TEST', market_symbol}
+        if unexpected:
+            raise ValueError(f"Unexpected symbols {unexpected} in mock_service")
+        return service
+
+    monkeypatch.setattr('backend.quant.market_model.get_covariance_service', mock_service)
+    monkeypatch.setattr('backend.agents.risk.beta_agent.get_covariance_service', mock_service)
 
 @pytest.mark.asyncio
 async def test_beta_agent():
@@ -0,0 +1,138 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.agents.decorators import standard_agent_execution
+from backend.utils.cache_batch import cache_batch, current_cache_batch
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+        return self
+
+    async def execute(self):
+        self.client.pipeline_executions += 1
+        for key, value, _ in self.commands:
+            self.client.store[key] = value
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """Dict-backed client exposing the MGET/pipeline surface the batch uses."""
+
+    def __init__(self, store=None):
+        self.store = dict(store or {})
+        self.pipeline_executions = 0
+        self.get = AsyncMock(side_effect=lambda key: self.store.get(key))
+        self.set = AsyncMock()
+        self.mget = AsyncMock(side_effect=lambda keys: [self.store.get(k) for k in keys])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_and_flush_use_single_round_trips():
+    client = FakeRedis({"a": "1"})
+    async with cache_batch(client) as batch:
+        assert current_cache_batch() is batch
+        assert await batch.prefetch(["a", "b"])
+        assert batch.lookup("a") == "1"
+        assert batch.is_prefetched("b") and batch.lookup("b") is None
+        batch.stage("b", "2", ex=60)
+        batch.stage("c", "3", ex=60)
+        assert batch.lookup("b") == "2"
+
+    assert current_cache_batch() is None
+    client.mget.assert_awaited_once()
+    client.set.assert_not_awaited()
+    assert client.pipeline_executions == 1
+    assert client.store == {"a": "1", "b": "2", "c": "3"}
+    assert batch.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_flush_falls_back_to_individual_sets_without_pipeline():
+    client = AsyncMock()  # pipeline() returns a coroutine; mget reply is not a list
+    async with cache_batch(client) as batch:
+        assert not await batch.prefetch(["a"])
+        assert not batch.is_prefetched("a")
+        batch.stage("a", "1", ex=10)
+    client.set.assert_awaited_once_with("a", "1", ex=10)
+
+
+@pytest.mark.asyncio
+@patch('backend.agents.decorators.get_tracker')
+@patch('backend.agents.decorators.get_redis_client')
+async def test_decorator_serves_hits_from_batch_and_stages_writes(mock_get_redis, mock_get_tracker):
+    agent_client = AsyncMock()
+    mock_get_redis.return_value = agent_client
+    mock_get_tracker.return_value = MagicMock()
+
+    cached = {"symbol": "HIT", "verdict": "BUY", "confidence": 0.9, "value": 1, "details": {}, "agent_name": "batch_test_agent"}
+    inner = AsyncMock(return_value={"symbol": "MISS", "verdict": "SELL", "confidence": 0.2, "value": 2, "details": {}})
+    agent = standard_agent_execution(agent_name="batch_test_agent", category="test")(inner)
+
+    batch_client = FakeRedis({"batch_test_agent:HIT": json.dumps(cached)})
+    async with cache_batch(batch_client) as batch:
+        await batch.prefetch(["batch_test_agent:HIT", "batch_test_agent:MISS"])
+        assert await agent("HIT") == cached
+        miss_result = await agent("MISS")
+        assert batch.pending_keys == ["batch_test_agent:MISS"]
+
+    inner.assert_awaited_once_with("MISS")
+    assert miss_result["verdict"] == "SELL"
+    agent_client.get.assert_not_called()
+    agent_client.set.assert_not_called()
+    assert json.loads(batch_client.store["batch_test_agent:MISS"])["verdict"] == "SELL"
+
+
+@pytest.mark.asyncio
+@patch('backend.agents.decorators.get_tracker')
+@patch('backend.agents.decorators.get_redis_client')
+async def test_invalidated_keys_recompute_and_overwrite_cached_results(mock_get_redis, mock_get_tracker):
+    mock_get_redis.return_value = AsyncMock()
+    mock_get_tracker.return_value = MagicMock()
+
+    stale = {"symbol": "TCS", "verdict": "BUY", "confidence": 0.9, "value": 1, "details": {}, "agent_name": "batch_test_agent"}
+    inner = AsyncMock(return_value={"symbol": "TCS", "verdict": "SELL", "confidence": 0.4, "value": 2, "details": {}})
+    agent = standard_agent_execution(agent_name="batch_test_agent", category="test")(inner)
+
+    client = FakeRedis({"batch_test_agent:TCS": json.dumps(stale)})
+    async with cache_batch(client) as batch:
+        batch.invalidate(["batch_test_agent:TCS"])
+        assert await batch.prefetch(["batch_test_agent:TCS", "other:TCS"])
+        assert (await agent("TCS"))["verdict"] == "SELL"
+
+    inner.assert_awaited_once_with("TCS")
+    client.mget.assert_awaited_once_with(["other:TCS"])
+    assert json.loads(client.store["batch_test_agent:TCS"])["verdict"] == "SELL"
+
+
+@pytest.mark.asyncio
+@patch('backend.utils.data_provider.fetch_ohlcv_series', new_callable=AsyncMock)
+async def test_technical_agents_share_one_ohlcv_fetch_per_run(mock_fetch):
+    import asyncio
+    import pandas as pd
+    from backend.quant.indicators import get_indicators
+    from backend.utils.data_provider import fetch_technical_ohlcv
+
+    mock_fetch.return_value = pd.DataFrame(
+        {"close": [float(i) for i in range(1, 61)]}, index=pd.date_range(end="2025-05-01", periods=60, freq="D")
+    )
+    async with cache_batch(FakeRedis()):
+        frames = await asyncio.gather(fetch_technical_ohlcv("TCS"), fetch_technical_ohlcv("TCS"))
+        await fetch_technical_ohlcv("INFY")
+
+    assert mock_fetch.await_count == 2  # once per symbol
+    assert get_indicators("TCS", frames[0]) is get_indicators("TCS", frames[1])
+
+    await fetch_technical_ohlcv("TCS")
+    assert mock_fetch.await_count == 3  # outside a run every call fetches
@@ -0,0 +1,78 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+import numpy as np
+from backend.utils.cache_codec import (
+    CACHE_CODEC_MAGIC,
+    CacheDecodeError,
+    decode_cache_value,
+    encode_cache_value,
+    get_cache_codec,
+)
+
+PAYLOAD = {
+    "symbol": "TEST",
+    "verdict": "BUY",
+    "confidence": np.float64(0.75),
+    "value": np.int64(42),
+    "details": {"series": np.arange(5, dtype=np.float64), "flag": np.bool_(True)},
+}
+EXPECTED = {
+    "symbol": "TEST",
+    "verdict": "BUY",
+    "confidence": 0.75,
+    "value": 42,
+    "details": {"series": [0.0, 1.0, 2.0, 3.0, 4.0], "flag": True},
+}
+
+
+def test_json_codec_writes_legacy_string():
+    encoded = encode_cache_value(PAYLOAD, codec="json", compression="none")
+    assert isinstance(encoded, str)
+    assert json.loads(encoded) == EXPECTED
+    assert decode_cache_value(encoded) == EXPECTED
+
+
+def test_legacy_payloads_decode():
+    legacy = json.dumps(EXPECTED)
+    assert decode_cache_value(legacy) == EXPECTED
+    assert decode_cache_value(legacy.encode("utf-8")) == EXPECTED
+    assert decode_cache_value(EXPECTED) is EXPECTED  # already decoded by an in-process client
+
+
+@pytest.mark.parametrize("codec_name, module", [("orjson", "orjson"), ("msgpack", "msgpack")])
+def test_binary_codecs_roundtrip(codec_name, module):
+    pytest.importorskip(module)
+    encoded = encode_cache_value(PAYLOAD, codec=codec_name, compression="none")
+    assert isinstance(encoded, bytes)
+    assert encoded.startswith(CACHE_CODEC_MAGIC)
+    assert decode_cache_value(encoded) == EXPECTED
+
+
+def test_compression_applies_above_threshold():
+    big = {"rows": [{"i": i, "v": "x" * 20} for i in range(500)]}
+    small = encode_cache_value(big, codec="json", compression="zlib", compression_threshold=10**9)
+    compressed = encode_cache_value(big, codec="json", compression="zlib", compression_threshold=0)
+    assert isinstance(small, str)
+    assert isinstance(compressed, bytes)
+    assert len(compressed) < len(small)
+    assert decode_cache_value(compressed) == big
+
+
+def test_unknown_codec_falls_back_to_json():
+    assert get_cache_codec("does-not-exist").name == "json"
+
+
+@pytest.mark.parametrize("raw", [
+    CACHE_CODEC_MAGIC + bytes((99, 0, 0)) + b"{}",  # unsupported version
+    CACHE_CODEC_MAGIC + bytes((1, 77, 0)) + b"{}",  # unknown codec
+    CACHE_CODEC_MAGIC + bytes((1, 0, 9)) + b"{}",   # unknown compression
+    CACHE_CODEC_MAGIC + b"\x01",                    # truncated header
+    "not json",
+    12345,
+])
+def test_corrupt_payloads_raise(raw):
+    with pytest.raises(CacheDecodeError):
+        decode_cache_value(raw)
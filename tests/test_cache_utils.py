@@ -0,0 +1,64 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from backend.utils import cache_utils
+from backend.utils.cache_utils import (
+    InMemoryRedis,
+    InstrumentedConnectionPool,
+    InstrumentedPipeline,
+    create_redis_client,
+    get_redis_client,
+    set_redis_client,
+)
+
+
+@pytest.mark.asyncio
+async def test_get_redis_client_is_shared_and_swappable():
+    previous = cache_utils._redis_client
+    try:
+        set_redis_client(None)
+        first = await get_redis_client()
+        assert isinstance(first, InMemoryRedis)  # pytest run uses the in-memory stand-in
+        assert await get_redis_client() is first
+
+        replacement = InMemoryRedis()
+        set_redis_client(replacement)
+        assert await get_redis_client() is replacement
+    finally:
+        set_redis_client(previous)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_redis_matches_redis_semantics():
+    client = InMemoryRedis()
+    assert await client.set("a", "1", ex=60)
+    assert await client.get("a") == b"1"
+    assert await client.set("a", "2", nx=True) is None
+    assert await client.mget(["a", "missing"]) == [b"1", None]
+    assert 0 < await client.ttl("a") <= 60
+
+    pipe = client.pipeline(transaction=False)
+    pipe.set("b", b"\x00binary", ex=5).set("c", 3)
+    assert await pipe.execute() == [True, True]
+    assert await client.get("b") == b"\x00binary"
+    assert await client.incr("c") == 4
+
+    assert await client.delete("a", "missing") == 1
+    with pytest.raises(TypeError):
+        await client.set("d", {"not": "bytes"})
+
+
+@pytest.mark.asyncio
+async def test_create_redis_client_uses_pool_settings():
+    client = create_redis_client("redis://example:6380/2")
+    try:
+        pool = client.connection_pool
+        assert isinstance(pool, InstrumentedConnectionPool)
+        assert pool.max_connections == cache_utils.get_settings().redis.MAX_CONNECTIONS
+        assert pool.connection_kwargs["host"] == "example"
+        assert pool.connection_kwargs["db"] == 2
+        assert pool.connection_kwargs["retry_on_timeout"] is True
+        assert isinstance(client.pipeline(transaction=False), InstrumentedPipeline)
+    finally:
+        await client.aclose()
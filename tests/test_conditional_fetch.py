@@ -0,0 +1,76 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import pytest
+from unittest.mock import MagicMock
+from backend.utils import cache_utils, conditional_fetch
+from backend.utils.cache_utils import InMemoryRedis, set_redis_client
+from backend.utils.conditional_fetch import conditional_fetch_stats, conditional_get
+
+BODY = b"<html>" + b"x" * 5000 + b"</html>"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch):
+    previous = cache_utils._redis_client
+    set_redis_client(InMemoryRedis())
+    monkeypatch.setattr(conditional_fetch, "_stats", {})
+    yield
+    set_redis_client(previous)
+
+
+def make_client(requests_seen, etag='"v1"'):
+    def handler(request):
+        requests_seen.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=BODY, headers={"ETag": etag, "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_304_reuses_parsed_result_and_reports_savings():
+    seen = []
+    parse = MagicMock(side_effect=lambda response: {"size": len(response.content)})
+    async with make_client(seen) as client:
+        first = await conditional_get(client, "https://example.com/quote", parse, params={"s": "ABC"})
+        second = await conditional_get(client, "https://example.com/quote", parse, params={"s": "ABC"})
+
+    assert first.status_code == 200 and not first.not_modified
+    assert second.not_modified and second.value == {"size": len(BODY)}
+    assert parse.call_count == 1
+    assert "If-None-Match" not in seen[0].headers
+    assert seen[1].headers["If-None-Match"] == '"v1"'
+    assert seen[1].headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    stats = conditional_fetch_stats()["example.com"]
+    assert stats["requests"] == 2
+    assert stats["not_modified"] == 1
+    assert stats["bytes_saved"] == len(BODY)
+
+
+@pytest.mark.asyncio
+async def test_variants_and_params_are_cached_separately():
+    seen = []
+    async with make_client(seen) as client:
+        await conditional_get(client, "https://example.com/q", lambda r: "price", variant="price")
+        volume = await conditional_get(client, "https://example.com/q", lambda r: "volume", variant="volume")
+        other = await conditional_get(client, "https://example.com/q", lambda r: "other", params={"s": "XYZ"})
+    assert volume.value == "volume" and not volume.not_modified
+    assert other.value == "other" and not other.not_modified
+    assert all("If-None-Match" not in request.headers for request in seen)
+
+
+@pytest.mark.asyncio
+async def test_responses_without_validators_are_not_cached():
+    def handler(request):
+        assert "If-None-Match" not in request.headers
+        return httpx.Response(200, json={"articles": [1, 2]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for _ in range(2):
+            fetched = await conditional_get(client, "https://news.example/api", lambda r: len(r.json()["articles"]))
+            assert fetched.value == 2
+    assert conditional_fetch_stats()["news.example"]["not_modified"] == 0
@@ -0,0 +1,123 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from backend.quant.covariance import CovarianceService
+from backend.utils.price_panel import PricePanel
+
+SYMBOLS = ["AAA", "BBB", "CCC", "IDX"]
+
+
+def _returns(bars=400, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, bars)
+    loadings = np.array([0.8, 1.2, 0.3, 1.0])
+    noise = rng.normal(0, 0.006, (bars, len(SYMBOLS)))
+    noise[:, -1] = 0.0
+    return market[:, None] * loadings + noise
+
+
+def _panel(returns, start="2024-01-01"):
+    close = 100 * np.vstack([np.ones(len(SYMBOLS)), np.cumprod(1 + returns, axis=0)]).T
+    return PricePanel(SYMBOLS, {"close": close}, pd.bdate_range(start, periods=close.shape[1]))
+
+
+def test_updates_match_pandas_ewm_and_sample_covariance():
+    returns = _returns()
+    weighted, equal = CovarianceService(SYMBOLS, halflife=30), CovarianceService(SYMBOLS)
+    for bar in returns:
+        weighted.update(bar)
+        equal.update(bar)
+
+    expected = pd.DataFrame(returns, columns=SYMBOLS).ewm(halflife=30).cov().loc[len(returns) - 1]
+    np.testing.assert_allclose(weighted.covariance_matrix(), expected.values, rtol=1e-9)
+    np.testing.assert_allclose(equal.covariance_matrix(), np.cov(returns.T), rtol=1e-9)
+    assert weighted.correlation("AAA", "IDX") == pytest.approx(expected.loc["AAA", "IDX"] / np.sqrt(expected.loc["AAA", "AAA"] * expected.loc["IDX", "IDX"]))
+    assert equal.beta("BBB", "IDX") == pytest.approx(np.cov(returns[:, 1], returns[:, 3])[0, 1] / returns[:, 3].var(ddof=1))
+    np.testing.assert_array_equal(equal.recent_returns(["CCC"], 5), returns[-5:, [2]].T)
+
+
+def test_ledoit_wolf_shrinkage_matches_sklearn():
+    covariance = pytest.importorskip("sklearn.covariance")
+    returns = _returns(seed=4)
+    service = CovarianceService(SYMBOLS)
+    for bar in returns:
+        service.update(bar)
+
+    subset = ["BBB", "AAA", "CCC"]
+    _, expected = covariance.ledoit_wolf(returns[:, [1, 0, 2]])
+    intensity = service.shrinkage(subset)
+    assert 0.0 <= intensity <= 1.0
+    assert intensity == pytest.approx(expected, rel=0.02)
+    shrunk = service.submatrix(subset)
+    assert shrunk.shape == (3, 3)
+    assert np.all(np.linalg.eigvalsh(shrunk) > 0)
+    np.testing.assert_allclose(service.submatrix(subset, shrink=False), np.cov(returns[:, [1, 0, 2]].T), rtol=1e-9)
+
+
+def test_incremental_panel_updates_match_bootstrap_and_survive_save(tmp_path):
+    returns = _returns(300, seed=2)
+    returns[:50, 2] = np.nan  # CCC lists late
+    full = _panel(np.nan_to_num(returns))
+    close = full.close.copy()
+    close[2, :51] = np.nan
+    full = PricePanel(SYMBOLS, {"close": close}, full.index)
+    head = PricePanel(SYMBOLS, {"close": close[:, :200]}, full.index[:200])
+
+    bootstrapped = CovarianceService.from_panel(full, halflife=40)
+    rolled = CovarianceService.from_panel(head, halflife=40)
+    rolled.save(tmp_path / "covariance.npz")
+    rolled = CovarianceService.load(tmp_path / "covariance.npz")
+    assert rolled.update_from_panel(full) == 101
+    assert rolled.update_from_panel(full) == 0  # nothing new
+
+    np.testing.assert_allclose(rolled.covariance_matrix(), bootstrapped.covariance_matrix(), rtol=1e-12)
+    assert rolled.shrinkage() == pytest.approx(bootstrapped.shrinkage())
+    assert rolled.observations("CCC") < rolled.observations("AAA")
+    assert rolled.last_timestamp == full._index[-1]
+    np.testing.assert_array_equal(rolled.recent_returns(), bootstrapped.recent_returns())
+
+
+def test_added_symbols_match_a_rebuild_over_the_recent_window():
+    returns = _returns(300, seed=3)
+    full = _panel(returns)
+    tracked = PricePanel(SYMBOLS[:2] + SYMBOLS[3:], {"close": full.close[[0, 1, 3]]}, full.index)
+    only_ccc = PricePanel(["CCC"], {"close": full.close[[2], 50:]}, full.index[50:])  # Fetched on its own
+
+    service = CovarianceService.from_panel(tracked, halflife=40, history=200)
+    assert service.add_from_panel(only_ccc) == ("CCC",) and service.add_from_panel(only_ccc) == ()
+
+    window = PricePanel(SYMBOLS, {"close": full.close[:, -201:]}, full.index[-201:])
+    rebuilt = CovarianceService.from_panel(window, halflife=40, history=200)
+    for symbol in SYMBOLS:
+        assert service.covariance("CCC", symbol) == pytest.approx(rebuilt.covariance("CCC", symbol), rel=1e-12)
+    assert service.covariance("AAA", "IDX") == CovarianceService.from_panel(tracked, halflife=40, history=200).covariance("AAA", "IDX")
+    np.testing.assert_array_equal(service.recent_returns(SYMBOLS), rebuilt.recent_returns(SYMBOLS))
+
+
+@pytest.mark.asyncio
+async def test_shared_service_fetches_only_untracked_symbols(tmp_path, monkeypatch):
+    from unittest.mock import AsyncMock, patch
+    from backend.config.settings import get_settings
+    from backend.quant import covariance
+
+    monkeypatch.setattr(get_settings().agent_settings.covariance, "STATE_PATH", str(tmp_path / "covariance.npz"))
+    monkeypatch.setattr(covariance, "_service", None)
+    monkeypatch.setattr(covariance, "_unavailable", {})
+    full = _panel(_returns(300, seed=5))
+
+    def panel_of(symbols, period="1y"):
+        return PricePanel.from_frames({symbol: full.frame(symbol) for symbol in symbols if symbol in SYMBOLS})
+
+    fetch_panel = AsyncMock(side_effect=panel_of)
+    with patch("backend.utils.data_provider.fetch_price_panel", fetch_panel):
+        await covariance.get_covariance_service(["AAA", "IDX"])
+        await covariance.get_covariance_service(["BBB", "IDX"])
+        await covariance.get_covariance_service(["CCC", "IDX"])
+        for _ in range(3):
+            service = await covariance.get_covariance_service(["NODATA", "IDX"])
+
+    assert [call.args[0] for call in fetch_panel.await_args_list] == [["AAA", "IDX"], ["BBB"], ["CCC"], ["NODATA"]]
+    assert set(service.symbols) == set(SYMBOLS) and "NODATA" not in service
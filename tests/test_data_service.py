@@ -0,0 +1,82 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock
+from backend.data.data_service import DataService
+from backend.utils.cache_utils import InMemoryRedis
+
+
+class CountingRedis(InMemoryRedis):
+    def __init__(self):
+        super().__init__()
+        self.gets = 0
+        self.mgets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return await super().get(key)
+
+    async def mget(self, keys, *args):
+        self.mgets += 1
+        return [self._data.get(key) for key in keys]
+
+
+@pytest.fixture
+def service():
+    svc = DataService()
+    svc.cache = CountingRedis()
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_fetches_run_concurrently_under_the_semaphore(service):
+    in_flight, peak = 0, 0
+
+    async def fetch(symbol, data_type):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"source": "yahoo_finance", "data": {"price": len(symbol)}, "confidence": "high"}
+
+    service.data_provider = AsyncMock()
+    service.data_provider.fetch_data_resilient.side_effect = fetch
+    symbols = [f"S{i}" for i in range(20)]
+
+    result = await service.get_market_data(symbols)
+
+    assert list(result["data"]) == symbols
+    assert peak == 5
+    assert result["errors"] is None
+    # Writes were flushed, so a second call is served entirely from one MGET
+    service.data_provider.fetch_data_resilient.reset_mock()
+    again = await service.get_market_data(symbols)
+    service.data_provider.fetch_data_resilient.assert_not_awaited()
+    assert again["data"] == result["data"]
+    assert service.cache.mgets == 2 and service.cache.gets == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_and_low_confidence_are_not_cached(service):
+    await service.cache.set("market_data_HIT", json.dumps({"price": 1, "source": "cache", "confidence": "high"}))
+
+    async def fetch(symbol, data_type):
+        if symbol == "BAD":
+            raise ConnectionError("down")
+        return {"source": "fallback", "data": {"price": 2}, "confidence": "low"}
+
+    service.data_provider = AsyncMock()
+    service.data_provider.fetch_data_resilient.side_effect = fetch
+
+    result = await service.get_market_data(["HIT", "BAD", "LOW", "HIT"])
+
+    assert list(result["data"]) == ["HIT", "BAD", "LOW"]
+    assert result["data"]["HIT"]["source"] == "cache"
+    assert result["data"]["BAD"]["source"] == "error"
+    assert result["errors"] == ["BAD: down"]
+    assert await service.cache.get("market_data_LOW") is None
+    assert await service.cache.get("market_data_BAD") is None
@@ -0,0 +1,62 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, text
+from backend.database.db_service import DatabaseService
+
+START = datetime(2024, 1, 2, 9, 15)
+
+
+@pytest.fixture
+def service(tmp_path):
+    return DatabaseService(f"sqlite:///{tmp_path / 'market.db'}")
+
+
+def make_bars(symbols, minutes):
+    stamps = [START + timedelta(minutes=i) for i in range(minutes)]
+    return pd.DataFrame({
+        "symbol": np.repeat(symbols, minutes),
+        "timestamp": stamps * len(symbols),
+        "price": np.tile(np.arange(minutes, dtype=float), len(symbols)) + 100,
+        "volume": 1000.0,
+    })
+
+
+def test_bulk_ingest_and_range_reads(service):
+    bars = make_bars([f"SYM{i}" for i in range(200)], 375)  # one session of 1-minute bars
+    started = time.perf_counter()
+    assert service.save_market_data_bulk(bars) == len(bars)
+    assert time.perf_counter() - started < 30
+
+    frame = service.get_historical_data("SYM7", START + timedelta(minutes=10), START + timedelta(minutes=19))
+    assert len(frame) == 10
+    assert frame["timestamp"].is_monotonic_increasing
+    assert frame["price"].tolist() == [110.0 + i for i in range(10)]
+
+    arrays = service.get_historical_arrays("SYM7", START)
+    assert arrays["price"].dtype == np.float64 and len(arrays["price"]) == 375
+    assert arrays["timestamp"][0] == np.datetime64(START)
+
+
+def test_single_rows_and_epoch_timestamps_still_supported(service):
+    service.save_market_data({"symbol": "ABC", "timestamp": START.timestamp(), "price": 10.0, "volume": 5.0})
+    frame = service.get_historical_data("ABC", START - timedelta(days=1))
+    assert frame["timestamp"].iloc[0] == pd.Timestamp(START)
+
+
+def test_reads_are_parameterized(service):
+    service.save_market_data_bulk(make_bars(["ABC"], 3))
+    assert service.get_historical_data("x' OR '1'='1", START).empty
+
+
+def test_wal_mode_and_composite_index(service):
+    with service.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    indexes = {index["name"]: index["column_names"] for index in inspect(service.engine).get_indexes("market_data")}
+    assert indexes["ix_market_data_symbol_timestamp"] == ["symbol", "timestamp"]
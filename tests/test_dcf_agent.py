@@ -3,8 +3,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 import asyncio
+import numpy as np
 from unittest.mock import AsyncMock, patch, MagicMock # Import patch and MagicMock
 from backend.agents.valuation.dcf_agent import run as dcf_run # Use alias
+from backend.agents.valuation.dcf_agent import draw_dcf_scenarios, simulate_dcf, simulate_dcf_batch, summarize_simulation
 from backend.config.settings import get_settings # Import settings
 
 agent_name = "dcf_agent"
@@ -13,7 +15,7 @@ agent_name = "dcf_agent"
 # Patch dependencies (innermost first)
 @patch('backend.agents.decorators.get_tracker') # Decorator dependency
 @patch('backend.agents.decorators.get_redis_client') # Decorator dependency
-@patch('backend.agents.valuation.dcf_agent.simulate_dcf')
+@patch('backend.agents.valuation.dcf_agent.simulate_dcf_batch')
 @patch('backend.agents.valuation.dcf_agent.fetch_alpha_vantage')
 @patch('backend.agents.valuation.dcf_agent.fetch_price_point')
 async def test_dcf_agent_buy_scenario(
@@ -28,7 +30,7 @@ async def test_dcf_agent_buy_scenario(
     symbol = "TEST_SYMBOL"
     current_price = 100.0
     simulated_intrinsic_value = 150.0 # Value returned by each simulation run
-    n_simulations = 1000 # Match the agent's simulation count
+    n_simulations = get_settings().agent_settings.valuation.DCF_SIMULATION_RUNS # Match the agent's path count
 
     # 1. Mock fetch_price_point
     mock_fetch_price.return_value = {"latestPrice": current_price}
@@ -38,9 +40,9 @@ async def test_dcf_agent_buy_scenario(
     base_eps = 10.0
     beta = 1.1
 
-    # 3. Mock simulate_dcf to return a consistent high value
+    # 3. Mock simulate_dcf_batch to return a consistent high value for every path
     # This makes the mean value predictable (it will be simulated_intrinsic_value)
-    mock_simulate_dcf.return_value = simulated_intrinsic_value
+    mock_simulate_dcf.return_value = np.full(n_simulations, simulated_intrinsic_value)
 
     # 4. Mock Redis
     mock_redis_instance = AsyncMock()
@@ -56,7 +58,7 @@ async def test_dcf_agent_buy_scenario(
     # --- Expected Calculations ---
     # Margin of Safety = (150 - 100) / 100 * 100 = 50.0%
     # Since MoS > 30%, verdict should be STRONG_BUY, base_confidence = 0.9
-    # Since simulate_dcf always returns the same value, std_dev = 0, relative_std_dev = 0
+    # Since every simulated path has the same value, std_dev = 0, relative_std_dev = 0
     # Uncertainty penalty = 0
     # Final confidence = 0.9 * (1 - 0) = 0.9
     expected_verdict = "STRONG_BUY"
@@ -97,11 +99,43 @@ async def test_dcf_agent_buy_scenario(
     # --- Verify Mocks ---
     mock_fetch_price.assert_awaited_once_with(symbol)
     mock_fetch_av.assert_awaited_once_with(symbol, "overview")
-    # Check simulate_dcf was called n_simulations times
-    assert mock_simulate_dcf.call_count == n_simulations 
+    # Check all paths were valued in a single batch
+    assert mock_simulate_dcf.call_count == 1
+    assert len(mock_simulate_dcf.call_args.args[3]) == n_simulations # one discount rate per path
     mock_get_redis.assert_awaited_once()
     mock_redis_instance.get.assert_awaited_once()
     mock_redis_instance.set.assert_awaited_once() # Should cache on success
     mock_get_tracker.assert_called_once() # Check if tracker was fetched
     # Check if tracker status was updated (decorator handles this)
     mock_tracker_instance.update_agent_status.assert_awaited_once()
+
+
+def _loop_dcf(base_eps, growth_rates, discount_rate, terminal_pe):
+    """The per-year loop simulate_dcf used before batching."""
+    current_eps, projected_eps = base_eps, []
+    for g in [growth_rates[0]] * 5 + [growth_rates[1]] * 5:
+        current_eps *= 1 + g
+        projected_eps.append(current_eps)
+    if discount_rate <= growth_rates[2]:
+        return np.nan
+    terminal_value = current_eps * (1 + growth_rates[2]) * terminal_pe / (discount_rate - growth_rates[2])
+    present_values = [eps / ((1 + discount_rate) ** (i + 1)) for i, eps in enumerate(projected_eps)]
+    return sum(present_values) + terminal_value / ((1 + discount_rate) ** len(projected_eps))
+
+
+def test_batch_simulation_matches_the_per_path_loop():
+    rng = np.random.default_rng(3)
+    stage_growth, terminal_growth, discount = draw_dcf_scenarios(500, [0.10, 0.05, 0.025], 0.06, 0.02, 0.02, rng)
+    values = simulate_dcf_batch(8.0, stage_growth, terminal_growth, discount, 15.0)
+    expected = [
+        _loop_dcf(8.0, [*stage_growth[i], terminal_growth[i]], discount[i], 15.0) for i in range(500)
+    ]
+    np.testing.assert_allclose(values, expected, rtol=1e-10, equal_nan=True)
+    assert np.isnan(values).any() and not np.isnan(values).all()  # some paths have discount <= terminal growth
+    assert simulate_dcf(8.0, [0.1, 0.05, 0.02], 0.09, 15.0) == pytest.approx(_loop_dcf(8.0, [0.1, 0.05, 0.02], 0.09, 15.0))
+
+    summary = summarize_simulation(values)
+    valid = values[~np.isnan(values)]
+    assert summary["count"] == len(valid)
+    assert summary["percentiles"][50] == pytest.approx(np.median(valid))
+    assert list(summary["percentiles"]) == [5, 25, 50, 75, 95]
@@ -0,0 +1,110 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.quant.core import QuantCore
+from backend.quant.factor_model import FACTORS, FactorModel, cross_sectional_regression, factor_exposures, get_factor_model
+from backend.utils.cache_utils import InMemoryRedis
+from backend.utils.price_panel import PricePanel
+
+
+def _universe(n_symbols=60, bars=320, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.01, (bars, 1))
+    close = 100 * np.exp(np.cumsum(market + rng.normal(0, 0.015, (bars, n_symbols)) * rng.uniform(0.5, 2, n_symbols), axis=0)).T
+    fundamentals = [{"eps": rng.uniform(-1, 10), "book_value_per_share": rng.uniform(5, 50),
+                     "shares_outstanding": rng.uniform(1e6, 1e9)} for _ in range(n_symbols)]
+    fundamentals[0] = None  # No snapshot: value, size and quality fall back to the mean
+    return close, fundamentals, pd.bdate_range("2023-01-02", periods=bars)
+
+
+def test_batched_regression_matches_lstsq_per_date_and_recovers_planted_returns():
+    close, fundamentals, _ = _universe()
+    exposures = factor_exposures(close, fundamentals, momentum_window=200, momentum_skip=10)
+    assert exposures.shape == (320, 60, len(FACTORS))
+    assert np.all(exposures[:, 0, [0, 2, 3]] == 0) and np.abs(exposures).max() <= 3.0
+    assert np.all(exposures[:200, :, 1] == 0) and np.any(exposures[200:, :, 1] != 0)  # momentum warm-up
+
+    rng = np.random.default_rng(1)
+    planted = rng.normal(0, 0.01, (320, len(FACTORS) + 1))
+    returns = planted[:, 0:1] + np.einsum("tnk,tk->tn", exposures, planted[:, 1:]) + rng.normal(0, 1e-4, (320, 60))
+    returns[5, :55] = np.nan  # Too thin a cross-section to regress
+    returns[6, :3] = np.nan  # Symbols without a return drop out of that date only
+    fit = cross_sectional_regression(returns, exposures)
+
+    assert np.isnan(fit["coefficients"][5]).all()
+    for t in (6, 250, 319):
+        rows = np.isfinite(returns[t])
+        design = np.column_stack([np.ones(rows.sum()), exposures[t, rows]])
+        expected = np.linalg.lstsq(design, returns[t, rows], rcond=None)[0]
+        np.testing.assert_allclose(fit["coefficients"][t], expected, atol=1e-12)
+    np.testing.assert_allclose(fit["coefficients"][250:], planted[250:], atol=1e-4)
+    assert np.nanmin(fit["r_squared"][250:]) > 0.99
+
+
+def test_model_scores_serialise_and_quantcore_uses_the_engine():
+    close, fundamentals, dates = _universe()
+    symbols = [f"S{i}" for i in range(60)]
+    model = FactorModel.fit(close, symbols, dates, fundamentals, momentum_window=200, momentum_skip=10)
+    assert model.factor_returns.shape == (319, len(FACTORS) + 1)
+    assert model.dates[0] == dates[1].date().isoformat()
+
+    scores = model.scores()
+    percentiles = sorted(row["composite_percentile"] for row in scores.values())
+    assert percentiles[0] == pytest.approx(1 / 60, abs=1e-4) and percentiles[-1] == 1.0
+    assert scores["S0"]["exposures"]["value"] == 0.0
+    assert set(model.premia()) == {"market", *FACTORS}
+
+    restored = FactorModel.from_dict(json.loads(json.dumps(model.to_dict())))
+    assert restored.scores() == scores
+    pd.testing.assert_frame_equal(restored.factor_return_frame(), model.factor_return_frame())
+
+    returns = pd.DataFrame(close.T, index=dates, columns=symbols).pct_change()
+    factors = QuantCore.calculate_factors(returns)
+    assert list(factors.columns) == ["market", *FACTORS]
+    assert (factors[["value", "size", "quality"]].abs().to_numpy() < 1e-12).all()  # No fundamentals given
+
+
+@pytest.mark.asyncio
+async def test_factor_model_is_fitted_once_a_day_and_lookups_never_fit():
+    close, fundamentals, dates = _universe(n_symbols=20, bars=120)
+    symbols = [f"S{i}" for i in range(20)]
+    panel = PricePanel(symbols, {"close": close}, dates)
+    service = MagicMock(symbols=(*symbols, "^NSEI"))
+    get_service = AsyncMock(return_value=service)
+    fetch_panel = AsyncMock(return_value=panel)
+    snapshots = dict(zip(symbols, fundamentals))
+
+    with patch("backend.quant.factor_model.get_redis_client", AsyncMock(return_value=InMemoryRedis())), \
+         patch("backend.quant.covariance.get_covariance_service", get_service), \
+         patch("backend.utils.data_provider.fetch_price_panel", fetch_panel), \
+         patch("backend.utils.data_provider.fetch_fundamentals_snapshot", AsyncMock(side_effect=snapshots.get)):
+        assert await get_factor_model() is None  # Not fitted yet: a lookup does not fit
+        model = await get_factor_model(["S3"], fit=True)
+        cached = await get_factor_model()
+        assert await get_factor_model(fit=True) is not None
+
+    assert fetch_panel.await_count == 1
+    assert get_service.await_args.args[0] == ["S3"]
+    assert fetch_panel.await_args.args[0] == symbols  # The market index is not part of the cross-section
+    assert cached.score("S4") == model.score("S4")
+
+
+@pytest.mark.asyncio
+async def test_too_small_a_universe_is_cached_for_the_day():
+    close, _, dates = _universe(n_symbols=5, bars=120)
+    symbols = [f"S{i}" for i in range(5)]
+    fetch_panel = AsyncMock(return_value=PricePanel(symbols, {"close": close}, dates))
+
+    with patch("backend.quant.factor_model.get_redis_client", AsyncMock(return_value=InMemoryRedis())), \
+         patch("backend.quant.covariance.get_covariance_service", AsyncMock(return_value=MagicMock(symbols=tuple(symbols)))), \
+         patch("backend.utils.data_provider.fetch_price_panel", fetch_panel):
+        assert await get_factor_model(fit=True) is None
+        assert await get_factor_model(fit=True) is None
+        assert await get_factor_model() is None
+
+    assert fetch_panel.await_count == 1
@@ -3,7 +3,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 import numpy as np
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 # Correct import path
 from backend.agents.intelligence.factor_score_agent import run as factor_score_run, FactorScoreAgent 
 
@@ -13,7 +13,9 @@ agent_name = "factor_score_agent"
 # Patch the get_market_context method directly on the class prototype
 @patch.object(FactorScoreAgent, 'get_market_context', new_callable=AsyncMock)
 @patch('backend.agents.base.get_redis_client', new_callable=AsyncMock) 
+@patch('backend.agents.intelligence.factor_score_agent.get_factor_model', new_callable=AsyncMock, return_value=None)
 async def test_factor_score_agent_strong_bull(
+    mock_get_factor_model,
     mock_base_get_redis_client, 
     mock_get_market_context
 ):
@@ -94,3 +96,24 @@ async def test_factor_score_agent_strong_bull(
 
     # --- Verify Mocks ---
     mock_get_market_context.assert_awaited_once_with(symbol)
+    mock_get_factor_model.assert_not_awaited()  # Other agents' outputs are scored directly
+
+
+@pytest.mark.asyncio
+@patch.object(FactorScoreAgent, 'get_market_context', new_callable=AsyncMock, return_value={"regime": "BULL"})
+@patch('backend.agents.base.get_redis_client', new_callable=AsyncMock)
+async def test_factor_score_agent_falls_back_to_the_factor_model(mock_base_get_redis_client, mock_get_market_context):
+    row = {
+        "exposures": {"value": 0.5, "momentum": 1.2, "size": -0.3, "quality": 0.1, "low_volatility": 0.4},
+        "composite": 0.031, "composite_percentile": 0.82, "specific_volatility": 0.21,
+    }
+    model = MagicMock()
+    model.score.return_value = row
+    with patch('backend.agents.intelligence.factor_score_agent.get_factor_model', AsyncMock(return_value=model)) as lookup:
+        result = await factor_score_run("TEST_SYMBOL")  # No other agents' outputs, as run by the registry
+
+    lookup.assert_awaited_once_with()
+    assert result['verdict'] == "STRONG_FACTORS"
+    assert result['value'] == pytest.approx(0.82)
+    assert result['details']['factor_scores'] == row["exposures"]
+    assert result['details']['factor_model'] == row
@@ -147,7 +147,7 @@ async def test_rsi_agent_accuracy(
     async def mock_fetch_ohlcv(symbol, start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE):
         # Return a DataFrame with a 'close' column
         return pd.DataFrame({'close': prices})
-    monkeypatch.setattr('backend.agents.technical.rsi_agent.fetch_ohlcv_series', mock_fetch_ohlcv)
+    monkeypatch.setattr('backend.agents.technical.rsi_agent.fetch_technical_ohlcv', mock_fetch_ohlcv)
     # Mock get_market_context as it's called by the agent (needed for adjustments)
     monkeypatch.setattr('backend.agents.technical.rsi_agent.RSIAgent.get_market_context', AsyncMock(return_value={"regime": "NEUTRAL"}))
 
@@ -180,7 +180,7 @@ async def test_macd_agent_accuracy(
     async def mock_fetch_ohlcv(symbol, start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE):
         # Return a DataFrame with a 'close' column
         return pd.DataFrame({'close': extended_prices})
-    monkeypatch.setattr('backend.agents.technical.macd_agent.fetch_ohlcv_series', mock_fetch_ohlcv)
+    monkeypatch.setattr('backend.agents.technical.macd_agent.fetch_technical_ohlcv', mock_fetch_ohlcv)
     # Mock get_market_context as it's called by the agent
     monkeypatch.setattr('backend.agents.technical.macd_agent.MACDAgent.get_market_context', AsyncMock(return_value={"regime": "NEUTRAL"}))
 
@@ -40,7 +40,7 @@ async def test_rsi_agent_precision(
     async def mock_fetch_ohlcv(symbol, start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE):
         # Return a DataFrame with a 'close' column
         return pd.DataFrame({'close': prices})
-    monkeypatch.setattr('backend.agents.technical.rsi_agent.fetch_ohlcv_series', mock_fetch_ohlcv)
+    monkeypatch.setattr('backend.agents.technical.rsi_agent.fetch_technical_ohlcv', mock_fetch_ohlcv)
     # Mock get_market_context as it's called by the agent
     monkeypatch.setattr('backend.agents.technical.rsi_agent.RSIAgent.get_market_context', AsyncMock(return_value={"regime": "NEUTRAL"}))
 
@@ -70,7 +70,7 @@ async def test_macd_agent_precision(
     async def mock_fetch_ohlcv(symbol, start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE):
         # Return a DataFrame with a 'close' column
         return pd.DataFrame({'close': prices})
-    monkeypatch.setattr('backend.agents.technical.macd_agent.fetch_ohlcv_series', mock_fetch_ohlcv)
+    monkeypatch.setattr('backend.agents.technical.macd_agent.fetch_technical_ohlcv', mock_fetch_ohlcv)
     # Mock get_market_context as it's called by the agent
     monkeypatch.setattr('backend.agents.technical.macd_agent.MACDAgent.get_market_context', AsyncMock(return_value={"regime": "NEUTRAL"}))
 
@@ -106,11 +106,19 @@ async def test_beta_and_volatility(monkeypatch):
         else:
             return pd.Series([]) # Return empty for other symbols
 
-    # Patch fetch_price_series where it's used by beta_agent and vol_run
+    # Patch fetch_price_series where it's used by vol_run
     mock_fetch_async = AsyncMock(side_effect=mock_fetch)
-    monkeypatch.setattr('backend.agents.risk.beta_agent.fetch_price_series', mock_fetch_async)
     monkeypatch.setattr('backend.agents.risk.volatility_level_agent.fetch_price_series', mock_fetch_async)
 
+    # beta_agent reads both histories through the shared covariance service
+    from backend.config.settings import get_settings
+    from backend.quant.covariance import CovarianceService
+    from backend.utils.price_panel import PricePanel
+    frames = {'TST': symbol_prices, get_settings().data_provider.MARKET_INDEX_SYMBOL: market_prices}
+    mock_service = AsyncMock(return_value=CovarianceService.from_panel(PricePanel.from_frames(frames)))
+    monkeypatch.setattr('backend.quant.market_model.get_covariance_service', mock_service)
+    monkeypatch.setattr('backend.agents.risk.beta_agent.get_covariance_service', mock_service)
+
     # Run agents
     res_beta = await beta_run('TST')
     # Check for error first, or assert key exists
@@ -23,8 +23,9 @@ def test_health():
     assert resp.status_code in [200, 503]
     # Check if the response is JSON and contains the 'status' key
     try:
-        # Assert status is within the detail dictionary
-        assert "status" in resp.json().get("detail", {})
+        # Unhealthy responses wrap the body in "detail" (HTTPException)
+        body = resp.json()
+        assert "status" in (body.get("detail", {}) if resp.status_code == 503 else body)
     except Exception as e:
         pytest.fail(f"Health endpoint did not return valid JSON or expected structure: {e}\nResponse text: {resp.text}")
 
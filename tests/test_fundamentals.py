@@ -0,0 +1,122 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from backend.data import fundamentals
+from backend.data.fundamentals import FundamentalsSnapshot, get_fundamentals_snapshot, snapshot_cache_key
+from backend.utils import cache_utils, data_provider
+from backend.utils.cache_codec import encode_cache_value
+from backend.utils.cache_utils import InMemoryRedis, set_redis_client
+
+OVERVIEW = {
+    "Symbol": "TEST",
+    "EPS": "5.2",
+    "BookValue": "40",
+    "Beta": "1.1",
+    "RevenueTTM": "1000",
+    "SharesOutstanding": "100",
+    "EBITDA": "200",
+    "EVToEBITDA": "12",
+    "DividendYield": "None",
+}
+
+
+@pytest.fixture
+def redis_client():
+    previous = cache_utils._redis_client
+    client = InMemoryRedis()
+    set_redis_client(client)
+    yield client
+    set_redis_client(previous)
+
+
+def make_provider(overview=OVERVIEW):
+    provider = MagicMock()
+
+    async def fetch_overview(symbol):
+        await asyncio.sleep(0.01)
+        return overview
+
+    provider.fetch_company_overview = AsyncMock(side_effect=fetch_overview)
+    provider.fetch_data_resilient = AsyncMock(return_value={"source": "fallback", "data": {}})
+    provider.fetch_cash_flow_data = AsyncMock(return_value={
+        "annualReports": [{"operatingCashflow": "900", "capitalExpenditures": "-250"}, {"operatingCashflow": "1"}],
+    })
+    provider.fetch_company_info = AsyncMock(return_value={"fcf_per_share": "4.5"})
+    return provider
+
+
+def test_snapshot_from_overview_parses_fields():
+    snapshot = FundamentalsSnapshot.from_overview("TEST", OVERVIEW, "alpha_vantage")
+    assert snapshot.eps == 5.2
+    assert snapshot.book_value_per_share == 40.0
+    assert snapshot.sales_per_share == 10.0  # RevenueTTM / SharesOutstanding
+    assert snapshot.dividend_yield is None
+    assert snapshot.enterprise_value == 2400.0
+    assert snapshot.to_overview()["Beta"] == "1.1"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_agents_share_one_overview_request(redis_client, monkeypatch):
+    provider = make_provider()
+    monkeypatch.setattr(data_provider, "provider", provider)
+
+    eps, book, ev, overview = await asyncio.gather(
+        data_provider.fetch_latest_eps("TEST"),
+        data_provider.fetch_book_value("TEST"),
+        data_provider.fetch_latest_ev("TEST"),
+        data_provider.fetch_alpha_vantage("TEST", "overview"),
+    )
+    assert eps == {"eps": 5.2}
+    assert book == {"book_value": 40.0}
+    assert ev == {"enterprise_value": 2400.0}
+    assert overview["EPS"] == "5.2"
+
+    # Later calls are served from the cached snapshot
+    assert (await data_provider.fetch_latest_bvps("TEST"))["bookValuePerShare"] == 40.0
+    provider.fetch_company_overview.assert_awaited_once_with("TEST")
+    assert await redis_client.ttl(snapshot_cache_key("TEST")) > 300
+
+
+@pytest.mark.asyncio
+async def test_stale_version_is_refetched(redis_client):
+    stale = FundamentalsSnapshot.from_overview("TEST", {"EPS": "1"}, "alpha_vantage").to_dict()
+    stale["version"] = fundamentals.SNAPSHOT_VERSION - 1
+    await redis_client.set(snapshot_cache_key("TEST"), encode_cache_value(stale))
+
+    provider = make_provider()
+    snapshot = await get_fundamentals_snapshot("TEST", provider)
+    assert snapshot.eps == 5.2
+    provider.fetch_company_overview.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_missing_overview_falls_back_and_caches_briefly(redis_client):
+    provider = make_provider(overview=None)
+    provider.fetch_data_resilient.return_value = {"source": "yahoo_finance", "data": {"EPS": 3}}
+
+    snapshot = await get_fundamentals_snapshot("TEST", provider)
+    assert snapshot.source == "yahoo_finance"
+    assert snapshot.eps == 3.0
+    provider.fetch_data_resilient.assert_awaited_once_with("TEST", "company_info")
+
+    provider.fetch_data_resilient.return_value = {"source": "fallback", "data": {}}
+    empty = await get_fundamentals_snapshot("EMPTY", provider)
+    assert empty.is_empty
+    assert 0 < await redis_client.ttl(snapshot_cache_key("EMPTY")) <= 300
+
+
+@pytest.mark.asyncio
+async def test_fcf_per_share_comes_from_the_cash_flow_statement(redis_client, monkeypatch):
+    provider = make_provider()
+    monkeypatch.setattr(data_provider, "provider", provider)
+    assert await data_provider.fetch_fcf_per_share("TEST") == {"fcf_per_share": 6.5}  # (900 - 250) / 100 shares
+    provider.fetch_company_info.assert_not_awaited()
+
+    # Without a usable statement the resilient company-info chain still answers
+    provider.fetch_cash_flow_data.return_value = {}
+    snapshot = await get_fundamentals_snapshot("OTHER", provider)
+    assert snapshot.fcf_per_share == 4.5
+    provider.fetch_company_info.assert_awaited_once_with("OTHER", "fcf_per_share")
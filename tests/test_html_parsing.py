@@ -0,0 +1,55 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from backend.data.providers.unified_provider import UnifiedDataProvider
+from backend.utils.html_parsing import available_parsers, parse_html, parse_off_loop, resolve_parser
+
+PAGE = """
+<html><body>
+  <div class="key-ratios">
+    <div class="ratio-item"><span class="label">P/E</span><span class="value"> 30.0 </span></div>
+    <div class="ratio-item"><span class="label">P/B</span><span class="value">3.<b>0</b></span></div>
+  </div>
+  <fin-streamer data-test="qsp-price">2,456.30</fin-streamer>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_documents_expose_same_selector_api(parser):
+    doc = parse_html(PAGE, parser)
+    items = doc.select(".key-ratios .ratio-item")
+    assert [item.select_one(".label").text for item in items] == ["P/E", "P/B"]
+    assert [item.select_one(".value").text.strip() for item in items] == ["30.0", "3.0"]
+    assert doc.select_one(".missing") is None
+
+
+def test_unavailable_parser_falls_back():
+    assert resolve_parser("no-such-parser") == available_parsers()[0]
+    assert resolve_parser("html.parser") == "html.parser"
+
+
+@pytest.mark.asyncio
+async def test_parse_off_loop_runs_extractor_in_worker_thread():
+    loop_thread = threading.get_ident()
+
+    def extract(doc, selector):
+        return threading.get_ident(), doc.select_one(selector).text
+
+    thread_id, text = await parse_off_loop(PAGE, extract, '[data-test="qsp-price"]', source="test")
+    assert text == "2,456.30"
+    assert thread_id != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_scrape_single_site_extracts_off_loop():
+    provider = UnifiedDataProvider()
+    response = MagicMock(text=PAGE)
+    client = MagicMock()
+    client.get = AsyncMock(return_value=response)
+
+    result = await provider._scrape_single_site(client, "yahoo", "https://example/quote/TEST", "price")
+    assert result == {"price": 2456.3}
@@ -0,0 +1,105 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from backend.quant.indicators import IndicatorSet, TechnicalIndicators, clear_indicator_cache, get_indicators
+from backend.utils.price_frame import PriceFrame
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(7)
+    n = 400
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "open": close * (1 + rng.normal(0, 0.005, n)),
+        "high": close * (1 + rng.uniform(0, 0.02, n)),
+        "low": close * (1 - rng.uniform(0, 0.02, n)),
+        "close": close,
+        "volume": rng.uniform(1e5, 1e6, n),
+    }, index=pd.bdate_range("2023-01-02", periods=n))
+
+
+def test_indicators_match_the_pandas_formulas_bar_for_bar(ohlcv):
+    indicators = IndicatorSet(PriceFrame.from_any(ohlcv))
+    close = ohlcv["close"]
+
+    delta = close.diff()
+    avg_gain = delta.where(delta > 0, 0.0).ewm(com=13, min_periods=14, adjust=False).mean()
+    avg_loss = (-delta.where(delta < 0, 0.0)).ewm(com=13, min_periods=14, adjust=False).mean()
+    np.testing.assert_allclose(indicators.rsi(14), 100 - 100 / (1 + avg_gain / avg_loss), equal_nan=True)
+
+    macd_line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    macd = indicators.macd()
+    np.testing.assert_allclose(macd["macd"], macd_line)
+    np.testing.assert_allclose(macd["signal"], macd_line.ewm(span=9, adjust=False).mean())
+
+    bands = indicators.bollinger(20, 2.0)
+    np.testing.assert_allclose(bands["middle"], close.rolling(20, min_periods=20).mean(), equal_nan=True)
+    np.testing.assert_allclose(bands["std"], close.rolling(20, min_periods=20).std(), equal_nan=True)
+
+    low_min, high_max = ohlcv["low"].rolling(14).min(), ohlcv["high"].rolling(14).max()
+    k = (100 * (close - low_min) / (high_max - low_min).replace(0, np.nan)).fillna(50)
+    stochastic = indicators.stochastic(14, 3)
+    np.testing.assert_allclose(stochastic["k"], k)
+    np.testing.assert_allclose(stochastic["d"], k.rolling(3).mean(), equal_nan=True)
+
+    volume_ratio = ohlcv["volume"] / ohlcv["volume"].rolling(20).mean()
+    np.testing.assert_allclose(indicators.volume_ratio(20), volume_ratio, equal_nan=True)
+
+
+def test_shared_intermediates_and_sets_are_memoised(ohlcv):
+    clear_indicator_cache()
+    first = get_indicators("TCS", ohlcv)
+    assert get_indicators("TCS", ohlcv.copy()) is first  # same symbol and bars
+    assert get_indicators("TCS", ohlcv.iloc[:-1]) is not first  # a new bar is a new set
+    assert get_indicators("INFY", ohlcv) is not first
+
+    atr = first.atr(14)
+    first.adx(14)
+    assert first.atr(14) is atr
+    assert first.bollinger()["middle"] is first.sma(20)
+
+
+def test_calculate_all_runs_end_to_end(ohlcv):
+    results = TechnicalIndicators.calculate_all(ohlcv)
+    assert {"rsi", "macd", "bollinger", "atr", "adx", "stochastic", "volume_ratio", "hurst", "half_life"} <= set(results)
+    assert np.isfinite(results["half_life"]) and np.isfinite(results["hurst"])
+
+
+def _legacy_supertrend(df, period, multiplier):
+    """The per-row pandas loop SupertrendAgent used before the kernel."""
+    df = df.copy()
+    df["tr"] = pd.DataFrame({
+        "hl": df["high"] - df["low"],
+        "hc": abs(df["high"] - df["close"].shift(1)),
+        "lc": abs(df["low"] - df["close"].shift(1)),
+    }).max(axis=1)
+    df["atr"] = df["tr"].rolling(period).mean()
+    hl2 = (df["high"] + df["low"]) / 2
+    df["upper_band"] = hl2 + multiplier * df["atr"]
+    df["lower_band"] = hl2 - multiplier * df["atr"]
+    df["supertrend"] = df["upper_band"]
+    df["uptrend"] = True
+    for i in range(period, len(df)):
+        curr, prev = df.iloc[i], df.iloc[i - 1]
+        if curr["close"] > prev["upper_band"]:
+            df.loc[df.index[i], "uptrend"] = True
+        elif curr["close"] < prev["lower_band"]:
+            df.loc[df.index[i], "uptrend"] = False
+        else:
+            df.loc[df.index[i], "uptrend"] = prev["uptrend"]
+        band = "lower_band" if df.loc[df.index[i], "uptrend"] else "upper_band"
+        df.loc[df.index[i], "supertrend"] = df.loc[df.index[i], band]
+    return df
+
+
+@pytest.mark.parametrize("period, multiplier", [(10, 0.5), (12, 1.0), (7, 1.5)])
+def test_supertrend_matches_the_row_loop_bar_for_bar(ohlcv, period, multiplier):
+    reference = _legacy_supertrend(ohlcv, period, multiplier)
+    result = IndicatorSet(PriceFrame.from_any(ohlcv)).supertrend(period, multiplier)
+    np.testing.assert_allclose(result["supertrend"], reference["supertrend"], equal_nan=True)
+    np.testing.assert_array_equal(result["uptrend"], reference["uptrend"].to_numpy(dtype=bool))
+    assert result["uptrend"].any() and not result["uptrend"].all()
@@ -0,0 +1,78 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from backend.quant.indicators import IndicatorSet
+from backend.quant.panel import compute_indicators_panel, latest_frame
+from backend.utils.price_panel import PricePanel
+
+
+def _ohlcv(seed: int, n: int, start: str) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "high": close * (1 + rng.uniform(0, 0.02, n)),
+        "low": close * (1 - rng.uniform(0, 0.02, n)),
+        "close": close,
+        "volume": rng.uniform(1e5, 1e6, n),
+    }, index=pd.bdate_range(start, periods=n))
+
+
+@pytest.fixture
+def frames():
+    return {
+        "TCS": _ohlcv(1, 300, "2024-01-01"),
+        "INFY": _ohlcv(2, 300, "2024-01-01").drop(pd.bdate_range("2024-06-03", periods=3)),  # suspended
+        "IPO": _ohlcv(3, 300, "2024-01-01").iloc[180:],  # listed later
+    }
+
+
+def test_panel_aligns_listings_and_fills_gaps(frames):
+    panel = PricePanel.from_frames(frames)
+    assert panel.symbols == ("TCS", "INFY", "IPO") and panel.bars == 300
+    ipo, infy = panel.row("IPO"), panel.row("INFY")
+    assert np.isnan(panel.close[ipo, :180]).all() and not np.isnan(panel.close[ipo, 180:]).any()
+    gap = panel.index.get_indexer(pd.bdate_range("2024-06-03", periods=3))
+    assert (panel.close[infy, gap] == panel.close[infy, gap[0] - 1]).all()
+    assert (panel.volume[infy, gap] == 0).all()
+    assert len(panel.frame("IPO")) == 120
+
+
+def test_panel_rows_match_the_single_symbol_engine(frames):
+    panel = PricePanel.from_frames(frames)
+    results = compute_indicators_panel(panel, ["rsi", "macd", "bollinger", "adx", "stochastic", "atr"])
+    for symbol in panel.symbols:
+        row = panel.row(symbol)
+        single = IndicatorSet(panel.frame(symbol))
+        bars = len(single)
+        np.testing.assert_allclose(results["rsi"][row, -bars:], single.rsi(14), equal_nan=True)
+        np.testing.assert_allclose(results["macd"]["signal"][row, -bars:], single.macd()["signal"], equal_nan=True)
+        np.testing.assert_allclose(results["bollinger"]["upper"][row, -bars:], single.bollinger()["upper"], equal_nan=True)
+        np.testing.assert_allclose(results["adx"]["adx"][row, -bars:], single.adx(14)["adx"], equal_nan=True)
+        np.testing.assert_allclose(results["stochastic"]["d"][row, -bars:], single.stochastic()["d"], equal_nan=True)
+        np.testing.assert_allclose(results["atr"][row, -bars:], single.atr(14), equal_nan=True)
+        assert np.isnan(results["rsi"][row, :-bars]).all()
+
+
+def test_spec_supports_named_variants_crossovers_and_momentum(frames):
+    panel = PricePanel.from_frames(frames)
+    results = compute_indicators_panel(panel, {
+        "rsi_fast": {"kind": "rsi", "period": 7},
+        "sma_cross": {"fast": 5, "slow": 20},
+        "momentum": {"lookbacks": [21, None]},
+    })
+    close = frames["TCS"]["close"]
+    spread = close.rolling(5).mean() - close.rolling(20).mean()
+    crossed_up = (spread > 0) & (spread.shift() <= 0)
+    tcs = panel.row("TCS")
+    np.testing.assert_array_equal(results["sma_cross"]["cross"][tcs] == 1, crossed_up.to_numpy())
+    np.testing.assert_allclose(results["momentum"][21][tcs], close.pct_change(21), equal_nan=True)
+
+    latest = latest_frame(results, panel)
+    assert latest.loc["IPO", "momentum.window"] == pytest.approx(frames["IPO"]["close"].iloc[-1] / frames["IPO"]["close"].iloc[0] - 1)
+    assert {"rsi_fast", "sma_cross.cross", "momentum.21"} <= set(latest.columns)
+
+    with pytest.raises(ValueError):
+        compute_indicators_panel(panel, ["ichimoku"])
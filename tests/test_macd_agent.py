@@ -4,7 +4,6 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import pytest
 import pandas as pd
 import numpy as np
-import datetime
 from unittest.mock import AsyncMock, patch, MagicMock
 from backend.agents.technical.macd_agent import run as macd_run, MACDAgent # Import run and the class
 
@@ -14,19 +13,13 @@ agent_name = "macd_agent"
 @patch('backend.agents.base.get_redis_client', new_callable=AsyncMock)      # For AgentBase.initialize
 @patch('backend.agents.decorators.get_redis_client', new_callable=AsyncMock) # For @cache_agent_result decorator
 # Patch dependencies (innermost first)
-# Patch datetime used by the agent (for datetime.date.today(), timedelta, etc.)
-@patch('backend.agents.technical.macd_agent.datetime')
 # Patch the get_market_context method directly on the class prototype
 @patch.object(MACDAgent, 'get_market_context')
 # Patch the data fetching function used by the agent
-@patch('backend.agents.technical.macd_agent.fetch_ohlcv_series')
-# Patch the pandas EWM calculation
-@patch('pandas.core.window.ewm.ExponentialMovingWindow.mean')
+@patch('backend.agents.technical.macd_agent.fetch_technical_ohlcv')
 async def test_macd_agent_buy_signal(
-    mock_ewm_mean,                   # Corresponds to @patch('pandas.core.window.ewm.ExponentialMovingWindow.mean')
-    mock_fetch_ohlcv,                # Corresponds to @patch('backend.agents.technical.macd_agent.fetch_ohlcv_series')
+    mock_fetch_ohlcv,                # Corresponds to @patch('backend.agents.technical.macd_agent.fetch_technical_ohlcv')
     mock_get_market_context,         # Corresponds to @patch.object(MACDAgent, 'get_market_context')
-    mock_datetime_in_agent,          # Corresponds to @patch('backend.agents.technical.macd_agent.datetime')
     mock_decorator_get_redis_client, # Corresponds to @patch('backend.agents.decorators.get_redis_client', ...)
     mock_base_get_redis_client       # Corresponds to @patch('backend.agents.base.get_redis_client', ...)
 ):
@@ -34,44 +27,17 @@ async def test_macd_agent_buy_signal(
     symbol = "TEST_SYMBOL"
     market_regime = "BULL"
     
-    # Use real datetime for test setup, but mock what the agent sees
-    real_datetime_date_class = datetime.date
-    real_datetime_timedelta_class = datetime.timedelta
-
-    mock_today_date_object = real_datetime_date_class(2025, 5, 2)
-
-    # Configure datetime.date.today() as seen by the agent
-    # The agent calls datetime.date.today()
-    mock_datetime_in_agent.date.today.return_value = mock_today_date_object
-
-    # Ensure timedelta and datetime.datetime are available if the agent uses them via the mocked datetime module
-    mock_datetime_in_agent.timedelta = real_datetime_timedelta_class
-    # If agent uses datetime.datetime.strptime or other datetime.datetime methods:
-    mock_datetime_in_agent.datetime = datetime.datetime 
-
     # 1. Mock fetch_ohlcv_series
     # Create a dummy DataFrame with a 'close' column
     data_df = pd.DataFrame({'close': np.linspace(100, 110, 35)}) # Need enough data for EWM
     mock_fetch_ohlcv.return_value = data_df
 
-    # 2. Mock EWM calculations to produce BUY signal
-    # We need macd > signal and histogram > 0
-    # Let macd = 1.5, signal = 1.0 => histogram = 0.5
-    # Let exp1.iloc[-1] = 11.5
-    # Let exp2.iloc[-1] = 10.0 => macd = 1.5
-    # Let signal_calc_input = macd (which is exp1 - exp2)
-    # Let signal_calc_output.iloc[-1] = 1.0 => hist = 0.5
-
-    # Return actual pd.Series with the desired final value
-    # The agent code performs subtraction on the Series, then uses iloc[-1]
-    mock_exp1_series = pd.Series([11.5]) # Series with the final value
-    mock_exp2_series = pd.Series([10.0]) # Series with the final value
-    # The signal line calculation takes the macd series as input
-    # Mock the result of the signal line's .mean() call
-    mock_signal_series = pd.Series([1.0]) # Series with the final signal value
-
-    # The order matters: exp1, exp2, signal
-    mock_ewm_mean.side_effect = [mock_exp1_series, mock_exp2_series, mock_signal_series]
+    # 2. Reference MACD from the pandas formulas the indicator engine replaces
+    # A steady uptrend keeps the MACD line above its signal line
+    exp1 = data_df['close'].ewm(span=12, adjust=False).mean()
+    exp2 = data_df['close'].ewm(span=26, adjust=False).mean()
+    macd_line = exp1 - exp2
+    signal_line = macd_line.ewm(span=9, adjust=False).mean()
 
     # 3. Mock get_market_context
     mock_get_market_context.return_value = {"regime": market_regime}
@@ -84,15 +50,14 @@ async def test_macd_agent_buy_signal(
     mock_base_get_redis_client.return_value = mock_redis_instance
 
     # --- Expected Calculations ---
-    # Based on mocked means: macd = 11.5 - 10.0 = 1.5, signal = 1.0, hist = 0.5
-    # Since macd > signal and hist > 0 => verdict = BUY
+    # macd > signal and hist > 0 => verdict = BUY
     # Base confidence = 0.8
     # Confidence adjusted for BULL regime (assuming adjust_for_market_regime increases it)
     # We will assert confidence > 0.5 without mocking the adjustment function itself.
     expected_verdict = "BUY"
-    expected_macd_value = 1.5
-    expected_signal_value = 1.0
-    expected_hist_value = 0.5
+    expected_macd_value = round(macd_line.iloc[-1], 4)
+    expected_signal_value = round(signal_line.iloc[-1], 4)
+    expected_hist_value = round(macd_line.iloc[-1] - signal_line.iloc[-1], 4)
 
     # --- Run Agent ---
     # The run function creates an instance, so patching the class method works.
@@ -116,14 +81,7 @@ async def test_macd_agent_buy_signal(
     assert details['market_regime'] == market_regime
 
     # --- Verify Mocks ---
-    # Calculate expected dates based on the mocked today's date
-    end_date = mock_today_date_object # Use the object used for mocking
-    start_date = end_date - real_datetime_timedelta_class(days=365) # Use real timedelta for test calculation
-    mock_fetch_ohlcv.assert_awaited_once_with(symbol, start_date=start_date, end_date=end_date)
-    # Check ewm().mean() calls
-    assert mock_ewm_mean.call_count == 3
-    # iloc[-1] is called *after* subtraction in the agent code, so we don't verify it on the mocks directly.
-    # Instead, we rely on the assertions on the final 'result' dictionary.
+    mock_fetch_ohlcv.assert_awaited_once_with(symbol)
     mock_get_market_context.assert_awaited_once_with(symbol)
     mock_decorator_get_redis_client.assert_awaited_once() # Verify decorator Redis mock
     mock_base_get_redis_client.assert_awaited_once()      # Verify base Redis mock
@@ -145,7 +103,7 @@ async def test_macd_agent_schema(mock_decorator_get_redis_client, mock_base_get_
     mock_base_get_redis_client.return_value = mock_redis_instance
 
     # Mock dependencies for schema test to avoid actual calculation/fetching
-    with patch('backend.agents.technical.macd_agent.fetch_ohlcv_series', new_callable=AsyncMock) as mock_fetch, \
+    with patch('backend.agents.technical.macd_agent.fetch_technical_ohlcv', new_callable=AsyncMock) as mock_fetch, \
          patch.object(MACDAgent, 'get_market_context', new_callable=AsyncMock) as mock_context:
         
         # Provide minimal valid return values for mocks
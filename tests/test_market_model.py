@@ -0,0 +1,63 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+from backend.config.settings import get_settings
+from backend.quant.covariance import CovarianceService
+from backend.quant.market_model import get_market_model, index_regression
+from backend.utils.cache_utils import InMemoryRedis
+from backend.utils.price_panel import PricePanel
+
+
+def test_batch_regression_matches_per_symbol_fits():
+    rng = np.random.default_rng(5)
+    market = rng.normal(0, 0.01, 250)
+    returns = market * np.array([[0.5], [1.0], [1.6]]) + rng.normal(0, 0.004, (3, 250))
+    returns[2, :100] = np.nan  # late listing
+
+    result = index_regression(returns, market, window=200)
+    for row in range(3):
+        y, x = pd.Series(returns[row, -200:]), pd.Series(market[-200:])
+        mask = y.notna()
+        slope, intercept = np.polyfit(x[mask], y[mask], 1)
+        residuals = y[mask] - (intercept + slope * x[mask])
+        assert result["beta"][row] == pytest.approx(y.cov(x) / x[mask].var())
+        assert result["beta"][row] == pytest.approx(slope)
+        assert result["alpha"][row] == pytest.approx(intercept, abs=1e-12)
+        assert result["correlation"][row] == pytest.approx(y.corr(x))
+        assert result["r_squared"][row] == pytest.approx(y.corr(x) ** 2)
+        assert result["idiosyncratic_vol"][row] == pytest.approx(np.sqrt((residuals ** 2).sum() / (mask.sum() - 2) * 252))
+    np.testing.assert_array_equal(result["observations"], [200, 200, 150])
+    assert np.isnan(index_regression(returns[:, :2], market[:2])["beta"]).all()  # too few bars
+
+
+@pytest.mark.asyncio
+async def test_market_model_table_is_built_once_and_cached():
+    index_symbol = get_settings().data_provider.MARKET_INDEX_SYMBOL
+    rng = np.random.default_rng(9)
+    dates = pd.bdate_range("2024-01-01", periods=300)
+    market = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+    frames = {
+        index_symbol: pd.Series(market, index=dates),
+        "LOW": pd.Series(market ** 0.5, index=dates),
+        "HIGH": pd.Series(market ** 1.5 * np.exp(rng.normal(0, 0.002, 300)), index=dates),
+    }
+    service = AsyncMock(return_value=CovarianceService.from_panel(PricePanel.from_frames(frames), halflife=60))
+    redis_client = InMemoryRedis()
+
+    with patch("backend.quant.market_model.get_covariance_service", service), \
+         patch("backend.quant.market_model.get_redis_client", AsyncMock(return_value=redis_client)):
+        first = await get_market_model(["HIGH", "MISSING"])
+        second = await get_market_model(["LOW", "HIGH"])
+
+    assert service.await_count == 1  # LOW was answered from the cached table
+    assert first["MISSING"] is None
+    assert second["HIGH"] == first["HIGH"]
+    assert second["LOW"]["beta_252d"] == pytest.approx(0.5, abs=0.01)
+    assert first["HIGH"]["beta_60d"] == pytest.approx(1.5, abs=0.05)
+    assert first["HIGH"]["correlation_30d"] > 0.95
+    assert first["HIGH"]["beta_ewm"] == pytest.approx(first["HIGH"]["beta_252d"], abs=0.05)
+    assert first["HIGH"]["observations_252d"] == 252
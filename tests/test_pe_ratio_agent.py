@@ -96,4 +96,39 @@ async def test_pe_ratio_agent(
     assert result['details']['current_price'] == pytest.approx(current_price)
     assert 'percentile_rank' in result['details']
     # Expect low percentile rank because 20 is below the 22-28 range
-    assert result['details']['percentile_rank'] < 20 # Adjust threshold based on agent settings if needed
\ No newline at end of file
+    assert result['details']['percentile_rank'] < 20 # Adjust threshold based on agent settings if needed
+
+@pytest.mark.asyncio
+@patch('backend.agents.decorators.get_tracker')
+@patch('backend.agents.decorators.get_redis_client')
+@patch('backend.agents.valuation.pe_ratio_agent.fetch_historical_price_series')
+@patch('backend.agents.valuation.pe_ratio_agent.fetch_latest_eps')
+@patch('backend.agents.valuation.pe_ratio_agent.fetch_price_point')
+async def test_pe_ratio_agent_uses_the_cached_sketch_when_no_new_bars(
+    mock_fetch_price, mock_fetch_eps, mock_fetch_hist, mock_get_redis, mock_get_tracker
+):
+    from backend.config.settings import get_settings
+    from backend.quant.sketches import RollingQuantileSketch, save_quantile_sketch
+    from backend.utils.cache_utils import InMemoryRedis
+
+    symbol = 'TEST_PE_SKETCH'
+    mock_fetch_price.return_value = {"latestPrice": 200.0}
+    mock_fetch_eps.return_value = {"eps": 10.0}
+    # Weekend or holiday: nothing since the sketch's last bar
+    mock_fetch_hist.return_value = pd.Series(dtype=float)
+    mock_get_redis.return_value = AsyncMock(get=AsyncMock(return_value=None))
+    mock_get_tracker.return_value = AsyncMock()
+
+    window_days = get_settings().agent_settings.pe_ratio.HISTORICAL_YEARS * 365
+    dates = pd.bdate_range(end=datetime.now() - timedelta(days=3), periods=500)
+    sketch = RollingQuantileSketch.from_series(dates, np.linspace(220, 280, len(dates)), window_days)
+    cache = InMemoryRedis()
+    await save_quantile_sketch(cache, f"prices:{symbol}", sketch)
+
+    with patch('backend.agents.valuation.pe_ratio_agent.get_redis_client', AsyncMock(return_value=cache)):
+        result = await pe_run(symbol)
+
+    assert mock_fetch_hist.call_args.kwargs['start_date'] == dates[-1].strftime("%Y-%m-%d")
+    assert result['verdict'] == 'UNDERVALUED_REL_HIST'
+    assert result['details']['historical_mean_pe'] == pytest.approx(25.0)
+    assert result['details']['data_source'] == "calculated_fundamental + historical_prices"
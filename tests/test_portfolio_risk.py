@@ -0,0 +1,91 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.agents.intelligence.portfolio_risk_simulator import run as risk_run
+from backend.quant import risk
+from backend.quant.risk import PortfolioRiskEngine
+from backend.utils.price_panel import PricePanel
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(5)
+    n_assets, n_bars = 40, 300
+    market = rng.normal(0, 0.01, n_bars)
+    returns = rng.uniform(0.5, 1.5, (n_assets, 1)) * market + rng.normal(0, 0.012, (n_assets, n_bars))
+    close = 100 * np.exp(np.cumsum(returns, axis=1))
+    index = pd.bdate_range("2025-01-01", periods=n_bars)
+    return PricePanel.from_frames({f"S{i}": pd.Series(close[i], index=index) for i in range(n_assets)})
+
+
+def test_historical_and_parametric_match_their_definitions(panel):
+    weights = np.linspace(1, 2, len(panel))
+    weights /= weights.sum()
+    engine = PortfolioRiskEngine(panel, weights)
+    log_returns = np.diff(np.log(panel.close), axis=1)
+    portfolio = weights @ log_returns
+
+    historical = engine.historical_var(0.95)
+    assert historical["var"] == pytest.approx(np.percentile(portfolio, 5))
+    assert historical["cvar"] == pytest.approx(portfolio[portfolio <= historical["var"]].mean())
+
+    mean, volatility = portfolio.mean(), portfolio.std(ddof=1)
+    parametric = engine.parametric_var(0.99, horizon=10)
+    assert parametric["var"] == pytest.approx(10 * mean + norm.ppf(0.01) * volatility * np.sqrt(10))
+
+    contributions = engine.var_contributions(0.95)
+    assert contributions["component_var"].sum() == pytest.approx(engine.parametric_var(0.95)["var"])
+    assert contributions["percent_contribution"].sum() == pytest.approx(1.0)
+
+
+def test_monte_carlo_converges_to_parametric_and_reuses_the_covariance(panel):
+    risk.clear_covariance_cache()
+    engine = PortfolioRiskEngine(panel)
+    simulated = engine.monte_carlo_var(0.95, n_paths=40_000, seed=11, batch_size=7_000)
+    parametric = engine.parametric_var(0.95)
+    assert simulated["var"] == pytest.approx(parametric["var"], rel=0.03)
+    assert simulated["cvar"] == pytest.approx(parametric["cvar"], rel=0.03)
+    assert simulated["component_cvar"].sum() == pytest.approx(simulated["cvar"])
+    assert engine.monte_carlo_var(0.95, n_paths=5_000, seed=3)["var"] == engine.monte_carlo_var(0.95, n_paths=5_000, seed=3)["var"]
+
+    reweighted = PortfolioRiskEngine(panel, np.full(len(panel), 2.0 / len(panel)))
+    assert reweighted.estimate is engine.estimate  # same window, no re-estimation
+    assert reweighted.parametric_var()["var"] == pytest.approx(2 * parametric["var"])
+
+
+def test_singular_covariance_still_factorises():
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (30, 21)), axis=1))  # 30 assets, 20 returns
+    engine = PortfolioRiskEngine(PricePanel([f"S{i}" for i in range(30)], {"close": close}))
+    factor = engine.estimate.factor
+    np.testing.assert_allclose(factor @ factor.T, engine.estimate.covariance, atol=1e-8)
+    assert np.isfinite(engine.monte_carlo_var(n_paths=2_000, seed=1)["var"])
+
+
+@pytest.mark.asyncio
+@patch('backend.agents.intelligence.portfolio_risk_simulator.tracker', new=MagicMock())
+@patch('backend.agents.intelligence.portfolio_risk_simulator.fetch_price_panel', new_callable=AsyncMock)
+@patch('backend.agents.intelligence.portfolio_risk_simulator.get_redis_client', new_callable=AsyncMock)
+async def test_portfolio_risk_simulator_reports_all_methods(mock_get_redis_client, mock_fetch_panel, panel):
+    mock_redis_instance = AsyncMock()
+    mock_redis_instance.get.return_value = None
+    mock_get_redis_client.return_value = mock_redis_instance
+    mock_fetch_panel.return_value = panel
+
+    symbols = list(panel.symbols) + ["MISSING"]
+    res = await risk_run(symbols, weights=[1.0] * len(symbols))
+
+    mock_fetch_panel.assert_awaited_once()
+    assert res["verdict"] in ("LOW_RISK", "MEDIUM_RISK", "HIGH_RISK")
+    assert set(res["value"]) == {"VaR95", "CVaR95"}
+    details = res["details"]
+    assert details["skipped"] == ["MISSING"] and details["positions"] == len(panel)
+    assert {"historical", "parametric", "monte_carlo"} <= set(details)
+    assert details["monte_carlo"]["CVaR"] <= details["monte_carlo"]["VaR"] < 0
+    assert len(details["top_contributors"]) == 10
+    mock_redis_instance.set.assert_awaited_once()
@@ -0,0 +1,83 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+from backend.utils.price_frame import PriceFrame
+
+INDEX = pd.date_range("2024-01-01", periods=5, freq="D")
+
+
+@pytest.mark.parametrize("data", [
+    pd.DataFrame({"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": [10, 11, 12, 13, 14], "Volume": 100}, index=INDEX),
+    pd.DataFrame({"date": INDEX, "close": [10, 11, 12, 13, 14]}),
+    pd.Series([10.0, 11, 12, 13, 14], index=INDEX),
+    np.column_stack([np.ones(5), np.ones(5), np.ones(5), [10, 11, 12, 13, 14], np.ones(5)]),
+    [10, 11, 12, 13, 14],
+])
+def test_every_provider_shape_normalises_to_float64_close(data):
+    frame = PriceFrame.from_any(data)
+    assert frame.close.dtype == np.float64 and frame.close.flags.c_contiguous
+    np.testing.assert_array_equal(frame.close, [10, 11, 12, 13, 14])
+    if frame.has_index:
+        assert frame.index.equals(INDEX)
+
+
+def test_columns_are_read_only_views_and_derived_series_are_memoised():
+    series = pd.Series([100.0, 110.0, 99.0], index=INDEX[:3])
+    frame = PriceFrame.from_any(series)
+    assert np.shares_memory(frame.close, series.to_numpy())
+    with pytest.raises(ValueError):
+        frame.close[0] = 1.0
+    np.testing.assert_allclose(frame.returns, [0.1, -0.1])
+    np.testing.assert_allclose(frame.log_returns, np.log([1.1, 0.9]))
+    assert frame.returns is frame.returns
+    assert not frame.returns.flags.writeable
+    assert PriceFrame.from_any(frame) is frame
+
+
+def test_non_numeric_rows_are_dropped_with_their_dates():
+    frame = PriceFrame.from_any(pd.Series(["10", "bad", 12, None, 14], index=INDEX))
+    np.testing.assert_array_equal(frame.close, [10, 12, 14])
+    assert list(frame.index) == [INDEX[0], INDEX[2], INDEX[4]]
+    assert frame.tail(2).last == 14 and len(frame.tail(0)) == 0
+    assert PriceFrame.from_any(None).empty
+
+
+def test_aligned_returns_use_common_dates():
+    stock = PriceFrame.from_any(pd.Series([1.0, 2.0, 4.0, 8.0], index=INDEX[:4]))
+    market = PriceFrame.from_any(pd.Series([10.0, 11.0, 12.1], index=INDEX[1:4]))
+    mine, theirs = stock.aligned_returns(market)
+    np.testing.assert_allclose(mine, [1.0, 1.0])
+    np.testing.assert_allclose(theirs, [0.1, 0.1])
+
+
+@pytest.mark.asyncio
+async def test_var_and_correlation_agents_consume_price_frames():
+    from backend.agents.market.correlation_agent import run as correlation_run
+    from backend.agents.risk.var_agent import run as var_run
+    from backend.quant.covariance import CovarianceService
+    from backend.utils.price_panel import PricePanel
+
+    rng = np.random.default_rng(1)
+    index = pd.bdate_range("2024-01-01", periods=120)
+    market = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 120)))
+    stock = market * np.exp(rng.normal(0, 0.001, 120))
+    frames = {"ABC": PriceFrame.from_any(pd.Series(stock, index=index)),
+              "^NSEI": PriceFrame.from_any(pd.Series(market, index=index))}
+    fetch = AsyncMock(side_effect=lambda symbol, *args, **kwargs: frames[symbol])
+    service = AsyncMock(return_value=CovarianceService.from_panel(PricePanel.from_frames(frames), halflife=30))
+
+    with patch("backend.agents.risk.var_agent.fetch_price_frame", fetch), \
+         patch("backend.quant.market_model.get_covariance_service", service):
+        var_result = await var_run("ABC", {})
+        corr_result = await correlation_run("ABC", {})
+
+    expected_var = -np.percentile(np.diff(np.log(stock)), 5) * 100
+    assert var_result["value"] == pytest.approx(round(expected_var, 2))
+    assert var_result["details"]["calculation_period_days"] == 120
+    assert corr_result["verdict"] == "HIGH_CORRELATION"
+    assert corr_result["value"] > 0.9
+    assert corr_result["details"]["correlation_ewm"] > 0.9
@@ -0,0 +1,117 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from backend.quant.sketches import RollingQuantileSketch, TDigest, load_quantile_sketch, refresh_quantile_sketch
+from backend.utils.cache_codec import decode_cache_value, encode_cache_value
+from backend.utils.cache_utils import InMemoryRedis
+
+
+def test_digest_quantiles_track_numpy_and_merging_keeps_exact_moments():
+    rng = np.random.default_rng(0)
+    returns = rng.standard_t(4, 5000) * 0.01
+    digest = TDigest()
+    digest.extend(returns)
+    assert len(digest.means) < 250
+    ordered = np.sort(returns)
+    for q in (0.001, 0.01, 0.05, 0.5, 0.95, 0.99):
+        rank_error = abs(np.searchsorted(ordered, digest.quantile(q)) - q * len(returns))
+        assert rank_error <= (3 if q != 0.5 else 10)  # out of 5000; tightest in the tails
+    for value in (-0.03, 0.0, 0.004):
+        assert digest.percentile_rank(value) == pytest.approx(stats.percentileofscore(returns, value), abs=0.2)
+
+    year = TDigest()
+    year.extend(returns[:252])  # A year of daily returns keeps its VaR tails exact
+    assert year.quantile(0.01) == np.percentile(returns[:252], 1)
+    assert year.quantile(0.05) == np.percentile(returns[:252], 5)
+
+    halves = [TDigest(), TDigest()]
+    halves[0].extend(returns[:2000])
+    halves[1].extend(returns[2000:])
+    merged = TDigest.merge(halves)
+    assert merged.mean == pytest.approx(returns.mean()) and merged.std == pytest.approx(returns.std(ddof=1))
+    assert abs(np.searchsorted(ordered, merged.quantile(0.01)) - 50) <= 3
+
+    short = TDigest()
+    short.extend([8, 9, 10, 11, 12, 10])
+    assert short.percentile_rank(10) == stats.percentileofscore([8, 9, 10, 11, 12, 10], 10, kind="rank")
+    assert short.quantile(0.3) == np.percentile([8, 9, 10, 11, 12, 10], 30)
+
+
+def test_rolling_window_drops_old_buckets_and_survives_serialisation():
+    dates = pd.bdate_range("2020-01-01", periods=800)
+    values = np.arange(800, dtype=float)
+    sketch = RollingQuantileSketch.from_series(dates, values, window_days=365, bucket_days=30)
+    in_window = values[dates >= dates[-1] - pd.Timedelta(days=365)]
+    # Exact to within one bucket of bars at the old end
+    assert len(in_window) <= sketch.count <= len(in_window) + 25
+    assert sketch.quantile(1.0) == values[-1]
+
+    restored = RollingQuantileSketch.from_state(decode_cache_value(encode_cache_value(sketch.to_state())))
+    assert restored.quantile(0.05) == sketch.quantile(0.05)
+    assert restored.update_from_series(dates, values) == 0
+    more = pd.bdate_range(dates[-1] + pd.Timedelta(days=1), periods=3)
+    assert restored.update_from_series(more, [1000.0, 1001.0, 1002.0]) == 3
+    assert restored.quantile(1.0) == 1002.0
+
+
+@pytest.mark.asyncio
+async def test_cached_sketch_extends_with_new_bars_and_rebuilds_on_changed_history():
+    cache = InMemoryRedis()
+    dates = pd.bdate_range("2024-01-01", periods=200)
+    prices = np.linspace(100, 120, 200)
+    sketch = await refresh_quantile_sketch(cache, "prices:XYZ", dates[:150], prices[:150], window_days=365)
+    assert sketch.count == 150
+
+    # Only the recent bars, overlapping the last one the sketch saw
+    extended = await refresh_quantile_sketch(cache, "prices:XYZ", dates[149:], prices[149:], window_days=365)
+    assert extended.count == 200 and (await load_quantile_sketch(cache, "prices:XYZ")).count == 200
+
+    halved = prices / 2  # e.g. a 2:1 split adjustment restates the history
+    rebuilt = await refresh_quantile_sketch(cache, "prices:XYZ", dates, halved, window_days=365)
+    assert rebuilt.count == 200 and rebuilt.quantile(1.0) == pytest.approx(60.0)
+
+
+@pytest.mark.asyncio
+async def test_var_agent_fetches_only_bars_after_its_cached_sketch():
+    from unittest.mock import AsyncMock, patch
+    from backend.agents.risk.var_agent import run as var_run
+    from backend.utils.price_frame import PriceFrame
+
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=300)
+    history = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300))), index=dates)
+    available = {"bars": history.iloc[:-5]}
+
+    async def fetch(symbol, source_preference=None, period="1y"):
+        bars = available["bars"]
+        if period.endswith("d"):
+            bars = bars[bars.index >= pd.Timestamp.now().normalize() - pd.Timedelta(days=int(period[:-1]))]
+        return PriceFrame.from_any(bars)
+
+    async def run_var(cache, fetcher):
+        with patch("backend.agents.decorators.get_redis_client", AsyncMock(return_value=AsyncMock(get=AsyncMock(return_value=None)))), \
+                patch("backend.agents.risk.var_agent.get_redis_client", AsyncMock(return_value=cache)), \
+                patch("backend.agents.risk.var_agent.fetch_price_frame", fetcher):
+            return await var_run("VARX", {})
+
+    cache, fetcher = InMemoryRedis(), AsyncMock(side_effect=fetch)
+    await run_var(cache, fetcher)
+    available["bars"] = history
+    incremental = await run_var(cache, fetcher)
+    since_sketch = (pd.Timestamp.now() - dates[-6]).days + 7  # a week of overlap with the sketched bars
+    assert [c.kwargs.get("period", "1y") for c in fetcher.await_args_list] == ["1y", f"{since_sketch}d"]
+    rebuilt = await run_var(InMemoryRedis(), AsyncMock(side_effect=fetch))
+    assert incremental["value"] == pytest.approx(rebuilt["value"], abs=0.01)
+    assert incremental["details"]["calculation_period_days"] == rebuilt["details"]["calculation_period_days"]
+
+    # A restated bar the sketch already holds rebuilds it from the full year
+    restated = history.copy()
+    restated.iloc[-1] *= 1.05
+    available["bars"] = restated
+    fetcher.reset_mock()
+    await run_var(cache, fetcher)
+    assert [c.kwargs.get("period", "1y") for c in fetcher.await_args_list][-1] == "1y"
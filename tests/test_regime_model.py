@@ -0,0 +1,91 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+from backend.config.settings import get_settings
+from backend.quant import regime
+from backend.quant.regime import RegimeModel, regime_features
+from backend.utils.price_frame import PriceFrame
+
+
+def _index_close(bars_per_phase=(400, 150, 400), seed=0):
+    rng = np.random.default_rng(seed)
+    volatility = np.concatenate([np.full(n, v) for n, v in zip(bars_per_phase, (0.006, 0.03, 0.012))])
+    return 100 * np.exp(np.cumsum(rng.normal(0.0003, volatility)))
+
+
+def test_numpy_probabilities_match_sklearn_and_survive_save(tmp_path):
+    from sklearn.mixture import GaussianMixture
+
+    features = regime_features(_index_close())
+    model = RegimeModel.fit(features)
+    assert model.labels == ("low_volatility", "normal", "high_volatility")
+    assert np.all(np.diff(model.means[:, 1]) > 0)  # ordered calmest first
+
+    reference = GaussianMixture(3, covariance_type="full", random_state=42, n_init=3).fit(features)
+    order = np.argsort(reference.means_[:, 1])
+    np.testing.assert_allclose(model.predict_proba(features), reference.predict_proba(features)[:, order], atol=1e-8)
+    assert model.predict([0.1, 0.08]) == "low_volatility"
+    assert model.predict([-0.5, 0.6]) == "high_volatility"
+
+    model.save(tmp_path / "regime.npz")
+    loaded = RegimeModel.load(tmp_path / "regime.npz")
+    np.testing.assert_array_equal(loaded.predict_proba(features), model.predict_proba(features))
+    assert loaded.current() == model.current()
+
+
+def test_warm_started_refit_converges_faster():
+    close = _index_close()
+    cold = RegimeModel.fit(regime_features(close[:-5]))
+    warm = RegimeModel.fit(regime_features(close), previous=cold)
+    assert warm.iterations < RegimeModel.fit(regime_features(close)).iterations
+    np.testing.assert_allclose(warm.means, cold.means, rtol=0.05, atol=0.02)
+
+
+@pytest.mark.asyncio
+async def test_shared_model_refits_only_when_the_index_has_new_bars(tmp_path, monkeypatch):
+    config = get_settings().agent_settings.regime_model
+    monkeypatch.setattr(config, "STATE_PATH", str(tmp_path / "regime.npz"))
+    monkeypatch.setattr(regime, "_model", None)
+    monkeypatch.setattr(regime, "_checked_at", None)
+    close = _index_close()
+    dates = pd.bdate_range("2020-01-01", periods=len(close))
+    frames = [PriceFrame.from_any(pd.Series(close[:-1], index=dates[:-1])),
+              PriceFrame.from_any(pd.Series(close[:-1], index=dates[:-1])),
+              PriceFrame.from_any(pd.Series(close, index=dates))]
+    fetch = AsyncMock(side_effect=frames)
+
+    with patch("backend.utils.data_provider.fetch_price_frame", fetch):
+        first = await regime.get_regime_model()
+        assert await regime.get_regime_model() is first and fetch.await_count == 1  # fresh: no fetch
+        assert await regime.get_regime_model(max_age=0) is first  # no new bars: no refit
+        refitted = await regime.get_regime_model(max_age=0)
+
+    assert refitted is not first and refitted.last_timestamp == dates[-1].to_datetime64()
+    monkeypatch.setattr(regime, "_model", None)
+    assert regime.RegimeModel.load(config.STATE_PATH).current() == refitted.current()
+
+
+@pytest.mark.asyncio
+async def test_ml_regime_agent_serves_the_fitted_model():
+    from backend.agents.ml.market_regime import run
+
+    model = RegimeModel.fit(regime_features(_index_close()))
+    with patch("backend.agents.ml.market_regime.get_regime_model", AsyncMock(return_value=model)):
+        result = await run("REGIME_TEST_SYMBOL")
+    expected = model.current()
+    assert result["verdict"] == f"REGIME_{expected['regime_index']}"
+    assert result["details"]["regime_label"] == expected["regime"]
+    assert result["confidence"] == pytest.approx(expected["probability"], abs=1e-4)
+
+
+
+def test_market_state_uses_the_signal_and_monitor_vocabulary():
+    model = RegimeModel.fit(regime_features(_index_close()))
+    assert model.market_state([0.1, 0.08]) == "normal"  # low volatility
+    assert model.market_state([0.2, 0.6]) == "stress"
+    assert model.market_state([-0.5, 0.6]) == "crisis"
+    assert model.market_state() in ("normal", "stress", "crisis")
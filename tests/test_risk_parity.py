@@ -0,0 +1,65 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+from backend.quant.covariance import CovarianceService
+from backend.quant.risk_parity import risk_parity_weights
+from backend.quant.strategies import QuantStrategies
+
+
+def _covariance(n, seed=0):
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.1, (n, 3))
+    return loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.09, n))
+
+
+def test_contributions_match_the_budget_and_the_old_slsqp_solution():
+    covariance = _covariance(8)
+    result = risk_parity_weights(covariance)
+    assert result.converged
+    assert result.weights.sum() == pytest.approx(1.0)
+    np.testing.assert_allclose(result.risk_contributions, np.full(8, 1 / 8), atol=1e-10)
+
+    def objective(weights):  # the formulation risk_parity_allocation used before
+        volatility = np.sqrt(weights @ covariance @ weights)
+        return np.sum((weights * (covariance @ weights) / volatility - volatility / 8) ** 2)
+
+    legacy = minimize(objective, np.full(8, 1 / 8), method="SLSQP", tol=1e-14,
+                      constraints=[{"type": "eq", "fun": lambda x: x.sum() - 1}, {"type": "ineq", "fun": lambda x: x}])
+    np.testing.assert_allclose(result.weights, legacy.x, atol=1e-5)
+
+    budget = np.array([4, 1, 1, 1, 1, 1, 1, 2], dtype=float)
+    budgeted = risk_parity_weights(covariance, budget=budget)
+    np.testing.assert_allclose(budgeted.risk_contributions, budget / budget.sum(), atol=1e-10)
+
+
+def test_warm_start_from_previous_allocation_needs_fewer_steps():
+    covariance = _covariance(200, seed=1)
+    cold = risk_parity_weights(covariance)
+    moved = covariance * 1.02
+    moved[:10, :10] *= 1.05
+    warm = risk_parity_weights(moved, x0=cold.weights)
+    assert warm.converged and warm.iterations < cold.iterations
+    np.testing.assert_allclose(warm.weights, risk_parity_weights(moved).weights, atol=1e-12)
+    with pytest.raises(ValueError):
+        risk_parity_weights(covariance, x0=cold.weights[:5])
+
+
+def test_strategy_allocation_uses_service_and_remembers_previous():
+    rng = np.random.default_rng(2)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (300, 4)) * [1, 2, 3, 4], columns=list("ABCD"))
+    allocation = QuantStrategies.risk_parity_allocation(returns)
+    assert list(allocation) == list("ABCD")
+    assert sum(allocation.values()) == pytest.approx(1.0)
+    assert allocation["A"] > allocation["B"] > allocation["C"] > allocation["D"]
+    assert QuantStrategies.risk_parity_allocation(returns) == pytest.approx(allocation)
+
+    service = CovarianceService(returns.columns)
+    for bar in returns.to_numpy():
+        service.update(bar)
+    shrunk = QuantStrategies.risk_parity_allocation(returns, covariance_service=service)
+    expected = risk_parity_weights(service.submatrix(list("ABCD"))).weights
+    np.testing.assert_allclose(list(shrunk.values()), expected, atol=1e-9)
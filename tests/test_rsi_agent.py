@@ -4,7 +4,6 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import pytest
 import pandas as pd
 import numpy as np
-import datetime # Add datetime import
 from unittest.mock import AsyncMock, patch, MagicMock
 # Import the agent's run function
 from backend.agents.technical.rsi_agent import run as rsi_run, agent_name # Import agent_name
@@ -13,35 +12,19 @@ from backend.agents.technical.rsi_agent import run as rsi_run, agent_name # Impo
 
 @pytest.mark.asyncio
 # Patch dependencies in reverse order
-# Patch datetime used by the agent
-@patch('backend.agents.technical.rsi_agent.datetime')
 @patch('backend.agents.decorators.get_tracker')
 @patch('backend.agents.decorators.get_redis_client', new_callable=AsyncMock)
-@patch('backend.agents.technical.rsi_agent.fetch_ohlcv_series', new_callable=AsyncMock)
+@patch('backend.agents.technical.rsi_agent.fetch_technical_ohlcv', new_callable=AsyncMock)
 @patch('backend.agents.base.get_redis_client', new_callable=AsyncMock)  # Patch for AgentBase
 async def test_rsi_agent_oversold(
     mock_base_get_redis_client, # New mock for base
     mock_fetch_ohlcv, # Renamed mock
     mock_get_redis_decorator, # Renamed to reflect it mocks the decorator's get_redis_client
-    mock_get_tracker,
-    mock_datetime_in_agent # This is the mock for 'backend.agents.technical.rsi_agent.datetime'
+    mock_get_tracker
 ):
     # --- Mock Configuration ---
     symbol = "TEST_RSI_OS"
     
-    # Use real datetime for test setup, but mock what the agent sees
-    real_datetime_date_class = datetime.date
-    real_datetime_timedelta_class = datetime.timedelta
-    mock_today_date_object = real_datetime_date_class(2025, 5, 2)
-
-    # Configure datetime.date.today() as seen by the agent
-    # The agent calls datetime.date.today()
-    mock_datetime_in_agent.date.today.return_value = mock_today_date_object
-
-    # Ensure timedelta and datetime.datetime are available if the agent uses them via the mocked datetime module
-    mock_datetime_in_agent.timedelta = real_datetime_timedelta_class
-    mock_datetime_in_agent.datetime = datetime.datetime # Assigns the actual datetime module to this attribute of the mock
-
     rsi_period = 14 # Default RSI period
     num_periods = rsi_period + 50 # Need enough data for calculation + stability
 
@@ -112,10 +95,7 @@ async def test_rsi_agent_oversold(
     assert result.get('error') is None
 
     # --- Verify Mocks ---
-    # Calculate expected dates based on mocked today
-    end_date = mock_today_date_object # Use the object used for mocking
-    start_date = end_date - real_datetime_timedelta_class(days=365) # Use real timedelta for test calculation
-    mock_fetch_ohlcv.assert_awaited_once_with(symbol, start_date=start_date, end_date=end_date) # Check symbol and date args
+    mock_fetch_ohlcv.assert_awaited_once_with(symbol) # The shared technical window
     mock_get_redis_decorator.assert_awaited_once() # Verify the factory function was awaited
     mock_base_get_redis_client.assert_awaited_once() # AgentBase's redis client factory
     
@@ -128,3 +108,41 @@ async def test_rsi_agent_oversold(
         mock_redis_instance.set.assert_not_awaited()
     mock_get_tracker.assert_called_once() # Tracker factory
     mock_tracker_instance.update_agent_status.assert_awaited_once() # Tracker update method
+
+
+@pytest.mark.asyncio
+@patch('backend.agents.decorators.get_tracker')
+@patch('backend.agents.decorators.get_redis_client', new_callable=AsyncMock)
+@patch('backend.agents.base.get_redis_client', new_callable=AsyncMock)
+async def test_rsi_agent_reads_the_cached_streaming_state(mock_base_get_redis_client, mock_get_redis_decorator, mock_get_tracker):
+    from backend.quant.streaming import StreamingIndicatorSet, save_streaming_indicators
+
+    mock_redis_instance = AsyncMock()
+    mock_redis_instance.get = AsyncMock(return_value=None)
+    mock_base_get_redis_client.return_value = mock_redis_instance
+    mock_get_redis_decorator.return_value = mock_redis_instance
+    mock_get_tracker.return_value = MagicMock(update_agent_status=AsyncMock())
+
+    rng = np.random.default_rng(5)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120)))
+    price_df = pd.DataFrame({'close': close}, index=pd.bdate_range('2025-01-01', periods=120))
+
+    store = {}
+    cache = AsyncMock()
+    cache.get.side_effect = lambda key: store.get(key)
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+    cache.set.side_effect = _set
+    # The scheduler's state stops two bars short of the agent's window
+    await save_streaming_indicators(cache, "TEST_RSI_STREAM", StreamingIndicatorSet.bootstrap(price_df.iloc[:-2]))
+
+    with patch('backend.agents.technical.rsi_agent.fetch_technical_ohlcv', AsyncMock(return_value=price_df)), \
+         patch('backend.agents.technical.rsi_agent.RSIAgent.get_market_context', AsyncMock(return_value={"regime": "NEUTRAL"})), \
+         patch('backend.utils.cache_utils.get_redis_client', AsyncMock(return_value=cache)), \
+         patch('backend.agents.technical.rsi_agent.get_indicators') as mock_get_indicators:
+        result = await rsi_run("TEST_RSI_STREAM")
+
+    mock_get_indicators.assert_not_called()
+    expected = StreamingIndicatorSet.bootstrap(price_df).snapshot()["rsi"]
+    assert result['value'] == pytest.approx(round(expected, 2))
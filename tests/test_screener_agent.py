@@ -0,0 +1,40 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.agents.automation.screener_agent import run as screen_run
+from backend.utils.price_panel import PricePanel
+
+
+def _trend(drift: float, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.01, 260)))
+    return pd.DataFrame({"high": close * 1.01, "low": close * 0.99, "close": close},
+                        index=pd.bdate_range("2025-01-01", periods=260))
+
+
+@pytest.mark.asyncio
+@patch('backend.agents.automation.screener_agent.tracker', new=MagicMock())
+@patch('backend.agents.automation.screener_agent.fetch_price_panel', new_callable=AsyncMock)
+@patch('backend.agents.automation.screener_agent.get_redis_client', new_callable=AsyncMock)
+async def test_screener_ranks_the_universe_from_one_panel(mock_get_redis_client, mock_fetch_panel):
+    mock_redis_instance = AsyncMock()
+    mock_redis_instance.get.return_value = None
+    mock_get_redis_client.return_value = mock_redis_instance
+    mock_fetch_panel.return_value = PricePanel.from_frames({
+        "RISER": _trend(0.004, 1), "FALLER": _trend(-0.004, 2), "FLAT": _trend(0.0, 3),
+    })
+
+    res = await screen_run(["RISER", "FALLER", "FLAT", "DELISTED"])
+
+    mock_fetch_panel.assert_awaited_once()
+    assert res["verdict"] == "COMPLETED"
+    ranked = res["details"]["ranked"]
+    assert [entry["symbol"] for entry in ranked][0] == "RISER"
+    assert ranked[-1]["symbol"] == "FALLER" and ranked[0]["verdict"] == "BUY"
+    assert res["details"]["skipped"] == ["DELISTED"]
+    assert set(ranked[0]["indicators"]) >= {"rsi", "adx", "momentum_126"}
+    mock_redis_instance.set.assert_awaited_once()
@@ -27,7 +27,7 @@ async def test_stochastic_agent(mock_get_redis_direct_agent, mock_get_redis_deco
 
     # Mock fetch_ohlcv_series correctly within the agent's module
     mock_fetch = AsyncMock(return_value=data_df)
-    monkeypatch.setattr('backend.agents.technical.stochastic_agent.fetch_ohlcv_series', mock_fetch)
+    monkeypatch.setattr('backend.agents.technical.stochastic_agent.fetch_technical_ohlcv', mock_fetch)
 
     # Mock for the direct call in stochastic_agent.run()
     # The existing 'mock_redis_instance' is now 'mock_redis_instance_agent'
@@ -0,0 +1,153 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+from backend.quant.indicators import IndicatorSet
+from backend.quant.streaming import (
+    StreamingIndicatorSet, advance_streaming_indicators, read_streaming_indicators, refresh_streaming_indicators,
+    snapshot_cache_key, state_cache_key,
+)
+from backend.utils.cache_codec import available_codecs, decode_cache_value, encode_cache_value
+from backend.utils.price_frame import PriceFrame
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(11)
+    n = 300
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "high": close * (1 + rng.uniform(0, 0.02, n)),
+        "low": close * (1 - rng.uniform(0, 0.02, n)),
+        "close": close,
+    }, index=pd.bdate_range("2024-01-01", periods=n))
+
+
+def _bar(row) -> dict:
+    return {"high": row.high, "low": row.low, "close": row.close}
+
+
+def test_streaming_matches_the_vectorized_engine_bar_for_bar(ohlcv):
+    indicators = IndicatorSet(PriceFrame.from_any(ohlcv))
+    expected = {
+        "rsi": indicators.rsi(14),
+        "macd": indicators.macd()["macd"],
+        "macd_signal": indicators.macd()["signal"],
+        "bollinger_upper": indicators.bollinger(20, 2.0)["upper"],
+        "atr": indicators.atr(14),
+        "stochastic_k": indicators.stochastic(14, 3)["k"],
+        "stochastic_d": indicators.stochastic(14, 3)["d"],
+    }
+    streaming = StreamingIndicatorSet()
+    for i, row in enumerate(ohlcv.itertuples()):
+        snapshot = streaming.update(_bar(row))
+        for name, values in expected.items():
+            value = snapshot[name]
+            if np.isnan(values[i]):
+                assert value is None, (name, i)
+            else:
+                assert value == pytest.approx(values[i], rel=1e-9, abs=1e-9), (name, i)
+
+
+def test_state_round_trips_through_the_cache_codec(ohlcv):
+    history, tail = ohlcv.iloc[:-5], ohlcv.iloc[-5:]
+    live = StreamingIndicatorSet.bootstrap(history)
+    for codec in [name for name, installed in available_codecs().items() if installed]:
+        raw = encode_cache_value(live.to_state(), codec=codec)
+        restored = StreamingIndicatorSet.from_state(decode_cache_value(raw))
+        assert restored.snapshot() == live.snapshot()
+
+    # A fresh set stays NaN-safe through the codec before any warm-up completes
+    early = StreamingIndicatorSet.from_state(decode_cache_value(encode_cache_value(StreamingIndicatorSet().to_state())))
+    assert early.snapshot()["rsi"] is None
+
+    forming = live.preview(_bar(next(tail.itertuples())))
+    assert live.bars == len(history)  # preview leaves the state alone
+    for row in tail.itertuples():
+        latest = live.update(_bar(row))
+    assert forming["rsi"] != latest["rsi"]
+    assert latest == StreamingIndicatorSet.bootstrap(ohlcv).snapshot()
+
+
+@pytest.mark.asyncio
+async def test_refresh_bootstraps_once_then_updates_from_cache(ohlcv):
+    store = {}
+    cache = AsyncMock()
+    cache.get.side_effect = lambda key: store.get(key)
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+    cache.set.side_effect = _set
+
+    history, last = ohlcv.iloc[:-1], _bar(next(ohlcv.iloc[-1:].itertuples()))
+    fetch = AsyncMock(return_value=PriceFrame.from_any(history))
+    with patch("backend.utils.data_provider.fetch_price_frame", fetch):
+        preview = await refresh_streaming_indicators(cache, "TCS", last, closed=False)
+        snapshot = await refresh_streaming_indicators(cache, "TCS", last)
+
+    fetch.assert_awaited_once()
+    assert preview == snapshot
+    assert decode_cache_value(store[state_cache_key("TCS")])["bars"] == len(ohlcv)
+
+
+@pytest.mark.asyncio
+async def test_advance_applies_each_completed_bar_once_and_previews_the_forming_one(ohlcv):
+    store = {}
+    cache = AsyncMock()
+    cache.get.side_effect = lambda key: store.get(key)
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+    cache.set.side_effect = _set
+
+    # The provider's full history already includes the session's forming bar
+    fetch = AsyncMock(return_value=PriceFrame.from_any(ohlcv.iloc[:-2]))
+    with patch("backend.utils.data_provider.fetch_price_frame", fetch):
+        intraday = await advance_streaming_indicators(cache, "TCS", ohlcv.iloc[-8:-2], forming=True)
+        expected = StreamingIndicatorSet.bootstrap(ohlcv.iloc[:-3]).preview(_bar(next(ohlcv.iloc[-3:-2].itertuples())))
+        assert intraday == expected
+
+        # Next pre-market: the forming bar has closed and one more session completed
+        closed = await advance_streaming_indicators(cache, "TCS", ohlcv.iloc[-7:-1])
+        again = await advance_streaming_indicators(cache, "TCS", ohlcv.iloc[-7:-1])
+
+    fetch.assert_awaited_once()
+    assert closed == again == StreamingIndicatorSet.bootstrap(ohlcv.iloc[:-1]).snapshot()
+    assert decode_cache_value(store[snapshot_cache_key("TCS")]) == closed
+
+
+@pytest.mark.asyncio
+async def test_agent_reads_seed_the_state_then_fold_new_bars_and_preview_today(ohlcv):
+    store = {}
+    cache = AsyncMock()
+    cache.get.side_effect = lambda key: store.get(key)
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+    cache.set.side_effect = _set
+
+    # A miss seeds the state from the agents' window and leaves the recompute to them
+    assert await read_streaming_indicators(cache, "TCS", ohlcv.iloc[:-3]) is None
+    assert decode_cache_value(store[state_cache_key("TCS")])["bars"] == len(ohlcv) - 3
+
+    # A later window folds in the two bars the state has not seen
+    snapshot = await read_streaming_indicators(cache, "TCS", ohlcv.iloc[:-1])
+    assert snapshot == StreamingIndicatorSet.bootstrap(ohlcv.iloc[:-1]).snapshot()
+    vectorized = IndicatorSet(PriceFrame.from_any(ohlcv.iloc[:-1]))
+    assert snapshot["rsi"] == pytest.approx(vectorized.rsi(14)[-1])
+    assert decode_cache_value(store[state_cache_key("TCS")])["bars"] == len(ohlcv) - 1
+
+    # A bar dated today is still forming: previewed, not stored
+    today = ohlcv.iloc[-1:].set_axis(pd.DatetimeIndex([pd.Timestamp.now().normalize()]))
+    forming = await read_streaming_indicators(cache, "TCS", pd.concat([ohlcv.iloc[:-1], today]))
+    assert forming == StreamingIndicatorSet.bootstrap(ohlcv).snapshot()
+    assert decode_cache_value(store[state_cache_key("TCS")])["bars"] == len(ohlcv) - 1
+
+    # Revised history at the stored bar is a miss, and the state is left alone
+    revised = ohlcv.iloc[:-1].copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] *= 1.05
+    assert await read_streaming_indicators(cache, "TCS", revised) is None
+    assert decode_cache_value(store[state_cache_key("TCS")])["bars"] == len(ohlcv) - 1
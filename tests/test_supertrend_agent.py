@@ -25,7 +25,7 @@ async def test_supertrend_agent(mock_get_tracker_arg, mock_get_redis_arg, monkey
 
     # Mock fetch_ohlcv_series within the agent's module
     mock_fetch = AsyncMock(return_value=prices)
-    monkeypatch.setattr('backend.agents.technical.supertrend_agent.fetch_ohlcv_series', mock_fetch)
+    monkeypatch.setattr('backend.agents.technical.supertrend_agent.fetch_technical_ohlcv', mock_fetch)
 
     # Mock get_market_context
     mock_market_context = AsyncMock(return_value={'volatility': 0.2, 'regime': 'NEUTRAL'})
@@ -30,7 +30,7 @@ async def test_volume_spike_agent(mock_get_tracker_arg, mock_get_redis_arg, monk
 
     # Mock fetch_ohlcv_series within the agent's module
     mock_fetch = AsyncMock(return_value=data_df)
-    monkeypatch.setattr('backend.agents.technical.volume_spike_agent.fetch_ohlcv_series', mock_fetch)
+    monkeypatch.setattr('backend.agents.technical.volume_spike_agent.fetch_technical_ohlcv', mock_fetch)
 
     # Mock get_market_context
     mock_market_context = AsyncMock(return_value={'regime': 'NEUTRAL'})
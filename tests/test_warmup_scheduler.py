@@ -0,0 +1,171 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import AsyncMock, patch
+from backend.db.base import Base
+from backend.db.models import Holding, Portfolio, Watchlist, WatchlistSymbol
+from backend.quant.streaming import StreamingIndicatorSet, snapshot_cache_key
+from backend.scheduler import BAR_CLOSE, PRE_MARKET, RateBudget, WarmupScheduler, collect_warmup_symbols, next_warmup
+from backend.utils.cache_codec import decode_cache_value
+from backend.utils.cache_utils import InMemoryRedis
+from backend.utils.price_frame import PriceFrame
+
+IST = ZoneInfo("Asia/Kolkata")
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        first, second = Watchlist(name="a"), Watchlist(name="b")
+        portfolio = Portfolio(name="p")
+        db.add_all([first, second, portfolio])
+        db.flush()
+        db.add_all([
+            WatchlistSymbol(watchlist_id=first.id, symbol="TCS"),
+            WatchlistSymbol(watchlist_id=second.id, symbol="tcs "),
+            WatchlistSymbol(watchlist_id=first.id, symbol="INFY"),
+            WatchlistSymbol(watchlist_id=second.id, symbol="HDFCBANK"),
+            Holding(portfolio_id=portfolio.id, symbol="INFY", quantity=1, purchase_price=1),
+            Holding(portfolio_id=portfolio.id, symbol="RELIANCE", quantity=1, purchase_price=1),
+        ])
+        db.commit()
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_symbols_are_unioned_and_ranked_by_popularity(session_factory):
+    with session_factory() as db:
+        ranked = await collect_warmup_symbols(db)
+    assert ranked == [("INFY", 2), ("TCS", 2), ("HDFCBANK", 1), ("RELIANCE", 1)]
+    with session_factory() as db:
+        assert [s for s, _ in await collect_warmup_symbols(db, limit=2)] == ["INFY", "TCS"]
+
+
+@pytest.mark.parametrize("now, expected, reason", [
+    (datetime(2026, 10, 16, 7, 0, tzinfo=IST), datetime(2026, 10, 16, 8, 30, tzinfo=IST), PRE_MARKET),
+    (datetime(2026, 10, 16, 9, 20, tzinfo=IST), datetime(2026, 10, 16, 9, 30, tzinfo=IST), BAR_CLOSE),
+    (datetime(2026, 10, 16, 15, 30, tzinfo=IST), datetime(2026, 10, 16, 15, 30, tzinfo=IST), BAR_CLOSE),
+    # Friday after the close rolls over the weekend to Monday's pre-market
+    (datetime(2026, 10, 16, 16, 0, tzinfo=IST), datetime(2026, 10, 19, 8, 30, tzinfo=IST), PRE_MARKET),
+])
+def test_next_warmup(now, expected, reason):
+    assert next_warmup(now) == (expected, reason)
+
+
+@pytest.mark.asyncio
+async def test_rate_budget_waits_for_refill():
+    clock = {"now": 0.0}
+
+    async def fake_sleep(seconds):
+        clock["now"] += seconds
+
+    budget = RateBudget(per_minute=6, clock=lambda: clock["now"], sleep=fake_sleep)
+    assert await budget.acquire(6) == 0
+    waited = await budget.acquire(2)
+    assert waited == pytest.approx(20.0)  # 6/min refills one call every 10s
+
+
+@pytest.mark.asyncio
+async def test_run_once_warms_popular_symbols_first_and_counts_failures(session_factory):
+    orchestrator = AsyncMock()
+    orchestrator.analyze_symbol.side_effect = lambda symbol, force_refresh, refresh_categories: (
+        {"error": "boom"} if symbol == "RELIANCE" else {"symbol": symbol}
+    )
+    data_service = AsyncMock()
+    scheduler = WarmupScheduler(
+        orchestrator=orchestrator, data_service=data_service, session_factory=session_factory,
+        budgets={"alpha_vantage": RateBudget(per_minute=1000)},
+    )
+    scheduler.settings = scheduler.settings.model_copy(update={"CONCURRENCY": 1})
+
+    with patch("backend.utils.data_provider.fetch_fundamentals_snapshot", AsyncMock()) as snapshot, \
+            patch.object(scheduler, "refresh_indicators", AsyncMock()) as indicators:
+        summary = await scheduler.run_once(PRE_MARKET)
+
+    assert summary == {"symbols": 4, "warmed": 3, "failed": 1}
+    assert [c.args[0] for c in orchestrator.analyze_symbol.call_args_list] == ["INFY", "TCS", "HDFCBANK", "RELIANCE"]
+    assert all(c.kwargs["force_refresh"] for c in orchestrator.analyze_symbol.call_args_list)
+    assert all(c.kwargs["refresh_categories"] is None for c in orchestrator.analyze_symbol.call_args_list)
+    assert snapshot.await_count == 4
+    data_service.get_market_data.assert_any_await(["INFY"])
+    indicators.assert_any_await("INFY", PRE_MARKET)
+
+    with patch("backend.utils.data_provider.fetch_fundamentals_snapshot", AsyncMock()) as snapshot, \
+            patch.object(scheduler, "refresh_indicators", AsyncMock()):
+        await scheduler.run_once(BAR_CLOSE)
+    snapshot.assert_not_awaited()
+    assert orchestrator.analyze_symbol.call_args.kwargs["refresh_categories"] == ["technical", "market", "risk"]
+
+
+@pytest.mark.asyncio
+async def test_passes_cover_only_what_the_budgets_finish_in_their_slot(session_factory):
+    scheduler = WarmupScheduler(orchestrator=AsyncMock(), data_service=AsyncMock(), session_factory=session_factory)
+    scheduler.settings = scheduler.settings.model_copy(update={"MAX_SYMBOLS": 500})
+    # 3 Alpha Vantage calls a minute over the 45-minute lead; 60 Yahoo calls over a 15-minute bar at 4 each
+    assert scheduler.symbol_capacity(PRE_MARKET) == 135
+    assert scheduler.symbol_capacity(BAR_CLOSE) == 225
+
+    clock = {"now": 0.0}
+
+    async def fake_sleep(seconds):
+        clock["now"] += seconds
+
+    scheduler.budgets = {"yahoo_finance": RateBudget(per_minute=1, clock=lambda: clock["now"], sleep=fake_sleep)}
+    scheduler.settings = scheduler.settings.model_copy(update={"BAR_MINUTES": 8, "CONCURRENCY": 1})
+    with patch.object(scheduler, "refresh_indicators", AsyncMock()):
+        summary = await scheduler.run_once(BAR_CLOSE)
+    assert summary["symbols"] == 2
+    assert [c.args[0] for c in scheduler._orchestrator.analyze_symbol.call_args_list] == ["INFY", "TCS"]
+
+
+@pytest.mark.asyncio
+async def test_bar_close_pass_advances_the_streaming_indicators():
+    rng = np.random.default_rng(5)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120)))
+    bars = pd.DataFrame({"close": close}, index=pd.bdate_range("2026-04-01", periods=120))
+    cache = InMemoryRedis()
+
+    async def fetch(symbol, source_preference=None, period="1y"):
+        return PriceFrame.from_any(bars.iloc[-5:] if period == "5d" else bars)
+
+    scheduler = WarmupScheduler(orchestrator=AsyncMock(), data_service=AsyncMock(),
+                                 budgets={"alpha_vantage": RateBudget(per_minute=1000)})
+    with patch("backend.utils.data_provider.fetch_price_frame", AsyncMock(side_effect=fetch)) as fetched, \
+            patch("backend.utils.cache_utils.get_redis_client", AsyncMock(return_value=cache)):
+        await scheduler.warm_symbol("TCS", BAR_CLOSE)
+        await scheduler.warm_symbol("TCS", BAR_CLOSE)
+
+    # One full-history bootstrap, then only the short window per pass
+    assert [c.kwargs.get("period", "1y") for c in fetched.await_args_list] == ["5d", "1y", "5d"]
+    snapshot = decode_cache_value(await cache.get(snapshot_cache_key("TCS")))
+    expected = StreamingIndicatorSet.bootstrap(bars.iloc[:-1]).preview({"close": close[-1]})
+    assert snapshot == expected
+
+
+@pytest.mark.asyncio
+async def test_scheduler_records_history_and_flushes_it_on_exit():
+    from backend.scheduler import main
+
+    writer = object()
+    with patch("backend.core.orchestrator.SystemOrchestrator") as orchestrator_cls, \
+            patch("backend.db.analysis_history.get_history_writer", return_value=writer):
+        orchestrator_cls.return_value.initialize = AsyncMock()
+        await WarmupScheduler(budgets={"alpha_vantage": RateBudget(per_minute=1000)})._get_orchestrator()
+    assert orchestrator_cls.call_args.kwargs["history_writer"] is writer
+
+    with patch.object(WarmupScheduler, "run_once", AsyncMock(side_effect=RuntimeError("boom"))), \
+            patch("backend.db.analysis_history.close_history_writer", AsyncMock()) as close:
+        with pytest.raises(RuntimeError):
+            await main(once=True)
+    close.assert_awaited_once()